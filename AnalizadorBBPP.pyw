@@ -17,6 +17,10 @@ ROOT_DIR = Path(__file__).parent
 sys.path.insert(0, str(ROOT_DIR))
 
 if __name__ == "__main__":
+    # Necesario para los procesos de reportes en el ejecutable (PyInstaller)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # Importar y ejecutar la aplicación
     from src.ui.main_window import MainWindow
     app = MainWindow()
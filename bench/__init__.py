@@ -0,0 +1,3 @@
+"""
+Herramientas de rendimiento: proyectos sintéticos y benchmarks
+"""
@@ -0,0 +1,243 @@
+"""
+Comparador de rendimiento contra líneas base versionadas
+Compara un documento de resultados de run_benchmarks con bench/baselines.json
+y marca como regresión cada fase cuya mediana (o pico de memoria) supere la
+línea base en más de la tolerancia configurada. Las diferencias absolutas por
+debajo del umbral de ruido se ignoran para no fallar por fases de pocos ms.
+
+Uso:
+    python -m bench.compare                       # medir y comparar (exit 1 si hay regresión)
+    python -m bench.compare --current bench.json  # comparar resultados ya medidos
+    python -m bench.compare --update-baseline     # medir y guardar como nueva línea base
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Permitir ejecución directa (python bench/compare.py)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+# Línea base versionada junto al código
+BASELINE_FILE = Path(__file__).parent / 'baselines.json'
+
+# Tolerancias por defecto (0.5 = hasta un 50% más lento / más memoria)
+DEFAULT_TIME_TOLERANCE = 0.5
+DEFAULT_MEMORY_TOLERANCE = 0.5
+
+# Umbrales de ruido: diferencias absolutas menores no cuentan como regresión
+DEFAULT_TIME_NOISE_MS = 5.0
+DEFAULT_MEMORY_NOISE_KB = 256
+
+# Repeticiones por defecto para la mediana
+DEFAULT_REPEAT = 5
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Optional[Dict]:
+    """
+    Cargar la línea base
+
+    Args:
+        path: Archivo JSON de línea base
+
+    Returns:
+        Documento de línea base o None si no existe
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_baseline(document: Dict) -> Dict:
+    """
+    Reducir un documento de run_benchmarks a la línea base (mediana y memoria por fase)
+
+    Args:
+        document: Resultado de run_benchmarks()
+
+    Returns:
+        Documento de línea base con claves '<tamaño>/<fase>'
+    """
+    benchmarks = {}
+    for entry in document.get('results', []):
+        for stage, metrics in entry.get('stages', {}).items():
+            if 'skipped' in metrics:
+                continue
+            benchmarks[f"{entry['size']}/{stage}"] = {
+                'median_s': metrics['median'],
+                'peak_memory_kb': metrics.get('peak_memory_kb'),
+            }
+    return {
+        'schema_version': document.get('schema_version'),
+        'app_version': document.get('app_version'),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': document.get('environment', {}),
+        'config': document.get('config', {}),
+        'benchmarks': benchmarks,
+    }
+
+
+def save_baseline(document: Dict, path: Path = BASELINE_FILE) -> Path:
+    """
+    Guardar un documento de run_benchmarks como nueva línea base
+
+    Args:
+        document: Resultado de run_benchmarks()
+        path: Archivo destino
+
+    Returns:
+        Ruta del archivo guardado
+    """
+    path = Path(path)
+    path.write_text(json.dumps(build_baseline(document), indent=2, ensure_ascii=False) + '\n',
+                    encoding='utf-8')
+    return path
+
+
+def _check_metric(name: str, metric: str, base: Optional[float], current: Optional[float],
+                  tolerance: float, noise: float) -> Optional[Dict]:
+    """Comparar una métrica; None si alguno de los valores no está disponible"""
+    if base is None or current is None:
+        return None
+    ratio = current / base if base else None
+    delta = current - base
+    if delta > noise and (ratio is None or ratio > 1 + tolerance):
+        status = 'regression'
+    elif -delta > noise and ratio is not None and ratio < 1 / (1 + tolerance):
+        status = 'improvement'
+    else:
+        status = 'ok'
+    return {
+        'benchmark': name,
+        'metric': metric,
+        'baseline': base,
+        'current': current,
+        'ratio': round(ratio, 3) if ratio is not None else None,
+        'status': status,
+    }
+
+
+def compare(document: Dict, baseline: Dict,
+            time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+            memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+            time_noise_ms: float = DEFAULT_TIME_NOISE_MS,
+            memory_noise_kb: float = DEFAULT_MEMORY_NOISE_KB) -> List[Dict]:
+    """
+    Comparar resultados actuales con la línea base
+
+    Args:
+        document: Resultado de run_benchmarks()
+        baseline: Línea base (load_baseline / build_baseline)
+        time_tolerance: Incremento relativo de la mediana permitido
+        memory_tolerance: Incremento relativo del pico de memoria permitido
+        time_noise_ms: Diferencia absoluta de tiempo (ms) que se considera ruido
+        memory_noise_kb: Diferencia absoluta de memoria (KB) que se considera ruido
+
+    Returns:
+        Lista de comparaciones con status 'ok', 'regression', 'improvement' o 'new'
+    """
+    current = build_baseline(document)['benchmarks']
+    base_benchmarks = baseline.get('benchmarks', {})
+    comparisons = []
+    for name in sorted(current):
+        if name not in base_benchmarks:
+            comparisons.append({'benchmark': name, 'metric': 'median_s', 'baseline': None,
+                                'current': current[name]['median_s'], 'ratio': None, 'status': 'new'})
+            continue
+        base = base_benchmarks[name]
+        checks = [
+            _check_metric(name, 'median_s', base.get('median_s'), current[name]['median_s'],
+                          time_tolerance, time_noise_ms / 1000),
+            _check_metric(name, 'peak_memory_kb', base.get('peak_memory_kb'),
+                          current[name].get('peak_memory_kb'), memory_tolerance, memory_noise_kb),
+        ]
+        comparisons.extend(c for c in checks if c is not None)
+    return comparisons
+
+
+def regressions(comparisons: List[Dict]) -> List[Dict]:
+    """Filtrar las comparaciones marcadas como regresión"""
+    return [c for c in comparisons if c['status'] == 'regression']
+
+
+def format_comparison(comparisons: List[Dict]) -> str:
+    """Tabla de texto con el resultado de la comparación"""
+    markers = {'ok': '  ', 'regression': '❌', 'improvement': '✅', 'new': '🆕'}
+    lines = []
+    for c in comparisons:
+        ratio = f"x{c['ratio']:.2f}" if c['ratio'] is not None else '-'
+        base = c['baseline'] if c['baseline'] is not None else '-'
+        lines.append(f"{markers[c['status']]} {c['benchmark']:<28} {c['metric']:<15} "
+                     f"{base!s:>12} -> {c['current']!s:>12}  {ratio}")
+    return '\n'.join(lines)
+
+
+def _env_float(name: str, default: float) -> float:
+    """Leer una tolerancia numérica desde variable de entorno"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def main(argv: List[str] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    from bench.run_benchmarks import run_benchmarks
+
+    parser = argparse.ArgumentParser(description='Comparar benchmarks con la línea base')
+    parser.add_argument('--current', type=Path, help='JSON de run_benchmarks ya medido')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help='Archivo de línea base')
+    parser.add_argument('--sizes', nargs='+', help='Tamaños a medir (por defecto los de la línea base)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Repeticiones (mediana de N)')
+    parser.add_argument('--tolerance', type=float,
+                        default=_env_float('BBPP_PERF_TOLERANCE', DEFAULT_TIME_TOLERANCE),
+                        help='Incremento relativo de tiempo permitido (0.5 = 50%%)')
+    parser.add_argument('--memory-tolerance', type=float,
+                        default=_env_float('BBPP_PERF_MEMORY_TOLERANCE', DEFAULT_MEMORY_TOLERANCE),
+                        help='Incremento relativo de memoria permitido')
+    parser.add_argument('--noise-ms', type=float, default=DEFAULT_TIME_NOISE_MS,
+                        help='Diferencia de tiempo (ms) considerada ruido')
+    parser.add_argument('--update-baseline', action='store_true', help='Guardar la medición como línea base')
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+
+    if args.current:
+        document = json.loads(args.current.read_text(encoding='utf-8'))
+    else:
+        sizes = args.sizes
+        if not sizes and baseline:
+            sizes = sorted({name.split('/')[0] for name in baseline.get('benchmarks', {})})
+        document = run_benchmarks(sizes=sizes or ['small'], repeat=args.repeat)
+
+    if args.update_baseline:
+        path = save_baseline(document, args.baseline)
+        print(f"OK: Línea base actualizada en {path}")
+        return 0
+
+    if baseline is None:
+        print(f"ERROR: No existe línea base en {args.baseline}. Usa --update-baseline para crearla.")
+        return 2
+
+    comparisons = compare(document, baseline, time_tolerance=args.tolerance,
+                          memory_tolerance=args.memory_tolerance, time_noise_ms=args.noise_ms)
+    print(format_comparison(comparisons))
+
+    found = regressions(comparisons)
+    if found:
+        print(f"\nERROR: {len(found)} regresión(es) de rendimiento respecto a la línea base "
+              f"(v{baseline.get('app_version')})")
+        return 1
+    print("\nOK: Sin regresiones de rendimiento")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
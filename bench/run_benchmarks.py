@@ -0,0 +1,333 @@
+"""
+Banco de pruebas de rendimiento por fases
+Mide por separado cada fase del pipeline (parseo, análisis, estadísticas,
+score, persistencia y reportes) sobre proyectos sintéticos de varios
+tamaños y escribe los resultados en JSON para comparar entre versiones.
+
+Cada fase se cronometra `repeat` veces (mediana y extremos) y, en una
+pasada adicional con tracemalloc activo, se mide el pico de memoria Python
+de cada fase. Las escrituras (BD y reportes) van a carpetas temporales.
+
+Uso:
+    python -m bench.run_benchmarks --sizes small medium --repeat 3
+    python -m bench.run_benchmarks --sizes large --output output/bench.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Permitir ejecución directa (python bench/run_benchmarks.py)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import SIZES, generate_project
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+# Versión del formato del JSON de resultados
+SCHEMA_VERSION = 1
+
+# Fases medidas, en orden de ejecución
+STAGES = [
+    'parse',           # XamlParser.parse de todos los XAML
+    'analyze',         # BBPPAnalyzer.analyze por archivo + proyecto + grafo de invocaciones
+    'statistics',      # ProjectScanner._calculate_statistics
+    'score',           # ProjectScanner._calculate_score
+    'save_analysis',   # MetricsDatabase.save_analysis (BD temporal)
+    'html_normal',     # HTMLReportGenerator.generate (normal)
+    'html_detallado',  # HTMLReportGenerator.generate (detallado)
+    'excel',           # ExcelReportGenerator.generate (si openpyxl está disponible)
+]
+
+
+class _PipelineRun:
+    """Estado de una ejecución completa del pipeline sobre un proyecto"""
+
+    def __init__(self, project_path: Path, work_dir: Path, active_sets: List[str]):
+        from src.project_scanner import ProjectScanner
+
+        self.work_dir = work_dir
+        self.scanner = ProjectScanner(project_path, active_sets=active_sets)
+        self.parsed = []
+        self.stats = None
+        self.score_result = None
+        self.result = None
+
+    def parse(self):
+        from src.xaml_parser import XamlParser
+
+        scanner = self.scanner
+        scanner.project_info = scanner._detect_project_info()
+        scanner.xaml_files = scanner._find_xaml_files()
+        self.parsed = [(f, XamlParser(f).parse()) for f in scanner.xaml_files]
+
+    def analyze(self):
+        from src.analyzer import BBPPAnalyzer
+        from src.rules_manager import get_rules_manager
+
+        scanner = self.scanner
+        rules = get_rules_manager().get_active_rules(scanner.active_sets)
+        scanner.naming_cache.clear()
+        scanner.analyzer = BBPPAnalyzer(scanner.config, rules=rules, active_sets=scanner.active_sets,
+                                        naming_cache=scanner.naming_cache)
+        scanner.parsed_files = []
+        scanner.file_findings = {}
+        for xaml_file, parsed_data in self.parsed:
+            if 'error' in parsed_data:
+                continue
+            scanner.parsed_files.append(parsed_data)
+            scanner.file_findings[str(xaml_file)] = list(scanner.analyzer.analyze(parsed_data))
+        scanner.project_findings = list(scanner.analyzer.analyze_project(scanner.project_info))
+        scanner._build_invocation_graph()
+        scanner.all_findings = scanner._collect_findings()
+
+    def statistics(self):
+        self.stats = self.scanner._calculate_statistics()
+
+    def score(self):
+        self.score_result = self.scanner._calculate_score(self.stats)
+
+    def build_result(self):
+        """Resultado completo para las fases de persistencia y reportes (no se cronometra)"""
+        self.result = self.scanner._build_result()
+
+    def save_analysis(self):
+        from src.database.metrics_db import MetricsDatabase
+
+        db = MetricsDatabase(self.work_dir / 'metrics.db')
+        try:
+            db.save_analysis(self.result)
+        finally:
+            db.close()
+
+    def html_normal(self):
+        from src.report_generator import HTMLReportGenerator
+
+        HTMLReportGenerator(self.result, output_path=self.work_dir / 'report_normal.html',
+                            report_type='normal').generate()
+
+    def html_detallado(self):
+        from src.report_generator import HTMLReportGenerator
+
+        HTMLReportGenerator(self.result, output_path=self.work_dir / 'report_detallado.html',
+                            report_type='detallado').generate()
+
+    def excel(self):
+        from src.excel_report_generator import ExcelReportGenerator
+
+        ExcelReportGenerator(self.result, output_path=self.work_dir / 'report.xlsx').generate()
+
+
+def _available_stages(stages: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Determinar qué fases pueden ejecutarse en este entorno
+
+    Returns:
+        Diccionario {fase: motivo de omisión o None si se ejecuta}
+    """
+    from src.excel_report_generator import OPENPYXL_AVAILABLE
+
+    skipped = {}
+    for stage in stages:
+        skipped[stage] = None
+        if stage == 'excel' and not OPENPYXL_AVAILABLE:
+            skipped[stage] = 'openpyxl no disponible'
+    return skipped
+
+
+def _run_pipeline(project_path: Path, stages: List[str], active_sets: List[str],
+                  measure: Callable[[str, Callable], None]) -> _PipelineRun:
+    """Ejecutar las fases en orden delegando la medición en `measure`"""
+    with tempfile.TemporaryDirectory(prefix='bbpp_bench_') as tmp:
+        run = _PipelineRun(project_path, Path(tmp), active_sets)
+        for stage in STAGES:
+            if stage in stages:
+                measure(stage, getattr(run, stage))
+            elif stage in ('parse', 'analyze', 'statistics', 'score'):
+                getattr(run, stage)()  # Prerrequisito de fases posteriores
+            if stage == 'score':
+                run.build_result()
+        return run
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """Pico de memoria residente del proceso en KB (None si no es medible)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa en bytes; Linux en KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def benchmark_project(project_path: Path, stages: List[str] = None, repeat: int = 3,
+                      active_sets: List[str] = None, memory: bool = True) -> Dict:
+    """
+    Medir las fases del pipeline sobre un proyecto
+
+    Args:
+        project_path: Proyecto UiPath a analizar
+        stages: Fases a medir (por defecto todas)
+        repeat: Número de repeticiones cronometradas
+        active_sets: Conjuntos de reglas activos
+        memory: Medir el pico de memoria por fase (pasada extra con tracemalloc)
+
+    Returns:
+        Diccionario {'stages': {fase: métricas}, 'xaml_files', 'findings', 'peak_rss_kb'}
+    """
+    stages = list(stages or STAGES)
+    active_sets = active_sets if active_sets is not None else ['UiPath', 'NTTData']
+    skipped = _available_stages(stages)
+    runnable = [s for s in stages if not skipped[s]]
+
+    samples = {stage: [] for stage in runnable}
+
+    def timed(stage, func):
+        start = time.perf_counter()
+        func()
+        samples[stage].append(time.perf_counter() - start)
+
+    last_run = None
+    for _ in range(max(1, repeat)):
+        last_run = _run_pipeline(project_path, runnable, active_sets, timed)
+
+    peaks = {}
+    if memory:
+        def traced(stage, func):
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            else:
+                # Python 3.8 (sin reset_peak): reiniciar la traza pone el pico a cero
+                tracemalloc.stop()
+                tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks[stage] = max(0, tracemalloc.get_traced_memory()[1] - base) // 1024
+
+        tracemalloc.start()
+        try:
+            _run_pipeline(project_path, runnable, active_sets, traced)
+        finally:
+            tracemalloc.stop()
+
+    stage_results = {}
+    for stage in stages:
+        if skipped[stage]:
+            stage_results[stage] = {'skipped': skipped[stage]}
+            continue
+        values = samples[stage]
+        stage_results[stage] = {
+            'samples': [round(v, 6) for v in values],
+            'median': round(statistics.median(values), 6),
+            'min': round(min(values), 6),
+            'max': round(max(values), 6),
+            'peak_memory_kb': peaks.get(stage),
+        }
+
+    return {
+        'xaml_files': len(last_run.scanner.xaml_files),
+        'activities': sum(len(p.get('activities', [])) for p in last_run.scanner.parsed_files),
+        'findings': len(last_run.scanner.all_findings),
+        'stages': stage_results,
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+
+
+def run_benchmarks(sizes: List[str] = None, repeat: int = 3, seed: int = 42,
+                   stages: List[str] = None, memory: bool = True) -> Dict:
+    """
+    Generar los proyectos sintéticos de cada tamaño y medirlos
+
+    Args:
+        sizes: Tamaños de SIZES a medir (por defecto small y medium)
+        repeat: Repeticiones cronometradas por tamaño
+        seed: Semilla del generador de proyectos
+        stages: Fases a medir (por defecto todas)
+        memory: Medir el pico de memoria por fase
+
+    Returns:
+        Documento de resultados serializable a JSON
+    """
+    from src.config import APP_VERSION
+
+    sizes = list(sizes or ['small', 'medium'])
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bbpp_bench_projects_') as tmp:
+        for size in sizes:
+            files, activities = SIZES[size]
+            manifest = generate_project(Path(tmp) / size, files=files, activities=activities, seed=seed)
+            print(f"Midiendo tamaño '{size}' ({files} workflows, ~{activities} actividades)...")
+            measured = benchmark_project(Path(manifest['project_path']), stages=stages,
+                                         repeat=repeat, memory=memory)
+            results.append({'size': size, 'files': files, 'target_activities': activities, **measured})
+
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'app_version': APP_VERSION,
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'config': {'repeat': repeat, 'seed': seed, 'memory': memory},
+        'results': results,
+    }
+
+
+def format_summary(document: Dict) -> str:
+    """Tabla de texto con la mediana (ms) y pico de memoria (KB) por fase y tamaño"""
+    lines = []
+    for entry in document.get('results', []):
+        lines.append(f"\n[{entry['size']}] {entry['xaml_files']} XAML, "
+                     f"{entry['activities']} actividades, {entry['findings']} hallazgos")
+        for stage, metrics in entry['stages'].items():
+            if 'skipped' in metrics:
+                lines.append(f"   {stage:<16} omitida ({metrics['skipped']})")
+                continue
+            peak = metrics.get('peak_memory_kb')
+            peak_text = f"{peak:>10} KB" if peak is not None else ''
+            lines.append(f"   {stage:<16} {metrics['median'] * 1000:>10.1f} ms{peak_text}")
+    return '\n'.join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description='Benchmarks por fase del Analizador BBPP')
+    parser.add_argument('--sizes', nargs='+', choices=sorted(SIZES), default=['small', 'medium'],
+                        help='Tamaños de proyecto sintético')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por tamaño')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, help='Fases a medir (por defecto todas)')
+    parser.add_argument('--no-memory', action='store_true', help='No medir el pico de memoria por fase')
+    parser.add_argument('--output', type=Path, help='Archivo JSON de resultados')
+    args = parser.parse_args(argv)
+
+    document = run_benchmarks(sizes=args.sizes, repeat=args.repeat, seed=args.seed,
+                              stages=args.stages, memory=not args.no_memory)
+    print(format_summary(document))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(document, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\nOK: Resultados guardados en {args.output}")
+    else:
+        print(json.dumps(document, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+Generador determinista de proyectos UiPath sintéticos
+Produce proyectos realistas (estructura REFramework, project.json con
+dependencias, StateMachine, Ifs anidados, bloques CommentOut, LogMessage,
+TryCatch y violaciones de nomenclatura) parametrizados por tamaño y semilla.
+Es la carga de trabajo compartida para las pruebas de rendimiento.
+
+Uso:
+    python -m bench.synthetic_project output/synthetic --files 200 --activities 10000 --seed 42
+    python -m bench.synthetic_project output/synthetic --size large
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import quoteattr
+
+
+# Tamaños predefinidos: (número de workflows, actividades totales aproximadas)
+SIZES = {
+    'small': (25, 1000),
+    'medium': (200, 10000),
+    'large': (1000, 50000),
+}
+
+# Workflows del framework (además de Main.xaml)
+FRAMEWORK_FILES = [
+    'Framework/InitAllSettings.xaml',
+    'Framework/InitAllApplications.xaml',
+    'Framework/GetTransactionData.xaml',
+    'Framework/Process.xaml',
+    'Framework/SetTransactionStatus.xaml',
+    'Framework/CloseAllApplications.xaml',
+    'Framework/KillAllProcesses.xaml',
+]
+
+DEPENDENCIES = {
+    'UiPath.Excel.Activities': '[2.22.3]',
+    'UiPath.Mail.Activities': '[1.23.1]',
+    'UiPath.System.Activities': '[23.10.3]',
+    'UiPath.Testing.Activities': '[23.10.0]',
+    'UiPath.UIAutomation.Activities': '[23.10.3]',
+}
+
+MODULES = ['Login', 'Invoices', 'Customers', 'Reports', 'Orders', 'Payments', 'Utils', 'Mail']
+VERBS = ['Read', 'Validate', 'Process', 'Update', 'Extract', 'Send', 'Build', 'Check']
+NOUNS = ['Invoice', 'Customer', 'Order', 'Report', 'Payment', 'Record', 'Ticket', 'Account']
+
+# Nombres de variables: válidos y con violaciones (PascalCase, snake_case, genéricos)
+GOOD_VARIABLES = ['customerName', 'invoiceTotal', 'orderId', 'rowIndex', 'filePath',
+                  'retryCount', 'reportDate', 'accountNumber', 'isValid', 'mailSubject']
+BAD_VARIABLES = ['CustomerName', 'invoice_total', 'temp', 'var1', 'data', 'result',
+                 'ORDERID', 'Value2', 'str', 'item']
+UI_ACTIVITIES = ['Click', 'TypeInto', 'GetText', 'ElementExists']
+
+NAMESPACES = (
+    'xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" '
+    'xmlns:ui="http://schemas.uipath.com/workflow/activities" '
+    'xmlns:sap2010="http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation" '
+    'xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml"'
+)
+
+
+class _WorkflowBuilder:
+    """Construye el XML de un workflow contando las actividades emitidas"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.activities = 0
+        self.ids = 0
+
+    def _name(self, kind: str) -> str:
+        self.ids += 1
+        return f'{kind} {self.ids}'
+
+    def activity(self, tag: str, kind: str, attrs: str = '', body: str = '') -> str:
+        """Emitir una actividad con DisplayName (cuenta como actividad)"""
+        self.activities += 1
+        display = quoteattr(self._name(kind))
+        if body:
+            return f'<{tag} DisplayName={display}{attrs}>{body}</{tag}>'
+        return f'<{tag} DisplayName={display}{attrs} />'
+
+    def log(self, variable: str) -> str:
+        message = quoteattr(f'["Procesando " + {variable}.ToString]')
+        return self.activity('ui:LogMessage', 'Log Message', f' Level="Info" Message={message}')
+
+    def assign(self, variable: str) -> str:
+        body = (f'<Assign.To><OutArgument x:TypeArguments="x:String">[{variable}]</OutArgument></Assign.To>'
+                f'<Assign.Value><InArgument x:TypeArguments="x:String">[{variable}.Trim]</InArgument></Assign.Value>')
+        return self.activity('Assign', 'Assign', body=body)
+
+    def ui_activity(self) -> str:
+        kind = self.rng.choice(UI_ACTIVITIES)
+        selector = quoteattr("<html app='chrome.exe' /><webctrl tag='INPUT' idx='%d' />" % self.rng.randint(1, 9))
+        return self.activity(f'ui:{kind}', kind, f' Selector={selector}')
+
+    def sequence(self, children: List[str], kind: str = 'Sequence') -> str:
+        return self.activity('Sequence', kind, body=''.join(children))
+
+    def nested_ifs(self, depth: int, variable: str) -> str:
+        """Cadena de Ifs anidados de la profundidad indicada"""
+        inner = self.log(variable)
+        for _ in range(depth):
+            condition = quoteattr(f'[{variable}.Length > {self.rng.randint(0, 20)}]')
+            inner = self.activity('If', 'If', f' Condition={condition}',
+                                  body=f'<If.Then>{inner}</If.Then>')
+        return inner
+
+    def try_catch(self, children: List[str], empty_catch: bool) -> str:
+        catch_body = '' if empty_catch else self.log('exception')
+        body = (f'<TryCatch.Try>{self.sequence(children, "Try")}</TryCatch.Try>'
+                '<TryCatch.Catches><Catch x:TypeArguments="x:Exception">'
+                '<ActivityAction x:TypeArguments="x:Exception">'
+                '<ActivityAction.Argument><DelegateInArgument x:TypeArguments="x:Exception" Name="exception" />'
+                f'</ActivityAction.Argument>{catch_body}</ActivityAction></Catch></TryCatch.Catches>')
+        return self.activity('TryCatch', 'Try Catch', body=body)
+
+    def comment_out(self, children: List[str]) -> str:
+        body = f'<ui:CommentOut.Body>{self.sequence(children, "Ignored Activities")}</ui:CommentOut.Body>'
+        return self.activity('ui:CommentOut', 'Comment Out', body=body)
+
+    def for_each(self, children: List[str]) -> str:
+        body = ('<ui:ForEach.Body><ActivityAction x:TypeArguments="x:Object">'
+                f'{self.sequence(children, "Body")}</ActivityAction></ui:ForEach.Body>')
+        return self.activity('ui:ForEach', 'For Each', ' x:TypeArguments="x:Object" Values="[items]"', body=body)
+
+    def invoke(self, workflow: str, protected: bool) -> str:
+        invoke = self.activity('ui:InvokeWorkflowFile', 'Invoke Workflow File',
+                               f' WorkflowFileName={quoteattr(workflow.replace("/", chr(92)))}')
+        return self.try_catch([invoke], empty_catch=False) if protected else invoke
+
+
+def _variables_xml(variables: List[Tuple[str, str]]) -> str:
+    return ''.join(f'<Variable x:TypeArguments="{vtype}" Name={quoteattr(name)} />' for name, vtype in variables)
+
+
+def _members_xml(arguments: List[Tuple[str, str, str]]) -> str:
+    if not arguments:
+        return ''
+    props = ''.join(
+        f'<x:Property Name={quoteattr(name)} Type="{direction}Argument(x:String)"'
+        + (f' sap2010:Annotation.AnnotationText={quoteattr(annotation)}' if annotation else '')
+        + ' />'
+        for name, direction, annotation in arguments
+    )
+    return f'<x:Members>{props}</x:Members>'
+
+
+def _document(class_name: str, arguments: List[Tuple[str, str, str]], root: str) -> str:
+    return ('<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<Activity mc:Ignorable="sap2010" x:Class={quoteattr(class_name)} {NAMESPACES} '
+            'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">\n'
+            f'  {_members_xml(arguments)}\n  {root}\n</Activity>\n')
+
+
+def _business_workflow(rng: random.Random, class_name: str, budget: int, invokes: List[str]) -> str:
+    """Workflow de negocio con una mezcla realista de actividades hasta agotar el presupuesto"""
+    builder = _WorkflowBuilder(rng)
+
+    variables = []
+    for _ in range(rng.randint(3, 8)):
+        pool = BAD_VARIABLES if rng.random() < 0.3 else GOOD_VARIABLES
+        name = rng.choice(pool)
+        if name not in [v[0] for v in variables]:
+            variables.append((name, 'x:String'))
+    used = [name for name, _ in variables[:max(1, len(variables) - 1)]]  # La última suele quedar sin uso
+
+    arguments = []
+    for direction, prefix in (('In', 'in_'), ('Out', 'out_'), ('InOut', 'io_')):
+        if rng.random() < 0.7:
+            noun = rng.choice(NOUNS)
+            name = f'{prefix}{noun}' if rng.random() < 0.85 else noun  # Algunos sin prefijo
+            annotation = f'{noun} de entrada del proceso' if rng.random() < 0.6 else ''
+            arguments.append((name, direction, annotation))
+    used.extend(name for name, _, _ in arguments)
+
+    children = [builder.log(rng.choice(used))]
+    pending_invokes = list(invokes)
+    while builder.activities < budget - 2 or pending_invokes:
+        if pending_invokes and rng.random() < 0.3:
+            children.append(builder.invoke(pending_invokes.pop(0), protected=rng.random() < 0.7))
+            continue
+        choice = rng.random()
+        variable = rng.choice(used)
+        if choice < 0.25:
+            children.append(builder.assign(variable))
+        elif choice < 0.40:
+            children.append(builder.log(variable))
+        elif choice < 0.55:
+            children.append(builder.nested_ifs(rng.randint(1, 6), variable))
+        elif choice < 0.70:
+            children.append(builder.try_catch([builder.ui_activity() for _ in range(rng.randint(1, 3))],
+                                              empty_catch=rng.random() < 0.2))
+        elif choice < 0.80:
+            children.append(builder.ui_activity())
+        elif choice < 0.90:
+            children.append(builder.for_each([builder.assign(variable), builder.log(variable)]))
+        else:
+            children.append(builder.comment_out([builder.assign(variable) for _ in range(rng.randint(1, 4))]))
+    children.append(builder.log(rng.choice(used)))
+
+    root = ('<Sequence DisplayName="Main Sequence">'
+            f'<Sequence.Variables>{_variables_xml(variables)}</Sequence.Variables>'
+            f'{"".join(children)}</Sequence>')
+    return _document(class_name, arguments, root)
+
+
+def _main_state_machine() -> str:
+    """Main.xaml con StateMachine al estilo REFramework"""
+    builder = _WorkflowBuilder(random.Random(0))
+
+    def state(name: str, invokes: List[str], final: bool = False) -> str:
+        entry = builder.sequence([builder.invoke(w, protected=True) for w in invokes], f'{name} Entry')
+        attrs = ' IsFinal="True"' if final else ''
+        return builder.activity('State', name, attrs, body=f'<State.Entry>{entry}</State.Entry>')
+
+    states = ''.join([
+        state('Initialization', ['Framework/InitAllSettings.xaml', 'Framework/KillAllProcesses.xaml',
+                                 'Framework/InitAllApplications.xaml']),
+        state('Get Transaction Data', ['Framework/GetTransactionData.xaml']),
+        state('Process Transaction', ['Framework/Process.xaml', 'Framework/SetTransactionStatus.xaml']),
+        state('End Process', ['Framework/CloseAllApplications.xaml'], final=True),
+    ])
+    variables = _variables_xml([('Config', 'scg:Dictionary(x:String, x:Object)'),
+                                ('TransactionItem', 'ui:QueueItem'),
+                                ('TransactionNumber', 'x:Int32')])
+    root = (f'<StateMachine DisplayName="Main"><StateMachine.Variables>{variables}'
+            f'</StateMachine.Variables>{states}</StateMachine>')
+    return _document('Main', [], root)
+
+
+def generate_project(output_dir: Path, files: int = 25, activities: int = 1000, seed: int = 42,
+                     name: str = None) -> Dict:
+    """
+    Generar un proyecto sintético determinista
+
+    Args:
+        output_dir: Carpeta destino (se crea si no existe)
+        files: Número total de workflows (mínimo 1 + framework)
+        activities: Número total aproximado de actividades
+        seed: Semilla del generador (misma semilla => mismos bytes)
+        name: Nombre del proyecto (por defecto derivado de la semilla)
+
+    Returns:
+        Manifiesto con la lista de archivos generados y parámetros
+    """
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    name = name or f'SYN_{seed % 1000:03d}_SyntheticProject'
+    business_count = max(1, files - 1 - len(FRAMEWORK_FILES))
+    workflow_files = list(FRAMEWORK_FILES)
+    business = []
+    for i in range(business_count):
+        module = MODULES[i % len(MODULES)]
+        business.append(f'Workflows/{module}/{rng.choice(VERBS)}{rng.choice(NOUNS)}_{i:04d}.xaml')
+    workflow_files.extend(business)
+
+    # Árbol de invocaciones: Process invoca los primeros, cada workflow invoca
+    # a los siguientes; ~5% quedan huérfanos (no alcanzables desde Main)
+    orphans = set(rng.sample(range(business_count), k=business_count // 20)) if business_count >= 20 else set()
+    reachable = [i for i in range(business_count) if i not in orphans]
+    invokes_by_file = {path: [] for path in workflow_files}
+    if reachable:
+        invokes_by_file['Framework/Process.xaml'].append(business[reachable[0]])
+    for pos, i in enumerate(reachable[1:], start=1):
+        parent = reachable[rng.randrange(pos)]
+        invokes_by_file[business[parent]].append(business[i])
+
+    per_file = max(5, activities // max(1, len(workflow_files) + 1))
+    written = {}
+    written['Main.xaml'] = _main_state_machine()
+    for path in workflow_files:
+        class_name = Path(path).stem
+        written[path] = _business_workflow(rng, class_name, per_file, invokes_by_file[path])
+
+    for rel_path, content in written.items():
+        target = output_dir / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding='utf-8', newline='\n')
+
+    project_json = {
+        'name': name,
+        'projectId': f'00000000-0000-4000-8000-{seed:012d}',
+        'description': 'Proyecto sintético para pruebas de rendimiento',
+        'main': 'Main.xaml',
+        'dependencies': DEPENDENCIES,
+        'schemaVersion': '4.0',
+        'studioVersion': '23.10.3.0',
+        'projectVersion': '1.0.0',
+        'runtimeOptions': {'isAttended': False, 'requiresUserInteraction': True},
+        'designOptions': {'projectProfile': 'Developement', 'outputType': 'Process',
+                          'fileInfoCollection': []},
+        'entryPoints': [{'filePath': 'Main.xaml', 'uniqueId': f'00000000-0000-4000-9000-{seed:012d}',
+                         'input': [], 'output': []}],
+        'expressionLanguage': 'VisualBasic',
+        'targetFramework': 'Windows',
+    }
+    (output_dir / 'project.json').write_text(json.dumps(project_json, indent=2) + '\n',
+                                             encoding='utf-8', newline='\n')
+
+    return {
+        'project_path': str(output_dir),
+        'name': name,
+        'seed': seed,
+        'files': sorted(written),
+        'orphans': sorted(business[i] for i in orphans),
+        'activities_per_file': per_file,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description='Generador de proyectos UiPath sintéticos')
+    parser.add_argument('output', help='Carpeta destino')
+    parser.add_argument('--size', choices=sorted(SIZES), help='Tamaño predefinido')
+    parser.add_argument('--files', type=int, default=25, help='Número de workflows')
+    parser.add_argument('--activities', type=int, default=1000, help='Actividades totales aproximadas')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla del generador')
+    args = parser.parse_args(argv)
+
+    files, activities = SIZES[args.size] if args.size else (args.files, args.activities)
+    manifest = generate_project(Path(args.output), files=files, activities=activities, seed=args.seed)
+    print(f"OK: Proyecto sintético generado en {manifest['project_path']} "
+          f"({len(manifest['files'])} workflows, ~{manifest['activities_per_file']} actividades/workflow)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,6 +16,10 @@ ROOT_DIR = Path(__file__).parent
 sys.path.insert(0, str(ROOT_DIR))
 
 if __name__ == "__main__":
+    # Necesario para los procesos de reportes en el ejecutable (PyInstaller)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     print("=" * 60)
     print("  Analizador de Buenas Prácticas para UiPath")
     print("  Versión 1.2.0")
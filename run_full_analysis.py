@@ -1,6 +1,8 @@
 
 import sys
 import os
+import argparse
+import copy
 from pathlib import Path
 
 # Add src to path
@@ -8,43 +10,116 @@ sys.path.append(os.getcwd())
 
 from src.project_scanner import ProjectScanner
 from src.report_generator import HTMLReportGenerator
+from src.config import DEFAULT_CONFIG
 
-def run_analysis():
-    project_path = Path(os.getcwd()) / "dummy_project"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless analysis of a UiPath project")
+    parser.add_argument("project", nargs="?", default=str(Path(os.getcwd()) / "dummy_project"),
+                        help="Path to the UiPath project (default: ./dummy_project)")
+    parser.add_argument("--sets", nargs="+", default=['UiPath', 'NTTData'],
+                        help="BBPP sets to apply")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile scan and report generation (cProfile + collapsed stacks)")
+    parser.add_argument("--profile-dir", type=Path, default=None,
+                        help="Output folder for profiles (default: output/profiles)")
+    parser.add_argument("--sample-interval", type=float, default=None,
+                        help="Stack sampling interval in seconds (0 disables per-file sampling)")
+    parser.add_argument("--memory-budget", type=float, default=0,
+                        help="Traced Python memory budget in MB; when exceeded the scan switches to low-memory mode")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Snapshot tracemalloc between phases and print the top allocators")
+    parser.add_argument("--aggregate", action="store_true",
+                        help="Emit one finding per (rule, file) for naming rules, with full detail in a sidecar file")
+    parser.add_argument("--baseline-file", default=None,
+                        help="Accepted-findings baseline (default: bbpp-baseline.json in the project)")
+    parser.add_argument("--update-baseline", choices=['file', 'db'], default=None,
+                        help="Accept the current findings as the new baseline")
+    parser.add_argument("--fail-on-new", action="store_true",
+                        help="Exit with status 1 if there are findings not in the baseline")
+    return parser.parse_args(argv)
+
+
+def run_analysis(args):
+    project_path = Path(args.project)
     print(f"Analyzing project at: {project_path}")
-    
+
     # Initialize scanner
-    scanner = ProjectScanner(project_path, active_sets=['UiPath', 'NTTData'])
-    
-    # Run scan
-    print("Scanning...")
-    results = scanner.scan()
-    
-    if not results['success']:
-        print(f"Analysis failed: {results.get('error')}")
-        return
-        
-    print("Analysis complete.")
-    
-    # Print findings
-    print("\nFindings:")
-    for finding in results.get('findings', []):
-        print(f"[{finding['severity'].upper()}] {finding['rule_id']}: {finding['description']} - {finding['location']}")
-        if finding.get('details'):
-            print(f"  Details: {finding['details']}")
-    print("\n")
-    
-    # Generate report
-    print("Generating HTML report...")
-    generator = HTMLReportGenerator(results)
-    report_path = generator.generate()
-    
-    print(f"Report generated at: {report_path}")
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config['memory']['budget_mb'] = args.memory_budget
+    config['memory']['accounting'] = args.memory_report
+    config['aggregation']['enabled'] = args.aggregate
+    if args.baseline_file:
+        config['baseline']['file'] = args.baseline_file
+    scanner = ProjectScanner(project_path, config=config, active_sets=args.sets)
+
+    profiler = None
+    if args.profile:
+        from src.profiler import AnalysisProfiler, DEFAULT_SAMPLE_INTERVAL
+        interval = DEFAULT_SAMPLE_INTERVAL if args.sample_interval is None else args.sample_interval
+        profiler = AnalysisProfiler(label=project_path.name, output_dir=args.profile_dir,
+                                    sample_interval=interval)
+        scanner.profiler = profiler
+        profiler.start()
+
+    try:
+        # Run scan
+        print("Scanning...")
+        results = scanner.scan()
+
+        if not results['success']:
+            print(f"Analysis failed: {results.get('error')}")
+            return 2
+
+        print("Analysis complete.")
+
+        if args.memory_report and scanner.memory is not None:
+            print("\nMemory by phase:")
+            print(scanner.memory.format_report())
+
+        # Print findings
+        print("\nFindings:")
+        for finding in results.get('findings', []):
+            print(f"[{finding['severity'].upper()}] {finding['rule_id']}: {finding['description']} - {finding['location']}")
+            if finding.get('details'):
+                print(f"  Details: {finding['details']}")
+        print("\n")
+
+        # Generate report
+        print("Generating HTML report...")
+        generator = HTMLReportGenerator(results)
+        report_path = generator.generate()
+
+        print(f"Report generated at: {report_path}")
+
+        if args.update_baseline:
+            scanner.save_baseline(results, target=args.update_baseline)
+            return 0
+
+        baseline = results.get('baseline')
+        if baseline:
+            print(f"Baseline ({baseline['source']}): {baseline['new']} new, "
+                  f"{baseline['suppressed']} accepted, {baseline['fixed']} fixed")
+        if args.fail_on_new:
+            new_findings = baseline['new'] if baseline else results['statistics']['total_findings']
+            if new_findings:
+                print(f"ERROR: {new_findings} new finding(s)")
+                return 1
+        return 0
+    finally:
+        if profiler is not None:
+            output_files = profiler.stop()
+            print("\nProfile written:")
+            for kind, path in output_files.items():
+                print(f"  {kind}: {path}")
+            for name, samples, seconds in profiler.slowest_files(5):
+                print(f"  ~{seconds:.3f}s  {name}")
 
 if __name__ == "__main__":
     try:
-        run_analysis()
+        sys.exit(run_analysis(parse_args()))
     except Exception as e:
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
+        sys.exit(2)
@@ -0,0 +1,126 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Clasificadores precompilados para tipos de actividad y nombres
+Se construyen una vez al cargar el conjunto de reglas y memorizan el
+resultado por cada string de tipo distinto.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Pattern
+
+
+def _compile_alternation(patterns: Iterable[str]) -> Optional[Pattern]:
+    """
+    Compilar una lista de subcadenas literales en una única regex de alternancia
+
+    Args:
+        patterns: Subcadenas a buscar
+
+    Returns:
+        Regex compilada o None si la lista está vacía
+    """
+    literals = sorted({p for p in patterns if p}, key=len, reverse=True)
+    if not literals:
+        return None
+    return re.compile('|'.join(re.escape(p) for p in literals))
+
+
+class ActivityMatcher:
+    """
+    Clasifica tipos de actividad en grupos con nombre (ej: 'critical', 'invoke').
+
+    Un tipo pertenece a un grupo si contiene alguna de las subcadenas del grupo
+    (misma semántica que `any(p in activity_type for p in patrones)`).
+    La clasificación de cada tipo distinto se calcula una sola vez.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """
+        Args:
+            groups: Diccionario {nombre_grupo: lista de subcadenas}
+        """
+        self._exact = {}
+        self._regex = {}
+        for name, patterns in groups.items():
+            patterns = list(patterns or [])
+            self._exact[name] = frozenset(patterns)
+            self._regex[name] = _compile_alternation(patterns)
+        self._cache: Dict[str, FrozenSet[str]] = {}
+
+    def classify(self, activity_type: str) -> FrozenSet[str]:
+        """
+        Obtener los grupos a los que pertenece un tipo de actividad
+
+        Args:
+            activity_type: Tipo de actividad (tag sin namespace)
+
+        Returns:
+            Conjunto inmutable con los nombres de grupo
+        """
+        groups = self._cache.get(activity_type)
+        if groups is None:
+            groups = frozenset(
+                name for name, exact in self._exact.items()
+                if activity_type in exact
+                or (self._regex[name] is not None and self._regex[name].search(activity_type))
+            )
+            self._cache[activity_type] = groups
+        return groups
+
+    def matches(self, activity_type: str, group: str) -> bool:
+        """Verificar si un tipo de actividad pertenece a un grupo"""
+        return group in self.classify(activity_type)
+
+    def cache_size(self) -> int:
+        """Número de tipos distintos clasificados"""
+        return len(self._cache)
+
+
+class NameMatcher:
+    """
+    Detecta nombres genéricos: nombres exactos prohibidos (frozenset en
+    minúsculas) y patrones regex combinados en una única alternancia.
+    """
+
+    def __init__(self, forbidden_names: Iterable[str] = None, generic_patterns: Iterable[str] = None):
+        """
+        Args:
+            forbidden_names: Nombres exactos prohibidos (sin distinguir mayúsculas)
+            generic_patterns: Patrones regex (se aplican con re.match sobre el nombre en minúsculas)
+        """
+        self.forbidden = frozenset(name.lower() for name in (forbidden_names or []))
+        self.patterns = [p for p in (generic_patterns or []) if p]
+        self._combined = None
+        self._compiled = []
+        if self.patterns:
+            try:
+                self._combined = re.compile('|'.join(f'(?:{p})' for p in self.patterns))
+            except re.error:
+                # Patrones con flags inline u otras construcciones no combinables
+                self._compiled = [re.compile(p) for p in self.patterns]
+
+    def __bool__(self) -> bool:
+        return bool(self.forbidden or self.patterns)
+
+    def check(self, name: str) -> Optional[str]:
+        """
+        Verificar si un nombre es genérico
+
+        Args:
+            name: Nombre de la variable
+
+        Returns:
+            Motivo si es genérico, None si no lo es
+        """
+        lowered = name.lower()
+        if lowered in self.forbidden:
+            return 'Nombre genérico exacto'
+        if self._combined is not None:
+            if self._combined.match(lowered):
+                return 'Nombre genérico con número'
+        elif any(p.match(lowered) for p in self._compiled):
+            return 'Nombre genérico con número'
+        return None
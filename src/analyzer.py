@@ -8,15 +8,61 @@ Aplica reglas de BBPP al código XAML parseado
 VERSIÓN 0.2 - Reglas desde JSON
 """
 
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from pathlib import Path
+import copy
 import re
+import time
 from src.config import (
     SEVERITY_ERROR, SEVERITY_WARNING, SEVERITY_INFO,
     PATTERN_CAMEL_CASE, PATTERN_PASCAL_CASE,
     PATTERN_GENERIC_VARIABLE_NAME, GENERIC_NAMES,
     get_active_rules
 )
+from src.xaml_parser import CTX_IN_TRY, CTX_COMMENTED
+from src.activity_matcher import ActivityMatcher, NameMatcher
+from src.naming_cache import NamingCache
+from src.timing import TimingRecorder, SPAN_RULE
+from src.finding_aggregation import AGGREGATED_CHECKS, DEFAULT_MAX_SAMPLES, aggregate_findings
+
+
+# Actividades críticas por defecto (ESTRUCTURA_003)
+DEFAULT_CRITICAL_ACTIVITIES = [
+    'InvokeWorkflowFile', 'InvokeMethod', 'InvokeCode',
+    'ReadRange', 'WriteRange', 'OpenBrowser', 'Click',
+    'TypeInto', 'GetText'
+]
+
+# Actividades que requieren timeout explícito por defecto (RENDIMIENTO_001)
+DEFAULT_TIMEOUT_ACTIVITIES = ['Click', 'TypeInto', 'GetText', 'ElementExists', 'Find']
+
+# Verificaciones por XAML, en orden de aplicación: (método, recibe lista de reglas)
+FILE_CHECKS = [
+    # Reglas de nomenclatura
+    ('_check_variable_naming', True),
+    ('_check_variable_naming_pascal', True),  # Nueva regla PascalCase
+    ('_check_generic_names', True),
+    ('_check_argument_prefixes', True),
+    ('_check_argument_descriptions', True),
+    # Reglas de estructura y complejidad
+    ('_check_nested_ifs', True),
+    ('_check_empty_catch', True),
+    # ELIMINADO: _check_sequence_size - Duplicado de _check_long_sequences
+    # Reglas de calidad de código
+    ('_check_commented_code', True),
+    ('_check_unused_variables', True),
+    ('_check_unused_arguments', True),
+    ('_check_missing_logs', True),
+    ('_check_init_end_pattern', False),
+    # Reglas organizadas por categoría
+    ('_check_critical_activities_in_try_catch', True),
+    ('_check_orchestrator_assets', True),
+    ('_check_invoke_workflow_usage', True),
+    ('_check_explicit_timeouts', True),
+    ('_check_stable_selectors', True),
+    ('_check_adequate_logging', True),
+    # ELIMINADO: _check_version_control - Regla eliminada
+]
 
 
 class Finding:
@@ -46,12 +92,33 @@ class Finding:
             'details': self.details,
             'penalty': self.penalty
         }
+    
+    @property
+    def occurrences(self) -> int:
+        """Número de casos que representa (mayor que 1 en hallazgos agregados)"""
+        return self.details.get('occurrences', 1) if self.details.get('aggregated') else 1
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Finding':
+        """Reconstruir un hallazgo desde to_dict()"""
+        return cls(
+            category=data.get('category', ''),
+            severity=data.get('severity', ''),
+            rule_name=data.get('rule_name', ''),
+            description=data.get('description', ''),
+            file_path=data.get('file_path', ''),
+            location=data.get('location', ''),
+            details=data.get('details'),
+            rule_id=data.get('rule_id', ''),
+            penalty=data.get('penalty', 0)
+        )
 
 
 class BBPPAnalyzer:
     """Analizador de Buenas Prácticas para UiPath - v0.3 con RulesManager"""
     
-    def __init__(self, config: Dict = None, rules: List[Dict] = None, active_sets: List[str] = None):
+    def __init__(self, config: Dict = None, rules: List[Dict] = None, active_sets: List[str] = None,
+                 naming_cache: NamingCache = None, timings: TimingRecorder = None):
         """
         Inicializar analizador con configuración
         
@@ -59,12 +126,22 @@ class BBPPAnalyzer:
             config: Diccionario con configuración de umbrales y validaciones
             rules: Lista de reglas a aplicar (si None, carga desde RulesManager)
             active_sets: Lista de conjuntos activos (ej: ['UiPath', 'NTTData'])
+            naming_cache: Caché LRU de nomenclatura compartida durante el escaneo
+            timings: Registro de tiempos por regla (opcional; sin él no se mide)
         """
         # Importar rules_manager
         from src.rules_manager import get_rules_manager
 
         self.rules_manager = get_rules_manager()
         self.config = config or {}
+        self.naming_cache = naming_cache if naming_cache is not None else NamingCache()
+        self.timings = timings
+        
+        # Agregación en origen de reglas de alta cardinalidad (un hallazgo por regla y archivo)
+        aggregation = self.config.get('aggregation', {}) if isinstance(self.config, dict) else {}
+        self.aggregate = aggregation.get('enabled', False)
+        self.max_samples = aggregation.get('max_samples', DEFAULT_MAX_SAMPLES)
+        self.detail_sidecar = None  # FindingSidecar con el detalle completo (lo asigna el escáner)
 
         # Si no se especifican conjuntos activos, usar todos los conjuntos habilitados
         if active_sets is None:
@@ -90,6 +167,43 @@ class BBPPAnalyzer:
                 self.rules_by_type[rule_type] = []
             self.rules_by_type[rule_type].append(rule)
         
+        # Clasificadores precompilados (una vez por conjunto de reglas)
+        self._build_matchers()
+        
+    def _build_matchers(self):
+        """
+        Precompilar las listas de tipos de actividad y nombres genéricos de las
+        reglas activas. La clasificación por tipo de actividad queda memorizada.
+        """
+        critical_rule = next((r for r in self.rules if r.get('id') == 'ESTRUCTURA_003'), None)
+        timeout_rule = next((r for r in self.rules if r.get('id') == 'RENDIMIENTO_001'), None)
+        critical = (critical_rule or {}).get('parameters', {}).get('critical_activities', [])
+        timeout = (timeout_rule or {}).get('parameters', {}).get('timeout_required_activities', [])
+        
+        self.activity_matcher = ActivityMatcher({
+            'critical': critical or DEFAULT_CRITICAL_ACTIVITIES,
+            'timeout': timeout or DEFAULT_TIMEOUT_ACTIVITIES,
+            'invoke': ['InvokeWorkflowFile'],
+            'comment_out': ['CommentOut'],
+            'log': ['LogMessage'],
+            'state': ['State'],
+        })
+        
+        # Un NameMatcher por regla con nombres/patrones genéricos
+        self._name_matchers = {}
+        for rule in self.rules:
+            self._get_name_matcher(rule)
+    
+    def _get_name_matcher(self, rule: Dict) -> NameMatcher:
+        """Obtener (o compilar y guardar) el NameMatcher de una regla"""
+        entry = self._name_matchers.get(id(rule))
+        if entry is None or entry[0] is not rule:
+            params = rule.get('parameters', {})
+            matcher = NameMatcher(params.get('forbidden_names', []), params.get('generic_patterns', []))
+            entry = (rule, matcher)
+            self._name_matchers[id(rule)] = entry
+        return entry[1]
+    
     def analyze(self, parsed_xaml: Dict) -> List[Finding]:
         """
         Analizar un XAML parseado y retornar lista de hallazgos
@@ -117,46 +231,100 @@ class BBPPAnalyzer:
         Returns:
             Lista de hallazgos
         """
+        # Hallazgos solo del proyecto (no arrastrar los del último XAML analizado)
+        self.findings = []
+
         # Usar conjuntos activos del constructor
         # Verificar dependencias
-        self._check_dependencies(project_info, self.active_sets)
+        self._run_check('_check_dependencies', project_info, self.active_sets)
 
         # Verificar que use actividades modernas
-        self._check_modern_activities(project_info)
+        self._run_check('_check_modern_activities', project_info)
 
         # Verificar nomenclatura del nombre del proyecto
-        self._check_project_name(project_info)
+        self._run_check('_check_project_name', project_info)
 
         return self.findings
     
+    def evaluate_rule(self, rule: Dict, parsed_files: Iterable[Dict],
+                      project_info: Dict = None) -> List[Finding]:
+        """
+        Evaluar una sola regla sobre XAML ya parseados (sin reescanear)
+
+        Permite previsualizar el efecto de editar un umbral: la regla se pasa
+        con sus parámetros modificados y el resto de reglas no se ejecutan.
+
+        Args:
+            rule: Regla a evaluar (puede ser una copia editada)
+            parsed_files: parsed_data completos de los XAML
+            project_info: Información del project.json (para reglas de proyecto)
+
+        Returns:
+            Hallazgos de la regla
+        """
+        single = BBPPAnalyzer(self.config, rules=[rule], active_sets=self.active_sets,
+                              naming_cache=self.naming_cache)
+        findings = []
+        for data in parsed_files:
+            findings.extend(single.analyze(data))
+        if project_info is not None:
+            # Las verificaciones de proyecto enriquecen project_info y la de
+            # dependencias usa una regla virtual: copia y solo los de esta regla
+            findings.extend(f for f in single.analyze_project(copy.deepcopy(project_info))
+                            if f.rule_id == rule.get('id'))
+        return findings
+
+    def _get_rule_parameter(self, rule: Dict, param_name: str):
+        """
+        Valor de un parámetro leído de la propia regla (o del RulesManager si no lo define)
+
+        Args:
+            rule: Regla en evaluación
+            param_name: Nombre del parámetro
+
+        Returns:
+            Valor del parámetro o None si no existe
+        """
+        parameters = rule.get('parameters') or {}
+        if param_name not in parameters:
+            return self.rules_manager.get_rule_parameter(rule['id'], param_name)
+        param = parameters[param_name]
+        if isinstance(param, dict) and 'value' in param:
+            return param.get('value')
+        return param
+
     def _apply_rules(self, data: Dict):
         """Aplicar todas las reglas habilitadas al XAML"""
+        for method_name, with_rules in FILE_CHECKS:
+            if with_rules:
+                self._run_check(method_name, data, self.rules)
+            else:
+                self._run_check(method_name, data)
+    
+    def _run_check(self, method_name: str, *args):
+        """
+        Ejecutar un método _check_*, midiendo su duración y hallazgos si hay registro de tiempos
+        y agregando sus hallazgos por regla si es de alta cardinalidad y la agregación está activa
         
-        # Reglas de nomenclatura
-        self._check_variable_naming(data, self.rules)
-        self._check_variable_naming_pascal(data, self.rules)  # Nueva regla PascalCase
-        self._check_generic_names(data, self.rules)
-        self._check_argument_prefixes(data, self.rules)
-        self._check_argument_descriptions(data, self.rules)
-        
-        # Reglas de estructura y complejidad
-        self._check_nested_ifs(data, self.rules)
-        self._check_empty_catch(data, self.rules)
-        # ELIMINADO: self._check_sequence_size - Duplicado de _check_long_sequences
-        
-        # Reglas de calidad de código
-        self._check_commented_code(data, self.rules)
-        self._check_missing_logs(data, self.rules)
-        self._check_init_end_pattern(data)
-        
-        # Reglas organizadas por categoría
-        self._check_critical_activities_in_try_catch(data, self.rules)
-        self._check_orchestrator_assets(data, self.rules)
-        self._check_invoke_workflow_usage(data, self.rules)
-        self._check_explicit_timeouts(data, self.rules)
-        self._check_stable_selectors(data, self.rules)
-        self._check_adequate_logging(data, self.rules)
-        # ELIMINADO: self._check_version_control - Regla eliminada
+        Args:
+            method_name: Nombre del método de verificación
+            *args: Argumentos del método
+        """
+        check = getattr(self, method_name)
+        aggregate = self.aggregate and method_name in AGGREGATED_CHECKS
+        if self.timings is None and not aggregate:
+            check(*args)
+            return
+        
+        before = len(self.findings)
+        start = time.perf_counter()
+        check(*args)
+        if aggregate and len(self.findings) - before > 1:
+            self.findings[before:] = aggregate_findings(self.findings[before:], self.max_samples,
+                                                        self.detail_sidecar)
+        if self.timings is not None:
+            self.timings.add(SPAN_RULE, method_name, time.perf_counter() - start,
+                             findings=len(self.findings) - before)
     
     def _add_finding(self, rule: Dict, file_path: str, location: str, 
                      details: Dict = None, count: int = 1):
@@ -171,10 +339,7 @@ class BBPPAnalyzer:
             count: Número de casos encontrados (para penalty_mode individual)
         """
         # Obtener penalty_mode de la regla
-        penalty_mode = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'penalty_mode'
-        ) or 'total'
+        penalty_mode = self._get_rule_parameter(rule, 'penalty_mode') or 'total'
         
         # Calcular penalización según el modo
         base_penalty = rule.get('penalty', 0)
@@ -278,6 +443,11 @@ class BBPPAnalyzer:
                 )
     
     def _is_camel_case(self, name: str) -> bool:
+        """Verificar si un nombre sigue el patrón camelCase (memorizado)"""
+        return self.naming_cache.get_or_compute('is_camel', name, self._compute_is_camel_case)
+    
+    @staticmethod
+    def _compute_is_camel_case(name: str) -> bool:
         """Verificar si un nombre sigue el patrón camelCase"""
         if not name:
             return False
@@ -302,6 +472,11 @@ class BBPPAnalyzer:
         return True
     
     def _to_camel_case(self, name: str) -> str:
+        """Convertir un nombre a camelCase (sugerencia memorizada)"""
+        return self.naming_cache.get_or_compute('to_camel', name, self._compute_to_camel_case)
+    
+    @staticmethod
+    def _compute_to_camel_case(name: str) -> str:
         """Convertir un nombre a camelCase (sugerencia)"""
         # Si empieza con mayúscula, convertir primera letra a minúscula
         if name and name[0].isupper():
@@ -315,6 +490,11 @@ class BBPPAnalyzer:
         return name
     
     def _is_pascal_case(self, name: str) -> bool:
+        """Verificar si un nombre sigue el patrón PascalCase (memorizado)"""
+        return self.naming_cache.get_or_compute('is_pascal', name, self._compute_is_pascal_case)
+    
+    @staticmethod
+    def _compute_is_pascal_case(name: str) -> bool:
         """Verificar si un nombre sigue el patrón PascalCase"""
         if not name:
             return False
@@ -334,6 +514,11 @@ class BBPPAnalyzer:
         return True
     
     def _to_pascal_case(self, name: str) -> str:
+        """Convertir un nombre a PascalCase (sugerencia memorizada)"""
+        return self.naming_cache.get_or_compute('to_pascal', name, self._compute_to_pascal_case)
+    
+    @staticmethod
+    def _compute_to_pascal_case(name: str) -> str:
         """Convertir un nombre a PascalCase (sugerencia)"""
         # Si empieza con minúscula, convertir primera letra a mayúscula
         if name and name[0].islower():
@@ -414,15 +599,13 @@ class BBPPAnalyzer:
         file_path = data.get('file_path', '')
 
         for rule in rules:
-            params = rule.get('parameters', {})
-            forbidden_names = params.get('forbidden_names', [])
-            generic_patterns = params.get('generic_patterns', [])
+            # Nombres exactos (frozenset) y patrones (regex única) precompilados
+            matcher = self._get_name_matcher(rule)
+            if not matcher:
+                continue
             
             # NUEVO: Obtener excepciones del REFramework
-            exceptions = params.get('exceptions', [])
-
-            if not forbidden_names and not generic_patterns:
-                continue
+            exceptions = frozenset(rule.get('parameters', {}).get('exceptions', []))
 
             for var in data.get('variables', []):
                 var_name = var.get('name', '')
@@ -431,25 +614,9 @@ class BBPPAnalyzer:
                 if var_name in exceptions:
                     continue  # Saltar validación
                 
-                var_name = var_name.lower()
-                is_generic = False
-                reason = ''
-
-                # 1. Verificar nombres exactos
-                if forbidden_names and var_name in [name.lower() for name in forbidden_names]:
-                    is_generic = True
-                    reason = 'Nombre genérico exacto'
-
-                # 2. Verificar patrones configurables
-                if not is_generic and generic_patterns:
-                    import re
-                    for pattern in generic_patterns:
-                        if re.match(pattern, var_name):
-                            is_generic = True
-                            reason = 'Nombre genérico con número'
-                            break
+                reason = matcher.check(var_name)
 
-                if is_generic:
+                if reason:
                     self._add_finding(
                         rule=rule,
                         file_path=file_path,
@@ -692,10 +859,7 @@ class BBPPAnalyzer:
         file_path = data.get('file_path', '')
         
         # Obtener parámetro configurable
-        max_activities = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'max_activities'
-        )
+        max_activities = self._get_rule_parameter(rule, 'max_activities')
         if isinstance(max_activities, dict):
             max_activities = max_activities.get('value', 20)
         if max_activities is None:
@@ -707,8 +871,8 @@ class BBPPAnalyzer:
             total_activities = data.get('activity_count', 0)
             
             # Contar Invokes (cada Invoke es un nuevo módulo, deja de contar)
-            invoke_count = len([a for a in data.get('activities', []) 
-                               if 'InvokeWorkflowFile' in a.get('type', '')])
+            invoke_count = sum(1 for a in data.get('activities', [])
+                               if self.activity_matcher.matches(a.get('type', ''), 'invoke'))
             
             if total_activities > max_activities:
                 self._add_finding(
@@ -729,6 +893,10 @@ class BBPPAnalyzer:
         file_path = data.get('file_path', '')
         
         for rule in rules:
+            # Solo reglas de descripción de argumentos (no todas las del conjunto)
+            if rule.get('rule_type') != 'argument_description' or not rule.get('enabled'):
+                continue
+            
             params = rule.get('parameters', {})
             require_description = params.get('require_description', True)
             min_description_length = params.get('min_description_length', 5)
@@ -746,7 +914,8 @@ class BBPPAnalyzer:
                 if arg_name in exceptions:
                     continue  # Saltar validación para este argumento
                 
-                description = arg.get('annotation', '').strip()
+                # El parser expone la anotación del argumento como 'description'
+                description = (arg.get('description') or arg.get('annotation') or '').strip()
                 
                 if not description or len(description) < min_description_length:
                     self._add_finding(
@@ -769,10 +938,7 @@ class BBPPAnalyzer:
         file_path = data.get('file_path', '')
         
         # Obtener parámetro configurable
-        max_levels = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'max_nested_levels'
-        )
+        max_levels = self._get_rule_parameter(rule, 'max_nested_levels')
         
         # Si el parámetro tiene estructura compleja, extraer el valor
         if isinstance(max_levels, dict):
@@ -841,16 +1007,13 @@ class BBPPAnalyzer:
         if not rule or not rule.get('enabled'):
             return
         
-        # Obtener parámetro configurable desde rules_manager
-        max_percentage = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'max_percentage'
-        ) or 5  # Default si no existe
+        # Obtener parámetro configurable de la regla
+        max_percentage = self._get_rule_parameter(rule, 'max_percentage') or 5  # Default si no existe
         
         file_path = data.get('file_path', '')
         total_activities = data.get('activity_count', 0)
-        commented_activities = sum(1 for act in data.get('activities', []) 
-                                  if 'CommentOut' in act.get('type', ''))
+        commented_activities = sum(1 for act in data.get('activities', [])
+                                   if self.activity_matcher.matches(act.get('type', ''), 'comment_out'))
         
         if total_activities > 0:
             percentage = (commented_activities / total_activities) * 100
@@ -868,6 +1031,65 @@ class BBPPAnalyzer:
                     }
                 )
      
+    def _check_unused_variables(self, data: Dict, rules: List[Dict]):
+        """Detectar variables declaradas y no referenciadas (CODIGO_002)"""
+        rule = next((r for r in rules if r.get('rule_type') == 'unused_variables'), None)
+        if not rule or not rule.get('enabled'):
+            return
+        
+        # Índice invertido de identificadores generado por el parser
+        identifier_index = data.get('identifier_index')
+        if identifier_index is None:
+            return
+        
+        file_path = data.get('file_path', '')
+        exceptions = frozenset(rule.get('parameters', {}).get('exceptions', []))
+        
+        for var in data.get('variables', []):
+            var_name = var.get('name', '')
+            if not var_name or var_name in exceptions:
+                continue
+            if var_name.lower() not in identifier_index:
+                self._add_finding(
+                    rule=rule,
+                    file_path=file_path,
+                    location=f"Variable: {var_name}",
+                    details={
+                        'variable_name': var_name,
+                        'variable_type': var.get('type', ''),
+                        'suggestion': f'Eliminar la variable "{var_name}" o revisar si falta su uso'
+                    }
+                )
+    
+    def _check_unused_arguments(self, data: Dict, rules: List[Dict]):
+        """Detectar argumentos declarados y no referenciados (CODIGO_003)"""
+        rule = next((r for r in rules if r.get('rule_type') == 'unused_arguments'), None)
+        if not rule or not rule.get('enabled'):
+            return
+        
+        identifier_index = data.get('identifier_index')
+        if identifier_index is None:
+            return
+        
+        file_path = data.get('file_path', '')
+        exceptions = frozenset(rule.get('parameters', {}).get('exceptions', []))
+        
+        for arg in data.get('arguments', []):
+            arg_name = arg.get('name', '')
+            if not arg_name or arg_name in exceptions:
+                continue
+            if arg_name.lower() not in identifier_index:
+                self._add_finding(
+                    rule=rule,
+                    file_path=file_path,
+                    location=f"Argumento: {arg_name}",
+                    details={
+                        'argument_name': arg_name,
+                        'argument_type': arg.get('type', ''),
+                        'suggestion': f'Eliminar el argumento "{arg_name}" o revisar si falta su uso'
+                    }
+                )
+    
     def _check_missing_logs(self, data: Dict, rules: List[Dict]):
         """Detectar workflows con ratio insuficiente de logs por actividades"""
         rule = next((r for r in rules if r.get('rule_type') == 'insufficient_logging'), None)
@@ -876,11 +1098,8 @@ class BBPPAnalyzer:
         
         file_path = data.get('file_path', '')
         
-        # Obtener parámetro configurable desde rules_manager
-        max_activities_per_log = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'max_activities_per_log'
-        ) or 10  # Default si no existe
+        # Obtener parámetro configurable de la regla
+        max_activities_per_log = self._get_rule_parameter(rule, 'max_activities_per_log') or 10  # Default si no existe
         
         # Contar actividades y logs
         total_activities = data.get('activity_count', 0)
@@ -924,25 +1143,20 @@ class BBPPAnalyzer:
         if not rule or not rule.get('enabled'):
             return
 
-        # Obtener lista configurable de actividades críticas
-        params = rule.get('parameters', {})
-        critical_activities = params.get('critical_activities', [])
-
-        if not critical_activities:
-            critical_activities = [
-                'InvokeWorkflowFile', 'InvokeMethod', 'InvokeCode',
-                'ReadRange', 'WriteRange', 'OpenBrowser', 'Click',
-                'TypeInto', 'GetText'
-            ]
+        # Lista configurable de actividades críticas precompilada en _build_matchers
+        matcher = self.activity_matcher
 
         file_path = data.get('file_path', '')
         activities = data.get('activities', [])
         
         for activity in activities:
             activity_type = activity.get('type', '')
-            if any(crit in activity_type for crit in critical_activities):
-                parent = activity.get('parent_type', '')
-                if 'TryCatch' not in parent:
+            if matcher.matches(activity_type, 'critical'):
+                # Flags de contexto calculados por el parser en el recorrido único
+                context = activity.get('context', 0)
+                if context & CTX_COMMENTED:
+                    continue  # Código comentado: no se ejecuta
+                if not context & CTX_IN_TRY:
                     self._add_finding(
                         rule, file_path,
                         location=activity.get('display_name', activity_type),
@@ -985,18 +1199,15 @@ class BBPPAnalyzer:
         file_path = data.get('file_path', '')
         
         # Obtener parámetro configurable
-        min_activities = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'min_activities_for_modularization'
-        )
+        min_activities = self._get_rule_parameter(rule, 'min_activities_for_modularization')
         if isinstance(min_activities, dict):
             min_activities = min_activities.get('value', 50)
         if min_activities is None:
             min_activities = 50
         
         total_activities = data.get('activity_count', 0)
-        invoke_count = len([a for a in data.get('activities', []) 
-                           if 'InvokeWorkflowFile' in a.get('type', '')])
+        invoke_count = sum(1 for a in data.get('activities', [])
+                           if self.activity_matcher.matches(a.get('type', ''), 'invoke'))
         
         # Sugerencia: si tiene muchas actividades y no usa Invoke
         if total_activities > min_activities and invoke_count == 0:
@@ -1020,21 +1231,14 @@ class BBPPAnalyzer:
         file_path = data.get('file_path', '')
         
         # Obtener parámetro configurable
-        default_timeout = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'default_timeout_ms'
-        )
+        default_timeout = self._get_rule_parameter(rule, 'default_timeout_ms')
         if isinstance(default_timeout, dict):
             default_timeout = default_timeout.get('value', 30000)
         if default_timeout is None:
             default_timeout = 30000
 
-        # Obtener lista configurable de actividades que requieren timeout
-        params_timeout = rule.get('parameters', {})
-        timeout_required = params_timeout.get('timeout_required_activities', [])
-
-        if not timeout_required:
-            timeout_required = ['Click', 'TypeInto', 'GetText', 'ElementExists', 'Find']
+        # Lista configurable de actividades que requieren timeout (precompilada)
+        matcher = self.activity_matcher
 
         activities = data.get('activities', [])
 
@@ -1043,7 +1247,7 @@ class BBPPAnalyzer:
         
         for activity in activities:
             activity_type = activity.get('type', '')
-            if any(req in activity_type for req in timeout_required):
+            if matcher.matches(activity_type, 'timeout'):
                 properties = activity.get('properties', {})
                 timeout = properties.get('TimeoutMS') or properties.get('Timeout')
                 
@@ -1245,15 +1449,9 @@ class BBPPAnalyzer:
             return
         
         # Obtener parámetros configurables
-        check_start = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'check_start_activities'
-        ) or 5
+        check_start = self._get_rule_parameter(rule, 'check_start_activities') or 5
         
-        check_end = self.rules_manager.get_rule_parameter(
-            rule['id'],
-            'check_end_activities'
-        ) or 5
+        check_end = self._get_rule_parameter(rule, 'check_end_activities') or 5
         
         activities = data.get('activities', [])
         total = len(activities)
@@ -1308,8 +1506,8 @@ class BBPPAnalyzer:
             return
         
         # Buscar states en las actividades
-        states = [act for act in data.get('activities', []) 
-                  if 'State' in act.get('type', '')]
+        states = [act for act in data.get('activities', [])
+                  if self.activity_matcher.matches(act.get('type', ''), 'state')]
         
         if not states:
             return
@@ -1434,3 +1632,74 @@ class BBPPAnalyzer:
                     'suggestion': f'Renombrar el proyecto siguiendo alguno de estos patrones: {patterns_str}. Ejemplos válidos: {examples_valid}'
                 }
             )
+
+    # ========================================================================
+    # REGLAS SOBRE EL GRAFO DE INVOCACIONES
+    # ========================================================================
+
+    def analyze_unreachable_workflows(self, graph, entry_points: List[str]) -> List[Finding]:
+        """
+        Detectar workflows no alcanzables desde los entry points (MODULARIZACION_004)
+
+        Args:
+            graph: InvocationGraph del proyecto
+            entry_points: Rutas relativas de los entry points
+
+        Returns:
+            Lista de hallazgos
+        """
+        self.findings = []
+        rule = next((r for r in self.rules if r.get('rule_type') == 'unreachable_workflow'), None)
+        if not rule or not rule.get('enabled'):
+            return self.findings
+
+        # Una invocación de ruta dinámica alcanzable puede llegar a cualquier workflow:
+        # sin poder resolverla no se marca ninguno como no alcanzable (el resumen del
+        # grafo conserva 'unreachable' y 'dynamic_sources' como referencia)
+        if graph.dynamic_sources(entry_points):
+            return self.findings
+
+        for rel_path in graph.unreachable(entry_points):
+            self._add_finding(
+                rule=rule,
+                file_path=str(graph.project_path / rel_path),
+                location="Workflow no invocado",
+                details={
+                    'workflow': rel_path,
+                    'entry_points': entry_points,
+                    'suggestion': 'Invocar el workflow desde el flujo principal o eliminarlo si ya no se usa'
+                }
+            )
+        return self.findings
+
+    def analyze_missing_workflows(self, graph, sources: List[str]) -> List[Finding]:
+        """
+        Detectar InvokeWorkflowFile hacia archivos inexistentes (MODULARIZACION_005)
+
+        Args:
+            graph: InvocationGraph del proyecto
+            sources: Rutas relativas de los workflows a evaluar
+
+        Returns:
+            Lista de hallazgos
+        """
+        self.findings = []
+        rule = next((r for r in self.rules if r.get('rule_type') == 'missing_workflow'), None)
+        if not rule or not rule.get('enabled'):
+            return self.findings
+
+        for rel_path in sources:
+            idx = graph.get_index(rel_path)
+            if idx is None:
+                continue
+            for invoke in graph.unresolved.get(idx, []):
+                self._add_finding(
+                    rule=rule,
+                    file_path=str(graph.project_path / rel_path),
+                    location=invoke.get('display_name') or 'Invoke Workflow File',
+                    details={
+                        'workflow_file': invoke.get('workflow_file', ''),
+                        'suggestion': 'Corregir la ruta del workflow invocado o restaurar el archivo'
+                    }
+                )
+        return self.findings
@@ -68,6 +68,7 @@ SRC_DIR = ROOT_DIR / "src"
 ASSETS_DIR = ROOT_DIR / "assets"
 CONFIG_DIR = ROOT_DIR / "config"
 OUTPUT_DIR = ROOT_DIR / "output"
+DATA_DIR = ROOT_DIR / "data"  # Base de datos de métricas
 TESTS_DIR = ROOT_DIR / "tests"
 DOCS_DIR = ROOT_DIR / "docs"
 
@@ -95,6 +96,8 @@ DEFAULT_CONFIG = {
     "output": {
         "generate_html": True,
         "generate_excel": True,
+        "generate_html_normal": False,  # Además del detallado, en la generación automática
+        "parallel_reports": True,  # Generar cada formato en un proceso separado
         "generate_pdf": False,  # Futuro
         "include_charts": True,
         "include_commented_code_list": True,
@@ -103,6 +106,32 @@ DEFAULT_CONFIG = {
         "error_weight": -10,
         "warning_weight": -3,
         "info_weight": -0.5,
+    },
+    "memory": {
+        "accounting": False,  # Snapshots de tracemalloc por fase (mayores asignadores)
+        "budget_mb": 0,  # Presupuesto de memoria Python (0 = sin límite)
+        "top_allocators": 10,
+        "lean_results": False,  # Conservar solo estadísticas por archivo tras el análisis (opcional)
+    },
+    "aggregation": {
+        "enabled": False,  # Un hallazgo por (regla, archivo) en reglas de nomenclatura
+        "max_samples": 10,  # Ocurrencias de muestra; el detalle completo va al sidecar
+    },
+    "baseline": {
+        "enabled": True,  # Restar hallazgos aceptados (archivo del proyecto o BD)
+        "file": "bbpp-baseline.json",  # Relativo a la raíz del proyecto
+        "use_db": True,  # Si no hay archivo, usar la tabla finding_baseline
+        "score_new_only": True,  # El score solo penaliza hallazgos nuevos
+    },
+    "rule_preview": {
+        "cache_parsed_data": False,  # Volcar parsed_data a output/cache/ para previsualizar reglas (opcional)
+    },
+    "retention": {
+        "enabled": True,  # Mantenimiento automático de la BD de métricas al iniciar
+        "raw_findings_days": 0,  # Borrar hallazgos en bruto más antiguos (0 = conservar siempre)
+        "archive": True,  # Archivarlos antes en data/archive/findings-AAAA-MM.jsonl.gz
+        "keep_last_per_project": 0,  # Borrar análisis completos más allá de los últimos N (0 = todos)
+        "compact_interval_days": 7,  # Días entre mantenimientos automáticos
     }
 }
 
@@ -2,6 +2,7 @@
 Módulo de base de datos para métricas
 """
 
+from .connection_manager import ConnectionManager, get_connection_manager
 from .metrics_db import MetricsDatabase, get_metrics_db
 
-__all__ = ['MetricsDatabase', 'get_metrics_db']
+__all__ = ['ConnectionManager', 'get_connection_manager', 'MetricsDatabase', 'get_metrics_db']
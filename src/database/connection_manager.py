@@ -0,0 +1,236 @@
+"""
+Gestor de conexiones SQLite concurrentes
+Una instancia por archivo de base de datos, compartida por todos los
+MetricsDatabase del proceso:
+- Modo WAL: las lecturas no se bloquean mientras el escáner escribe
+- busy_timeout en todas las conexiones (sin "database is locked" inmediato)
+- Una conexión de solo lectura por hilo (GUI, escáner, reportes...)
+- Un único hilo escritor que serializa todas las escrituras en una cola
+- auto_vacuum incremental: el espacio liberado se puede devolver sin VACUUM
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict
+
+
+# Espera máxima ante un bloqueo antes de fallar (milisegundos)
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+
+_STOP = object()
+
+
+class ConnectionManager:
+    """Conexiones de lectura por hilo y cola de escritura única para una base de datos"""
+
+    def __init__(self, db_path: Path, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS):
+        """
+        Args:
+            db_path: Ruta al archivo de base de datos
+            busy_timeout_ms: Espera máxima ante bloqueos
+        """
+        self.db_path = Path(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._readers = {}        # Hilo -> conexión de lectura (para cerrarlas)
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_ident = None
+        self._refs = 0
+        self.closed = False
+
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        """Abrir una conexión configurada (WAL, busy_timeout, filas por nombre)"""
+        conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        if read_only:
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            # Solo tiene efecto en archivos nuevos; las BDs existentes lo activan con compact(full=True)
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def acquire(self) -> bool:
+        """
+        Registrar un usuario del gestor (arranca el hilo escritor si hace falta)
+
+        Returns:
+            False si el gestor ya se cerró (hay que crear otro)
+        """
+        with self._lock:
+            if self.closed:
+                return False
+            self._refs += 1
+            if self._writer is None:
+                started = threading.Event()
+                self._writer = threading.Thread(target=self._writer_loop, args=(started,),
+                                                name=f"metrics-db-writer:{self.db_path.name}", daemon=True)
+                self._writer.start()
+                started.wait()
+        return True
+
+    def release(self) -> bool:
+        """
+        Liberar un usuario; con el último se cierran escritor y lectores
+
+        Returns:
+            True si el gestor quedó cerrado
+        """
+        with self._lock:
+            self._refs = max(0, self._refs - 1)
+            if self._refs or self.closed:
+                return self.closed
+            self.closed = True
+        self._shutdown()
+        return True
+
+    def close(self):
+        """Cerrar el gestor aunque queden usuarios (al salir de la aplicación)"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        self._shutdown()
+
+    def _shutdown(self):
+        """Vaciar la cola de escritura y cerrar todas las conexiones"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+            readers, self._readers = list(self._readers.values()), {}
+        if writer is not None:
+            self._queue.put(_STOP)
+            if threading.get_ident() != self._writer_ident:
+                writer.join()
+        for conn in readers:
+            conn.close()
+        _forget_manager(self)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def reader(self) -> sqlite3.Connection:
+        """Conexión de solo lectura del hilo actual (se crea al primer uso)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.closed:
+                raise sqlite3.ProgrammingError(f"Gestor de conexiones cerrado: {self.db_path}")
+            conn = self._open(read_only=True)
+            self._local.conn = conn
+            with self._lock:
+                # Cerrar los lectores de hilos terminados (p. ej. escaneos anteriores)
+                finished = [thread for thread in self._readers if not thread.is_alive()]
+                for thread in finished:
+                    self._readers.pop(thread).close()
+                self._readers[threading.current_thread()] = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def submit(self, func: Callable[[sqlite3.Connection], object]) -> Future:
+        """
+        Encolar una escritura; func recibe la conexión del escritor
+
+        La transacción se confirma al terminar func (o se revierte si lanza).
+
+        Returns:
+            Future con el valor devuelto por func
+        """
+        future = Future()
+        if self.closed:
+            future.set_exception(sqlite3.ProgrammingError(f"Gestor de conexiones cerrado: {self.db_path}"))
+        elif threading.get_ident() == self._writer_ident:
+            # Escritura anidada desde otra escritura: ya estamos en el escritor
+            future.set_result(func(self._writer_conn))
+        else:
+            self._queue.put((func, future))
+        return future
+
+    def write(self, func: Callable[[sqlite3.Connection], object]):
+        """Ejecutar una escritura en el hilo escritor y esperar su resultado"""
+        return self.submit(func).result()
+
+    def _writer_loop(self, started: threading.Event):
+        """Hilo escritor: única conexión con permiso de escritura"""
+        self._writer_ident = threading.get_ident()
+        self._writer_conn = self._open(read_only=False)
+        started.set()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                func, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = func(self._writer_conn)
+                    self._writer_conn.commit()
+                    future.set_result(result)
+                except BaseException as e:
+                    self._writer_conn.rollback()
+                    future.set_exception(e)
+        finally:
+            self._writer_conn.close()
+
+
+# Un gestor por archivo de base de datos
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: Path) -> ConnectionManager:
+    """
+    Obtener (o crear) el gestor compartido de una base de datos y registrarse como usuario
+
+    Cada llamada debe emparejarse con release() del gestor devuelto.
+
+    Args:
+        db_path: Ruta al archivo de base de datos
+
+    Returns:
+        ConnectionManager del archivo
+    """
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None or not manager.acquire():
+            manager = ConnectionManager(db_path)
+            manager.acquire()
+            _managers[key] = manager
+    return manager
+
+
+def _forget_manager(manager: ConnectionManager):
+    """Quitar un gestor cerrado del registro"""
+    with _managers_lock:
+        for key, registered in list(_managers.items()):
+            if registered is manager:
+                del _managers[key]
+
+
+def close_all_managers():
+    """Cerrar todos los gestores (al salir de la aplicación)"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close()
+
+
+# Vaciar las escrituras pendientes al salir del proceso
+atexit.register(close_all_managers)
@@ -0,0 +1,235 @@
+"""
+Retención, archivado y compactación de la BD de métricas
+Los resúmenes de cada análisis (analysis_history, tiempos, latest_analysis)
+se conservan siempre; los hallazgos en bruto (findings_detail y los
+resultados completos de analysis_results) más antiguos que el plazo
+configurado se archivan en un JSONL comprimido por mes y se borran. Después
+se devuelve el espacio libre al sistema (auto_vacuum incremental).
+
+La aplicación lo ejecuta al iniciar si han pasado compact_interval_days
+desde el último mantenimiento (sección "retention" de la configuración).
+
+Uso:
+    python -m src.database.maintenance                 # según la configuración
+    python -m src.database.maintenance --days 180      # retención + compactación
+    python -m src.database.maintenance --compact --full
+"""
+
+import argparse
+import gzip
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+# Clave de db_maintenance con la fecha (UTC) del último mantenimiento
+LAST_MAINTENANCE_KEY = 'last_maintenance'
+
+# Formato de analysis_date (CURRENT_TIMESTAMP de SQLite, UTC)
+DB_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def retention_config(config: Optional[Dict] = None) -> Dict:
+    """
+    Sección "retention" de la configuración, completada con los valores por defecto
+
+    Args:
+        config: Configuración de usuario (None = cargarla)
+
+    Returns:
+        Diccionario con todas las claves de DEFAULT_CONFIG['retention']
+    """
+    from src.config import DEFAULT_CONFIG, load_user_config
+
+    if config is None:
+        config = load_user_config()
+    return {**DEFAULT_CONFIG['retention'], **(config.get('retention') or {})}
+
+
+def archive_path(archive_dir: Path, analysis_date: str) -> Path:
+    """Archivo del mes de un análisis: findings-AAAA-MM.jsonl.gz"""
+    return Path(archive_dir) / f"findings-{analysis_date[:7]}.jsonl.gz"
+
+
+def default_archive_dir(db) -> Path:
+    """Carpeta archive/ junto al archivo de la base de datos"""
+    return Path(db.db_path).parent / 'archive'
+
+
+def read_archive(path: Path) -> Iterator[Dict]:
+    """
+    Leer un archivo de hallazgos archivados
+
+    Args:
+        path: Archivo .jsonl.gz
+
+    Yields:
+        Un registro por análisis (como MetricsDatabase.export_raw_findings)
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _archive_and_purge(db, analysis_ids: List[int], archive: bool, archive_dir: Path,
+                       archives: set) -> int:
+    """Archivar (si procede) y borrar los hallazgos en bruto de unos análisis"""
+    if archive:
+        by_file = {}
+        for analysis_id in analysis_ids:
+            record = db.export_raw_findings(analysis_id)
+            if record is not None:
+                path = archive_path(archive_dir, record['analysis_date'])
+                by_file.setdefault(path, []).append(record)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        for path, records in by_file.items():
+            # Modo 'at': cada ejecución añade un miembro gzip (se leen como un único archivo)
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            archives.add(str(path))
+    # Solo se borra lo que ya está escrito y cerrado en el archivo
+    return db.purge_raw_findings(analysis_ids)
+
+
+def apply_retention(db, raw_findings_days: int, archive: bool = True,
+                    archive_dir: Optional[Path] = None, keep_last_per_project: int = 0,
+                    now: Optional[datetime] = None, batch_size: int = 200) -> Dict:
+    """
+    Aplicar la política de retención
+
+    Args:
+        db: Instancia de MetricsDatabase
+        raw_findings_days: Borrar hallazgos en bruto de análisis más antiguos (0 = no)
+        archive: Archivar los hallazgos antes de borrarlos
+        archive_dir: Carpeta de los archivos (None = archive/ junto a la BD)
+        keep_last_per_project: Borrar análisis completos más allá de los últimos N (0 = no)
+        now: Fecha de referencia (None = ahora, UTC)
+        batch_size: Análisis por lote (acota la memoria)
+
+    Returns:
+        {'cutoff', 'purged_analyses', 'purged_findings', 'deleted_analyses', 'archives'}
+    """
+    archive_dir = Path(archive_dir) if archive_dir else default_archive_dir(db)
+    now = now or datetime.now(timezone.utc)
+    summary = {'cutoff': None, 'purged_analyses': 0, 'purged_findings': 0,
+               'deleted_analyses': 0, 'archives': set()}
+
+    # Análisis completos fuera de los últimos N (se archivan sus hallazgos primero)
+    if keep_last_per_project > 0:
+        for project_name in db.get_unique_projects():
+            old_ids = db.get_old_analysis_ids(project_name, keep_last_per_project)
+            if old_ids:
+                summary['purged_findings'] += _archive_and_purge(
+                    db, old_ids, archive, archive_dir, summary['archives'])
+                summary['deleted_analyses'] += db.cleanup_old_analyses(project_name, keep_last_per_project)
+
+    if raw_findings_days > 0:
+        cutoff = (now - timedelta(days=raw_findings_days)).strftime(DB_DATE_FORMAT)
+        summary['cutoff'] = cutoff
+        while True:
+            batch = db.get_raw_findings_before(cutoff, limit=batch_size)
+            if not batch:
+                break
+            ids = [row['id'] for row in batch]
+            summary['purged_findings'] += _archive_and_purge(db, ids, archive, archive_dir,
+                                                             summary['archives'])
+            summary['purged_analyses'] += len(ids)
+
+    summary['archives'] = sorted(summary['archives'])
+    return summary
+
+
+def run_maintenance(db=None, config: Optional[Dict] = None, force: bool = False,
+                    full: bool = False, now: Optional[datetime] = None) -> Optional[Dict]:
+    """
+    Retención y compactación según la configuración, si toca
+
+    Args:
+        db: Instancia de MetricsDatabase (None = la BD por defecto)
+        config: Configuración de usuario (None = cargarla)
+        force: Ejecutar aunque no haya pasado el intervalo (o esté desactivado)
+        full: Compactación completa (VACUUM)
+        now: Fecha de referencia (None = ahora, UTC)
+
+    Returns:
+        {'retention', 'compaction'} o None si no tocaba
+    """
+    settings = retention_config(config)
+    if not settings['enabled'] and not force:
+        return None
+
+    own_db = db is None
+    if own_db:
+        from src.database.metrics_db import get_metrics_db
+        db = get_metrics_db()
+    try:
+        now = now or datetime.now(timezone.utc)
+        last = db.get_maintenance_value(LAST_MAINTENANCE_KEY)
+        if last and not force:
+            elapsed = now - datetime.strptime(last, DB_DATE_FORMAT).replace(tzinfo=timezone.utc)
+            if elapsed < timedelta(days=settings['compact_interval_days']):
+                return None
+
+        retention = apply_retention(db, settings['raw_findings_days'], archive=settings['archive'],
+                                    keep_last_per_project=settings['keep_last_per_project'], now=now)
+        compaction = db.compact(full=full)
+        db.set_maintenance_value(LAST_MAINTENANCE_KEY, now.strftime(DB_DATE_FORMAT))
+
+        print(f"OK: Mantenimiento de la BD: {retention['purged_analyses']} análisis archivados, "
+              f"{retention['deleted_analyses']} eliminados, "
+              f"{compaction['freed_bytes'] / (1024 * 1024):.1f} MB liberados")
+        return {'retention': retention, 'compaction': compaction}
+    finally:
+        if own_db:
+            db.close()
+
+
+def main(argv: List[str] = None) -> int:
+    """Retención y compactación de la BD de métricas desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description='Retención y compactación de la BD de métricas')
+    parser.add_argument('--days', type=int, help='Archivar y borrar hallazgos de más de N días')
+    parser.add_argument('--keep-last', type=int, help='Borrar análisis más allá de los últimos N por proyecto')
+    parser.add_argument('--no-archive', action='store_true', help='Borrar sin archivar')
+    parser.add_argument('--archive-dir', type=Path, help='Carpeta de los archivos .jsonl.gz')
+    parser.add_argument('--compact', action='store_true', help='Solo compactar (sin retención)')
+    parser.add_argument('--full', action='store_true', help='Compactación completa (VACUUM)')
+    args = parser.parse_args(argv)
+
+    from src.database.metrics_db import get_metrics_db
+
+    db = get_metrics_db()
+    try:
+        if args.days is None and args.keep_last is None and not args.compact:
+            outcome = run_maintenance(db, force=True, full=args.full)
+            return 0 if outcome is not None else 1
+
+        if not args.compact:
+            settings = retention_config()
+            retention = apply_retention(
+                db, args.days if args.days is not None else settings['raw_findings_days'],
+                archive=settings['archive'] and not args.no_archive, archive_dir=args.archive_dir,
+                keep_last_per_project=(args.keep_last if args.keep_last is not None
+                                       else settings['keep_last_per_project']))
+            print(f"OK: {retention['purged_analyses']} análisis archivados "
+                  f"({retention['purged_findings']} hallazgos), "
+                  f"{retention['deleted_analyses']} análisis eliminados")
+            for path in retention['archives']:
+                print(f"   • {path}")
+
+        compaction = db.compact(full=args.full)
+        print(f"OK: Compactación {'completa' if compaction['full'] else 'incremental'}: "
+              f"{compaction['freed_bytes'] / (1024 * 1024):.1f} MB liberados "
+              f"({compaction['pages_before']} -> {compaction['pages_after']} páginas)")
+        if not compaction['auto_vacuum']:
+            print("WARNING: auto_vacuum incremental no activo; ejecuta --compact --full una vez")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,10 +5,68 @@ Gestiona el almacenamiento y recuperación de análisis históricos en SQLite
 
 import sqlite3
 import json
-from pathlib import Path
+import zlib
+from pathlib import Path, PurePosixPath, PureWindowsPath
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
+from src.report_model import get_report_model
+from src.database.connection_manager import get_connection_manager
+
+
+# Prefijos de metric_name en metrics_summary para los tiempos del análisis
+TIMING_PREFIXES = {
+    'phases': 'phase:',
+    'rules': 'rule:',
+    'files': 'file:',
+}
+TIMING_COUNT_PREFIX = 'count:'
+TIMING_RULE_FINDINGS_PREFIX = 'rule_findings:'
+
+# Archivos más lentos que se persisten por análisis
+TIMING_TOP_FILES = 20
+
+# Columnas del listado del historial (sin metadata: se lee al abrir los detalles)
+HISTORY_LIST_COLUMNS = (
+    'id', 'project_name', 'project_path', 'analysis_date', 'version', 'bbpp_sets',
+    'total_findings', 'high_findings', 'medium_findings', 'low_findings', 'score',
+    'html_report_path', 'excel_report_path',
+)
+
+# Columnas de latest_analysis (último análisis de cada proyecto, mantenido con triggers)
+LATEST_ANALYSIS_COLUMNS = ('project_name', 'analysis_id', 'team', 'analysis_date', 'score', 'total_findings')
+
+# Índices de búsqueda de texto completo: (tabla FTS5, tabla origen, columnas)
+SEARCH_INDEXES = (
+    ('findings_fts', 'findings_detail', ('description', 'location', 'file_path', 'rule_name', 'rule_id')),
+    ('analyses_fts', 'analysis_history', ('project_name', 'project_path', 'version', 'bbpp_sets')),
+)
+
+# Resultados completos persistidos por análisis (para regenerar reportes sin reescanear)
+RESULTS_SCHEMA_VERSION = 1
+RESULTS_PAYLOAD_KEYS = (
+    'success', 'project_path', 'project_info', 'total_files', 'analyzed_files',
+    'statistics', 'score', 'findings', 'parsed_files', 'bbpp_sets',
+    'version_validation', 'invocation_graph', 'low_memory', 'lean_results',
+    'findings_sidecar', 'baseline', 'execution_time',
+)
+
+
+def project_team(project_path) -> str:
+    """
+    Equipo de un proyecto: la carpeta que contiene el proyecto
+    (p. ej. C:/Robots/Finanzas/Facturas -> Finanzas)
+
+    Args:
+        project_path: Ruta del proyecto
+
+    Returns:
+        Nombre del equipo ('' si la ruta no tiene carpeta padre)
+    """
+    path = str(project_path or '')
+    parent = PureWindowsPath(path).parent if '\\' in path else PurePosixPath(path).parent
+    return parent.name
+
 
 class MetricsDatabase:
     """Gestor de base de datos SQLite para métricas de análisis"""
@@ -22,23 +80,41 @@ class MetricsDatabase:
         """
         if db_path is None:
             # Crear carpeta data si no existe
-            data_dir = Path(__file__).parent.parent.parent / 'data'
-            data_dir.mkdir(exist_ok=True)
-            db_path = data_dir / 'metrics.db'
+            from src.config import DATA_DIR
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            db_path = DATA_DIR / 'metrics.db'
         
         self.db_path = db_path
-        self.conn = None
-        self._connect()
+        # Conexiones compartidas del archivo: WAL, lectores por hilo y un único escritor
+        self.manager = get_connection_manager(db_path)
+        self._closed = False
+        self.fts_enabled = False  # Índice FTS5 de búsqueda (si SQLite lo incluye)
         self._init_database()
     
-    def _connect(self):
-        """Establecer conexión a la base de datos"""
-        self.conn = sqlite3.connect(str(self.db_path))
-        self.conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexión de solo lectura del hilo actual (las escrituras van por _write)"""
+        return self.manager.reader()
+    
+    def _write(self, func):
+        """
+        Ejecutar una escritura en el hilo escritor (confirma al terminar)
+        
+        Args:
+            func: Función que recibe la conexión de escritura
+            
+        Returns:
+            Valor devuelto por func
+        """
+        return self.manager.write(func)
     
     def _init_database(self):
         """Crear tablas si no existen"""
-        cursor = self.conn.cursor()
+        self._write(self._create_schema)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Crear tablas e índices (en el hilo escritor)"""
+        cursor = conn.cursor()
         
         # Tabla principal de historial de análisis
         cursor.execute('''
@@ -64,7 +140,7 @@ class MetricsDatabase:
         ''')
         
         # Migración: Añadir columnas si no existen (para BDs existentes)
-        self._migrate_add_report_paths()
+        self._migrate_add_report_paths(conn)
         
         # Tabla de detalles de hallazgos
         cursor.execute('''
@@ -94,6 +170,45 @@ class MetricsDatabase:
             )
         ''')
         
+        # Línea base de hallazgos aceptados (huellas estables por proyecto)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS finding_baseline (
+                project_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                rule_id TEXT,
+                file_path TEXT,
+                location TEXT,
+                group_key TEXT,
+                occurrences INTEGER,
+                accepted_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (project_name, fingerprint)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Migración: grupo y ocurrencias aceptadas (líneas base anteriores quedan a NULL)
+        baseline_columns = [column[1] for column in cursor.execute('PRAGMA table_info(finding_baseline)')]
+        for column, column_type in (('group_key', 'TEXT'), ('occurrences', 'INTEGER')):
+            if column not in baseline_columns:
+                cursor.execute(f'ALTER TABLE finding_baseline ADD COLUMN {column} {column_type}')
+        
+        # Resultados completos (JSON comprimido con zlib), uno por análisis
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                analysis_id INTEGER PRIMARY KEY,
+                schema_version INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                FOREIGN KEY (analysis_id) REFERENCES analysis_history(id) ON DELETE CASCADE
+            )
+        ''')
+
+        # Estado del mantenimiento (última retención/compactación)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS db_maintenance (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+
         # Índices para mejorar rendimiento
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_project_name 
@@ -110,11 +225,142 @@ class MetricsDatabase:
             ON findings_detail(analysis_id)
         ''')
         
-        self.conn.commit()
+        # Paginación por clave (analysis_date, id) del historial, global y por proyecto
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_history_keyset
+            ON analysis_history(analysis_date DESC, id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_history_project_keyset
+            ON analysis_history(project_name, analysis_date DESC, id DESC)
+        ''')
+        
+        # Índices que cubren las consultas de cartera (hallazgos por regla y por archivo)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_findings_rule
+            ON findings_detail(analysis_id, rule_id, rule_name, severity)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_findings_file
+            ON findings_detail(analysis_id, file_path, severity)
+        ''')
+
+        self._create_latest_analysis(conn)
+        self.fts_enabled = self._create_search_index(conn)
+
+    def _create_latest_analysis(self, conn: sqlite3.Connection):
+        """
+        Crear latest_analysis: una fila por proyecto con su último análisis
+
+        Los triggers la mantienen al insertar, borrar y recalcular scores, de
+        modo que las consultas de cartera no recorren el historial completo.
+        La primera vez se rellena con el historial existente.
+        """
+        existing = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'latest_analysis'").fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS latest_analysis (
+                project_name TEXT PRIMARY KEY,
+                analysis_id INTEGER NOT NULL,
+                team TEXT,
+                analysis_date DATETIME,
+                score REAL,
+                total_findings INTEGER
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_latest_team ON latest_analysis(team, score)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_latest_score ON latest_analysis(score)')
+
+        columns = ', '.join(LATEST_ANALYSIS_COLUMNS)
+        source = 'project_name, id, team, analysis_date, score, total_findings'
+        new_values = ', '.join(f"new.{column}" for column in source.split(', '))
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS latest_analysis_ai AFTER INSERT ON analysis_history BEGIN
+                INSERT INTO latest_analysis({columns}) VALUES ({new_values})
+                ON CONFLICT(project_name) DO UPDATE SET
+                    analysis_id = excluded.analysis_id, team = excluded.team,
+                    analysis_date = excluded.analysis_date, score = excluded.score,
+                    total_findings = excluded.total_findings
+                WHERE (excluded.analysis_date, excluded.analysis_id)
+                      >= (latest_analysis.analysis_date, latest_analysis.analysis_id);
+            END
+        ''')
+        # Al borrar el último análisis de un proyecto pasa a serlo el anterior (si queda)
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS latest_analysis_ad AFTER DELETE ON analysis_history
+            WHEN old.id = (SELECT analysis_id FROM latest_analysis WHERE project_name = old.project_name)
+            BEGIN
+                DELETE FROM latest_analysis WHERE project_name = old.project_name;
+                INSERT INTO latest_analysis({columns})
+                SELECT {source} FROM analysis_history
+                WHERE project_name = old.project_name
+                ORDER BY analysis_date DESC, id DESC LIMIT 1;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS latest_analysis_au AFTER UPDATE OF score, team ON analysis_history BEGIN
+                UPDATE latest_analysis SET score = new.score, team = new.team
+                WHERE analysis_id = new.id;
+            END
+        ''')
+
+        if not existing:
+            conn.execute(f'''
+                INSERT INTO latest_analysis({columns})
+                SELECT {source} FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY project_name ORDER BY analysis_date DESC, id DESC) AS position
+                    FROM analysis_history
+                ) WHERE position = 1
+            ''')
+
+    def _create_search_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        Crear los índices FTS5 de hallazgos y análisis (tablas de contenido externo
+        sincronizadas con triggers); la primera vez se indexa el historial existente
+        
+        Returns:
+            False si SQLite no incluye FTS5 (la búsqueda usa LIKE)
+        """
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('findings_fts', 'analyses_fts')")}
+        try:
+            for table, source, columns in SEARCH_INDEXES:
+                column_list = ', '.join(columns)
+                new_values = ', '.join(f"new.{column}" for column in columns)
+                old_values = ', '.join(f"old.{column}" for column in columns)
+                conn.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+                        {column_list}, content='{source}', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                ''')
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {source} BEGIN
+                        INSERT INTO {table}(rowid, {column_list}) VALUES (new.id, {new_values});
+                    END
+                ''')
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {source} BEGIN
+                        INSERT INTO {table}({table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+                    END
+                ''')
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {column_list} ON {source} BEGIN
+                        INSERT INTO {table}({table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+                        INSERT INTO {table}(rowid, {column_list}) VALUES (new.id, {new_values});
+                    END
+                ''')
+                if table not in existing:
+                    conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"WARNING: Búsqueda FTS5 no disponible ({e}); se usará LIKE")
+            return False
     
-    def _migrate_add_report_paths(self):
+    def _migrate_add_report_paths(self, conn: sqlite3.Connection):
         """Migración: Añadir columnas de rutas de reportes si no existen"""
-        cursor = self.conn.cursor()
+        cursor = conn.cursor()
         
         try:
             # Verificar si las columnas ya existen
@@ -144,8 +390,20 @@ class MetricsDatabase:
                     ADD COLUMN bbpp_sets TEXT
                 ''')
                 print("✅ Columna 'bbpp_sets' añadida a la base de datos")
+
+            # Añadir team (equipo del proyecto) si no existe, calculado desde la ruta
+            if 'team' not in columns:
+                cursor.execute('''
+                    ALTER TABLE analysis_history
+                    ADD COLUMN team TEXT
+                ''')
+                paths = [row[0] for row in cursor.execute(
+                    'SELECT DISTINCT project_path FROM analysis_history')]
+                cursor.executemany('UPDATE analysis_history SET team = ? WHERE project_path = ?',
+                                   [(project_team(path), path) for path in paths])
+                print("✅ Columna 'team' añadida a la base de datos")
             
-            self.conn.commit()
+            conn.commit()
         except Exception as e:
             print(f"⚠️  Error en migración de BD: {e}")
     
@@ -160,8 +418,6 @@ class MetricsDatabase:
         Returns:
             ID del análisis guardado
         """
-        cursor = self.conn.cursor()
-        
         # Extraer datos principales
         project_name = Path(analysis_data.get('project_path', '')).name
         
@@ -170,30 +426,26 @@ class MetricsDatabase:
         studio_version = project_info.get('studio_version', 'Unknown')
         
         # Mapeo de severidades: analyzer → metrics
-        # error → HIGH, warning → MEDIUM, info → LOW
+        # error → HIGH, warning → MEDIUM, info (y cualquier otra) → LOW
         severity_map = {
             'error': 'HIGH',
             'warning': 'MEDIUM',
             'info': 'LOW'
         }
         
-        # Contar hallazgos por severidad
+        # Contar hallazgos por severidad (del modelo compartido con los reportes;
+        # los hallazgos agregados cuentan todas sus ocurrencias)
         findings = analysis_data.get('findings', [])
+        model = get_report_model(analysis_data)
         severity_counts = {
             'CRITICAL': 0,  # Reservado para futuros errores críticos
             'HIGH': 0,      # Errores
             'MEDIUM': 0,    # Warnings
             'LOW': 0        # Info
         }
-        
-        for finding in findings:
-            # Obtener severidad del analyzer (error/warning/info)
-            analyzer_severity = finding.get('severity', 'info').lower()
-            # Mapear a severidad de métricas (HIGH/MEDIUM/LOW)
-            metrics_severity = severity_map.get(analyzer_severity, 'LOW')
-            
-            if metrics_severity in severity_counts:
-                severity_counts[metrics_severity] += 1
+        for analyzer_severity, occurrences in model.occurrences_by_severity.items():
+            severity_counts[severity_map.get(analyzer_severity, 'LOW')] += occurrences
+        total_findings = model.total_occurrences
         
         # Preparar metadata como JSON
         metadata = {
@@ -201,19 +453,62 @@ class MetricsDatabase:
             'config': analysis_data.get('config', {}),
             'statistics': analysis_data.get('statistics', {})
         }
+        if analysis_data.get('baseline'):
+            # Recuentos de hallazgos nuevos: permiten recalcular el score con línea base
+            metadata['baseline'] = analysis_data['baseline']
         
         # Extraer conjuntos de BBPP para columna dedicada
         bbpp_sets = analysis_data.get('bbpp_sets', [])
         bbpp_sets_str = ', '.join(bbpp_sets) if bbpp_sets else 'N/A'
         
+        # Resultados completos comprimidos fuera del hilo escritor
+        payload = self._encode_results(analysis_data)
+        
+        return self._write(lambda conn: self._insert_analysis(
+            conn, analysis_data, findings, project_name, studio_version,
+            total_findings, severity_counts, metadata, bbpp_sets_str, payload
+        ))
+    
+    def _encode_results(self, analysis_data: Dict) -> bytes:
+        """Serializar los resultados necesarios para regenerar reportes (JSON + zlib)"""
+        from src.memory_budget import summarize_parsed_file
+        
+        results = {key: analysis_data[key] for key in RESULTS_PAYLOAD_KEYS
+                   if key in analysis_data and key != 'findings'}
+        # parsed_files solo con estadísticas
+        results['parsed_files'] = [summarize_parsed_file(parsed)
+                                   for parsed in analysis_data.get('parsed_files', [])]
+        rest = json.dumps(results, ensure_ascii=False, default=str)
+        
+        # Los hallazgos pueden venir de disco (FindingStore): se comprimen de uno en uno
+        # sin materializar la lista ni el JSON completo en memoria
+        compressor = zlib.compressobj(6)
+        chunks = [compressor.compress(b'{"findings": [')]
+        separator = ''
+        for finding in analysis_data.get('findings', []):
+            text = separator + json.dumps(finding, ensure_ascii=False, default=str)
+            chunks.append(compressor.compress(text.encode('utf-8')))
+            separator = ', '
+        # rest siempre incluye parsed_files: se une como '{"findings": [...], <rest sin la {>'
+        chunks.append(compressor.compress(('], ' + rest[1:]).encode('utf-8')))
+        chunks.append(compressor.flush())
+        return b''.join(chunks)
+    
+    def _insert_analysis(self, conn: sqlite3.Connection, analysis_data: Dict, findings: List[Dict],
+                         project_name: str, studio_version: str, total_findings: int,
+                         severity_counts: Dict, metadata: Dict, bbpp_sets_str: str,
+                         payload: Optional[bytes] = None) -> int:
+        """Insertar un análisis, sus tiempos y sus hallazgos (en el hilo escritor)"""
+        cursor = conn.cursor()
+        
         # Insertar análisis principal
         cursor.execute('''
             INSERT INTO analysis_history (
                 project_name, project_path, version, bbpp_sets,
                 total_files, analyzed_files, total_findings,
                 critical_findings, high_findings, medium_findings, low_findings,
-                score, execution_time, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                score, execution_time, metadata, team
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             project_name,
             analysis_data.get('project_path', ''),
@@ -221,18 +516,29 @@ class MetricsDatabase:
             bbpp_sets_str,  # Conjuntos de BBPP utilizados
             analysis_data.get('total_files', 0),
             analysis_data.get('analyzed_files', 0),
-            len(findings),
+            total_findings,
             severity_counts['CRITICAL'],
             severity_counts['HIGH'],
             severity_counts['MEDIUM'],
             severity_counts['LOW'],
             analysis_data.get('score', {}).get('score', 0),
             analysis_data.get('execution_time', 0),
-            json.dumps(metadata, ensure_ascii=False)
+            json.dumps(metadata, ensure_ascii=False),
+            project_team(analysis_data.get('project_path', ''))
         ))
         
         analysis_id = cursor.lastrowid
         
+        # Guardar tiempos por fase/regla/archivo en metrics_summary
+        if analysis_data.get('timings'):
+            self._insert_timings(cursor, analysis_id, analysis_data['timings'])
+        
+        if payload is not None:
+            cursor.execute('''
+                INSERT INTO analysis_results (analysis_id, schema_version, payload)
+                VALUES (?, ?, ?)
+            ''', (analysis_id, RESULTS_SCHEMA_VERSION, payload))
+        
         # Guardar detalles de hallazgos (limitado a primeros 1000 para no saturar BD)
         for finding in findings[:1000]:
             cursor.execute('''
@@ -246,14 +552,139 @@ class MetricsDatabase:
                 finding.get('rule_name', ''),
                 finding.get('severity', 'MEDIUM'),
                 finding.get('category', ''),
-                finding.get('file', ''),
+                finding.get('file_path', finding.get('file', '')),
                 finding.get('location', ''),
                 finding.get('description', '')
             ))
         
-        self.conn.commit()
         return analysis_id
     
+    def _insert_timings(self, cursor, analysis_id: int, timings: Dict):
+        """Reemplazar las filas de tiempos de un análisis (sin commit)"""
+        prefixes = list(TIMING_PREFIXES.values()) + [TIMING_COUNT_PREFIX, TIMING_RULE_FINDINGS_PREFIX]
+        cursor.execute(
+            'DELETE FROM metrics_summary WHERE analysis_id = ? AND ('
+            + ' OR '.join('metric_name LIKE ?' for _ in prefixes) + ')',
+            [analysis_id] + [f'{prefix}%' for prefix in prefixes]
+        )
+        
+        rows = []
+        for key, prefix in TIMING_PREFIXES.items():
+            entries = list(timings.get(key, {}).items())
+            if key == 'files':
+                entries = sorted(entries, key=lambda e: e[1].get('seconds', 0), reverse=True)[:TIMING_TOP_FILES]
+            for name, entry in entries:
+                rows.append((analysis_id, f'{prefix}{name}', entry.get('seconds', 0), 's'))
+                if key == 'rules':
+                    rows.append((analysis_id, f'{TIMING_RULE_FINDINGS_PREFIX}{name}',
+                                 entry.get('findings', 0), 'count'))
+        for name, value in timings.get('counts', {}).items():
+            rows.append((analysis_id, f'{TIMING_COUNT_PREFIX}{name}', value, 'count'))
+        
+        cursor.executemany('''
+            INSERT INTO metrics_summary (analysis_id, metric_name, metric_value, metric_unit)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+    
+    def save_timings(self, analysis_id: int, timings: Dict):
+        """
+        Guardar (o reemplazar) los tiempos de un análisis en metrics_summary
+        
+        Args:
+            analysis_id: ID del análisis
+            timings: Diccionario result['timings'] (TimingRecorder.to_dict)
+        """
+        self._write(lambda conn: self._insert_timings(conn.cursor(), analysis_id, timings))
+    
+    def save_finding_baseline(self, project_name: str, entries: Dict[str, Dict]) -> int:
+        """
+        Reemplazar la línea base de hallazgos aceptados de un proyecto
+        
+        Args:
+            project_name: Nombre del proyecto
+            entries: {huella: entrada} (src.finding_baseline.baseline_entries)
+            
+        Returns:
+            Número de huellas guardadas
+        """
+        rows = [(project_name, fingerprint, e.get('rule_id', ''), e.get('file_path', ''), e.get('location', ''),
+                 e.get('group'), e.get('occurrences'))
+                for fingerprint, e in entries.items()]
+        
+        def replace(conn):
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM finding_baseline WHERE project_name = ?', (project_name,))
+            cursor.executemany('''
+                INSERT OR IGNORE INTO finding_baseline (
+                    project_name, fingerprint, rule_id, file_path, location, group_key, occurrences
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            return cursor.execute('SELECT COUNT(*) FROM finding_baseline WHERE project_name = ?',
+                                  (project_name,)).fetchone()[0]
+        
+        return self._write(replace)
+    
+    def get_finding_baseline(self, project_name: str) -> Dict[str, Dict]:
+        """
+        Obtener las huellas aceptadas de un proyecto
+        
+        Args:
+            project_name: Nombre del proyecto
+            
+        Returns:
+            {huella: {'group', 'occurrences'}} (vacío si no hay línea base)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT fingerprint, group_key, occurrences FROM finding_baseline WHERE project_name = ?',
+                       (project_name,))
+        return {row[0]: {'group': row[1], 'occurrences': row[2]} for row in cursor.fetchall()}
+    
+    def clear_finding_baseline(self, project_name: str):
+        """Eliminar la línea base de un proyecto"""
+        self._write(lambda conn: conn.execute('DELETE FROM finding_baseline WHERE project_name = ?',
+                                              (project_name,)))
+    
+    def get_timings(self, analysis_id: int) -> Dict:
+        """
+        Obtener los tiempos guardados de un análisis
+        
+        Args:
+            analysis_id: ID del análisis
+            
+        Returns:
+            Diccionario {'phases'|'rules'|'files': {nombre: {'seconds'[, 'findings']}}, 'counts': {...}}
+            (vacío si el análisis no tiene tiempos)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT metric_name, metric_value FROM metrics_summary
+            WHERE analysis_id = ? ORDER BY metric_value DESC
+        ''', (analysis_id,))
+        
+        timings = {key: {} for key in TIMING_PREFIXES}
+        timings['counts'] = {}
+        rule_findings = {}
+        found = False
+        for row in cursor.fetchall():
+            metric_name, value = row['metric_name'], row['metric_value']
+            if metric_name.startswith(TIMING_COUNT_PREFIX):
+                timings['counts'][metric_name[len(TIMING_COUNT_PREFIX):]] = int(value)
+                found = True
+            elif metric_name.startswith(TIMING_RULE_FINDINGS_PREFIX):
+                rule_findings[metric_name[len(TIMING_RULE_FINDINGS_PREFIX):]] = int(value)
+            else:
+                for key, prefix in TIMING_PREFIXES.items():
+                    if metric_name.startswith(prefix):
+                        timings[key][metric_name[len(prefix):]] = {'seconds': value}
+                        found = True
+                        break
+        
+        if not found:
+            return {}
+        for name, count in rule_findings.items():
+            timings['rules'].setdefault(name, {'seconds': 0.0})['findings'] = count
+        return timings
+    
     def get_unique_projects(self) -> List[str]:
         """
         Obtener lista de nombres de proyectos únicos
@@ -309,6 +740,232 @@ class MetricsDatabase:
         
         return results
     
+    def get_history_page(self, project_name: Optional[str] = None,
+                         after: Optional[Tuple[str, int]] = None,
+                         page_size: int = 200) -> List[Dict]:
+        """
+        Página del historial ordenada por (analysis_date, id) descendente
+        
+        Paginación por clave: la página siguiente empieza tras la última fila
+        de la anterior, de modo que el coste no crece con la posición (a
+        diferencia de OFFSET). Solo incluye HISTORY_LIST_COLUMNS; metadata se
+        lee con get_analysis_by_id al abrir los detalles.
+        
+        Args:
+            project_name: Filtrar por nombre de proyecto (None = todos)
+            after: (analysis_date, id) de la última fila de la página anterior
+                (None = primera página)
+            page_size: Número máximo de filas
+            
+        Returns:
+            Lista de análisis (menos de page_size si es la última página)
+        """
+        conditions = []
+        params = []
+        if project_name:
+            conditions.append('project_name = ?')
+            params.append(project_name)
+        if after is not None:
+            conditions.append('(analysis_date, id) < (?, ?)')
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        params.append(page_size)
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(HISTORY_LIST_COLUMNS)} FROM analysis_history
+            {where}
+            ORDER BY analysis_date DESC, id DESC
+            LIMIT ?
+        ''', params)
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_history_summary(self, project_name: Optional[str] = None) -> Dict:
+        """
+        Totales del historial sin cargarlo
+        
+        Args:
+            project_name: Filtrar por nombre de proyecto (None = todos)
+            
+        Returns:
+            {'total', 'avg_score', 'last_score'} (scores None si no hay análisis)
+        """
+        where, params = ('WHERE project_name = ?', (project_name,)) if project_name else ('', ())
+        cursor = self.conn.cursor()
+        total, avg_score = cursor.execute(
+            f'SELECT COUNT(*), AVG(score) FROM analysis_history {where}', params).fetchone()
+        last = cursor.execute(f'''
+            SELECT score FROM analysis_history {where}
+            ORDER BY analysis_date DESC, id DESC LIMIT 1
+        ''', params).fetchone()
+        return {'total': total, 'avg_score': avg_score, 'last_score': last[0] if last else None}
+    
+    def search_analyses(self, query: str, project_name: Optional[str] = None,
+                        limit: int = 100) -> List[Dict]:
+        """
+        Buscar análisis por el texto de sus hallazgos o de sus datos
+        
+        Un análisis coincide si alguno de sus hallazgos contiene todos los términos
+        (descripción, ubicación, archivo, regla) o si los contienen sus datos
+        (proyecto, ruta, versión, conjuntos). El último término busca por prefijo,
+        de modo que sirve mientras se escribe. "Process.xaml catch vacío" encuentra
+        los análisis donde Process.xaml tuvo un catch vacío.
+        
+        Args:
+            query: Texto a buscar
+            project_name: Filtrar por nombre de proyecto (None = todos)
+            limit: Número máximo de análisis
+            
+        Returns:
+            Análisis (como get_history_page) más recientes primero, con
+            'matches' (hallazgos coincidentes) y 'match_example' (el primero)
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        
+        cursor = self.conn.cursor()
+        if self.fts_enabled:
+            # Cada término como cadena FTS5 (las comillas internas se duplican)
+            quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+            quoted[-1] += '*'
+            match = ' '.join(quoted)
+            try:
+                finding_rows = cursor.execute('''
+                    SELECT d.analysis_id, COUNT(*) AS matches, MIN(d.id) AS first_id
+                    FROM findings_fts JOIN findings_detail d ON d.id = findings_fts.rowid
+                    WHERE findings_fts MATCH ?
+                    GROUP BY d.analysis_id
+                ''', (match,)).fetchall()
+                analysis_ids = [row[0] for row in cursor.execute(
+                    'SELECT rowid FROM analyses_fts WHERE analyses_fts MATCH ?', (match,))]
+            except sqlite3.OperationalError:
+                # Términos sin ningún token indexable (solo signos de puntuación)
+                return []
+        else:
+            finding_text = " || ' ' || ".join(f"IFNULL(d.{column}, '')" for column in SEARCH_INDEXES[0][2])
+            analysis_text = " || ' ' || ".join(f"IFNULL({column}, '')" for column in SEARCH_INDEXES[1][2])
+            likes = ['%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                     for term in terms]
+            finding_where = ' AND '.join([f"({finding_text}) LIKE ? ESCAPE '\\'"] * len(terms))
+            analysis_where = ' AND '.join([f"({analysis_text}) LIKE ? ESCAPE '\\'"] * len(terms))
+            finding_rows = cursor.execute(f'''
+                SELECT d.analysis_id, COUNT(*) AS matches, MIN(d.id) AS first_id
+                FROM findings_detail d
+                WHERE {finding_where}
+                GROUP BY d.analysis_id
+            ''', likes).fetchall()
+            analysis_ids = [row[0] for row in cursor.execute(
+                f'SELECT id FROM analysis_history WHERE {analysis_where}', likes)]
+        
+        found = {row[0]: {'matches': row[1], 'first_id': row[2]} for row in finding_rows}
+        for analysis_id in analysis_ids:
+            found.setdefault(analysis_id, {'matches': 0, 'first_id': None})
+        if not found:
+            return []
+        
+        # Análisis coincidentes (los hallazgos de análisis eliminados no aparecen)
+        ids = list(found)
+        history = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            sql = (f"SELECT {', '.join(HISTORY_LIST_COLUMNS)} FROM analysis_history "
+                   f"WHERE id IN ({','.join('?' * len(chunk))})")
+            params = list(chunk)
+            if project_name:
+                sql += ' AND project_name = ?'
+                params.append(project_name)
+            history.extend(dict(row) for row in cursor.execute(sql, params))
+        history.sort(key=lambda row: (row['analysis_date'], row['id']), reverse=True)
+        history = history[:limit]
+        
+        # Ejemplo de coincidencia por análisis (el primer hallazgo coincidente)
+        first_ids = [found[row['id']]['first_id'] for row in history if found[row['id']]['first_id']]
+        examples = {}
+        if first_ids:
+            examples = {row['analysis_id']: dict(row) for row in cursor.execute(f'''
+                SELECT analysis_id, rule_id, description, file_path, location
+                FROM findings_detail WHERE id IN ({','.join('?' * len(first_ids))})
+            ''', first_ids)}
+        for row in history:
+            row['matches'] = found[row['id']]['matches']
+            row['match_example'] = examples.get(row['id'])
+        return history
+    
+    def get_score_inputs(self, project_name: Optional[str] = None) -> List[Dict]:
+        """
+        Datos necesarios para recalcular el score de los análisis guardados
+
+        Args:
+            project_name: Filtrar por nombre de proyecto (None = todos)
+
+        Returns:
+            Lista de {'id', 'project_name', 'analysis_date', 'score', 'statistics', 'baseline'}
+            (solo análisis con recuentos por regla en metadata)
+        """
+        cursor = self.conn.cursor()
+        query = 'SELECT id, project_name, analysis_date, score, metadata FROM analysis_history'
+        params = ()
+        if project_name:
+            query += ' WHERE project_name = ?'
+            params = (project_name,)
+        cursor.execute(query + ' ORDER BY id', params)
+
+        inputs = []
+        for row in cursor.fetchall():
+            try:
+                metadata = json.loads(row['metadata']) if row['metadata'] else {}
+            except ValueError:
+                continue
+            statistics = metadata.get('statistics') or {}
+            if 'findings_by_rule' not in statistics:
+                continue
+            inputs.append({
+                'id': row['id'],
+                'project_name': row['project_name'],
+                'analysis_date': row['analysis_date'],
+                'score': row['score'],
+                'statistics': statistics,
+                'baseline': metadata.get('baseline'),
+            })
+        return inputs
+
+    def update_scores(self, scores: Dict[int, float]):
+        """
+        Actualizar el score de varios análisis (recalculados con src.scoring)
+
+        Args:
+            scores: {analysis_id: nuevo score}
+        """
+        rows = [(score, analysis_id) for analysis_id, score in scores.items()]
+        self._write(lambda conn: conn.executemany('UPDATE analysis_history SET score = ? WHERE id = ?', rows))
+    
+    def update_report_paths(self, analysis_id: int, html_path: Optional[Path] = None,
+                            excel_path: Optional[Path] = None):
+        """
+        Guardar las rutas de los reportes generados de un análisis
+        
+        Args:
+            analysis_id: ID del análisis
+            html_path: Ruta al reporte HTML (opcional)
+            excel_path: Ruta al reporte Excel (opcional)
+        """
+        def update(conn):
+            if html_path:
+                conn.execute('''
+                    UPDATE analysis_history 
+                    SET html_report_path = ? 
+                    WHERE id = ?
+                ''', (str(html_path), analysis_id))
+            if excel_path:
+                conn.execute('''
+                    UPDATE analysis_history 
+                    SET excel_report_path = ? 
+                    WHERE id = ?
+                ''', (str(excel_path), analysis_id))
+        
+        self._write(update)
+
     def get_analysis_by_id(self, analysis_id: int) -> Optional[Dict]:
         """
         Obtener análisis específico por ID
@@ -347,8 +1004,89 @@ class MetricsDatabase:
         findings = [dict(row) for row in cursor.fetchall()]
         analysis['findings'] = findings
         
+        # Tiempos por fase/regla/archivo (si se registraron)
+        analysis['timings'] = self.get_timings(analysis_id)
+        
         return analysis
     
+    def get_results(self, analysis_id: int) -> Optional[Dict]:
+        """
+        Reconstruir el diccionario de resultados de un análisis guardado
+        
+        Sirve de entrada a los generadores de reportes sin reescanear. Los
+        análisis anteriores a la persistencia de resultados se reconstruyen
+        con los hallazgos de findings_detail ('partial': True).
+        
+        Args:
+            analysis_id: ID del análisis
+            
+        Returns:
+            Resultados (como los de ProjectScanner.scan) o None si no existe
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT schema_version, payload FROM analysis_results WHERE analysis_id = ?
+        ''', (analysis_id,))
+        stored = cursor.fetchone()
+        
+        analysis = self.get_analysis_by_id(analysis_id)
+        if analysis is None:
+            return None
+        
+        if stored is not None and stored['schema_version'] == RESULTS_SCHEMA_VERSION:
+            results = json.loads(zlib.decompress(stored['payload']).decode('utf-8'))
+            results['partial'] = False
+        else:
+            results = self._legacy_results(analysis)
+        
+        results['analysis_id'] = analysis_id
+        results['analysis_date'] = analysis['analysis_date']
+        results['report_paths'] = {'html': analysis.get('html_report_path'),
+                                   'excel': analysis.get('excel_report_path')}
+        results['timings'] = analysis.get('timings', {})
+        results['reconstructed'] = True
+        return results
+    
+    def _legacy_results(self, analysis: Dict) -> Dict:
+        """Resultados aproximados de un análisis sin resultados completos guardados"""
+        from src.scoring import grade_for
+        
+        metadata = analysis.get('metadata') or {}
+        statistics = dict(metadata.get('statistics') or {})
+        statistics.setdefault('total_findings', analysis.get('total_findings', 0))
+        statistics.setdefault('errors', analysis.get('high_findings', 0))
+        statistics.setdefault('warnings', analysis.get('medium_findings', 0))
+        statistics.setdefault('infos', analysis.get('low_findings', 0))
+        score = analysis.get('score') or 0
+        grade, color = grade_for(score)
+        
+        findings = [{
+            'rule_id': row.get('rule_id', ''),
+            'rule_name': row.get('rule_name', ''),
+            'severity': row.get('severity', 'info'),
+            'category': row.get('category', ''),
+            'file_path': row.get('file_path', ''),
+            'location': row.get('location', ''),
+            'description': row.get('description', ''),
+        } for row in analysis.get('findings', [])]
+        
+        return {
+            'success': True,
+            'project_path': analysis.get('project_path', ''),
+            'project_info': {'name': analysis.get('project_name', 'Proyecto'),
+                             'studio_version': analysis.get('version', 'Unknown')},
+            'total_files': analysis.get('total_files', 0),
+            'analyzed_files': analysis.get('analyzed_files', 0),
+            'statistics': statistics,
+            'score': {'score': score, 'grade': grade, 'color': color},
+            'findings': findings,
+            'parsed_files': [],
+            'bbpp_sets': metadata.get('bbpp_sets', []),
+            'baseline': metadata.get('baseline'),
+            'execution_time': analysis.get('execution_time', 0),
+            'partial': True,
+        }
+    
     def get_project_stats(self, project_name: str) -> Dict:
         """
         Obtener estadísticas de un proyecto
@@ -441,14 +1179,16 @@ class MetricsDatabase:
         Returns:
             True si se eliminó correctamente
         """
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            DELETE FROM analysis_history WHERE id = ?
-        ''', (analysis_id,))
+        def delete(conn):
+            conn.execute('DELETE FROM analysis_results WHERE analysis_id = ?', (analysis_id,))
+            conn.execute('DELETE FROM findings_detail WHERE analysis_id = ?', (analysis_id,))
+            conn.execute('DELETE FROM metrics_summary WHERE analysis_id = ?', (analysis_id,))
+            cursor = conn.execute('''
+                DELETE FROM analysis_history WHERE id = ?
+            ''', (analysis_id,))
+            return cursor.rowcount > 0
         
-        self.conn.commit()
-        return cursor.rowcount > 0
+        return self._write(delete)
     
     def cleanup_old_analyses(self, project_name: str, keep_last: int = 50) -> int:
         """
@@ -461,35 +1201,200 @@ class MetricsDatabase:
         Returns:
             Número de análisis eliminados
         """
-        cursor = self.conn.cursor()
-        
         # Obtener IDs a eliminar
-        cursor.execute('''
-            SELECT id FROM analysis_history
-            WHERE project_name = ?
-            ORDER BY analysis_date DESC
-            LIMIT -1 OFFSET ?
-        ''', (project_name, keep_last))
-        
-        ids_to_delete = [row[0] for row in cursor.fetchall()]
-        
+        ids_to_delete = self.get_old_analysis_ids(project_name, keep_last)
+
         if not ids_to_delete:
             return 0
         
         # Eliminar
         placeholders = ','.join('?' * len(ids_to_delete))
-        cursor.execute(f'''
-            DELETE FROM analysis_history 
-            WHERE id IN ({placeholders})
-        ''', ids_to_delete)
         
-        self.conn.commit()
-        return cursor.rowcount
-    
+        def delete(conn):
+            conn.execute(f'DELETE FROM analysis_results WHERE analysis_id IN ({placeholders})', ids_to_delete)
+            conn.execute(f'DELETE FROM findings_detail WHERE analysis_id IN ({placeholders})', ids_to_delete)
+            conn.execute(f'DELETE FROM metrics_summary WHERE analysis_id IN ({placeholders})', ids_to_delete)
+            return conn.execute(f'''
+                DELETE FROM analysis_history 
+                WHERE id IN ({placeholders})
+            ''', ids_to_delete).rowcount
+        
+        return self._write(delete)
+
+    def get_old_analysis_ids(self, project_name: str, keep_last: int) -> List[int]:
+        """
+        IDs de los análisis de un proyecto que quedan fuera de los últimos N
+
+        Args:
+            project_name: Nombre del proyecto
+            keep_last: Número de análisis a mantener
+
+        Returns:
+            IDs del más reciente al más antiguo
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id FROM analysis_history
+            WHERE project_name = ?
+            ORDER BY analysis_date DESC, id DESC
+            LIMIT -1 OFFSET ?
+        ''', (project_name, keep_last))
+        return [row[0] for row in cursor.fetchall()]
+
+    # ------------------------------------------------------------------
+    # Retención y compactación
+    # ------------------------------------------------------------------
+
+    def get_raw_findings_before(self, cutoff: str, limit: int = 200) -> List[Dict]:
+        """
+        Análisis anteriores a una fecha que aún conservan hallazgos en bruto
+        (filas de findings_detail o resultados completos en analysis_results)
+
+        Args:
+            cutoff: Fecha límite 'YYYY-MM-DD HH:MM:SS' (UTC, como analysis_date)
+            limit: Número máximo de análisis
+
+        Returns:
+            Lista de {'id', 'project_name', 'analysis_date'}, más antiguos primero
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id, project_name, analysis_date FROM analysis_history h
+            WHERE analysis_date < ?
+              AND (EXISTS (SELECT 1 FROM findings_detail d WHERE d.analysis_id = h.id)
+                   OR EXISTS (SELECT 1 FROM analysis_results r WHERE r.analysis_id = h.id))
+            ORDER BY analysis_date, id
+            LIMIT ?
+        ''', (cutoff, limit))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def export_raw_findings(self, analysis_id: int) -> Optional[Dict]:
+        """
+        Hallazgos en bruto de un análisis, para archivarlos antes de borrarlos
+
+        Args:
+            analysis_id: ID del análisis
+
+        Returns:
+            {'analysis_id', 'project_name', 'project_path', 'analysis_date',
+            'findings_detail': [filas], 'results': resultados completos o None}
+            (None si el análisis no existe)
+        """
+        cursor = self.conn.cursor()
+        analysis = cursor.execute('''
+            SELECT id, project_name, project_path, analysis_date FROM analysis_history WHERE id = ?
+        ''', (analysis_id,)).fetchone()
+        if analysis is None:
+            return None
+
+        rows = cursor.execute('''
+            SELECT rule_id, rule_name, severity, category, file_path, location, description
+            FROM findings_detail WHERE analysis_id = ? ORDER BY id
+        ''', (analysis_id,)).fetchall()
+        stored = cursor.execute('''
+            SELECT schema_version, payload FROM analysis_results WHERE analysis_id = ?
+        ''', (analysis_id,)).fetchone()
+        results = None
+        if stored is not None:
+            results = json.loads(zlib.decompress(stored['payload']).decode('utf-8'))
+            results['schema_version'] = stored['schema_version']
+
+        return {
+            'analysis_id': analysis['id'],
+            'project_name': analysis['project_name'],
+            'project_path': analysis['project_path'],
+            'analysis_date': analysis['analysis_date'],
+            'findings_detail': [dict(row) for row in rows],
+            'results': results,
+        }
+
+    def purge_raw_findings(self, analysis_ids: List[int]) -> int:
+        """
+        Borrar los hallazgos en bruto de unos análisis, conservando su resumen
+        (analysis_history, tiempos y latest_analysis no cambian)
+
+        Args:
+            analysis_ids: IDs de los análisis
+
+        Returns:
+            Número de filas de findings_detail borradas
+        """
+        if not analysis_ids:
+            return 0
+
+        def purge(conn):
+            deleted = 0
+            for start in range(0, len(analysis_ids), 500):
+                chunk = list(analysis_ids[start:start + 500])
+                placeholders = ','.join('?' * len(chunk))
+                conn.execute(f'DELETE FROM analysis_results WHERE analysis_id IN ({placeholders})', chunk)
+                deleted += conn.execute(
+                    f'DELETE FROM findings_detail WHERE analysis_id IN ({placeholders})', chunk).rowcount
+            return deleted
+
+        return self._write(purge)
+
+    def get_maintenance_value(self, key: str) -> Optional[str]:
+        """Valor guardado del estado de mantenimiento (None si no existe)"""
+        row = self.conn.execute('SELECT value FROM db_maintenance WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_maintenance_value(self, key: str, value: str):
+        """Guardar un valor del estado de mantenimiento"""
+        self._write(lambda conn: conn.execute('''
+            INSERT INTO db_maintenance (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        ''', (key, value)))
+
+    def compact(self, full: bool = False) -> Dict:
+        """
+        Recuperar el espacio libre del archivo
+
+        Sin full, devuelve al sistema las páginas libres (auto_vacuum
+        incremental) y vacía el WAL. Con full, reescribe la base de datos
+        (VACUUM); también activa auto_vacuum incremental en BDs creadas antes
+        de usarlo. Ambos modos optimizan los índices FTS5 de búsqueda.
+
+        Args:
+            full: Reescribir toda la base de datos (más lento, bloquea escrituras)
+
+        Returns:
+            {'full', 'auto_vacuum', 'pages_before', 'pages_after', 'freed_bytes'}
+        """
+        def run(conn):
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            pages_before = conn.execute('PRAGMA page_count').fetchone()[0]
+
+            if self.fts_enabled:
+                for table, _, _ in SEARCH_INDEXES:
+                    conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+                conn.commit()
+
+            if full:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.execute('VACUUM')
+            elif conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+                # execute() solo avanza un paso (una página); executescript lo completa
+                conn.executescript('PRAGMA incremental_vacuum;')
+            conn.execute('PRAGMA optimize')
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+
+            pages_after = conn.execute('PRAGMA page_count').fetchone()[0]
+            return {
+                'full': full,
+                'auto_vacuum': conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2,
+                'pages_before': pages_before,
+                'pages_after': pages_after,
+                'freed_bytes': max(0, pages_before - pages_after) * page_size,
+            }
+
+        return self._write(run)
+
     def close(self):
-        """Cerrar conexión a la base de datos"""
-        if self.conn:
-            self.conn.close()
+        """Liberar las conexiones (se cierran al liberar el último usuario del archivo)"""
+        if not self._closed:
+            self._closed = True
+            self.manager.release()
     
     def __enter__(self):
         """Context manager entry"""
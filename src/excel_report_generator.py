@@ -7,8 +7,12 @@ from pathlib import Path
 from typing import Dict
 from datetime import datetime
 
+from src.memory_budget import parsed_count
+from src.report_model import get_report_model
+
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, Fill, PatternFill, Alignment, Border, Side
     from openpyxl.chart import PieChart, BarChart, Reference
     from openpyxl.chart.label import DataLabelList
@@ -23,7 +27,8 @@ except ImportError:
 class ExcelReportGenerator:
     """Generador de reportes Excel para análisis de BBPP"""
     
-    def __init__(self, results: Dict, output_path: Path = None, include_charts: bool = True):
+    def __init__(self, results: Dict, output_path: Path = None, include_charts: bool = True,
+                 streaming: bool = None):
         """
         Inicializar generador
         
@@ -31,9 +36,12 @@ class ExcelReportGenerator:
             results: Resultados del análisis
             output_path: Ruta donde guardar el reporte (opcional)
             include_charts: Si incluir gráficos
+            streaming: Generar en modo write-only (sin gráficos ni celdas combinadas).
+                       Por defecto se activa si el análisis terminó en modo de baja memoria.
         """
         self.results = results
-        self.include_charts = include_charts and OPENPYXL_AVAILABLE
+        self.streaming = results.get('low_memory', False) if streaming is None else streaming
+        self.include_charts = include_charts and OPENPYXL_AVAILABLE and not self.streaming
         
         # Cargar colores desde branding
         try:
@@ -94,6 +102,9 @@ class ExcelReportGenerator:
         if not OPENPYXL_AVAILABLE:
             raise ImportError("openpyxl no está instalado. Instala con: pip install openpyxl")
         
+        if self.streaming:
+            return self._generate_streaming()
+        
         # Crear workbook
         self.wb = Workbook()
         
@@ -116,6 +127,144 @@ class ExcelReportGenerator:
         
         return self.output_path
     
+    def _file_row(self, file_data: Dict):
+        """
+        Fila de la hoja Archivos (admite parsed_data completo o resumido)
+        
+        Returns:
+            Tupla (valores de la fila, % comentado)
+        """
+        total_lines = file_data.get('total_lines', 0)
+        commented_lines = file_data.get('commented_lines', 0)
+        comment_percent = (commented_lines / total_lines * 100) if total_lines > 0 else 0
+        
+        row_data = [
+            Path(file_data.get('file_path', '')).name,
+            file_data.get('workflow_type', 'Unknown'),
+            parsed_count(file_data, 'activities'),
+            parsed_count(file_data, 'variables'),
+            parsed_count(file_data, 'arguments'),
+            parsed_count(file_data, 'log_messages'),
+            f"{comment_percent:.1f}%"
+        ]
+        return row_data, comment_percent
+    
+    # ========================================================================
+    # MODO STREAMING (write-only, para análisis en modo de baja memoria)
+    # ========================================================================
+    
+    def _generate_streaming(self) -> Path:
+        """
+        Generar el reporte con un workbook write-only: las filas se escriben
+        según se leen los hallazgos, sin mantener la hoja en memoria.
+        Omite gráficos, celdas combinadas y la hoja de validación de versiones.
+        """
+        self.wb = Workbook(write_only=True)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._write_summary_sheet_streaming()
+        self._write_findings_sheet_streaming()
+        self._write_files_sheet_streaming()
+        
+        self.wb.save(self.output_path)
+        return self.output_path
+    
+    def _header_cells(self, ws, headers):
+        """Celdas de encabezado con estilo para una hoja write-only"""
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = self.header_font
+            cell.fill = self.header_fill
+            cell.alignment = self.center_align
+            cell.border = self.border
+            cells.append(cell)
+        return cells
+    
+    def _write_summary_sheet_streaming(self):
+        """Hoja de resumen en formato clave/valor"""
+        ws = self.wb.create_sheet("Resumen")
+        ws.column_dimensions['A'].width = 25
+        ws.column_dimensions['B'].width = 40
+        
+        project_info = self.results.get('project_info', {})
+        score_data = self.results.get('score', {})
+        stats = self.results.get('statistics', {})
+        
+        ws.append(self._header_cells(ws, ["RESUMEN EJECUTIVO", ""]))
+        rows = [
+            ("Nombre del Proyecto:", project_info.get('name', 'N/A')),
+            ("Tipo:", project_info.get('type', 'N/A')),
+            ("UiPath Studio:", project_info.get('studio_version', 'N/A')),
+            ("Archivos Analizados:", self.results.get('analyzed_files', 0)),
+            ("Fecha de Análisis:", datetime.now().strftime("%d/%m/%Y %H:%M")),
+            ("Score:", f"{score_data.get('score', 0)}/100"),
+            ("Calificación:", score_data.get('grade', 'N/A')),
+            ("❌ Errores:", stats.get('errors', 0)),
+            ("⚠️ Warnings:", stats.get('warnings', 0)),
+            ("ℹ️ Info:", stats.get('infos', 0)),
+            ("📊 Total:", stats.get('total_findings', 0)),
+            ("Nota:", "Reporte generado en modo de baja memoria (sin gráficos)"),
+        ]
+        bold = Font(bold=True)
+        for label, value in rows:
+            label_cell = WriteOnlyCell(ws, value=label)
+            label_cell.font = bold
+            ws.append([label_cell, value])
+    
+    def _write_findings_sheet_streaming(self):
+        """Hoja de hallazgos escrita fila a fila"""
+        ws = self.wb.create_sheet("Hallazgos")
+        for column, width in zip('ABCDEF', [5, 15, 20, 50, 25, 30]):
+            ws.column_dimensions[column].width = width
+        ws.freeze_panes = "A2"
+        
+        headers = ["#", "Severidad", "Categoría", "Descripción", "Archivo", "Ubicación"]
+        ws.append(self._header_cells(ws, headers))
+        
+        # Estilos de severidad compartidos por todas las filas
+        severity_styles = {
+            'error': ('❌ Error', PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid"),
+                      Font(color=self.COLOR_ERROR, bold=True)),
+            'warning': ('⚠️ Warning', PatternFill(start_color="FFF9E6", end_color="FFF9E6", fill_type="solid"),
+                        Font(color="B8860B", bold=True)),
+            'info': ('ℹ️ Info', PatternFill(start_color="E6F2FF", end_color="E6F2FF", fill_type="solid"),
+                     Font(color=self.COLOR_INFO, bold=True)),
+        }
+        
+        count = 0
+        # Hallazgos aceptados en la línea base no se listan
+        new_findings = (f for f in self.results.get('findings', []) if not f.get('suppressed'))
+        for count, finding in enumerate(new_findings, 1):
+            severity = finding.get('severity', 'info')
+            label, fill, font = severity_styles.get(severity, severity_styles['info'])
+            severity_cell = WriteOnlyCell(ws, value=label)
+            severity_cell.fill = fill
+            severity_cell.font = font
+            severity_cell.alignment = self.center_align
+            ws.append([
+                count,
+                severity_cell,
+                finding.get('category', ''),
+                finding.get('description', ''),
+                Path(finding.get('file_path', '')).name,
+                finding.get('location', ''),
+            ])
+        
+        ws.auto_filter.ref = f"A1:F{count + 1}"
+    
+    def _write_files_sheet_streaming(self):
+        """Hoja de archivos escrita fila a fila"""
+        ws = self.wb.create_sheet("Archivos")
+        for i, width in enumerate([30, 15, 12, 12, 12, 10, 12], 1):
+            ws.column_dimensions[get_column_letter(i)].width = width
+        
+        headers = ["Archivo", "Tipo", "Actividades", "Variables", "Argumentos", "Logs", "% Comentado"]
+        ws.append(self._header_cells(ws, headers))
+        for file_data in self.results.get('parsed_files', []):
+            row_data, _ = self._file_row(file_data)
+            ws.append(row_data)
+    
     def _create_summary_sheet(self):
         """Crear hoja de resumen ejecutivo"""
         ws = self.wb.create_sheet("Resumen", 0)
@@ -391,8 +540,10 @@ class ExcelReportGenerator:
             cell.alignment = self.center_align
             cell.border = self.border
         
-        # Datos
-        findings = self.results.get('findings', [])
+        # Datos (los hallazgos aceptados en la línea base no se listan); el
+        # recuento viene del modelo compartido, sin copiar la lista filtrada
+        model = get_report_model(self.results)
+        findings = (f for f in self.results.get('findings', []) if not f.get('suppressed'))
         
         # Color de fila alternada
         alternate_fill = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")
@@ -451,7 +602,7 @@ class ExcelReportGenerator:
         ws.column_dimensions['F'].width = 30
         
         # Filtros automáticos
-        ws.auto_filter.ref = f"A1:F{len(findings) + 1}"
+        ws.auto_filter.ref = f"A1:F{model.listed_findings + 1}"
         
         # Congelar primera fila
         ws.freeze_panes = "A2"
@@ -543,20 +694,7 @@ class ExcelReportGenerator:
         # Datos de archivos parseados
         parsed_files = self.results.get('parsed_files', [])
         for row_idx, file_data in enumerate(parsed_files, 2):
-            # Calcular % comentado
-            total_lines = file_data.get('total_lines', 0)
-            commented_lines = file_data.get('commented_lines', 0)
-            comment_percent = (commented_lines / total_lines * 100) if total_lines > 0 else 0
-            
-            row_data = [
-                Path(file_data.get('file_path', '')).name,
-                file_data.get('workflow_type', 'Unknown'),
-                len(file_data.get('activities', [])),
-                len(file_data.get('variables', [])),
-                len(file_data.get('arguments', [])),
-                len(file_data.get('log_messages', [])),
-                f"{comment_percent:.1f}%"
-            ]
+            row_data, comment_percent = self._file_row(file_data)
             
             for col_idx, value in enumerate(row_data, 1):
                 cell = ws.cell(row=row_idx, column=col_idx, value=value)
@@ -0,0 +1,167 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Agregación de hallazgos en origen
+Las reglas de nomenclatura emiten un hallazgo por variable o argumento; en
+proyectos legacy son decenas de miles de hallazgos casi idénticos. En modo
+agregado se emite un único hallazgo por (regla, archivo) con el número de
+ocurrencias y una muestra limitada. El detalle completo se escribe en un
+archivo sidecar JSONL y se expande bajo demanda con load_details().
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Verificaciones de alta cardinalidad (un hallazgo por variable/argumento)
+AGGREGATED_CHECKS = (
+    '_check_variable_naming',
+    '_check_variable_naming_pascal',
+    '_check_generic_names',
+    '_check_argument_prefixes',
+    '_check_argument_descriptions',
+)
+
+# Ocurrencias conservadas como muestra en el hallazgo agregado
+DEFAULT_MAX_SAMPLES = 10
+
+
+def get_sidecar_output_dir() -> Path:
+    """Directorio de los sidecars de detalle (output/findings/)"""
+    from src.config import OUTPUT_DIR
+
+    output_dir = OUTPUT_DIR / 'findings'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+def finding_occurrences(finding: Dict) -> int:
+    """Número de casos que representa un hallazgo (diccionario de Finding.to_dict())"""
+    details = finding.get('details') or {}
+    return details.get('occurrences', 1) if details.get('aggregated') else 1
+
+
+class FindingSidecar:
+    """Archivo JSONL con el detalle completo de los hallazgos agregados (una línea por grupo)"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Ruta del archivo sidecar (se abre en modo añadir al primer uso)
+        """
+        self.path = Path(path)
+        self._file = None
+
+    @classmethod
+    def for_project(cls, project_name: str) -> 'FindingSidecar':
+        """Sidecar nuevo en output/findings/ para un análisis del proyecto"""
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in project_name) or 'proyecto'
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return cls(get_sidecar_output_dir() / f"{safe_name}_{timestamp}.details.jsonl")
+
+    def write(self, findings: List[Dict]) -> Dict:
+        """
+        Escribir el detalle de un grupo
+
+        Args:
+            findings: Hallazgos completos del grupo (to_dict())
+
+        Returns:
+            Referencia {'path', 'offset'} para load_details()
+        """
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'ab')
+        offset = self._file.tell()
+        line = json.dumps(findings, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+        self._file.write(line)
+        return {'path': str(self.path), 'offset': offset}
+
+    def close(self):
+        """Cerrar el archivo (se reabre en modo añadir si se vuelve a escribir)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def aggregate_findings(findings: List, max_samples: int = DEFAULT_MAX_SAMPLES,
+                       sidecar: Optional[FindingSidecar] = None) -> List:
+    """
+    Agrupar los hallazgos de una verificación sobre un archivo por regla
+
+    Los grupos de un solo hallazgo se devuelven sin cambios. El agregado
+    suma las penalizaciones y los casos de cada ocurrencia, de modo que el
+    score (penalty_mode) es idéntico al de los hallazgos individuales.
+
+    Args:
+        findings: Hallazgos (Finding) emitidos por una verificación para un archivo
+        max_samples: Ocurrencias conservadas como muestra
+        sidecar: Destino del detalle completo (opcional)
+
+    Returns:
+        Lista de Finding con un hallazgo por regla
+    """
+    groups: Dict[str, List] = {}
+    for finding in findings:
+        groups.setdefault(finding.rule_id, []).append(finding)
+
+    aggregated = []
+    for group in groups.values():
+        if len(group) == 1:
+            aggregated.append(group[0])
+            continue
+
+        first = group[0]
+        count = len(group)
+        details = {
+            'aggregated': True,
+            'occurrences': count,
+            'samples': [{'location': f.location, 'details': f.details} for f in group[:max_samples]],
+            'penalty_mode': first.details.get('penalty_mode'),
+            'base_penalty': first.details.get('base_penalty'),
+            'cases_found': sum(f.details.get('cases_found', 1) for f in group),
+            'actual_penalty': sum(f.penalty for f in group),
+        }
+        if sidecar is not None:
+            details['detail_ref'] = sidecar.write([f.to_dict() for f in group])
+
+        aggregated.append(first.__class__(
+            category=first.category,
+            severity=first.severity,
+            rule_name=first.rule_name,
+            description=first.description,
+            file_path=first.file_path,
+            location=f"{count} ocurrencias",
+            details=details,
+            rule_id=first.rule_id,
+            penalty=details['actual_penalty']
+        ))
+    return aggregated
+
+
+def load_details(finding: Dict) -> List[Dict]:
+    """
+    Expandir un hallazgo agregado a sus ocurrencias completas
+
+    Args:
+        finding: Hallazgo (to_dict()); si no está agregado se devuelve tal cual
+
+    Returns:
+        Lista de hallazgos individuales (las muestras si no hay sidecar)
+    """
+    details = finding.get('details') or {}
+    if not details.get('aggregated'):
+        return [finding]
+
+    ref = details.get('detail_ref')
+    if ref and Path(ref['path']).exists():
+        with open(ref['path'], 'rb') as f:
+            f.seek(ref['offset'])
+            return json.loads(f.readline())
+
+    return [dict(finding, location=sample['location'], details=sample['details'])
+            for sample in details.get('samples', [])]
@@ -0,0 +1,281 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Huellas estables de hallazgos y línea base de hallazgos aceptados
+Cada hallazgo recibe una huella (hash de regla, ruta relativa normalizada,
+ubicación y detalles clave) que no cambia al desplazarse líneas. Una línea
+base (archivo JSON junto al proyecto o tabla finding_baseline de la BD)
+guarda las huellas aceptadas; el escaneo las resta para que solo los
+hallazgos nuevos puntúen y fallen la build.
+
+Los hallazgos agregados (una regla en un archivo) no conservan la huella de
+cada ocurrencia: la línea base guarda cuántas ocurrencias se aceptaron por
+grupo (regla + archivo) y el exceso cuenta como nuevo.
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.finding_aggregation import finding_occurrences
+
+
+BASELINE_SCHEMA_VERSION = 2
+
+# Archivo de línea base por defecto (relativo a la raíz del proyecto)
+DEFAULT_BASELINE_FILE = 'bbpp-baseline.json'
+
+# Detalles que identifican el elemento afectado (el resto son medidas o sugerencias)
+FINGERPRINT_DETAIL_KEYS = (
+    'variable_name', 'argument_name', 'display_name', 'package', 'workflow_file', 'workflow', 'property',
+)
+
+# Números sueltos en la ubicación (líneas, niveles, contadores): se normalizan
+_NUMBER_RE = re.compile(r'(?<!\w)\d+(?!\w)')
+
+
+def normalize_path(file_path: str, project_path: Path) -> str:
+    """Ruta relativa al proyecto en formato POSIX (o la ruta original si está fuera)"""
+    if not file_path:
+        return ''
+    path = Path(file_path)
+    try:
+        return path.relative_to(project_path).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def finding_fingerprint(finding: Dict, project_path: Path) -> str:
+    """
+    Huella de un hallazgo, estable ante desplazamientos de línea
+
+    Args:
+        finding: Hallazgo (Finding.to_dict())
+        project_path: Raíz del proyecto (para la ruta relativa)
+
+    Returns:
+        Hash hexadecimal de 16 caracteres
+    """
+    details = finding.get('details') or {}
+    if details.get('aggregated'):
+        # Un agregado representa la regla en el archivo: la ubicación es un recuento
+        return finding_group(finding, project_path)
+
+    location = _NUMBER_RE.sub('#', finding.get('location', '') or '')
+    key_details = [f"{key}={details[key]}" for key in FINGERPRINT_DETAIL_KEYS
+                   if isinstance(details.get(key), str)]
+    return _hash_parts([
+        finding.get('rule_id', ''),
+        normalize_path(finding.get('file_path', ''), Path(project_path)),
+        location,
+        *key_details,
+    ])
+
+
+def finding_group(finding: Dict, project_path: Path) -> str:
+    """
+    Huella del grupo de un hallazgo (regla + archivo), la misma que la de su
+    hallazgo agregado
+
+    Args:
+        finding: Hallazgo (Finding.to_dict())
+        project_path: Raíz del proyecto
+
+    Returns:
+        Hash hexadecimal de 16 caracteres
+    """
+    return _hash_parts([
+        finding.get('rule_id', ''),
+        normalize_path(finding.get('file_path', ''), Path(project_path)),
+        '',
+    ])
+
+
+def _hash_parts(parts: List[str]) -> str:
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def assign_fingerprints(findings: Iterable[Dict], project_path: Path) -> List[Dict]:
+    """
+    Añadir 'fingerprint' a cada hallazgo; los duplicados del lote reciben un sufijo
+
+    Args:
+        findings: Hallazgos de un lote (un archivo, el proyecto...)
+        project_path: Raíz del proyecto
+
+    Returns:
+        La misma lista de hallazgos con 'fingerprint'
+    """
+    findings = list(findings)
+    seen: Dict[str, int] = {}
+    for finding in findings:
+        fingerprint = finding_fingerprint(finding, project_path)
+        count = seen.get(fingerprint, 0)
+        seen[fingerprint] = count + 1
+        finding['fingerprint'] = fingerprint if count == 0 else f"{fingerprint}:{count}"
+    return findings
+
+
+def resolve_baseline_path(project_path: Path, baseline_file: str = None) -> Path:
+    """Ruta del archivo de línea base (relativa a la raíz del proyecto si no es absoluta)"""
+    path = Path(baseline_file or DEFAULT_BASELINE_FILE)
+    return path if path.is_absolute() else Path(project_path) / path
+
+
+def baseline_entries(findings: Iterable[Dict], project_path: Path) -> Dict[str, Dict]:
+    """
+    Entradas de línea base de los hallazgos actuales
+
+    Args:
+        findings: Hallazgos con 'fingerprint' (result['findings'])
+        project_path: Raíz del proyecto
+
+    Returns:
+        {huella: {'rule_id', 'file_path', 'location', 'group', 'occurrences'}}
+    """
+    entries = {}
+    for finding in findings:
+        entries[finding['fingerprint']] = {
+            'rule_id': finding.get('rule_id', ''),
+            'file_path': finding.get('file_path', ''),
+            'location': finding.get('location', ''),
+            'group': finding_group(finding, project_path),
+            'occurrences': finding_occurrences(finding),
+        }
+    return entries
+
+
+class FindingBaseline:
+    """
+    Huellas aceptadas de un proyecto y su consumo durante un escaneo
+
+    Un hallazgo individual se acepta si su huella está en la línea base. Un
+    agregado se acepta hasta el total de ocurrencias aceptadas en su grupo
+    (tanto si se aceptó agregado como si entonces era un único hallazgo); el
+    exceso queda en 'new_occurrences'. Las entradas anteriores a los recuentos
+    (sin 'occurrences') aceptan el agregado completo, como hasta ahora.
+    """
+
+    def __init__(self, entries: Dict[str, Dict], project_path: Path):
+        self.entries = entries
+        self.project_path = Path(project_path)
+        self.group_totals: Dict[str, int] = {}
+        self.aggregated_groups = set()
+        for entry in entries.values():
+            group = entry.get('group')
+            if group:
+                self.group_totals[group] = self.group_totals.get(group, 0) + (entry.get('occurrences') or 1)
+                if (entry.get('occurrences') or 1) > 1:
+                    self.aggregated_groups.add(group)
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def reset(self):
+        """Empezar un escaneo: nada consumido ni visto"""
+        self.remaining = dict(self.group_totals)
+        self.seen_fingerprints = set()
+        self.seen_groups = set()
+
+    def apply(self, finding: Dict):
+        """
+        Marcar un hallazgo como aceptado ('suppressed') o nuevo
+
+        Args:
+            finding: Hallazgo con 'fingerprint'; si un agregado es nuevo solo en
+                parte, recibe 'new_occurrences'
+        """
+        fingerprint = finding['fingerprint']
+        group = finding_group(finding, self.project_path)
+        occurrences = finding_occurrences(finding)
+        aggregated = (finding.get('details') or {}).get('aggregated')
+        entry = self.entries.get(fingerprint)
+        self.seen_fingerprints.add(fingerprint)
+        self.seen_groups.add(group)
+
+        if entry is not None and entry.get('occurrences') is None:
+            accepted = occurrences
+        elif aggregated:
+            accepted = min(occurrences, self.remaining.get(group, 0))
+        elif entry is not None:
+            accepted = 1
+        elif group in self.aggregated_groups:
+            # El grupo se aceptó agregado y ahora queda un único hallazgo
+            accepted = min(1, self.remaining.get(group, 0))
+        else:
+            accepted = 0
+
+        if group in self.remaining:
+            self.remaining[group] -= min(accepted, self.remaining[group])
+        finding['suppressed'] = accepted >= occurrences
+        if 0 < accepted < occurrences:
+            finding['new_occurrences'] = occurrences - accepted
+
+    def fixed(self) -> int:
+        """Entradas aceptadas que ya no aparecen (ni su grupo) en el escaneo"""
+        return sum(1 for fingerprint, entry in self.entries.items()
+                   if fingerprint not in self.seen_fingerprints
+                   and entry.get('group') not in self.seen_groups)
+
+
+def new_occurrences(finding: Dict) -> int:
+    """Ocurrencias de un hallazgo que son nuevas frente a la línea base"""
+    if finding.get('suppressed'):
+        return 0
+    return finding.get('new_occurrences', finding_occurrences(finding))
+
+
+def load_baseline_file(path: Path) -> Optional[Dict[str, Dict]]:
+    """
+    Cargar las entradas aceptadas de un archivo de línea base
+
+    Returns:
+        {huella: entrada} o None si el archivo no existe o no es válido
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        findings = document.get('findings', {})
+        return {fingerprint: (entry if isinstance(entry, dict) else {})
+                for fingerprint, entry in findings.items()}
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"WARNING: Línea base no válida en {path}: {e}")
+        return None
+
+
+def write_baseline_file(path: Path, entries: Dict[str, Dict], project_name: str) -> Path:
+    """
+    Guardar los hallazgos actuales como línea base aceptada
+
+    Args:
+        path: Archivo destino
+        entries: Entradas de baseline_entries()
+        project_name: Nombre del proyecto
+
+    Returns:
+        Ruta del archivo guardado
+    """
+    document = {
+        'schema_version': BASELINE_SCHEMA_VERSION,
+        'project': project_name,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'findings': {fingerprint: {
+            'rule_id': entry['rule_id'],
+            'file': Path(entry['file_path']).name,
+            'location': entry['location'],
+            'group': entry['group'],
+            'occurrences': entry['occurrences'],
+        } for fingerprint, entry in sorted(entries.items())},
+    }
+    path = Path(path)
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    return path
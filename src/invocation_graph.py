@@ -0,0 +1,350 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Grafo de invocaciones entre workflows de un proyecto UiPath
+Nodos indexados (rutas relativas resueltas) y listas de adyacencia de
+enteros en ambos sentidos, para detectar workflows no alcanzables desde
+los entry points y calcular conjuntos de impacto en reanálisis incrementales.
+"""
+
+import posixpath
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def normalize_workflow_path(path: str) -> str:
+    """
+    Normalizar una ruta de workflow a formato relativo POSIX
+
+    Args:
+        path: Ruta tal como aparece en WorkflowFileName / project.json
+
+    Returns:
+        Ruta normalizada (separador '/', sin './' ni '..' resolubles)
+    """
+    normalized = posixpath.normpath(str(path).strip().replace('\\', '/'))
+    return '' if normalized == '.' else normalized
+
+
+def is_dynamic_workflow_reference(value: str) -> bool:
+    """Detectar WorkflowFileName calculado por expresión (no resoluble estáticamente)"""
+    value = (value or '').strip()
+    return not value or value.startswith('[') or '+' in value or '"' in value
+
+
+class InvocationGraph:
+    """Grafo dirigido workflow -> workflows invocados"""
+
+    def __init__(self, project_path: Path):
+        """
+        Args:
+            project_path: Raíz del proyecto (las rutas se resuelven relativas a ella)
+        """
+        self.project_path = Path(project_path)
+        self.nodes: List[str] = []          # Índice -> ruta relativa
+        self.index: Dict[str, int] = {}     # Clave (minúsculas) -> índice
+        self.edges: List[List[int]] = []    # Adyacencia de salida (invoca a)
+        self.reverse: List[List[int]] = []  # Adyacencia de entrada (invocado por)
+        self.present: List[bool] = []       # False si el nodo ya no existe en disco
+        self.unresolved: Dict[int, List[Dict]] = {}  # Invocaciones a archivos inexistentes
+        self.dynamic: Dict[int, int] = {}   # Invocaciones con ruta calculada por expresión
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    def relative_path(self, file_path) -> str:
+        """Convertir una ruta absoluta de archivo en ruta relativa normalizada"""
+        path = Path(file_path)
+        try:
+            path = path.relative_to(self.project_path)
+        except ValueError:
+            pass
+        return normalize_workflow_path(path.as_posix())
+
+    def add_node(self, rel_path: str) -> int:
+        """
+        Registrar un workflow existente (idempotente)
+
+        Args:
+            rel_path: Ruta relativa al proyecto
+
+        Returns:
+            Índice del nodo
+        """
+        rel_path = normalize_workflow_path(rel_path)
+        key = rel_path.lower()
+        idx = self.index.get(key)
+        if idx is None:
+            idx = len(self.nodes)
+            self.index[key] = idx
+            self.nodes.append(rel_path)
+            self.edges.append([])
+            self.reverse.append([])
+            self.present.append(True)
+        else:
+            self.present[idx] = True
+        return idx
+
+    def remove_node(self, rel_path: str):
+        """Marcar un workflow como eliminado y retirar sus aristas de salida"""
+        idx = self.get_index(rel_path)
+        if idx is None:
+            return
+        self.set_invocations(rel_path, [])
+        self.present[idx] = False
+
+    def get_index(self, rel_path: str) -> Optional[int]:
+        """Obtener el índice de un workflow existente (None si no existe)"""
+        idx = self.index.get(normalize_workflow_path(rel_path).lower())
+        if idx is None or not self.present[idx]:
+            return None
+        return idx
+
+    def resolve(self, source: str, workflow_file: str) -> Optional[int]:
+        """
+        Resolver un WorkflowFileName como lo hace UiPath: primero relativo a la
+        raíz del proyecto y, si no existe, relativo a la carpeta del invocador.
+
+        Args:
+            source: Ruta relativa del workflow que invoca
+            workflow_file: Valor de WorkflowFileName
+
+        Returns:
+            Índice del workflow invocado o None si no se encuentra
+        """
+        target = normalize_workflow_path(workflow_file)
+        idx = self.get_index(target)
+        if idx is None:
+            source_dir = posixpath.dirname(normalize_workflow_path(source))
+            if source_dir:
+                idx = self.get_index(posixpath.join(source_dir, target))
+        return idx
+
+    def set_invocations(self, source: str, invokes: Iterable[Dict]):
+        """
+        Reemplazar las aristas de salida de un workflow
+
+        Args:
+            source: Ruta relativa del workflow que invoca
+            invokes: Entradas de parsed_data['invoke_workflow_files']
+        """
+        src = self.add_node(source)
+
+        # Retirar aristas anteriores (reanálisis incremental)
+        for dst in self.edges[src]:
+            self.reverse[dst].remove(src)
+        self.edges[src] = []
+        self.unresolved.pop(src, None)
+        self.dynamic.pop(src, None)
+
+        targets = []
+        for invoke in invokes:
+            if invoke.get('commented'):
+                continue  # Un Invoke dentro de CommentOut no se ejecuta
+            workflow_file = invoke.get('workflow_file', '')
+            if is_dynamic_workflow_reference(workflow_file):
+                self.dynamic[src] = self.dynamic.get(src, 0) + 1
+                continue
+            dst = self.resolve(source, workflow_file)
+            if dst is None:
+                self.unresolved.setdefault(src, []).append(invoke)
+            elif dst not in targets:
+                targets.append(dst)
+
+        self.edges[src] = targets
+        for dst in targets:
+            self.reverse[dst].append(src)
+
+    @classmethod
+    def build(cls, project_path: Path, parsed_files: List[Dict]) -> 'InvocationGraph':
+        """
+        Construir el grafo a partir de los XAML parseados
+
+        Args:
+            project_path: Raíz del proyecto
+            parsed_files: Lista de parsed_data (con 'file_path' e 'invoke_workflow_files')
+
+        Returns:
+            Grafo construido
+        """
+        graph = cls(project_path)
+        # Registrar primero todos los nodos para poder resolver cualquier arista
+        for parsed in parsed_files:
+            graph.add_node(graph.relative_path(parsed.get('file_path', '')))
+        for parsed in parsed_files:
+            graph.set_invocations(
+                graph.relative_path(parsed.get('file_path', '')),
+                parsed.get('invoke_workflow_files', [])
+            )
+        return graph
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def reachable_from(self, roots: Iterable[int]) -> bytearray:
+        """
+        Recorrido BFS desde los nodos raíz
+
+        Args:
+            roots: Índices de los nodos de partida
+
+        Returns:
+            bytearray con 1 en cada índice alcanzable
+        """
+        visited = bytearray(len(self.nodes))
+        queue = deque()
+        for root in roots:
+            if root is not None and not visited[root]:
+                visited[root] = 1
+                queue.append(root)
+        while queue:
+            node = queue.popleft()
+            for dst in self.edges[node]:
+                if not visited[dst]:
+                    visited[dst] = 1
+                    queue.append(dst)
+        return visited
+
+    def resolve_entry_points(self, entry_points: Iterable[str]) -> List[int]:
+        """Obtener los índices de los entry points que existen en el grafo"""
+        roots = []
+        for entry in entry_points:
+            idx = self.get_index(entry)
+            if idx is not None and idx not in roots:
+                roots.append(idx)
+        return roots
+
+    def unreachable(self, entry_points: Iterable[str]) -> List[str]:
+        """
+        Workflows existentes que ningún entry point invoca (directa o indirectamente)
+
+        Args:
+            entry_points: Rutas relativas de los entry points
+
+        Returns:
+            Rutas relativas no alcanzables (vacío si no hay entry points resolubles)
+        """
+        roots = self.resolve_entry_points(entry_points)
+        if not roots:
+            return []
+        visited = self.reachable_from(roots)
+        return [path for idx, path in enumerate(self.nodes)
+                if self.present[idx] and not visited[idx]]
+
+    def dynamic_sources(self, entry_points: Iterable[str]) -> List[str]:
+        """
+        Workflows alcanzables desde los entry points que invocan rutas calculadas
+        por expresión (pueden alcanzar workflows que el grafo no ve)
+
+        Args:
+            entry_points: Rutas relativas de los entry points
+
+        Returns:
+            Rutas relativas ordenadas (vacío si no hay entry points resolubles)
+        """
+        roots = self.resolve_entry_points(entry_points)
+        if not roots or not self.dynamic:
+            return []
+        visited = self.reachable_from(roots)
+        return sorted(self.nodes[idx] for idx, count in self.dynamic.items()
+                      if count and visited[idx] and self.present[idx])
+
+    def callers(self, rel_path: str, transitive: bool = False) -> Set[str]:
+        """
+        Workflows que invocan a uno dado
+
+        Args:
+            rel_path: Ruta relativa del workflow invocado
+            transitive: Incluir también invocadores indirectos
+
+        Returns:
+            Conjunto de rutas relativas
+        """
+        idx = self.index.get(normalize_workflow_path(rel_path).lower())
+        if idx is None:
+            return set()
+        seen = bytearray(len(self.nodes))
+        stack = list(self.reverse[idx])
+        result = set()
+        while stack:
+            node = stack.pop()
+            if seen[node]:
+                continue
+            seen[node] = 1
+            result.add(self.nodes[node])
+            if transitive:
+                stack.extend(self.reverse[node])
+        return result
+
+    def callers_by_name(self, file_name: str) -> List[int]:
+        """Invocadores con invocaciones sin resolver cuyo destino coincide con el nombre"""
+        name = posixpath.basename(normalize_workflow_path(file_name)).lower()
+        return [src for src, invokes in self.unresolved.items()
+                if any(posixpath.basename(normalize_workflow_path(i.get('workflow_file', ''))).lower() == name
+                       for i in invokes)]
+
+    def impact_set(self, changed: Iterable[str]) -> List[str]:
+        """
+        Workflows a reevaluar tras modificar, crear o eliminar archivos: los
+        propios archivos y sus invocadores directos (cuyos hallazgos de
+        proyecto dependen de que el destino exista). Incluye invocadores
+        con invocaciones sin resolver hacia un archivo recién creado.
+
+        Args:
+            changed: Rutas relativas modificadas
+
+        Returns:
+            Rutas relativas afectadas (orden estable)
+        """
+        impacted = []
+        seen = set()
+
+        def add(path):
+            key = path.lower()
+            if key not in seen:
+                seen.add(key)
+                impacted.append(path)
+
+        for rel_path in changed:
+            rel_path = normalize_workflow_path(rel_path)
+            add(rel_path)
+            for caller in sorted(self.callers(rel_path)):
+                add(caller)
+            for src in self.callers_by_name(rel_path):
+                add(self.nodes[src])
+        return impacted
+
+    def edge_count(self) -> int:
+        """Número total de aristas"""
+        return sum(len(targets) for targets in self.edges)
+
+    def summary(self, entry_points: Iterable[str]) -> Dict:
+        """
+        Resumen serializable del grafo para el resultado del análisis
+
+        Args:
+            entry_points: Rutas relativas de los entry points
+
+        Returns:
+            Diccionario con nodos, aristas, entry points, workflows no alcanzables
+            e invocaciones de ruta dinámica
+        """
+        entry_points = list(entry_points)
+        return {
+            'nodes': sum(1 for p in self.present if p),
+            'edges': self.edge_count(),
+            'entry_points': [self.nodes[i] for i in self.resolve_entry_points(entry_points)],
+            'unreachable': self.unreachable(entry_points),
+            'unresolved': [
+                {'source': self.nodes[src], 'workflow_file': i.get('workflow_file', '')}
+                for src, invokes in sorted(self.unresolved.items()) for i in invokes
+            ],
+            'dynamic_invocations': sum(self.dynamic.values()),
+            # Alcanzables con rutas dinámicas: 'unreachable' es solo orientativo
+            'dynamic_sources': self.dynamic_sources(entry_points),
+        }
@@ -20,4 +20,8 @@ def main():
     app.run()
 
 if __name__ == "__main__":
+    # Necesario para los procesos de reportes en el ejecutable (PyInstaller)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     main()
@@ -0,0 +1,334 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Contabilidad de memoria y modo de presupuesto de memoria
+MemoryAccountant toma snapshots de tracemalloc entre fases del escaneo y
+registra los mayores asignadores. Si se supera el presupuesto, el escáner
+pasa a modo de baja memoria: resume parsed_files, vuelca los hallazgos a
+disco (FindingStore, JSONL) y los reportes se generan en streaming.
+"""
+
+import json
+import os
+import tempfile
+import tracemalloc
+import weakref
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+# Listas de parsed_data que en el resumen se sustituyen por su longitud
+SUMMARY_COUNT_KEYS = (
+    'activities', 'variables', 'arguments', 'try_catch_blocks', 'log_messages', 'if_activities'
+)
+
+# Campos escalares (o pequeños) que se conservan en el resumen
+SUMMARY_KEEP_KEYS = (
+    'file_path', 'file_name', 'workflow_type', 'display_name', 'invoke_workflow_files',
+    'commented_lines', 'total_lines',
+)
+
+# Marcos excluidos de los mayores asignadores (ruido de la propia medición)
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+
+# tracemalloc.reset_peak solo existe desde Python 3.9
+_HAS_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+
+def summarize_parsed_file(parsed_data: Dict) -> Dict:
+    """
+    Reducir un parsed_data a su resumen (contadores en lugar de listas)
+
+    Args:
+        parsed_data: Resultado de XamlParser.parse()
+
+    Returns:
+        Diccionario con los campos ligeros y 'counts' {lista: longitud}
+    """
+    if parsed_data.get('summarized'):
+        return parsed_data
+    summary = {key: parsed_data[key] for key in SUMMARY_KEEP_KEYS if key in parsed_data}
+    summary['counts'] = {key: len(parsed_data.get(key, [])) for key in SUMMARY_COUNT_KEYS}
+    # De commented_code solo los contadores (sin muestras de comentarios ni detalles)
+    summary['commented_code'] = {key: value for key, value in parsed_data.get('commented_code', {}).items()
+                                 if not isinstance(value, (list, dict))}
+    summary['summarized'] = True
+    return summary
+
+
+def parsed_count(parsed_data: Dict, key: str) -> int:
+    """Número de elementos de una lista de parsed_data (completo o resumido)"""
+    counts = parsed_data.get('counts')
+    if counts is not None and key in counts:
+        return counts[key]
+    return len(parsed_data.get(key, []))
+
+
+class FindingStore(Sequence):
+    """
+    Secuencia de hallazgos (diccionarios) respaldada por un archivo JSONL temporal.
+    Solo mantiene en memoria los offsets de cada línea; iterar relee el archivo.
+
+    El descriptor se abre bajo demanda (release() lo cierra al terminar el
+    escaneo) y el archivo se borra con close(), al liberar el objeto o al salir
+    del intérprete. Al serializarse con pickle los hallazgos se copian en
+    streaming a un FindingStore nuevo del proceso que lo carga.
+    """
+
+    def __init__(self, directory: str = None):
+        """
+        Args:
+            directory: Carpeta del archivo temporal (por defecto la del sistema)
+        """
+        fd, self.path = tempfile.mkstemp(prefix='bbpp_findings_', suffix='.jsonl', dir=directory)
+        self.directory = directory
+        self._resources = {'file': os.fdopen(fd, 'w+b')}
+        self._finalizer = weakref.finalize(self, _discard_store_file, self._resources, self.path)
+        self._offsets = array('q')
+        self._end = 0
+
+    def _handle(self):
+        """Descriptor de lectura/escritura (se reabre si se liberó)"""
+        handle = self._resources['file']
+        if handle is None:
+            if not self._finalizer.alive:
+                raise ValueError('FindingStore cerrado')
+            handle = self._resources['file'] = open(self.path, 'r+b')
+        return handle
+
+    def append(self, finding: Dict):
+        """Añadir un hallazgo al final del archivo"""
+        line = json.dumps(finding, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+        handle = self._handle()
+        handle.seek(self._end)
+        handle.write(line)
+        self._offsets.append(self._end)
+        self._end += len(line)
+
+    def extend(self, findings: Iterable[Dict]):
+        """Añadir varios hallazgos"""
+        for finding in findings:
+            self.append(finding)
+
+    def truncate(self, length: int):
+        """Descartar los hallazgos a partir de la posición indicada"""
+        if length >= len(self._offsets):
+            return
+        self._end = self._offsets[length]
+        del self._offsets[length:]
+        self._handle().truncate(self._end)
+
+    def _read(self, indices: Iterable[int]) -> List[Dict]:
+        """Leer hallazgos por posición (con un lector temporal si el descriptor está liberado)"""
+        handle = self._resources['file']
+        if handle is not None:
+            handle.flush()
+            return [self._read_at(handle, index) for index in indices]
+        with open(self.path, 'rb') as reader:
+            return [self._read_at(reader, index) for index in indices]
+
+    def _read_at(self, handle, index: int) -> Dict:
+        handle.seek(self._offsets[index])
+        return json.loads(handle.readline())
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._read(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('FindingStore index out of range')
+        return self._read([index])[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._resources['file'] is not None:
+            self._resources['file'].flush()
+        count = len(self._offsets)
+        with open(self.path, 'rb') as reader:
+            for _ in range(count):
+                yield json.loads(reader.readline())
+
+    def __reduce__(self):
+        # El proceso que lo carga crea su propio archivo y recibe los hallazgos por extend()
+        return (FindingStore, (self.directory,), None, iter(self))
+
+    def release(self):
+        """Cerrar el descriptor conservando el archivo (se reabre al leer o añadir)"""
+        handle, self._resources['file'] = self._resources['file'], None
+        if handle is not None:
+            handle.close()
+
+    def close(self):
+        """Cerrar y eliminar el archivo temporal"""
+        self._finalizer()
+
+
+def _discard_store_file(resources: Dict, path: str):
+    """Cerrar el descriptor de un FindingStore y borrar su archivo"""
+    handle, resources['file'] = resources['file'], None
+    if handle is not None:
+        handle.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MappedSequence(Sequence):
+    """Vista perezosa que aplica una función a cada elemento de otra secuencia"""
+
+    def __init__(self, source: Sequence, func):
+        self.source = source
+        self.func = func
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.func(item) for item in self.source[index]]
+        return self.func(self.source[index])
+
+    def __iter__(self):
+        return (self.func(item) for item in self.source)
+
+
+class MemoryAccountant:
+    """Snapshots de tracemalloc por fase y control de presupuesto de memoria"""
+
+    def __init__(self, budget_mb: float = None, top: int = 10, snapshots: bool = True):
+        """
+        Args:
+            budget_mb: Presupuesto de memoria Python trazada en MB (None/0 = sin límite)
+            top: Número de asignadores registrados por fase
+            snapshots: Tomar snapshots para los mayores asignadores (más lento)
+        """
+        self.budget_bytes = int(budget_mb * 1024 * 1024) if budget_mb else None
+        self.top = top
+        self.snapshots = snapshots
+        self.phases: List[Dict] = []
+        self.exceeded_at: Optional[str] = None
+        self.peak_bytes = 0
+        self._owns_tracing = False
+        self._last_snapshot = None
+        self._last_current = 0
+        self._last_peak = 0
+
+    def start(self):
+        """Iniciar tracemalloc (si no estaba activo)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self._last_current, self._last_peak = tracemalloc.get_traced_memory()
+        if _HAS_RESET_PEAK:
+            tracemalloc.reset_peak()
+        if self.snapshots:
+            self._last_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def stop(self):
+        """Detener tracemalloc si lo inició este contador"""
+        if self._owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracing = False
+        self._last_snapshot = None
+
+    def current_bytes(self) -> int:
+        """Memoria Python trazada actualmente"""
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    def over_budget(self) -> bool:
+        """Verificar si la memoria trazada supera el presupuesto"""
+        return self.budget_bytes is not None and self.current_bytes() > self.budget_bytes
+
+    def mark_exceeded(self, where: str):
+        """Registrar dónde se superó el presupuesto (solo la primera vez)"""
+        if self.exceeded_at is None:
+            self.exceeded_at = where
+
+    def checkpoint(self, phase: str) -> Dict:
+        """
+        Registrar el consumo de la fase terminada y sus mayores asignadores
+
+        Args:
+            phase: Nombre de la fase
+
+        Returns:
+            Registro de la fase (current_kb, peak_kb, delta_kb, top)
+        """
+        if not tracemalloc.is_tracing():
+            return {}
+        current, peak = tracemalloc.get_traced_memory()
+        if not _HAS_RESET_PEAK:
+            # Python 3.8: el pico es global desde start(); si no creció en esta fase,
+            # la mejor cota disponible es la memoria al empezar o al terminar la fase
+            phase_peak = peak if peak > self._last_peak else max(current, self._last_current)
+            self._last_peak = max(self._last_peak, peak)
+            peak = phase_peak
+        self.peak_bytes = max(self.peak_bytes, peak)
+        entry = {
+            'phase': phase,
+            'current_kb': current // 1024,
+            'peak_kb': peak // 1024,
+            'delta_kb': (current - self._last_current) // 1024,
+            'top': [],
+        }
+        if self.snapshots:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            if self._last_snapshot is not None:
+                stats = snapshot.compare_to(self._last_snapshot, 'lineno')
+                stats = sorted(stats, key=lambda s: s.size_diff, reverse=True)
+            else:
+                stats = snapshot.statistics('lineno')
+            for stat in stats[:self.top]:
+                frame = stat.traceback[0]
+                entry['top'].append({
+                    'location': f"{frame.filename}:{frame.lineno}",
+                    'size_kb': stat.size // 1024,
+                    'size_diff_kb': getattr(stat, 'size_diff', stat.size) // 1024,
+                    'count': stat.count,
+                })
+            self._last_snapshot = snapshot
+        self.phases.append(entry)
+        self._last_current = current
+        if _HAS_RESET_PEAK:
+            tracemalloc.reset_peak()
+        return entry
+
+    def to_dict(self) -> Dict:
+        """
+        Serializar para el resultado del análisis
+
+        Returns:
+            Diccionario con presupuesto, superación, pico y fases
+        """
+        return {
+            'budget_mb': round(self.budget_bytes / 1024 / 1024, 1) if self.budget_bytes else None,
+            'exceeded': self.exceeded_at is not None,
+            'exceeded_at': self.exceeded_at,
+            'peak_kb': self.peak_bytes // 1024,
+            'phases': self.phases,
+        }
+
+    def format_report(self) -> str:
+        """Texto con el consumo por fase y los mayores asignadores"""
+        lines = []
+        for entry in self.phases:
+            lines.append(f"{entry['phase']:<20} actual {entry['current_kb']:>9} KB  "
+                         f"pico {entry['peak_kb']:>9} KB  delta {entry['delta_kb']:>+9} KB")
+            for alloc in entry['top'][:5]:
+                lines.append(f"      {alloc['size_diff_kb']:>+9} KB  {alloc['location']}")
+        if self.exceeded_at:
+            lines.append(f"Presupuesto superado en: {self.exceeded_at}")
+        return '\n'.join(lines)
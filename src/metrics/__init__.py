@@ -3,11 +3,19 @@ Módulo de métricas
 """
 
 from .metrics_calculator import MetricsCalculator, create_metrics_calculator
-from .chart_generator import ChartGenerator, create_chart_generator
+from .portfolio_analytics import PortfolioAnalytics, create_portfolio_analytics
 
 __all__ = [
     'MetricsCalculator',
     'create_metrics_calculator',
-    'ChartGenerator',
-    'create_chart_generator'
+    'PortfolioAnalytics',
+    'create_portfolio_analytics'
 ]
+
+# Los gráficos requieren matplotlib (opcional)
+try:
+    from .chart_generator import ChartGenerator, create_chart_generator
+    CHARTS_AVAILABLE = True
+    __all__ += ['ChartGenerator', 'create_chart_generator']
+except ImportError:
+    CHARTS_AVAILABLE = False
@@ -0,0 +1,228 @@
+"""
+Analítica de Cartera
+Consultas sobre todos los proyectos a la vez (reglas más violadas, peores
+archivos por equipo, distribución de scores) a partir de la tabla
+latest_analysis: una fila por proyecto con su último análisis, mantenida por
+triggers al guardar y borrar análisis. Las agregaciones se hacen en SQL sobre
+índices que cubren las consultas, sin cargar análisis uno a uno.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+
+# Penalización por severidad (la misma que el score por archivo de los reportes)
+SEVERITY_PENALTY = {'error': 10, 'warning': 5, 'info': 1}
+
+# Percentiles por defecto de la distribución de scores
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> Optional[float]:
+    """
+    Percentil con interpolación lineal entre las posiciones vecinas
+
+    Args:
+        sorted_values: Valores ordenados de menor a mayor
+        pct: Percentil (0-100)
+
+    Returns:
+        Valor del percentil (None si no hay valores)
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+class PortfolioAnalytics:
+    """Métricas de todos los proyectos a partir de su último análisis"""
+
+    def __init__(self, db):
+        """
+        Inicializar analítica de cartera
+
+        Args:
+            db: Instancia de MetricsDatabase
+        """
+        self.db = db
+
+    @staticmethod
+    def _team_filter(team: Optional[str], alias: str = 'l') -> tuple:
+        """Condición WHERE y parámetros para filtrar por equipo (None = todos)"""
+        if team is None:
+            return '', ()
+        return f'WHERE {alias}.team = ?', (team,)
+
+    def get_latest_analyses(self, team: Optional[str] = None) -> List[Dict]:
+        """
+        Último análisis de cada proyecto
+
+        Args:
+            team: Filtrar por equipo (None = todos)
+
+        Returns:
+            Lista de {'project_name', 'analysis_id', 'team', 'analysis_date',
+            'score', 'total_findings'}, peor score primero
+        """
+        where, params = self._team_filter(team)
+        rows = self.db.conn.execute(f'''
+            SELECT * FROM latest_analysis l {where}
+            ORDER BY l.score, l.project_name
+        ''', params).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_teams(self) -> List[Dict]:
+        """
+        Equipos de la cartera con su número de proyectos y score medio
+
+        Returns:
+            Lista de {'team', 'projects', 'avg_score', 'min_score'}, peor media primero
+        """
+        rows = self.db.conn.execute('''
+            SELECT team, COUNT(*) AS projects, AVG(score) AS avg_score, MIN(score) AS min_score
+            FROM latest_analysis
+            GROUP BY team
+            ORDER BY avg_score, team
+        ''').fetchall()
+        return [dict(row) for row in rows]
+
+    def get_top_violated_rules(self, limit: int = 10, team: Optional[str] = None) -> List[Dict]:
+        """
+        Reglas con más hallazgos en el último análisis de cada proyecto
+
+        Cuenta filas de findings_detail (un hallazgo agregado cuenta una vez y
+        se guardan hasta los primeros 1000 hallazgos de cada análisis).
+
+        Args:
+            limit: Número de reglas a retornar
+            team: Filtrar por equipo (None = todos)
+
+        Returns:
+            Lista de {'rule_id', 'rule_name', 'severity', 'findings', 'projects'}
+        """
+        where, params = self._team_filter(team)
+        rows = self.db.conn.execute(f'''
+            SELECT d.rule_id, MAX(d.rule_name) AS rule_name, MAX(d.severity) AS severity,
+                   COUNT(*) AS findings, COUNT(DISTINCT l.project_name) AS projects
+            FROM latest_analysis l
+            JOIN findings_detail d ON d.analysis_id = l.analysis_id
+            {where}
+            GROUP BY d.rule_id
+            ORDER BY findings DESC, projects DESC, d.rule_id
+            LIMIT ?
+        ''', params + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_worst_files(self, limit: int = 10, team: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Peores archivos de cada equipo en el último análisis de sus proyectos
+
+        El score por archivo es el de los reportes: 100 - 10 por error,
+        5 por warning y 1 por info (mínimo 0).
+
+        Args:
+            limit: Número de archivos por equipo
+            team: Solo este equipo (None = todos)
+
+        Returns:
+            {equipo: [{'project_name', 'file_path', 'errors', 'warnings',
+            'infos', 'total', 'score'}]} con el peor archivo primero
+        """
+        where, params = self._team_filter(team)
+        penalty = ' '.join(f"WHEN '{severity}' THEN {points}"
+                           for severity, points in SEVERITY_PENALTY.items())
+        rows = self.db.conn.execute(f'''
+            SELECT * FROM (
+                SELECT team, project_name, file_path, errors, warnings, infos, total,
+                       MAX(0, 100 - penalty) AS score,
+                       ROW_NUMBER() OVER (PARTITION BY team ORDER BY penalty DESC, total DESC,
+                                          project_name, file_path) AS position
+                FROM (
+                    SELECT l.team, l.project_name, d.file_path,
+                           SUM(d.severity = 'error') AS errors,
+                           SUM(d.severity = 'warning') AS warnings,
+                           SUM(d.severity = 'info') AS infos,
+                           COUNT(*) AS total,
+                           SUM(CASE d.severity {penalty} ELSE 0 END) AS penalty
+                    FROM latest_analysis l
+                    JOIN findings_detail d ON d.analysis_id = l.analysis_id
+                    {where}
+                    GROUP BY l.project_name, d.file_path
+                )
+            )
+            WHERE position <= ?
+            ORDER BY team, position
+        ''', params + (limit,)).fetchall()
+
+        worst_files = {}
+        for row in rows:
+            entry = dict(row)
+            del entry['position']
+            worst_files.setdefault(entry.pop('team'), []).append(entry)
+        return worst_files
+
+    def get_score_distribution(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                               team: Optional[str] = None) -> Dict:
+        """
+        Distribución de scores del último análisis de cada proyecto
+
+        Args:
+            percentiles: Percentiles a calcular (0-100)
+            team: Filtrar por equipo (None = todos)
+
+        Returns:
+            {'count', 'min', 'max', 'mean', 'percentiles': {p: score},
+            'buckets': {inicio_tramo: proyectos}} (tramos de 10 puntos)
+        """
+        where, params = self._team_filter(team)
+        # El índice (team, score) / (score) entrega los scores ya ordenados
+        scores = [row[0] for row in self.db.conn.execute(f'''
+            SELECT l.score FROM latest_analysis l {where} ORDER BY l.score
+        ''', params)]
+
+        buckets = {}
+        for score in scores:
+            start = min(int(score // 10) * 10, 90)
+            buckets[start] = buckets.get(start, 0) + 1
+
+        return {
+            'count': len(scores),
+            'min': scores[0] if scores else None,
+            'max': scores[-1] if scores else None,
+            'mean': sum(scores) / len(scores) if scores else None,
+            'percentiles': {pct: percentile(scores, pct) for pct in percentiles},
+            'buckets': dict(sorted(buckets.items())),
+        }
+
+    def get_portfolio_summary(self, top: int = 10) -> Dict:
+        """
+        Resumen de la cartera: distribución, equipos, reglas y peores archivos
+
+        Args:
+            top: Número de reglas y de archivos por equipo
+
+        Returns:
+            Diccionario con 'distribution', 'teams', 'top_rules' y 'worst_files'
+        """
+        return {
+            'distribution': self.get_score_distribution(),
+            'teams': self.get_teams(),
+            'top_rules': self.get_top_violated_rules(top),
+            'worst_files': self.get_worst_files(top),
+        }
+
+
+def create_portfolio_analytics(db):
+    """
+    Crear instancia de analítica de cartera
+
+    Args:
+        db: Instancia de MetricsDatabase
+
+    Returns:
+        Instancia de PortfolioAnalytics
+    """
+    return PortfolioAnalytics(db)
@@ -0,0 +1,84 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Caché LRU acotada para veredictos y sugerencias de nomenclatura
+Se comparte entre archivos (y hilos) durante un escaneo: en proyectos
+derivados de REFramework los mismos nombres se repiten en cientos de XAML.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+# Tamaño por defecto (nombres distintos x tipos de verificación)
+DEFAULT_NAMING_CACHE_SIZE = 4096
+
+
+class NamingCache:
+    """Memo LRU acotado y thread-safe con contadores de aciertos"""
+
+    def __init__(self, maxsize: int = DEFAULT_NAMING_CACHE_SIZE):
+        """
+        Args:
+            maxsize: Número máximo de entradas antes de expulsar la menos usada
+        """
+        self.maxsize = max(1, int(maxsize))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, kind: str, name: str, compute: Callable[[str], Any]) -> Any:
+        """
+        Obtener el resultado memorizado o calcularlo
+
+        Args:
+            kind: Tipo de verificación (ej: 'is_camel', 'to_pascal')
+            name: Nombre evaluado
+            compute: Función pura que calcula el resultado a partir del nombre
+
+        Returns:
+            Resultado de compute(name)
+        """
+        key = (kind, name)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+
+        value = compute(name)
+
+        with self._lock:
+            self.misses += 1
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Vaciar la caché y reiniciar contadores"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """
+        Obtener estadísticas de uso
+
+        Returns:
+            Diccionario con hits, misses, hit_rate (%), size y maxsize
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
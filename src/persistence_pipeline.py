@@ -0,0 +1,73 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Persistencia en segundo plano
+Cola de un solo hilo para guardar análisis en la BD de métricas y generar
+los reportes automáticos después de mostrar los resultados. Los trabajos se
+ejecutan en orden (dos escaneos seguidos no se mezclan) y el escáner notifica
+su finalización con un callback.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, List, Optional
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending: List[Future] = []
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Hilo de persistencia compartido (se crea al primer trabajo)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bbpp-persistence')
+    return _executor
+
+
+def _job_finished(future: Future):
+    """Quitar un trabajo terminado de la cola y registrar sus errores no capturados"""
+    with _lock:
+        if future in _pending:
+            _pending.remove(future)
+    if not future.cancelled() and future.exception() is not None:
+        print(f"WARNING: Error en la persistencia en segundo plano: {future.exception()}")
+
+
+def submit_persistence(func: Callable, *args) -> Future:
+    """
+    Encolar un trabajo de persistencia
+
+    Args:
+        func: Trabajo a ejecutar (p. ej. ProjectScanner._persist_result)
+        *args: Argumentos del trabajo
+
+    Returns:
+        Future con el resultado del trabajo
+    """
+    with _lock:
+        future = _get_executor().submit(func, *args)
+        _pending.append(future)
+    future.add_done_callback(_job_finished)
+    return future
+
+
+def wait_for_persistence(timeout: float = None) -> bool:
+    """
+    Esperar a que terminen los trabajos encolados (al cerrar la aplicación o en tests)
+
+    Args:
+        timeout: Segundos máximos de espera (None = sin límite)
+
+    Returns:
+        True si no queda ningún trabajo pendiente
+    """
+    with _lock:
+        pending = list(_pending)
+    if not pending:
+        return True
+    _, not_done = wait(pending, timeout=timeout)
+    return not not_done
@@ -0,0 +1,205 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Modo de perfilado del análisis
+Envuelve el escaneo y la generación de reportes en cProfile y, en paralelo,
+muestrea la pila del hilo de análisis a intervalos fijos. Las muestras se
+etiquetan con el workflow que se estaba analizando, de modo que el archivo
+de pilas colapsadas (formato de flamegraph.pl / speedscope) y el resumen
+identifican los XAML más lentos.
+
+Salida por sesión (en output/profiles/):
+    <nombre>.pstats          Estadísticas de cProfile (pstats / snakeviz)
+    <nombre>.collapsed.txt   Pilas colapsadas "marco;marco;... muestras"
+    <nombre>.summary.txt     Funciones más costosas y workflows con más muestras
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Intervalo de muestreo por defecto (segundos)
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Profundidad máxima de pila registrada por muestra
+MAX_STACK_DEPTH = 128
+
+# Etiqueta de las muestras tomadas fuera del análisis de un XAML
+NO_FILE_LABEL = '(proyecto)'
+
+
+def get_profile_output_dir() -> Path:
+    """Directorio de salida de los perfiles (output/profiles/)"""
+    from src.config import OUTPUT_DIR
+
+    output_dir = OUTPUT_DIR / 'profiles'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
+def _frame_label(frame) -> str:
+    """Etiqueta de un marco para la pila colapsada: función (módulo:línea de definición)"""
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).stem}:{code.co_firstlineno})"
+
+
+class AnalysisProfiler:
+    """
+    Perfilador de una sesión de análisis (context manager)
+
+    Uso:
+        with AnalysisProfiler(label='MiProyecto') as profiler:
+            scanner.profiler = profiler
+            scanner.scan()
+        print(profiler.output_files)
+    """
+
+    def __init__(self, label: str = 'analisis', output_dir: Path = None,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL, sampling: bool = True):
+        """
+        Args:
+            label: Nombre base de los archivos de salida (ej: nombre del proyecto)
+            output_dir: Carpeta destino (por defecto output/profiles/)
+            sample_interval: Segundos entre muestras de pila (0 desactiva el muestreo)
+            sampling: Activar el muestreo de pilas por workflow
+        """
+        self.label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label) or 'analisis'
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.sample_interval = sample_interval
+        self.sampling = sampling and sample_interval > 0
+        self.current_file = None
+        self.stacks: Counter = Counter()
+        self.file_samples: Counter = Counter()
+        self.output_files: Dict[str, Path] = {}
+        self._profile = cProfile.Profile()
+        self._target_thread = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started_at = None
+        self.elapsed = 0.0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Iniciar cProfile en el hilo actual y el muestreador en segundo plano"""
+        self._target_thread = threading.get_ident()
+        self._started_at = time.perf_counter()
+        if self.sampling:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='bbpp-profiler', daemon=True)
+            self._sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> Dict[str, Path]:
+        """
+        Detener el perfilado y escribir los archivos de salida
+
+        Returns:
+            Diccionario {'pstats'|'collapsed'|'summary': ruta}
+        """
+        self._profile.disable()
+        self.elapsed = time.perf_counter() - self._started_at
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        return self._write_outputs()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def set_current_file(self, name: Optional[str]):
+        """Indicar el workflow en análisis (etiqueta de las muestras siguientes)"""
+        self.current_file = name
+
+    # ------------------------------------------------------------------
+    # Muestreo
+    # ------------------------------------------------------------------
+
+    def _sample_loop(self):
+        """Tomar una muestra de la pila del hilo de análisis cada sample_interval"""
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            current = self.current_file or NO_FILE_LABEL
+            labels.append(f"workflow:{current}")
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.file_samples[current] += 1
+
+    # ------------------------------------------------------------------
+    # Salida
+    # ------------------------------------------------------------------
+
+    def _write_outputs(self) -> Dict[str, Path]:
+        """Escribir .pstats, pilas colapsadas y resumen"""
+        output_dir = self.output_dir or get_profile_output_dir()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        base = output_dir / f"{self.label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        pstats_path = base.with_name(base.name + '.pstats')
+        self._profile.dump_stats(str(pstats_path))
+        self.output_files = {'pstats': pstats_path}
+
+        if self.sampling:
+            collapsed_path = base.with_name(base.name + '.collapsed.txt')
+            with open(collapsed_path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            self.output_files['collapsed'] = collapsed_path
+
+        summary_path = base.with_name(base.name + '.summary.txt')
+        summary_path.write_text(self.summary(), encoding='utf-8')
+        self.output_files['summary'] = summary_path
+        return self.output_files
+
+    def slowest_files(self, limit: int = 20):
+        """
+        Workflows con más muestras (aproximación del tiempo de análisis de cada XAML)
+
+        Returns:
+            Lista de tuplas (workflow, muestras, segundos estimados)
+        """
+        return [(name, count, round(count * self.sample_interval, 3))
+                for name, count in self.file_samples.most_common(limit)]
+
+    def summary(self, limit: int = 30) -> str:
+        """Resumen de texto: funciones por tiempo acumulado y workflows con más muestras"""
+        stream = io.StringIO()
+        stream.write(f"Perfil: {self.label}\n")
+        stream.write(f"Duración: {self.elapsed:.3f}s\n")
+        if self.sampling:
+            stream.write(f"Muestras: {sum(self.file_samples.values())} "
+                         f"(cada {self.sample_interval * 1000:.1f} ms)\n")
+            stream.write("\nWORKFLOWS CON MÁS MUESTRAS\n" + "=" * 50 + "\n")
+            for name, count, seconds in self.slowest_files():
+                stream.write(f"{count:>8}  ~{seconds:>8.3f}s  {name}\n")
+
+        stream.write(f"\nFUNCIONES POR TIEMPO ACUMULADO (top {limit})\n" + "=" * 50 + "\n")
+        try:
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats('cumulative').print_stats(limit)
+        except TypeError:
+            stream.write("(sin datos de cProfile)\n")
+        return stream.getvalue()
@@ -4,14 +4,31 @@ Recorre recursivamente todos los XAML de un proyecto
 """
 
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Optional
+import copy
 import json
+import pickle
+import time
 
 from src.xaml_parser import XamlParser
 from src.analyzer import BBPPAnalyzer, Finding
+from src.naming_cache import NamingCache
+from src.invocation_graph import InvocationGraph
+from src.timing import TimingRecorder, SPAN_PHASE, SPAN_FILE
+from src.memory_budget import (MemoryAccountant, FindingStore, MappedSequence,
+                               summarize_parsed_file, parsed_count)
+from src.finding_aggregation import FindingSidecar
+from src.rule_preview import ParsedDataCache
+from src.finding_baseline import (FindingBaseline, assign_fingerprints, baseline_entries,
+                                  load_baseline_file, new_occurrences, resolve_baseline_path,
+                                  write_baseline_file)
 from src.config import DEFAULT_CONFIG
 
 
+# Campos que la persistencia añade al resultado (en segundo plano, sobre una copia)
+PERSISTED_RESULT_KEYS = ('analysis_id', 'report_paths', 'timings')
+
+
 class ProjectScanner:
     """Escáner de proyectos UiPath"""
     
@@ -31,27 +48,60 @@ class ProjectScanner:
         self.parsed_files = []
         self.all_findings = []
         self.project_info = {}
+        self.naming_cache = NamingCache()  # Compartida por todos los archivos del escaneo
+        self.analyzer = None
+        self.file_findings = {}       # str(ruta XAML) -> hallazgos del archivo
+        self.project_findings = []    # Hallazgos de project.json (dependencias, nombre...)
+        self.invocation_graph = None  # Grafo de invocaciones entre workflows
+        self.missing_findings = {}    # Ruta relativa -> hallazgos de invocaciones rotas
+        self.unreachable_findings = []
+        self.version_validation = {}
+        self.timings = TimingRecorder()  # Spans por fase, regla y archivo del último escaneo
+        self.profiler = None          # AnalysisProfiler activo (etiqueta muestras por XAML)
+        self.memory = None            # MemoryAccountant del escaneo (si hay contabilidad o presupuesto)
+        self.low_memory = False       # Presupuesto superado: parsed_files resumidos y hallazgos en disco
+        self.finding_store = None     # FindingStore con los hallazgos volcados en modo de baja memoria
+        self.lean_results = False     # parsed_files resumidos tras analizar cada archivo
+        self.baseline = None          # FindingBaseline con las huellas aceptadas (None si no hay)
+        self.baseline_source = None   # Archivo de línea base o 'db'
+        self.parsed_cache = None      # ParsedDataCache en escritura durante scan()
+        self.persistence = None       # Future del guardado y reportes en segundo plano
         
-    def scan(self, progress_callback=None) -> Dict:
+    def scan(self, progress_callback=None, background_persistence: bool = False,
+             on_persisted=None) -> Dict:
         """
         Escanear el proyecto completo
         
         Args:
             progress_callback: Función para reportar progreso (file_path, percentage)
+            background_persistence: Guardar en BD y generar reportes en segundo plano;
+                el resultado se devuelve en cuanto hay score (self.persistence es el Future)
+            on_persisted: Callback(result) al terminar guardado y reportes (en segundo
+                plano se ejecuta en el hilo de persistencia y recibe una copia superficial
+                del resultado; ver PERSISTED_RESULT_KEYS)
             
         Returns:
             Diccionario con resultados del análisis
         """
-        import time
         self._start_time = time.time()  # Para calcular tiempo de ejecución
+        self.timings.clear()
+        self._start_memory_accounting()
+        self.lean_results = self.config.get('memory', {}).get(
+            'lean_results', DEFAULT_CONFIG['memory']['lean_results'])
         
-        # 1. Detectar tipo de proyecto
-        self.project_info = self._detect_project_info()
-        
-        # 2. Encontrar todos los XAML
-        self.xaml_files = self._find_xaml_files()
+        with self.timings.span(SPAN_PHASE, 'discovery'):
+            # 1. Detectar tipo de proyecto
+            self.project_info = self._detect_project_info()
+            
+            # 2. Encontrar todos los XAML
+            self.xaml_files = self._find_xaml_files()
+            
+            # Línea base de hallazgos aceptados
+            self._load_baseline()
+        self._memory_checkpoint('discovery')
         
         if not self.xaml_files:
+            self._stop_memory_accounting()
             return {
                 'success': False,
                 'error': 'No se encontraron archivos XAML en el proyecto',
@@ -66,7 +116,15 @@ class ProjectScanner:
             rm = get_rules_manager()
             rules = rm.get_active_rules(self.active_sets)
             
-        analyzer = BBPPAnalyzer(self.config, rules=rules, active_sets=self.active_sets)
+        self.naming_cache.clear()
+        self.analyzer = BBPPAnalyzer(self.config, rules=rules, active_sets=self.active_sets,
+                                     naming_cache=self.naming_cache, timings=self.timings)
+        if self.analyzer.aggregate:
+            # Detalle completo de los hallazgos agregados, expandible con load_details()
+            self.analyzer.detail_sidecar = FindingSidecar.for_project(self.project_info.get('name', 'proyecto'))
+        self.parsed_files = []
+        self.file_findings = {}
+        self._open_parsed_cache()
         total_files = len(self.xaml_files)
         
         for idx, xaml_file in enumerate(self.xaml_files):
@@ -75,64 +133,84 @@ class ProjectScanner:
                 percentage = ((idx + 1) / total_files) * 100
                 progress_callback(xaml_file.name, percentage)
             
-            # Parsear XAML
-            parser = XamlParser(xaml_file)
-            parsed_data = parser.parse()
-            
-            if 'error' not in parsed_data:
-                self.parsed_files.append(parsed_data)
-                
-                # Analizar BBPP
-                findings = analyzer.analyze(parsed_data)
-                self.all_findings.extend(findings)
+            # Parsear y analizar BBPP
+            self._analyze_file(xaml_file)
+            self._check_memory_budget(self._relative_path(xaml_file))
+        if self.analyzer.detail_sidecar is not None:
+            self.analyzer.detail_sidecar.close()
+        self._memory_checkpoint('analysis')
         
         # 3.5 Analizar dependencias y proyecto global
-        project_findings = analyzer.analyze_project(self.project_info)
-        self.all_findings.extend(project_findings)
-
-        # 3.6 Validar compatibilidad de versiones (NUEVO)
-        from src.version_validator import validate_dependency_compatibility
-        selected_studio_version = self.config.get('selected_studio_version', None)
-        version_validation = validate_dependency_compatibility(
-            self.project_info,
-            selected_studio_version
-        )
-
-        # 4. Calcular estadísticas
-        stats = self._calculate_statistics()
+        with self.timings.span(SPAN_PHASE, 'project_checks'):
+            self.project_findings = list(self.analyzer.analyze_project(self.project_info))
+        self._memory_checkpoint('project_checks')
+
+        # 3.6 Grafo de invocaciones (workflows no alcanzables / invocaciones rotas)
+        with self.timings.span(SPAN_PHASE, 'invocation_graph'):
+            self._build_invocation_graph()
+        self._memory_checkpoint('invocation_graph')
+
+        # 3.7 Validar compatibilidad de versiones (NUEVO)
+        with self.timings.span(SPAN_PHASE, 'version_validation'):
+            from src.version_validator import validate_dependency_compatibility
+            selected_studio_version = self.config.get('selected_studio_version', None)
+            self.version_validation = validate_dependency_compatibility(
+                self.project_info,
+                selected_studio_version
+            )
+        self._memory_checkpoint('version_validation')
+
+        # 4-5. Estadísticas, score y resultado
+        result = self._build_result()
+        if self.finding_store is not None:
+            # Sin descriptor abierto en el resultado: las lecturas abren uno temporal
+            self.finding_store.release()
+        result['parsed_cache'] = self._finish_parsed_cache(result['statistics'])
+        self._memory_checkpoint('result', check_budget=False)
         
-        # 5. Calcular score
-        score = self._calculate_score(stats)
+        start_time = getattr(self, '_start_time', time.time())
+        result['execution_time'] = time.time() - start_time
         
-        # Preparar resultado
-        result = {
-            'success': True,
-            'project_path': str(self.project_path),
-            'project_info': self.project_info,
-            'total_files': total_files,
-            'analyzed_files': len(self.parsed_files),
-            'statistics': stats,
-            'score': score,
-            'findings': [f.to_dict() for f in self.all_findings],
-            'parsed_files': self.parsed_files,
-            'bbpp_sets': self.active_sets,  # Conjuntos de BBPP utilizados
-            'version_validation': version_validation,  # Validación de compatibilidad (NUEVO)
-        }
+        # 6-7. Guardar en BD y generar reportes (opcionalmente tras devolver el resultado)
+        if background_persistence:
+            # tracemalloc se detiene en este hilo (el siguiente escaneo puede arrancarlo);
+            # el hilo de persistencia trabaja sobre copias del resultado y de los tiempos
+            self._finish_memory_accounting(result)
+            from src.persistence_pipeline import submit_persistence
+            self.persistence = submit_persistence(self._persist_result, dict(result), on_persisted,
+                                                  copy.deepcopy(self.timings), False)
+            return result
+        return self._persist_result(result, on_persisted)
+    
+    def _persist_result(self, result: Dict, on_persisted=None, timings: TimingRecorder = None,
+                        track_memory: bool = True) -> Dict:
+        """
+        Guardar el análisis en la BD de métricas, generar los reportes automáticos
+        y cerrar la contabilidad de memoria
+        
+        Args:
+            result: Resultado de scan() (se completa con PERSISTED_RESULT_KEYS)
+            on_persisted: Callback(result) al terminar
+            timings: Tiempos del escaneo (por defecto self.timings)
+            track_memory: Registrar fases en la contabilidad de memoria y cerrarla
+                (False en segundo plano: ya se cerró en el hilo del escaneo)
+            
+        Returns:
+            El mismo resultado
+        """
+        if timings is None:
+            timings = self.timings
         
         # 6. Guardar en base de datos de métricas (auto-save)
         try:
             from src.database.metrics_db import get_metrics_db
             
-            start_time = getattr(self, '_start_time', time.time())
-            execution_time = time.time() - start_time
-            
-            # Añadir tiempo de ejecución al resultado
-            result['execution_time'] = execution_time
-            
             # Guardar en BD
-            db = get_metrics_db()
-            analysis_id = db.save_analysis(result)
-            db.close()
+            with timings.span(SPAN_PHASE, 'db_save'):
+                db = get_metrics_db()
+                analysis_id = db.save_analysis(result)
+            if track_memory:
+                self._memory_checkpoint('db_save', check_budget=False)
             
             # Opcional: añadir ID al resultado
             result['analysis_id'] = analysis_id
@@ -143,34 +221,30 @@ class ProjectScanner:
             auto_generate = config.get('output', {}).get('auto_generate_reports', True)
             
             if auto_generate:
-                html_path = None
-                excel_path = None
+                from src.report_jobs import (REPORT_EXCEL, REPORT_HTML_DETALLADO, REPORT_HTML_NORMAL,
+                                             generate_reports, report_kinds_from_config)
+                output_options = config.get('output', {})
                 
-                # Generar HTML si está habilitado
-                if config.get('output', {}).get('generate_html', True):
-                    try:
-                        from src.report_generator import HTMLReportGenerator
-                        html_gen = HTMLReportGenerator(result)
-                        html_path = html_gen.generate()
-                        print(f"OK: Reporte HTML generado automáticamente: {html_path}")
-                    except Exception as e:
-                        print(f"WARNING: Error al generar HTML automáticamente: {e}")
+                # Cada formato en un proceso separado (los resultados se serializan una vez)
+                with timings.span(SPAN_PHASE, 'reports'):
+                    outcomes = generate_reports(
+                        result,
+                        report_kinds_from_config(config),
+                        include_charts=output_options.get('include_charts', True),
+                        use_processes=output_options.get('parallel_reports', True)
+                    )
+                for kind, outcome in outcomes.items():
+                    timings.add(SPAN_PHASE, f"report_{kind}", outcome['elapsed'])
+                    if outcome['path']:
+                        print(f"OK: Reporte {kind} generado automáticamente: {outcome['path']}")
+                    else:
+                        print(f"WARNING: Error al generar {kind} automáticamente: {outcome['error']}")
                 
-                # Generar Excel si está habilitado
-                if config.get('output', {}).get('generate_excel', False):
-                    try:
-                        from src.excel_report_generator import ExcelReportGenerator, OPENPYXL_AVAILABLE
-                        if OPENPYXL_AVAILABLE:
-                            excel_gen = ExcelReportGenerator(
-                                result,
-                                include_charts=config.get('output', {}).get('include_charts', True)
-                            )
-                            excel_path = excel_gen.generate()
-                            print(f"OK: Reporte Excel generado automáticamente: {excel_path}")
-                        else:
-                            print("WARNING: openpyxl no disponible - Excel no generado")
-                    except Exception as e:
-                        print(f"WARNING: Error al generar Excel automáticamente: {e}")
+                html_path = (outcomes.get(REPORT_HTML_DETALLADO, {}).get('path')
+                             or outcomes.get(REPORT_HTML_NORMAL, {}).get('path'))
+                excel_path = outcomes.get(REPORT_EXCEL, {}).get('path')
+                result['report_paths'] = {kind: outcome['path'] for kind, outcome in outcomes.items()}
+                result['report_paths'].update({'html': html_path, 'excel': excel_path})
                 
                 # Guardar rutas en la base de datos
                 if html_path or excel_path:
@@ -180,13 +254,465 @@ class ProjectScanner:
                         print(f"OK: Rutas de reportes guardadas en BD (ID: {analysis_id})")
                     except Exception as e:
                         print(f"WARNING: Error al guardar rutas en BD: {e}")
+                if track_memory:
+                    self._memory_checkpoint('reports', check_budget=False)
+            
+            # Completar los tiempos con guardado y reportes (ya medidos tras save_analysis)
+            result['timings'] = timings.to_dict()
+            db.save_timings(analysis_id, result['timings'])
+            db.close()
             
         except Exception as e:
             # No fallar si no se puede guardar métricas o generar reportes
             print(f"WARNING: No se pudo guardar en base de datos de métricas o generar reportes: {e}")
         
+        if track_memory:
+            self._finish_memory_accounting(result)
+        if on_persisted is not None:
+            on_persisted(result)
+        return result
+    
+    def rescan(self, changed_files: List[Path]) -> Dict:
+        """
+        Reanalizar incrementalmente tras modificar, crear o eliminar XAML.
+        
+        Solo se re-parsean los archivos cambiados; los hallazgos de invocación
+        se reevalúan para el conjunto de impacto (archivos cambiados y sus
+        invocadores) y la alcanzabilidad se recalcula sobre el grafo.
+        No guarda en base de datos ni genera reportes.
+        
+        Args:
+            changed_files: Rutas (absolutas o relativas al proyecto) modificadas
+            
+        Returns:
+            Diccionario con resultados del análisis (como scan) más 'incremental'
+        """
+        if self.analyzer is None or self.invocation_graph is None or self.low_memory:
+            # En modo de baja memoria no se conservan los parsed_data completos
+            return self.scan()
+        
+        graph = self.invocation_graph
+        self.timings.clear()
+        changed_rel = []
+        for changed in changed_files:
+            path = Path(changed)
+            if not path.is_absolute():
+                path = self.project_path / path
+            rel_path = graph.relative_path(path)
+            changed_rel.append(rel_path)
+            
+            # Descartar el análisis anterior del archivo
+            self.parsed_files = [p for p in self.parsed_files if Path(p.get('file_path', '')) != path]
+            self.file_findings.pop(str(path), None)
+            self.xaml_files = [f for f in self.xaml_files if f != path]
+            
+            if path.exists():
+                self.xaml_files.append(path)
+                parsed_data = self._analyze_file(path)
+                graph.add_node(rel_path)
+                graph.set_invocations(rel_path, (parsed_data or {}).get('invoke_workflow_files', []))
+            else:
+                graph.remove_node(rel_path)
+        
+        self.xaml_files.sort()
+        self.parsed_files.sort(key=lambda p: p.get('file_path', ''))
+        
+        # Invocadores afectados: re-resolver sus aristas sin volver a parsearlos
+        impacted = graph.impact_set(changed_rel)
+        parsed_by_rel = {graph.relative_path(p.get('file_path', '')): p for p in self.parsed_files}
+        for rel_path in impacted:
+            if rel_path not in changed_rel and rel_path in parsed_by_rel:
+                graph.set_invocations(rel_path, parsed_by_rel[rel_path].get('invoke_workflow_files', []))
+        
+        with self.timings.span(SPAN_PHASE, 'invocation_graph'):
+            self._evaluate_invocation_findings(impacted)
+        if self.analyzer.detail_sidecar is not None:
+            self.analyzer.detail_sidecar.close()
+        
+        result = self._build_result()
+        result['incremental'] = {
+            'changed': changed_rel,
+            'impacted': impacted,
+        }
         return result
     
+    def _analyze_file(self, xaml_file: Path) -> Optional[Dict]:
+        """
+        Parsear y analizar un XAML, guardando sus hallazgos por archivo
+        
+        Args:
+            xaml_file: Ruta del XAML
+            
+        Returns:
+            parsed_data o None si el archivo no se pudo parsear
+        """
+        rel_path = self._relative_path(xaml_file)
+        if self.profiler is not None:
+            self.profiler.set_current_file(rel_path)
+        
+        start = time.perf_counter()
+        parser = XamlParser(xaml_file)
+        parsed_data = parser.parse()
+        parser.release()
+        parsed_at = time.perf_counter()
+        self.timings.add(SPAN_PHASE, 'parse', parsed_at - start)
+        
+        if 'error' in parsed_data:
+            if self.profiler is not None:
+                self.profiler.set_current_file(None)
+            return None
+        
+        findings = list(self.analyzer.analyze(parsed_data))
+        if self.parsed_cache is not None:
+            self.parsed_cache.add(parsed_data)
+        if self.lean_results or self.low_memory:
+            # Solo sobreviven las estadísticas por archivo que usan reportes y grafo
+            parsed_data = summarize_parsed_file(parsed_data)
+        if self.low_memory:
+            findings = self._spill_findings(findings)
+        self.parsed_files.append(parsed_data)
+        self.file_findings[str(xaml_file)] = findings
+        finished = time.perf_counter()
+        self.timings.add(SPAN_PHASE, 'rules', finished - parsed_at)
+        self.timings.add(SPAN_FILE, rel_path, finished - start)
+        if self.profiler is not None:
+            self.profiler.set_current_file(None)
+        return parsed_data
+    
+    def _open_parsed_cache(self):
+        """Empezar a volcar los parsed_data del escaneo para la previsualización de reglas"""
+        preview_config = self.config.get('rule_preview', DEFAULT_CONFIG['rule_preview'])
+        self.parsed_cache = None
+        if not preview_config.get('cache_parsed_data', False):
+            return
+        try:
+            self.parsed_cache = ParsedDataCache.for_project(self.project_path)
+            self.parsed_cache.open(self.project_path, self.active_sets, self.project_info)
+        except OSError as e:
+            print(f"WARNING: No se pudo crear la caché de parsed_data: {e}")
+            self.parsed_cache = None
+    
+    def _finish_parsed_cache(self, stats: Dict) -> Optional[str]:
+        """Cerrar la caché de parsed_data con las estadísticas del escaneo"""
+        if self.parsed_cache is None:
+            return None
+        cache, self.parsed_cache = self.parsed_cache, None
+        try:
+            path = cache.finish(stats)
+            return str(path) if path else None
+        except (OSError, pickle.PicklingError) as e:
+            print(f"WARNING: No se pudo guardar la caché de parsed_data: {e}")
+            cache.discard()
+            return None
+    
+    # ------------------------------------------------------------------
+    # Contabilidad y presupuesto de memoria
+    # ------------------------------------------------------------------
+    
+    def _start_memory_accounting(self):
+        """Iniciar tracemalloc si la contabilidad o el presupuesto están activos"""
+        self.low_memory = False
+        # El FindingStore anterior puede seguir en un resultado ya devuelto (GUI,
+        # persistencia): su archivo se borra cuando se libera ese resultado
+        self.finding_store = None
+        
+        memory_config = self.config.get('memory', DEFAULT_CONFIG['memory'])
+        accounting = memory_config.get('accounting', False)
+        budget_mb = memory_config.get('budget_mb', 0) or 0
+        if not accounting and budget_mb <= 0:
+            self.memory = None
+            return
+        
+        self.memory = MemoryAccountant(budget_mb=budget_mb if budget_mb > 0 else None,
+                                       top=memory_config.get('top_allocators', 10),
+                                       snapshots=accounting)
+        self.memory.start()
+    
+    def _stop_memory_accounting(self):
+        """Detener tracemalloc (el informe queda en self.memory)"""
+        if self.memory is not None:
+            self.memory.stop()
+    
+    def _finish_memory_accounting(self, result: Dict):
+        """Añadir el informe de memoria al resultado y detener tracemalloc"""
+        if self.memory is not None:
+            result['memory'] = self.memory.to_dict()
+        self._stop_memory_accounting()
+    
+    def _memory_checkpoint(self, phase: str, check_budget: bool = True):
+        """
+        Registrar la memoria de la fase terminada y comprobar el presupuesto
+        
+        Args:
+            phase: Nombre de la fase
+            check_budget: Comprobar el presupuesto (no tiene sentido con el resultado ya construido)
+        """
+        if self.memory is None:
+            return
+        self.memory.checkpoint(phase)
+        if check_budget:
+            self._check_memory_budget(phase)
+    
+    def _check_memory_budget(self, where: str):
+        """Pasar a modo de baja memoria si se supera el presupuesto"""
+        if self.memory is not None and not self.low_memory and self.memory.over_budget():
+            self._enter_low_memory(where)
+    
+    def _enter_low_memory(self, where: str):
+        """
+        Modo de baja memoria: resumir parsed_files y volcar los hallazgos
+        por archivo a disco. Los reportes se generan en streaming.
+        
+        Args:
+            where: Fase o archivo en que se superó el presupuesto
+        """
+        self.low_memory = True
+        self.memory.mark_exceeded(where)
+        print(f"WARNING: Presupuesto de memoria superado en {where} "
+              f"({self.memory.current_bytes() // 1024} KB) - modo de baja memoria activado")
+        
+        self.parsed_files = [summarize_parsed_file(p) for p in self.parsed_files]
+        self.finding_store = FindingStore()
+        for xaml_file in self.xaml_files:
+            key = str(xaml_file)
+            if key in self.file_findings:
+                self.file_findings[key] = self._spill_findings(self.file_findings[key])
+    
+    def _spill_findings(self, findings: List[Finding]) -> range:
+        """Volcar hallazgos al FindingStore y devolver sus posiciones"""
+        start = len(self.finding_store)
+        self.finding_store.extend(self._finding_dicts(findings))
+        return range(start, len(self.finding_store))
+    
+    def _relative_path(self, xaml_file: Path) -> str:
+        """Ruta relativa al proyecto (POSIX) para identificar un XAML en los tiempos"""
+        try:
+            return Path(xaml_file).relative_to(self.project_path).as_posix()
+        except ValueError:
+            return Path(xaml_file).as_posix()
+    
+    def _entry_point_paths(self) -> List[str]:
+        """
+        Rutas relativas de los puntos de entrada del proyecto: entryPoints y
+        test cases de project.json, o Main.xaml si no hay project.json.
+        Las librerías no tienen entry points (todos sus workflows son públicos).
+        """
+        if self.project_info.get('output_type') == 'Library':
+            return []
+        
+        paths = [ep.get('filePath', '') for ep in self.project_info.get('entry_points', [])
+                 if isinstance(ep, dict)]
+        paths.extend(self.project_info.get('test_cases', []))
+        if self.project_info.get('main'):
+            paths.append(self.project_info['main'])
+        if not paths and self.project_info.get('has_main'):
+            paths.append('Main.xaml')
+        return [p for p in paths if p]
+    
+    def _build_invocation_graph(self):
+        """Construir el grafo de invocaciones y evaluar sus reglas"""
+        self.invocation_graph = InvocationGraph.build(self.project_path, self.parsed_files)
+        self.missing_findings = {}
+        self._evaluate_invocation_findings(
+            [p for i, p in enumerate(self.invocation_graph.nodes) if self.invocation_graph.present[i]]
+        )
+    
+    def _evaluate_invocation_findings(self, sources: List[str]):
+        """
+        Reevaluar hallazgos del grafo: invocaciones rotas de los workflows
+        indicados y alcanzabilidad global (BFS lineal sobre el grafo)
+        
+        Args:
+            sources: Rutas relativas cuyas invocaciones se reevalúan
+        """
+        graph = self.invocation_graph
+        for rel_path in sources:
+            self.missing_findings.pop(rel_path, None)
+            findings = list(self.analyzer.analyze_missing_workflows(graph, [rel_path]))
+            if findings:
+                self.missing_findings[rel_path] = findings
+        self.unreachable_findings = list(
+            self.analyzer.analyze_unreachable_workflows(graph, self._entry_point_paths())
+        )
+    
+    def _finding_batches(self, include_files: bool = True):
+        """Lotes de hallazgos (por archivo, proyecto e invocaciones) en orden estable"""
+        if include_files:
+            for xaml_file in self.xaml_files:
+                yield self.file_findings.get(str(xaml_file), [])
+        yield self.project_findings
+        for rel_path in sorted(self.missing_findings):
+            yield self.missing_findings[rel_path]
+        yield self.unreachable_findings
+    
+    def _collect_findings(self) -> List[Finding]:
+        """Reunir hallazgos de archivos, proyecto y grafo en orden estable"""
+        findings = []
+        for batch in self._finding_batches():
+            findings.extend(batch)
+        return findings
+    
+    def _finding_dicts(self, findings: List[Finding]) -> List[Dict]:
+        """
+        Serializar un lote de hallazgos con su huella y, si hay línea base,
+        si está aceptado ('suppressed')
+        """
+        dicts = assign_fingerprints((f.to_dict() for f in findings), self.project_path)
+        if self.baseline is not None:
+            for finding in dicts:
+                self.baseline.apply(finding)
+        return dicts
+
+    def _new_findings(self, findings: Iterable[Dict]) -> Iterator[Finding]:
+        """Hallazgos nuevos frente a la línea base (los agregados, solo con su exceso)"""
+        for finding in findings:
+            count = new_occurrences(finding)
+            if not count:
+                continue
+            new = Finding.from_dict(finding)
+            if new.details.get('aggregated') and count != new.occurrences:
+                new.details = {**new.details, 'occurrences': count}
+            yield new
+    
+    def _load_baseline(self):
+        """Cargar las huellas aceptadas: archivo del proyecto o, si no existe, la BD"""
+        self.baseline = None
+        self.baseline_source = None
+        baseline_config = self.config.get('baseline', DEFAULT_CONFIG['baseline'])
+        if not baseline_config.get('enabled', True):
+            return
+        
+        path = resolve_baseline_path(self.project_path, baseline_config.get('file'))
+        entries = load_baseline_file(path)
+        if entries is not None:
+            self.baseline = FindingBaseline(entries, self.project_path)
+            self.baseline_source = str(path)
+            return
+        
+        if baseline_config.get('use_db', True):
+            try:
+                from src.database.metrics_db import get_metrics_db
+                db = get_metrics_db()
+                entries = db.get_finding_baseline(self.project_path.name)
+                db.close()
+            except Exception as e:
+                print(f"WARNING: No se pudo leer la línea base de la BD: {e}")
+                entries = {}
+            if entries:
+                self.baseline = FindingBaseline(entries, self.project_path)
+                self.baseline_source = 'db'
+    
+    def save_baseline(self, result: Dict, target: str = 'file') -> str:
+        """
+        Aceptar los hallazgos de un resultado como línea base
+        
+        Args:
+            result: Resultado de scan()
+            target: 'file' (archivo junto al proyecto) o 'db' (tabla finding_baseline)
+            
+        Returns:
+            Ruta del archivo o 'db'
+        """
+        entries = baseline_entries(result['findings'], self.project_path)
+        if target == 'db':
+            from src.database.metrics_db import get_metrics_db
+            db = get_metrics_db()
+            count = db.save_finding_baseline(self.project_path.name, entries)
+            db.close()
+            print(f"OK: Línea base guardada en BD ({count} hallazgos)")
+            return 'db'
+        
+        baseline_config = self.config.get('baseline', DEFAULT_CONFIG['baseline'])
+        path = resolve_baseline_path(self.project_path, baseline_config.get('file'))
+        write_baseline_file(path, entries, self.project_info.get('name', self.project_path.name))
+        print(f"OK: Línea base guardada en {path}")
+        return str(path)
+    
+    def _collect_spilled_findings(self) -> FindingStore:
+        """
+        Completar el FindingStore con los hallazgos de proyecto y grafo,
+        tras los de archivo (mismo orden que _collect_findings)
+        """
+        store = self.finding_store
+        file_count = max((r.stop for r in self.file_findings.values()), default=0)
+        store.truncate(file_count)
+        for batch in self._finding_batches(include_files=False):
+            store.extend(self._finding_dicts(batch))
+        return store
+    
+    def _build_result(self) -> Dict:
+        """Calcular estadísticas y score y preparar el diccionario de resultados"""
+        if self.low_memory:
+            findings = self._collect_spilled_findings()
+            self.all_findings = MappedSequence(findings, Finding.from_dict)
+        else:
+            if self.baseline is not None:
+                self.baseline.reset()
+            self.all_findings = []
+            findings = []
+            for batch in self._finding_batches():
+                self.all_findings.extend(batch)
+                findings.extend(self._finding_dicts(batch))
+        
+        # 4. Calcular estadísticas
+        with self.timings.span(SPAN_PHASE, 'statistics'):
+            stats = self._calculate_statistics()
+            new_stats = None
+            if self.baseline is not None:
+                new_stats = self._calculate_statistics(self._new_findings(findings))
+        
+        # 5. Calcular score (con línea base, opcionalmente solo sobre los hallazgos nuevos)
+        with self.timings.span(SPAN_PHASE, 'score'):
+            score = self._calculate_score(stats)
+            baseline_summary = None
+            if new_stats is not None:
+                baseline_config = self.config.get('baseline', DEFAULT_CONFIG['baseline'])
+                score_all = score
+                if baseline_config.get('score_new_only', True):
+                    score = self._calculate_score(new_stats)
+                baseline_summary = {
+                    'source': self.baseline_source,
+                    'accepted': len(self.baseline),
+                    'new': new_stats['total_findings'],
+                    'suppressed': stats['total_findings'] - new_stats['total_findings'],
+                    'fixed': self.baseline.fixed(),
+                    'new_statistics': {key: new_stats[key] for key in
+                                       ('total_findings', 'errors', 'warnings', 'infos', 'findings_by_rule')},
+                    'score_all': score_all['score'],
+                }
+        
+        self.timings.set_count('files', len(self.xaml_files))
+        self.timings.set_count('analyzed_files', len(self.parsed_files))
+        self.timings.set_count('activities', stats['total_activities'])
+        self.timings.set_count('variables', stats['total_variables'])
+        self.timings.set_count('arguments', stats['total_arguments'])
+        self.timings.set_count('findings', stats['total_findings'])
+        
+        sidecar = self.analyzer.detail_sidecar if self.analyzer is not None else None
+        graph_summary = {}
+        if self.invocation_graph is not None:
+            graph_summary = self.invocation_graph.summary(self._entry_point_paths())
+        
+        return {
+            'success': True,
+            'project_path': str(self.project_path),
+            'project_info': self.project_info,
+            'total_files': len(self.xaml_files),
+            'analyzed_files': len(self.parsed_files),
+            'statistics': stats,
+            'score': score,
+            'findings': findings,
+            'parsed_files': self.parsed_files,
+            'bbpp_sets': self.active_sets,  # Conjuntos de BBPP utilizados
+            'version_validation': self.version_validation,  # Validación de compatibilidad (NUEVO)
+            'invocation_graph': graph_summary,  # Resumen del grafo de invocaciones
+            'timings': self.timings.to_dict(),  # Spans por fase, regla y archivo
+            'low_memory': self.low_memory,  # Hallazgos en disco y parsed_files resumidos
+            'lean_results': self.lean_results,  # parsed_files con solo estadísticas por archivo
+            'findings_sidecar': str(sidecar.path) if sidecar is not None else None,  # Detalle de agregados
+            'baseline': baseline_summary,  # Nuevos frente a la línea base (None si no hay)
+        }
+    
     def _detect_project_info(self) -> Dict:
         """Detectar información del proyecto"""
         info = {
@@ -225,10 +751,19 @@ class ProjectScanner:
                     # Extraer información adicional
                     info['project_version'] = data.get('projectVersion', 'Unknown')
                     info['entry_points'] = data.get('entryPoints', [])
+                    info['main'] = data.get('main', '')
 
                     # Extraer projectProfile (Modern/Legacy)
                     design_options = data.get('designOptions', {})
                     info['project_profile'] = design_options.get('projectProfile', 'Legacy')
+                    info['output_type'] = design_options.get('outputType', 'Process')
+
+                    # Test cases (también son puntos de entrada)
+                    file_infos = design_options.get('fileInfoCollection', []) or []
+                    info['test_cases'] = [
+                        fi.get('fileName', '') for fi in file_infos
+                        if isinstance(fi, dict) and fi.get('testCaseId')
+                    ]
 
             except Exception as e:
                 info['error_reading_project_json'] = str(e)
@@ -263,10 +798,17 @@ class ProjectScanner:
         
         return sorted(xaml_files)
     
-    def _calculate_statistics(self) -> Dict:
-        """Calcular estadísticas del análisis"""
+    def _calculate_statistics(self, findings=None) -> Dict:
+        """
+        Calcular estadísticas del análisis
+        
+        Args:
+            findings: Hallazgos (Finding) a contar; por defecto todos los del escaneo
+        """
+        if findings is None:
+            findings = self.all_findings
         stats = {
-            'total_findings': len(self.all_findings),
+            'total_findings': 0,
             'errors': 0,
             'warnings': 0,
             'infos': 0,
@@ -282,170 +824,67 @@ class ProjectScanner:
             'total_commented_lines': 0,
         }
 
-        # Contar por severidad y por regla
-        for finding in self.all_findings:
+        # Contar por severidad y por regla (los hallazgos agregados cuentan sus ocurrencias)
+        for finding in findings:
             severity = finding.severity
             category = finding.category
             rule_id = finding.rule_id  # Asumimos que los findings tienen rule_id
+            occurrences = finding.occurrences
 
+            stats['total_findings'] += occurrences
             if severity == 'error':
-                stats['errors'] += 1
+                stats['errors'] += occurrences
             elif severity == 'warning':
-                stats['warnings'] += 1
+                stats['warnings'] += occurrences
             elif severity == 'info':
-                stats['infos'] += 1
+                stats['infos'] += occurrences
 
             # Por categoría
-            stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
-            stats['by_severity'][severity] = stats['by_severity'].get(severity, 0) + 1
+            stats['by_category'][category] = stats['by_category'].get(category, 0) + occurrences
+            stats['by_severity'][severity] = stats['by_severity'].get(severity, 0) + occurrences
 
             # Por regla (NUEVO)
-            stats['findings_by_rule'][rule_id] = stats['findings_by_rule'].get(rule_id, 0) + 1
+            stats['findings_by_rule'][rule_id] = stats['findings_by_rule'].get(rule_id, 0) + occurrences
 
         # Estadísticas de los archivos parseados
         for parsed_file in self.parsed_files:
-            stats['total_activities'] += len(parsed_file.get('activities', []))
-            stats['total_variables'] += len(parsed_file.get('variables', []))
-            stats['total_arguments'] += len(parsed_file.get('arguments', []))
-            stats['total_try_catch'] += len(parsed_file.get('try_catch_blocks', []))
-            stats['total_logs'] += len(parsed_file.get('log_messages', []))
+            stats['total_activities'] += parsed_count(parsed_file, 'activities')
+            stats['total_variables'] += parsed_count(parsed_file, 'variables')
+            stats['total_arguments'] += parsed_count(parsed_file, 'arguments')
+            stats['total_try_catch'] += parsed_count(parsed_file, 'try_catch_blocks')
+            stats['total_logs'] += parsed_count(parsed_file, 'log_messages')
 
             commented = parsed_file.get('commented_code', {})
             if commented.get('commented_lines', 0) > 0:
                 stats['files_with_commented_code'] += 1
                 stats['total_commented_lines'] += commented.get('commented_lines', 0)
 
+        # Eficacia de la caché de nomenclatura compartida en el escaneo
+        stats['naming_cache'] = self.naming_cache.stats()
+
         return stats
     
     def _calculate_score(self, stats: Dict) -> Dict:
         """
         Calcular score del proyecto (0-100) usando penalización personalizable por regla
 
+        El cálculo vive en src.scoring para poder recalcularlo sin reescanear.
+
         Args:
             stats: Estadísticas del análisis (debe incluir 'findings_by_rule')
 
         Returns:
             Diccionario con score y detalles
         """
-        from src.rules_manager import get_rules_manager
-
-        # Puntuación base
-        base_score = 100
-
-        # Pesos de severidad predeterminados (para modo severity_default)
-        error_weight = self.config.get('scoring', {}).get('error_weight', -10)
-        warning_weight = self.config.get('scoring', {}).get('warning_weight', -3)
-        info_weight = self.config.get('scoring', {}).get('info_weight', -0.5)
+        from src.scoring import calculate_score, collect_rule_params, scoring_settings
 
-        # Obtener gestor de reglas
-        rules_manager = get_rules_manager()
-
-        # Agrupar findings por regla
         findings_by_rule = stats.get('findings_by_rule', {})
-
-        # Calcular penalización por cada regla
-        total_penalty = 0
-        penalty_details = {}
-
-        for rule_id, count in findings_by_rule.items():
-            if count == 0:
-                continue
-
-            # Obtener configuración de la regla
-            rule = rules_manager.get_rule_by_id(rule_id)
-            if not rule:
-                continue
-
-            # Obtener parámetros de penalización
-            params = rule.get('parameters', {})
-            penalty_mode = params.get('penalty_mode', 'severity_default')
-            penalty_value = params.get('penalty_value', 2)
-            use_penalty_cap = params.get('use_penalty_cap', False)
-            penalty_cap = params.get('penalty_cap', 10)
-            severity = rule.get('severity', 'warning')
-
-            # Calcular penalización según el modo
-            rule_penalty = 0
-
-            # Si penalty_value es 0, no penalizar independientemente del modo
-            if penalty_value == 0:
-                rule_penalty = 0
-
-            elif penalty_mode == 'severity_default':
-                # Usar pesos globales según severidad
-                if severity == 'error':
-                    rule_penalty = count * abs(error_weight)
-                elif severity == 'warning':
-                    rule_penalty = count * abs(warning_weight)
-                elif severity == 'info':
-                    rule_penalty = count * abs(info_weight)
-
-            elif penalty_mode == 'individual':
-                # Cada hallazgo suma penalty_value%
-                rule_penalty = count * penalty_value
-
-            elif penalty_mode == 'global':
-                # Penalización fija sin importar cantidad
-                rule_penalty = penalty_value
-
-            # Aplicar límite máximo si está configurado
-            if use_penalty_cap and penalty_mode in ['severity_default', 'individual']:
-                rule_penalty = min(rule_penalty, penalty_cap)
-
-            # Acumular penalización
-            total_penalty += rule_penalty
-            penalty_details[rule_id] = {
-                'count': count,
-                'mode': penalty_mode,
-                'penalty': round(rule_penalty, 2)
-            }
-
-        # Ajuste por tamaño del proyecto (SCALING_FACTOR)
-        total_activities = max(1, stats.get('total_activities', 1))
-        penalty_per_activity = total_penalty / total_activities
-
-        # Factor de sensibilidad (configurable desde config)
-        SCALING_FACTOR = self.config.get('scoring', {}).get('scaling_factor', 5)
-
-        adjusted_penalty = penalty_per_activity * SCALING_FACTOR
-
-        # Score final (mínimo 0, máximo 100)
-        if total_activities < 10:
-            # Proyectos pequeños: penalización directa amortiguada
-            final_score = max(0, base_score - (total_penalty * 0.5))
-        else:
-            # Proyectos grandes: penalización ajustada por actividad
-            final_score = max(0, base_score - adjusted_penalty)
-
-        # Determinar calificación
-        if final_score >= 90:
-            grade = 'A - Excelente'
-            color = 'green'
-        elif final_score >= 80:
-            grade = 'B - Muy Bien'
-            color = 'lightgreen'
-        elif final_score >= 70:
-            grade = 'C - Bien'
-            color = 'yellow'
-        elif final_score >= 60:
-            grade = 'D - Aceptable'
-            color = 'orange'
-        else:
-            grade = 'F - Necesita Mejoras'
-            color = 'red'
-
-        return {
-            'score': round(final_score, 2),
-            'grade': grade,
-            'color': color,
-            'penalties': {
-                'total': round(total_penalty, 2),
-                'by_rule': penalty_details,
-                'penalty_per_activity': round(penalty_per_activity, 2),
-                'adjusted_penalty': round(adjusted_penalty, 2),
-                'scaling_factor': SCALING_FACTOR
-            }
-        }
+        return calculate_score(
+            findings_by_rule,
+            stats.get('total_activities', 1),
+            collect_rule_params(findings_by_rule),
+            scoring_settings(self.config)
+        )
     
     def get_summary(self) -> str:
         """Obtener resumen textual del análisis"""
@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import Dict
 import html
 
+from src.report_model import ReportModel, get_report_model
+
 
 class HTMLReportGenerator:
     """Generador de reportes HTML"""
@@ -41,30 +43,37 @@ class HTMLReportGenerator:
         Returns:
             Ruta al archivo generado
         """
-        html_content = self._build_html()
-        
         # Asegurar que existe el directorio
         self.output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Guardar archivo
+        # Guardar archivo en streaming: cada fragmento se escribe según se genera
         with open(self.output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            for chunk in self._iter_html():
+                f.write(chunk)
         
         return self.output_path
     
     def _build_html(self) -> str:
         """Construir contenido HTML completo según el tipo de reporte"""
+        return ''.join(self._iter_html())
+
+    def _iter_html(self):
+        """Fragmentos del HTML según el tipo de reporte"""
         if self.report_type == "detallado":
-            return self._build_html_detallado()
+            return self._iter_html_detallado()
         else:
-            return self._build_html_normal()
+            return self._iter_html_normal()
 
     def _build_html_detallado(self) -> str:
         """Construir reporte HTML detallado con pestañas, filtros y scores por archivo"""
+        return ''.join(self._iter_html_detallado())
+
+    def _iter_html_detallado(self):
+        """Fragmentos del reporte detallado (la sección de hallazgos se genera por partes)"""
         project_info = self.results.get('project_info', {})
         stats = self.results.get('statistics', {})
         score = self.results.get('score', {})
-        findings = self.results.get('findings', [])
+        model = get_report_model(self.results)
         
         # Preparar botón IA condicional (Mostrar siempre que haya datos, incluso error)
         ai_data = self.results.get('ai_analysis')
@@ -242,17 +251,21 @@ class HTMLReportGenerator:
 
             <!-- Pestaña: Hallazgos -->
             <div id="tab-hallazgos" class="tab-content" style="display: none;">
-                {self._build_findings(findings, stats)}
+                """
+        yield html_content
+        yield from self._iter_findings(model, stats)
+
+        html_content = f"""
             </div>
 
             <!-- Pestaña: Archivos -->
             <div id="tab-archivos" class="tab-content" style="display: none;">
-                {self._build_files_scores(findings)}
+                {self._build_files_scores(model)}
             </div>
 
             <!-- Pestaña: Gráficos -->
             <div id="tab-graficos" class="tab-content" style="display: none;">
-                {self._build_charts(findings, stats, score)}
+                {self._build_charts(model, stats, score)}
             </div>
             
             <!-- Pestaña: Análisis IA (Condicional) -->
@@ -264,14 +277,18 @@ class HTMLReportGenerator:
 </body>
 </html>"""
         
-        return html_content
+        yield html_content
 
     def _build_html_normal(self) -> str:
         """Construir reporte HTML simple sin pestañas (formato clásico)"""
+        return ''.join(self._iter_html_normal())
+
+    def _iter_html_normal(self):
+        """Fragmentos del reporte normal (la sección de hallazgos se genera por partes)"""
         project_info = self.results.get('project_info', {})
         stats = self.results.get('statistics', {})
         score = self.results.get('score', {})
-        findings = self.results.get('findings', [])
+        model = get_report_model(self.results)
 
         html_content = f"""<!DOCTYPE html>
 <html lang="es">
@@ -319,13 +336,17 @@ class HTMLReportGenerator:
         {self._build_dependencies(project_info)}
         {self._build_version_validation()}
         {self._build_statistics(stats)}
-        {self._build_findings_normal(findings, stats)}
+        """
+        yield html_content
+        yield from self._iter_findings_normal(model, stats)
+
+        html_content = f"""
         {self._build_footer()}
     </div>
 </body>
 </html>"""
 
-        return html_content
+        yield html_content
 
 
     def _get_css(self) -> str:
@@ -1194,8 +1215,31 @@ class HTMLReportGenerator:
                 <div class="score-value">{self.results.get('analyzed_files', 0)}</div>
                 <div class="grade">{self.results.get('total_xaml_files', 0)} archivos XAML</div>
             </div>
+            {self._build_baseline_card()}
         </div>
         """
+
+    def _build_baseline_card(self) -> str:
+        """Tarjeta de hallazgos nuevos frente a la línea base (vacía si no hay línea base)"""
+        baseline = self.results.get('baseline')
+        if not baseline:
+            return ''
+        new_stats = baseline.get('new_statistics', {})
+        return f"""
+            <div class="summary-card">
+                <h3>Nuevos vs Línea Base</h3>
+                <div class="score-value">{baseline.get('new', 0)}</div>
+                <div class="grade">
+                    ❌ {new_stats.get('errors', 0)} | 
+                    ⚠️ {new_stats.get('warnings', 0)} | 
+                    ℹ️ {new_stats.get('infos', 0)}
+                </div>
+                <div class="grade">
+                    🗂️ {baseline.get('suppressed', 0)} aceptados | ✔️ {baseline.get('fixed', 0)} corregidos
+                    (score sin línea base: {baseline.get('score_all', 0)})
+                </div>
+            </div>
+        """
     
     def _build_statistics(self, stats: Dict) -> str:
         """Construir sección de estadísticas"""
@@ -1243,10 +1287,14 @@ class HTMLReportGenerator:
             tags_html += f'<div class="category-tag">{html.escape(category)}: {count}</div>\n'
         return tags_html or '<div class="category-tag">Sin hallazgos</div>'
     
-    def _build_findings(self, findings: list, stats: Dict) -> str:
-        """Construir sección de hallazgos agrupados por regla"""
-        if not findings:
-            return """
+    def _build_findings(self, model: ReportModel, stats: Dict) -> str:
+        """Construir sección de hallazgos completa (ver _iter_findings)"""
+        return ''.join(self._iter_findings(model, stats))
+
+    def _iter_findings(self, model: ReportModel, stats: Dict):
+        """Construir sección de hallazgos agrupados por regla (del ReportModel), por fragmentos"""
+        if not model.source_size:
+            yield """
             <div class="section">
                 <h2>✅ Hallazgos</h2>
                 <div class="no-findings">
@@ -1254,30 +1302,10 @@ class HTMLReportGenerator:
                 </div>
             </div>
             """
-
-        # Agrupar hallazgos por (rule_id, category, description, severity)
-        # Esto agrupa todas las ocurrencias de la misma regla
-        from collections import defaultdict
-        grouped = defaultdict(list)
-
-        for finding in findings:
-            category = finding.get('category', 'unknown')
-
-            # Omitir hallazgos de dependencias (ya se muestran en la tabla superior)
-            if category == 'dependencias':
-                continue
-
-            # Clave de agrupación: (category, description, severity)
-            # Usamos esto para agrupar hallazgos de la misma regla
-            key = (
-                finding.get('category', 'unknown'),
-                finding.get('description', ''),
-                finding.get('severity', 'info')
-            )
-            grouped[key].append(finding)
+            return
 
         # Construir HTML
-        findings_html = """
+        yield """
         <div class="section">
             <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
                 <h2 style="margin: 0;">🔍 Hallazgos Detallados</h2>
@@ -1293,40 +1321,22 @@ class HTMLReportGenerator:
             <div class="findings-list">
         """
 
-        # Ordenar por severidad (error > warning > info)
-        severity_order = {'error': 0, 'warning': 1, 'info': 2}
-        sorted_groups = sorted(
-            grouped.items(),
-            key=lambda x: (severity_order.get(x[0][2], 3), x[0][0])
-        )
-
-        # Extraer categorías y severidades únicas para los filtros
-        categories = set()
-        severities = set()
-        for (category, description, severity), occurrences in sorted_groups:
-            categories.add(category)
-            severities.add(severity)
-
         # Añadir panel de filtros
-        findings_html += self._build_filters_panel(categories, severities, stats)
+        yield self._build_filters_panel(model.categories, model.severities, stats)
 
-        for idx, ((category, description, severity), occurrences) in enumerate(sorted_groups):
-            count = len(occurrences)
+        # Reglas ya ordenadas por severidad (error > warning > info)
+        for idx, group in enumerate(model.rule_groups):
+            category, description, severity = group['category'], group['description'], group['severity']
+            count = group['count']
             severity_class = f'finding-{severity}'
             badge_class = f'badge-{severity}'
 
             # ID único para este hallazgo (para collapsar)
             finding_id = f'finding-{idx}'
 
-            # Agrupar ocurrencias por archivo
-            by_file = defaultdict(list)
-            for occ in occurrences:
-                file_path = Path(occ.get('file_path', '')).name
-                by_file[file_path].append(occ)
-
             # Encabezado de la regla agrupada (con botón de toggle)
             # Añadir atributos data- para filtrar
-            findings_html += f"""
+            yield f"""
             <div class="finding-item {severity_class}" data-severity="{severity}" data-category="{category}">
                 <div class="finding-header clickable" onclick="toggleFinding('{finding_id}')">
                     <div class="finding-title-wrapper">
@@ -1344,10 +1354,10 @@ class HTMLReportGenerator:
             """
 
             # Listar por archivo
-            for file_name, file_occurrences in sorted(by_file.items()):
-                file_count = len(file_occurrences)
+            for file_group in group['files']:
+                file_name, file_count = file_group['name'], file_group['count']
 
-                findings_html += f"""
+                yield f"""
                     <div class="file-group">
                         <div class="file-header">
                             📄 <strong>{html.escape(file_name)}</strong>
@@ -1357,33 +1367,28 @@ class HTMLReportGenerator:
                 """
 
                 # Listar ubicaciones dentro del archivo
-                for occurrence in file_occurrences:
-                    location = occurrence.get('location', '')
-
-                    if location:
-                        findings_html += f"""
+                for location in file_group['locations']:
+                    yield f"""
                             <div class="location-item">
                                 📍 {html.escape(location)}
                             </div>
                         """
 
-                findings_html += """
+                yield """
                         </div>
                     </div>
                 """
 
-            findings_html += """
+            yield """
                 </div>
             </div>
             """
 
-        findings_html += """
+        yield """
             </div>
         </div>
         """
 
-        return findings_html
-
     def _build_filters_panel(self, categories: set, severities: set, stats: Dict) -> str:
         """Construir panel de filtros interactivos"""
 
@@ -1458,20 +1463,9 @@ class HTMLReportGenerator:
 
         return filters_html
 
-    def _build_files_scores(self, findings: list) -> str:
+    def _build_files_scores(self, model: ReportModel) -> str:
         """Construir pestaña de scores por archivo"""
-        from collections import defaultdict
-        from pathlib import Path
-
-        # Agrupar hallazgos por archivo
-        by_file = defaultdict(list)
-        for finding in findings:
-            if finding.get('category') == 'dependencias':
-                continue
-            file_path = Path(finding.get('file_path', '')).name
-            by_file[file_path].append(finding)
-
-        if not by_file:
+        if not model.file_stats:
             return """
             <div class="section">
                 <h2>📂 Scores por Archivo</h2>
@@ -1481,31 +1475,8 @@ class HTMLReportGenerator:
             </div>
             """
 
-        # Calcular score por archivo
-        files_data = []
-        for file_name, file_findings in by_file.items():
-            # Contar por severidad
-            errors = sum(1 for f in file_findings if f.get('severity') == 'error')
-            warnings = sum(1 for f in file_findings if f.get('severity') == 'warning')
-            infos = sum(1 for f in file_findings if f.get('severity') == 'info')
-
-            # Calcular penalización
-            penalty = (errors * 10) + (warnings * 5) + (infos * 1)
-
-            # Calcular score (100 - penalización, mínimo 0)
-            score = max(0, 100 - penalty)
-
-            files_data.append({
-                'name': file_name,
-                'score': score,
-                'errors': errors,
-                'warnings': warnings,
-                'infos': infos,
-                'total': len(file_findings)
-            })
-
-        # Ordenar por score (peor primero)
-        files_data.sort(key=lambda x: x['score'])
+        # Score por archivo (peor primero)
+        files_data = model.file_scores()
 
         # Construir HTML
         files_html = """
@@ -1588,10 +1559,8 @@ class HTMLReportGenerator:
 
         return files_html
 
-    def _build_charts(self, findings: list, stats: Dict, score: Dict) -> str:
+    def _build_charts(self, model: ReportModel, stats: Dict, score: Dict) -> str:
         """Construir pestaña de gráficos con visualizaciones interactivas"""
-        from collections import defaultdict
-        from pathlib import Path
         import json
 
         # Preparar datos para gráficos
@@ -1606,13 +1575,7 @@ class HTMLReportGenerator:
         category_data = {k: v for k, v in category_data.items() if k != 'dependencias'}
 
         # Top 10 archivos con más hallazgos
-        by_file = defaultdict(int)
-        for finding in findings:
-            if finding.get('category') != 'dependencias':
-                file_path = Path(finding.get('file_path', '')).name
-                by_file[file_path] += 1
-        
-        top_files = sorted(by_file.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_files = model.top_files(10)
         
         score_value = score.get('score', 0)
         grade = score.get('grade', 'N/A')
@@ -2281,10 +2244,14 @@ class HTMLReportGenerator:
         }
         """
 
-    def _build_findings_normal(self, findings: list, stats: Dict) -> str:
-        """Construir sección de hallazgos con agrupamiento multinivel (sin filtros)"""
-        if not findings:
-            return """
+    def _build_findings_normal(self, model: ReportModel, stats: Dict) -> str:
+        """Construir sección de hallazgos completa (ver _iter_findings_normal)"""
+        return ''.join(self._iter_findings_normal(model, stats))
+
+    def _iter_findings_normal(self, model: ReportModel, stats: Dict):
+        """Construir sección de hallazgos con agrupamiento multinivel (sin filtros), por fragmentos"""
+        if not model.source_size:
+            yield """
             <div class="section">
                 <h2>✅ Hallazgos</h2>
                 <div class="no-findings">
@@ -2292,28 +2259,10 @@ class HTMLReportGenerator:
                 </div>
             </div>
             """
-
-        # Agrupar hallazgos por (rule_id, category, description, severity)
-        from collections import defaultdict
-        grouped = defaultdict(list)
-
-        for finding in findings:
-            category = finding.get('category', 'unknown')
-
-            # Omitir hallazgos de dependencias (ya se muestran en la tabla superior)
-            if category == 'dependencias':
-                continue
-
-            # Clave de agrupación: (category, description, severity)
-            key = (
-                finding.get('category', 'unknown'),
-                finding.get('description', ''),
-                finding.get('severity', 'info')
-            )
-            grouped[key].append(finding)
+            return
 
         # Construir HTML
-        findings_html = """
+        yield """
         <div class="section">
             <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
                 <h2 style="margin: 0;">🔍 Hallazgos Detallados</h2>
@@ -2329,29 +2278,18 @@ class HTMLReportGenerator:
             <div class="findings-list">
         """
 
-        # Ordenar por severidad (error > warning > info)
-        severity_order = {'error': 0, 'warning': 1, 'info': 2}
-        sorted_groups = sorted(
-            grouped.items(),
-            key=lambda x: (severity_order.get(x[0][2], 3), x[0][0])
-        )
-
-        for idx, ((category, description, severity), occurrences) in enumerate(sorted_groups):
-            count = len(occurrences)
+        # Reglas ya ordenadas por severidad (error > warning > info)
+        for idx, group in enumerate(model.rule_groups):
+            category, description, severity = group['category'], group['description'], group['severity']
+            count = group['count']
             severity_class = f'finding-{severity}'
             badge_class = f'badge-{severity}'
 
             # ID único para este hallazgo (para collapsar)
             finding_id = f'finding-{idx}'
 
-            # Agrupar ocurrencias por archivo
-            by_file = defaultdict(list)
-            for occ in occurrences:
-                file_path = Path(occ.get('file_path', '')).name
-                by_file[file_path].append(occ)
-
             # Encabezado de la regla agrupada (con botón de toggle)
-            findings_html += f"""
+            yield f"""
             <div class="finding-item {severity_class}">
                 <div class="finding-header clickable" onclick="toggleFinding('{finding_id}')">
                     <div class="finding-title-wrapper">
@@ -2369,10 +2307,10 @@ class HTMLReportGenerator:
             """
 
             # Listar por archivo
-            for file_name, file_occurrences in sorted(by_file.items()):
-                file_count = len(file_occurrences)
+            for file_group in group['files']:
+                file_name, file_count = file_group['name'], file_group['count']
 
-                findings_html += f"""
+                yield f"""
                     <div class="file-group">
                         <div class="file-header">
                             📄 <strong>{html.escape(file_name)}</strong>
@@ -2382,30 +2320,24 @@ class HTMLReportGenerator:
                 """
 
                 # Listar ubicaciones dentro del archivo
-                for occurrence in file_occurrences:
-                    location = occurrence.get('location', '')
-
-                    if location:
-                        findings_html += f"""
+                for location in file_group['locations']:
+                    yield f"""
                             <div class="location-item">
                                 📍 {html.escape(location)}
                             </div>
                         """
 
-                findings_html += """
+                yield """
                         </div>
                     </div>
                 """
 
-            findings_html += """
+            yield """
                 </div>
             </div>
             """
 
-        findings_html += """
+        yield """
             </div>
         </div>
         """
-
-        return findings_html
-
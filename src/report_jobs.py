@@ -0,0 +1,454 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Generación de reportes en procesos separados
+Los resultados se serializan una sola vez a un archivo temporal y cada
+formato (HTML normal, HTML detallado, Excel) se construye en paralelo en un
+proceso del pool, sin competir por el GIL con la interfaz ni con el escaneo.
+Si no se pueden crear procesos se generan en el propio proceso, en serie.
+
+También regenera reportes de análisis guardados en la BD de métricas sin
+reescanear (un trabajo del pool por análisis).
+
+Uso:
+    python -m src.report_jobs --ids 12 13 14 --kinds html_detallado excel
+    python -m src.report_jobs --project MiProyecto --last 20
+"""
+
+import argparse
+import atexit
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Permitir ejecución directa (python src/report_jobs.py)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+# Tipos de reporte
+REPORT_HTML_NORMAL = 'html_normal'
+REPORT_HTML_DETALLADO = 'html_detallado'
+REPORT_EXCEL = 'excel'
+REPORT_KINDS = (REPORT_HTML_NORMAL, REPORT_HTML_DETALLADO, REPORT_EXCEL)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Trabajos enviados al pool y aún sin terminar (se cancelan al cerrarlo)
+_pending_jobs = set()
+
+# Resultados ya cargados en este proceso trabajador: (ruta, resultados)
+_loaded_results = (None, None)
+
+
+def report_kinds_from_config(config: Dict) -> list:
+    """
+    Tipos de reporte automáticos según config['output']
+
+    Args:
+        config: Configuración de usuario
+
+    Returns:
+        Lista de tipos (REPORT_*)
+    """
+    output = config.get('output', {})
+    kinds = []
+    if output.get('generate_html', True):
+        kinds.append(REPORT_HTML_DETALLADO)
+    if output.get('generate_html_normal', False):
+        kinds.append(REPORT_HTML_NORMAL)
+    if output.get('generate_excel', False):
+        kinds.append(REPORT_EXCEL)
+    return kinds
+
+
+def default_report_path(results: Dict, kind: str, tag: str = None, output_dir: Path = None) -> Path:
+    """
+    Ruta estándar del reporte (output/HTML u output/Excel)
+
+    El HTML normal lleva el sufijo _NORMAL para no coincidir con el detallado
+    generado en el mismo segundo.
+
+    Args:
+        results: Resultados del análisis
+        kind: Tipo de reporte (REPORT_*)
+        tag: Sufijo adicional del nombre (p. ej. el ID del análisis al regenerar)
+        output_dir: Carpeta de salida (por defecto OUTPUT_DIR)
+
+    Returns:
+        Ruta del archivo a generar
+    """
+    from src.report_utils import get_report_output_dir, generate_report_filename
+
+    project_name = results.get('project_info', {}).get('name', 'Proyecto')
+    extension = 'xlsx' if kind == REPORT_EXCEL else 'html'
+    filename = generate_report_filename(project_name, extension)
+    suffixes = ['NORMAL'] if kind == REPORT_HTML_NORMAL else []
+    if tag:
+        suffixes.append(tag)
+    if suffixes:
+        filename = filename.replace(f'.{extension}', f"_{'_'.join(suffixes)}.{extension}")
+    return get_report_output_dir('excel' if kind == REPORT_EXCEL else 'html', output_dir) / filename
+
+
+def _build_report(kind: str, results: Dict, output_path: Path, include_charts: bool) -> Path:
+    """Construir un reporte con su generador"""
+    if kind == REPORT_EXCEL:
+        from src.excel_report_generator import ExcelReportGenerator
+        return ExcelReportGenerator(results, output_path, include_charts=include_charts).generate()
+
+    from src.report_generator import HTMLReportGenerator
+    report_type = 'normal' if kind == REPORT_HTML_NORMAL else 'detallado'
+    return HTMLReportGenerator(results, output_path, report_type=report_type).generate()
+
+
+def _run_report_job(kind: str, results_path: str, output_path: str, include_charts: bool) -> Dict:
+    """
+    Trabajo del proceso del pool: cargar los resultados serializados y generar un reporte
+
+    Returns:
+        {'path', 'elapsed'}
+    """
+    global _loaded_results
+    start = time.perf_counter()
+    if _loaded_results[0] != results_path:
+        with open(results_path, 'rb') as f:
+            _loaded_results = (results_path, pickle.load(f))
+    path = _build_report(kind, _loaded_results[1], Path(output_path), include_charts)
+    return {'path': str(path), 'elapsed': time.perf_counter() - start}
+
+
+def get_report_pool(max_workers: int = None) -> ProcessPoolExecutor:
+    """
+    Pool de procesos compartido (se crea al primer uso y se reutiliza)
+
+    Usa 'spawn' en todas las plataformas: el proceso padre tiene hilos (GUI,
+    escritor de la BD) y es el único método disponible en Windows.
+
+    Args:
+        max_workers: Número de procesos (por defecto uno por tipo de reporte)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = max_workers or min(len(REPORT_KINDS), os.cpu_count() or 1)
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _submit(pool: ProcessPoolExecutor, func: Callable, *args) -> Future:
+    """Enviar un trabajo al pool registrándolo como pendiente"""
+    future = pool.submit(func, *args)
+    with _pool_lock:
+        _pending_jobs.add(future)
+    future.add_done_callback(_job_done)
+    return future
+
+
+def _job_done(future: Future):
+    with _pool_lock:
+        _pending_jobs.discard(future)
+
+
+def shutdown_report_pool():
+    """Cerrar el pool de procesos (al salir de la aplicación)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+        pending = list(_pending_jobs)
+    if pool is not None:
+        # Cancelar lo que aún no ha empezado (shutdown(cancel_futures=True) requiere Python 3.9)
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+atexit.register(shutdown_report_pool)
+
+
+def generate_reports(results: Dict, kinds: Iterable[str], include_charts: bool = True,
+                     output_paths: Dict[str, Path] = None, use_processes: bool = True,
+                     max_workers: int = None) -> Dict[str, Dict]:
+    """
+    Generar varios reportes en paralelo a partir de los mismos resultados
+
+    Args:
+        results: Resultados del análisis
+        kinds: Tipos a generar (REPORT_*)
+        include_charts: Gráficos en el Excel
+        output_paths: Rutas por tipo (por defecto default_report_path)
+        use_processes: Generar en el pool de procesos (False = en serie en este proceso)
+        max_workers: Procesos del pool si aún no existe
+
+    Returns:
+        {tipo: {'path': str o None, 'error': str o None, 'elapsed': segundos}}
+    """
+    kinds = [kind for kind in dict.fromkeys(kinds) if kind in REPORT_KINDS]
+    outcomes = {}
+    if REPORT_EXCEL in kinds:
+        from src.excel_report_generator import OPENPYXL_AVAILABLE
+        if not OPENPYXL_AVAILABLE:
+            kinds.remove(REPORT_EXCEL)
+            outcomes[REPORT_EXCEL] = {'path': None, 'error': 'openpyxl no disponible', 'elapsed': 0.0}
+    if not kinds:
+        return outcomes
+
+    output_paths = dict(output_paths or {})
+    for kind in kinds:
+        if kind not in output_paths:
+            output_paths[kind] = default_report_path(results, kind)
+
+    if use_processes:
+        try:
+            outcomes.update(_generate_in_pool(results, kinds, include_charts, output_paths, max_workers))
+            return outcomes
+        except (BrokenProcessPool, RuntimeError, OSError, pickle.PicklingError) as e:
+            print(f"WARNING: Generación de reportes en procesos no disponible ({e}); se generan en serie")
+            shutdown_report_pool()
+
+    for kind in kinds:
+        start = time.perf_counter()
+        try:
+            path = _build_report(kind, results, output_paths[kind], include_charts)
+            outcomes[kind] = {'path': str(path), 'error': None, 'elapsed': time.perf_counter() - start}
+        except Exception as e:
+            outcomes[kind] = {'path': None, 'error': str(e), 'elapsed': time.perf_counter() - start}
+    return outcomes
+
+
+def _generate_in_pool(results: Dict, kinds: list, include_charts: bool,
+                      output_paths: Dict[str, Path], max_workers: int = None) -> Dict[str, Dict]:
+    """Serializar los resultados una vez y repartir un trabajo por tipo en el pool"""
+    from src.config import OUTPUT_DIR
+
+    cache_dir = OUTPUT_DIR / 'cache'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, results_path = tempfile.mkstemp(prefix='report_job_', suffix='.pickle', dir=cache_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            try:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except (TypeError, AttributeError) as e:
+                # Objeto no serializable en los resultados: solo aquí significa "sin pool"
+                raise pickle.PicklingError(f"resultados no serializables: {e}") from e
+
+        pool = get_report_pool(max_workers)
+        futures = {
+            kind: _submit(pool, _run_report_job, kind, results_path, str(output_paths[kind]), include_charts)
+            for kind in kinds
+        }
+        outcomes = {}
+        for kind, future in futures.items():
+            try:
+                job = future.result()
+                outcomes[kind] = {'path': job['path'], 'error': None, 'elapsed': job['elapsed']}
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                outcomes[kind] = {'path': None, 'error': str(e), 'elapsed': 0.0}
+        return outcomes
+    finally:
+        Path(results_path).unlink(missing_ok=True)
+
+
+def submit_reports(results: Dict, kinds: Iterable[str], include_charts: bool = True,
+                   output_paths: Dict[str, Path] = None,
+                   on_done: Callable[[Dict[str, Dict]], None] = None) -> Future:
+    """
+    Generar reportes sin bloquear al llamante (p. ej. el hilo de la GUI)
+
+    Args:
+        results: Resultados del análisis
+        kinds: Tipos a generar (REPORT_*)
+        include_charts: Gráficos en el Excel
+        output_paths: Rutas por tipo (opcional)
+        on_done: Callback(outcomes) al terminar (se ejecuta en un hilo auxiliar)
+
+    Returns:
+        Future con el diccionario de generate_reports()
+    """
+    future = Future()
+
+    def run():
+        try:
+            outcomes = generate_reports(results, kinds, include_charts, output_paths)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        future.set_result(outcomes)
+        if on_done is not None:
+            on_done(outcomes)
+
+    threading.Thread(target=run, name='bbpp-report-jobs', daemon=True).start()
+    return future
+
+
+# ============================================================================
+# REGENERACIÓN DESDE LA BASE DE DATOS
+# ============================================================================
+
+def _regenerate_job(analysis_id: int, kinds: List[str], include_charts: bool, db_path: str,
+                    output_dir: str) -> Dict:
+    """
+    Trabajo del proceso del pool: reconstruir un análisis guardado y generar sus reportes
+
+    Las rutas llegan del proceso padre (el del pool no ve su configuración en memoria).
+
+    Returns:
+        {'outcomes': {tipo: {...}}, 'partial', 'error'}
+    """
+    from src.database.metrics_db import MetricsDatabase
+
+    db = MetricsDatabase(Path(db_path))
+    try:
+        results = db.get_results(analysis_id)
+    finally:
+        db.close()
+    if results is None:
+        return {'outcomes': {}, 'partial': False, 'error': f"Análisis {analysis_id} no encontrado"}
+
+    outcomes = generate_reports(
+        results, kinds, include_charts,
+        output_paths={kind: default_report_path(results, kind, tag=f"ID{analysis_id}", output_dir=output_dir)
+                      for kind in kinds},
+        use_processes=False
+    )
+    return {'outcomes': outcomes, 'partial': results.get('partial', False), 'error': None}
+
+
+def regenerate_reports(analysis_ids: Iterable[int], kinds: Iterable[str] = (REPORT_HTML_DETALLADO,),
+                       include_charts: bool = True, db=None, update_db: bool = True,
+                       use_processes: bool = True,
+                       progress_callback: Callable[[int, Dict], None] = None) -> Dict[int, Dict]:
+    """
+    Regenerar reportes de análisis guardados sin reescanear
+
+    Cada análisis se reconstruye (MetricsDatabase.get_results) y genera sus
+    reportes en un proceso del pool; las rutas nuevas se guardan en la BD.
+
+    Args:
+        analysis_ids: IDs de análisis
+        kinds: Tipos de reporte (REPORT_*)
+        include_charts: Gráficos en el Excel
+        db: MetricsDatabase (por defecto la de la aplicación)
+        update_db: Guardar las rutas de los reportes generados en analysis_history
+        use_processes: Un proceso por análisis (False = en serie en este proceso)
+        progress_callback: Callback(analysis_id, resultado) al terminar cada análisis
+
+    Returns:
+        {analysis_id: {'outcomes': {tipo: {'path', 'error', 'elapsed'}}, 'partial', 'error'}}
+    """
+    from src.config import OUTPUT_DIR
+    from src.database.metrics_db import get_metrics_db
+
+    owns_db = db is None
+    if owns_db:
+        db = get_metrics_db()
+    analysis_ids = list(dict.fromkeys(int(analysis_id) for analysis_id in analysis_ids))
+    kinds = [kind for kind in dict.fromkeys(kinds) if kind in REPORT_KINDS]
+    db_path = str(db.db_path)
+    output_dir = str(OUTPUT_DIR)
+    jobs = {}
+
+    try:
+        if use_processes and len(analysis_ids) > 1:
+            try:
+                pool = get_report_pool()
+                futures = {analysis_id: _submit(pool, _regenerate_job, analysis_id, kinds, include_charts,
+                                                db_path, output_dir)
+                           for analysis_id in analysis_ids}
+                for analysis_id, future in futures.items():
+                    try:
+                        jobs[analysis_id] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        jobs[analysis_id] = {'outcomes': {}, 'partial': False, 'error': str(e)}
+                    _regenerated(db, analysis_id, jobs[analysis_id], update_db, progress_callback)
+            except (BrokenProcessPool, RuntimeError, OSError) as e:
+                print(f"WARNING: Regeneración en procesos no disponible ({e}); se regenera en serie")
+                shutdown_report_pool()
+
+        for analysis_id in analysis_ids:
+            if analysis_id in jobs:
+                continue
+            try:
+                jobs[analysis_id] = _regenerate_job(analysis_id, kinds, include_charts, db_path, output_dir)
+            except Exception as e:
+                jobs[analysis_id] = {'outcomes': {}, 'partial': False, 'error': str(e)}
+            _regenerated(db, analysis_id, jobs[analysis_id], update_db, progress_callback)
+    finally:
+        if owns_db:
+            db.close()
+    return jobs
+
+
+def _regenerated(db, analysis_id: int, job: Dict, update_db: bool, progress_callback=None):
+    """Guardar las rutas de un análisis regenerado y notificar el progreso"""
+    outcomes = job['outcomes']
+    html_path = (outcomes.get(REPORT_HTML_DETALLADO, {}).get('path')
+                 or outcomes.get(REPORT_HTML_NORMAL, {}).get('path'))
+    excel_path = outcomes.get(REPORT_EXCEL, {}).get('path')
+    if update_db and (html_path or excel_path):
+        db.update_report_paths(analysis_id, html_path, excel_path)
+    if progress_callback is not None:
+        progress_callback(analysis_id, job)
+
+
+def main(argv: List[str] = None) -> int:
+    """Regenerar reportes de análisis guardados desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description='Regenerar reportes desde la BD de métricas')
+    parser.add_argument('--ids', nargs='+', type=int, help='IDs de análisis')
+    parser.add_argument('--project', help='Regenerar los análisis de un proyecto')
+    parser.add_argument('--last', type=int, default=10, help='Con --project: últimos N análisis')
+    parser.add_argument('--kinds', nargs='+', choices=REPORT_KINDS, default=[REPORT_HTML_DETALLADO],
+                        help='Tipos de reporte')
+    parser.add_argument('--no-charts', action='store_true', help='Excel sin gráficos')
+    parser.add_argument('--serial', action='store_true', help='Sin procesos (en serie)')
+    args = parser.parse_args(argv)
+
+    from src.database.metrics_db import get_metrics_db
+
+    if not args.ids and not args.project:
+        parser.error('indica --ids o --project')
+    analysis_ids = list(args.ids or [])
+    if args.project:
+        db = get_metrics_db()
+        history = db.get_analysis_history(args.project, limit=args.last)
+        db.close()
+        analysis_ids.extend(row['id'] for row in history)
+    if not analysis_ids:
+        print(f"ERROR: No hay análisis guardados del proyecto '{args.project}'")
+        return 1
+
+    def report(analysis_id, job):
+        if job['error']:
+            print(f"ERROR: Análisis {analysis_id}: {job['error']}")
+            return
+        note = ' (reconstrucción parcial)' if job['partial'] else ''
+        for kind, outcome in job['outcomes'].items():
+            if outcome['path']:
+                print(f"OK: Análisis {analysis_id} {kind}{note}: {outcome['path']}")
+            else:
+                print(f"WARNING: Análisis {analysis_id} {kind}: {outcome['error']}")
+
+    jobs = regenerate_reports(analysis_ids, args.kinds, include_charts=not args.no_charts,
+                              use_processes=not args.serial, progress_callback=report)
+    shutdown_report_pool()
+    return 0 if all(not job['error'] for job in jobs.values()) else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
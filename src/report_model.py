@@ -0,0 +1,186 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Modelo de vista de los reportes
+Agrupa los hallazgos una sola vez (por regla, archivo, categoría y
+severidad) para que los reportes HTML (normal y detallado), el Excel y los
+totales de la BD lo compartan en lugar de recorrer los hallazgos cada uno.
+Solo guarda nombres, ubicaciones y contadores: los hallazgos pueden venir
+de disco (FindingStore) y no se retienen.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from src.finding_aggregation import finding_occurrences
+
+
+# Orden de las reglas agrupadas: error > warning > info
+SEVERITY_ORDER = {'error': 0, 'warning': 1, 'info': 2}
+
+# Categoría que los reportes muestran aparte (tabla de dependencias)
+DEPENDENCIES_CATEGORY = 'dependencias'
+
+# Versión de los hallazgos en los resultados: la incrementa quien los modifica en sitio
+FINDINGS_VERSION_KEY = 'findings_version'
+
+
+def finding_locations(finding: Dict) -> List[Tuple[str, int]]:
+    """
+    Ubicaciones de un hallazgo con su peso en el recuento de ocurrencias.
+    Un hallazgo agregado aporta sus muestras y una línea con el resto.
+    """
+    details = finding.get('details') or {}
+    if not details.get('aggregated'):
+        return [(finding.get('location', ''), 1)]
+
+    samples = details.get('samples', [])
+    locations = [(sample.get('location', ''), 1) for sample in samples]
+    remaining = details.get('occurrences', len(samples)) - len(samples)
+    if remaining > 0:
+        sidecar = details.get('detail_ref', {}).get('path')
+        where = f" (detalle en {Path(sidecar).name})" if sidecar else ''
+        locations.append((f"… y {remaining} ocurrencias más{where}", remaining))
+    return locations
+
+
+class ReportModel:
+    """Agrupaciones de hallazgos calculadas en una pasada"""
+
+    def __init__(self):
+        # Reglas agrupadas por (categoría, descripción, severidad), ya ordenadas:
+        # {'category', 'description', 'severity', 'count',
+        #  'files': [{'name', 'count', 'locations': [...]}]} (archivos por nombre)
+        self.rule_groups: List[Dict] = []
+        self.categories = set()          # Categorías de las reglas agrupadas
+        self.severities = set()          # Severidades de las reglas agrupadas
+        # Hallazgos por archivo (sin dependencias, en orden de aparición):
+        # {nombre: {'errors', 'warnings', 'infos', 'total'}}
+        self.file_stats: Dict[str, Dict[str, int]] = {}
+        self.occurrences_by_severity: Dict[str, int] = defaultdict(int)
+        self.total_occurrences = 0       # Ocurrencias (los agregados cuentan todas)
+        self.listed_findings = 0         # Hallazgos no aceptados en la línea base
+        self.source_size = 0             # len(findings) al construir el modelo
+        self.source_version = 0          # results[FINDINGS_VERSION_KEY] al construir
+
+    @classmethod
+    def build(cls, findings: Iterable[Dict]) -> 'ReportModel':
+        """
+        Construir el modelo recorriendo los hallazgos una vez
+
+        Args:
+            findings: Hallazgos del análisis (lista o FindingStore)
+
+        Returns:
+            ReportModel
+        """
+        model = cls()
+        grouped = {}
+        for finding in findings:
+            model.source_size += 1
+            severity = finding.get('severity', 'info')
+            occurrences = finding_occurrences(finding)
+            model.total_occurrences += occurrences
+            model.occurrences_by_severity[severity.lower()] += occurrences
+            if not finding.get('suppressed'):
+                model.listed_findings += 1
+
+            category = finding.get('category', 'unknown')
+            if category == DEPENDENCIES_CATEGORY:
+                continue
+
+            file_name = Path(finding.get('file_path', '')).name
+            stats = model.file_stats.get(file_name)
+            if stats is None:
+                stats = model.file_stats[file_name] = {'errors': 0, 'warnings': 0, 'infos': 0, 'total': 0}
+            stats['total'] += 1
+            if finding.get('severity') in ('error', 'warning', 'info'):
+                stats[f"{finding['severity']}s"] += 1
+
+            # Los hallazgos aceptados en la línea base no se listan
+            if finding.get('suppressed'):
+                continue
+            key = (category, finding.get('description', ''), severity)
+            by_file = grouped.get(key)
+            if by_file is None:
+                by_file = grouped[key] = defaultdict(list)
+            by_file[file_name].extend(finding_locations(finding))
+
+        for (category, description, severity), by_file in sorted(
+                grouped.items(), key=lambda item: (SEVERITY_ORDER.get(item[0][2], 3), item[0][0])):
+            files = []
+            for file_name, locations in sorted(by_file.items()):
+                files.append({
+                    'name': file_name,
+                    'count': sum(weight for _, weight in locations),
+                    'locations': [location for location, _ in locations if location],
+                })
+            model.rule_groups.append({
+                'category': category,
+                'description': description,
+                'severity': severity,
+                'count': sum(f['count'] for f in files),
+                'files': files,
+            })
+            model.categories.add(category)
+            model.severities.add(severity)
+        model.occurrences_by_severity = dict(model.occurrences_by_severity)
+        return model
+
+    def file_scores(self) -> List[Dict]:
+        """
+        Score por archivo (100 - 10 por error, 5 por warning y 1 por info), peor primero
+
+        Returns:
+            Lista de {'name', 'score', 'errors', 'warnings', 'infos', 'total'}
+        """
+        files_data = []
+        for file_name, stats in self.file_stats.items():
+            penalty = (stats['errors'] * 10) + (stats['warnings'] * 5) + (stats['infos'] * 1)
+            files_data.append(dict(stats, name=file_name, score=max(0, 100 - penalty)))
+        files_data.sort(key=lambda x: x['score'])
+        return files_data
+
+    def top_files(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Archivos con más hallazgos: [(nombre, total)]"""
+        totals = ((name, stats['total']) for name, stats in self.file_stats.items())
+        return sorted(totals, key=lambda x: x[1], reverse=True)[:limit]
+
+
+def mark_findings_changed(results: Dict):
+    """
+    Avisar de que los hallazgos de results cambiaron en sitio (p. ej. 'suppressed'):
+    el próximo get_report_model reconstruye el modelo
+
+    Args:
+        results: Resultados del análisis
+    """
+    results[FINDINGS_VERSION_KEY] = results.get(FINDINGS_VERSION_KEY, 0) + 1
+
+
+def get_report_model(results: Dict) -> ReportModel:
+    """
+    Modelo de los resultados, construido una vez y guardado en results['report_model']
+
+    Se reconstruye si los hallazgos cambiaron de tamaño o se marcaron como
+    modificados con mark_findings_changed() (la versión viaja con los resultados
+    serializados, así que los procesos de reportes reutilizan el modelo).
+
+    Args:
+        results: Resultados del análisis
+
+    Returns:
+        ReportModel
+    """
+    findings = results.get('findings', [])
+    version = results.get(FINDINGS_VERSION_KEY, 0)
+    model = results.get('report_model')
+    if (not isinstance(model, ReportModel) or model.source_version != version
+            or model.source_size != len(findings)):
+        model = ReportModel.build(findings)
+        model.source_version = version
+        results['report_model'] = model
+    return model
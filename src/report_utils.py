@@ -42,24 +42,26 @@ def generate_report_filename(project_name: str, extension: str) -> str:
     return f"REPORTE_{clean_name}_{timestamp}.{extension}"
 
 
-def get_report_output_dir(report_type: str) -> Path:
+def get_report_output_dir(report_type: str, base_dir: Path = None) -> Path:
     """
     Obtener directorio de salida para reportes
     
     Args:
         report_type: 'html' o 'excel'
+        base_dir: Carpeta de salida (por defecto OUTPUT_DIR)
     
     Returns:
         Path al directorio (output/HTML/ o output/Excel/)
     """
     from src.config import OUTPUT_DIR
     
+    base_dir = OUTPUT_DIR if base_dir is None else Path(base_dir)
     if report_type.lower() == 'html':
-        output_dir = OUTPUT_DIR / 'HTML'
+        output_dir = base_dir / 'HTML'
     elif report_type.lower() == 'excel':
-        output_dir = OUTPUT_DIR / 'Excel'
+        output_dir = base_dir / 'Excel'
     else:
-        output_dir = OUTPUT_DIR
+        output_dir = base_dir
     
     # Crear directorio si no existe
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -157,23 +159,7 @@ def update_analysis_report_paths(analysis_id: int, html_path: Optional[Path] = N
     
     try:
         db = get_metrics_db()
-        cursor = db.conn.cursor()
-        
-        if html_path:
-            cursor.execute('''
-                UPDATE analysis_history 
-                SET html_report_path = ? 
-                WHERE id = ?
-            ''', (str(html_path), analysis_id))
-        
-        if excel_path:
-            cursor.execute('''
-                UPDATE analysis_history 
-                SET excel_report_path = ? 
-                WHERE id = ?
-            ''', (str(excel_path), analysis_id))
-        
-        db.conn.commit()
+        db.update_report_paths(analysis_id, html_path, excel_path)
         db.close()
         return True
     except Exception as e:
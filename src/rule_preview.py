@@ -0,0 +1,224 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Previsualización del impacto de editar una regla
+Durante el escaneo los parsed_data completos se vuelcan en streaming a una
+caché en disco (output/cache/), de modo que sobreviven al escaneo sin
+retenerse en memoria (compatible con lean_results). Al editar un umbral se
+reevalúa solo esa regla sobre la caché y se recalcula el score con
+src.scoring, sin volver a parsear los XAML.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+PARSED_CACHE_SCHEMA_VERSION = 1
+
+# Reglas que dependen del grafo de invocaciones (no se reevalúan por archivo)
+GRAPH_RULE_TYPES = ('unreachable_workflow', 'missing_workflow')
+
+
+def get_parsed_cache_dir() -> Path:
+    """Directorio de las cachés de parsed_data (output/cache/)"""
+    from src.config import OUTPUT_DIR
+
+    cache_dir = OUTPUT_DIR / 'cache'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+class ParsedDataCache:
+    """
+    Caché en disco de los parsed_data de un escaneo
+
+    Archivo pickle con registros consecutivos: cabecera (con project_info),
+    un registro por XAML y un registro final con las estadísticas. Se escribe en un
+    archivo temporal único que se renombra al terminar, así una caché a medias
+    nunca sustituye a la del escaneo anterior ni dos escaneos del mismo proyecto
+    escriben en el mismo archivo.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Ruta del archivo de caché
+        """
+        self.path = Path(path)
+        self._tmp_path = None
+        self._file = None
+        self.files = 0
+
+    @classmethod
+    def for_project(cls, project_path: Path) -> 'ParsedDataCache':
+        """Caché del proyecto en output/cache/ (una por ruta de proyecto)"""
+        project_path = Path(project_path).resolve()
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in project_path.name) or 'proyecto'
+        digest = hashlib.sha1(str(project_path).encode('utf-8')).hexdigest()[:8]
+        return cls(get_parsed_cache_dir() / f"{safe_name}_{digest}.parsed.pickle")
+
+    def open(self, project_path: Path, active_sets: List[str], project_info: Dict):
+        """
+        Empezar a escribir la caché de un escaneo
+
+        Args:
+            project_path: Raíz del proyecto
+            active_sets: Conjuntos de reglas del escaneo
+            project_info: Información del project.json antes de las verificaciones
+                de proyecto (que la enriquecen in-place)
+        """
+        self._file = tempfile.NamedTemporaryFile(mode='wb', dir=self.path.parent, prefix=self.path.name + '.',
+                                                 suffix='.tmp', delete=False)
+        self._tmp_path = Path(self._file.name)
+        self.files = 0
+        self._dump({
+            'schema_version': PARSED_CACHE_SCHEMA_VERSION,
+            'project_path': str(project_path),
+            'active_sets': list(active_sets or []),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'project_info': project_info,
+        })
+
+    def add(self, parsed_data: Dict):
+        """Añadir los parsed_data completos de un XAML"""
+        if self._file is None:
+            return
+        try:
+            self._dump(('file', parsed_data))
+            self.files += 1
+        except (pickle.PicklingError, TypeError, AttributeError, OSError) as e:
+            # La caché es opcional: no debe interrumpir el escaneo
+            print(f"WARNING: Caché de parsed_data desactivada para este escaneo: {e}")
+            self.discard()
+
+    def finish(self, statistics: Dict) -> Optional[Path]:
+        """
+        Cerrar la caché con las estadísticas del escaneo
+
+        Args:
+            statistics: Estadísticas del análisis (findings_by_rule, total_activities)
+
+        Returns:
+            Ruta de la caché o None si no se estaba escribiendo
+        """
+        if self._file is None:
+            return None
+        self._dump(('statistics', {
+            'statistics': {
+                'findings_by_rule': dict(statistics.get('findings_by_rule', {})),
+                'total_activities': statistics.get('total_activities', 1),
+            },
+        }))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def discard(self):
+        """Abandonar una caché a medio escribir"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._tmp_path.unlink(missing_ok=True)
+
+    def _dump(self, record):
+        pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_parsed_cache(path: Path) -> Optional[Dict]:
+    """
+    Cargar una caché de parsed_data
+
+    Args:
+        path: Archivo de caché
+
+    Returns:
+        {'path', 'project_path', 'active_sets', 'created_at', 'parsed_files',
+        'project_info', 'statistics'} o None si no existe o no es válida
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            if header.get('schema_version') != PARSED_CACHE_SCHEMA_VERSION:
+                return None
+            snapshot = dict(header, path=str(path), parsed_files=[], statistics={})
+            while True:
+                try:
+                    kind, payload = pickle.load(f)
+                except EOFError:
+                    break
+                if kind == 'file':
+                    snapshot['parsed_files'].append(payload)
+                else:
+                    snapshot.update(payload)
+        return snapshot
+    except (OSError, pickle.UnpicklingError, AttributeError, ValueError) as e:
+        print(f"WARNING: Caché de parsed_data no válida en {path}: {e}")
+        return None
+
+
+def latest_parsed_cache() -> Optional[Dict]:
+    """Caché del último proyecto escaneado (la más reciente de output/cache/)"""
+    caches = sorted(get_parsed_cache_dir().glob('*.parsed.pickle'), key=lambda p: p.stat().st_mtime)
+    return load_parsed_cache(caches[-1]) if caches else None
+
+
+def preview_rule_impact(rule: Dict, snapshot: Dict, config: Dict = None, analyzer=None) -> Dict:
+    """
+    Reevaluar una regla editada sobre la caché y calcular el cambio de score
+
+    Args:
+        rule: Regla con los parámetros editados
+        snapshot: load_parsed_cache()
+        config: Configuración de análisis (pesos y scaling_factor)
+        analyzer: BBPPAnalyzer a reutilizar entre previsualizaciones (opcional)
+
+    Returns:
+        {'rule_id', 'supported', 'findings_before', 'findings_after',
+        'score_before', 'score_after', 'delta', 'elapsed_ms'}
+    """
+    from src.analyzer import BBPPAnalyzer
+    from src.scoring import calculate_score, collect_rule_params, rule_penalty_params, scoring_settings
+
+    start = time.perf_counter()
+    rule_id = rule['id']
+    findings_by_rule = dict(snapshot['statistics'].get('findings_by_rule', {}))
+    total_activities = snapshot['statistics'].get('total_activities', 1)
+    settings = scoring_settings(config)
+    before = findings_by_rule.get(rule_id, 0)
+
+    supported = rule.get('rule_type') not in GRAPH_RULE_TYPES
+    after = before
+    if supported:
+        if analyzer is None:
+            analyzer = BBPPAnalyzer(config, rules=[], active_sets=snapshot.get('active_sets') or None)
+        findings = analyzer.evaluate_rule(rule, snapshot['parsed_files'], snapshot['project_info'])
+        after = sum(f.occurrences for f in findings)
+
+    score_before = calculate_score(findings_by_rule, total_activities,
+                                   collect_rule_params(findings_by_rule), settings)
+    findings_by_rule[rule_id] = after
+    rule_params = collect_rule_params(findings_by_rule, overrides={rule_id: rule_penalty_params(rule)})
+    score_after = calculate_score(findings_by_rule, total_activities, rule_params, settings)
+
+    return {
+        'rule_id': rule_id,
+        'supported': supported,
+        'findings_before': before,
+        'findings_after': after,
+        'score_before': score_before['score'],
+        'score_after': score_after['score'],
+        'delta': round(score_after['score'] - score_before['score'], 2),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
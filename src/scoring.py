@@ -0,0 +1,373 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Motor de puntuación
+Calcula el score (0-100) solo a partir de los recuentos por regla
+(findings_by_rule), los parámetros de penalización de cada regla y el número
+de actividades. Al no depender de los XAML permite recalcular el score del
+último resultado y de todo el histórico de MetricsDatabase sin reescanear,
+por ejemplo para previsualizar un cambio de penalty_mode o scaling_factor.
+El recálculo del histórico se vectoriza con NumPy si está disponible.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Pesos por severidad y factor de escala por defecto (sección 'scoring' de la configuración)
+DEFAULT_SCORING = {
+    'error_weight': -10,
+    'warning_weight': -3,
+    'info_weight': -0.5,
+    'scaling_factor': 5,
+}
+
+# Por debajo de este número de actividades la penalización se aplica amortiguada
+SMALL_PROJECT_ACTIVITIES = 10
+
+# Calificaciones: (score mínimo, calificación, color)
+GRADES = [
+    (90, 'A - Excelente', 'green'),
+    (80, 'B - Muy Bien', 'lightgreen'),
+    (70, 'C - Bien', 'yellow'),
+    (60, 'D - Aceptable', 'orange'),
+]
+FAILING_GRADE = ('F - Necesita Mejoras', 'red')
+
+# Códigos de penalty_mode para el cálculo vectorizado
+_MODE_CODES = {'severity_default': 0, 'individual': 1, 'global': 2}
+
+
+def scoring_settings(config: Dict = None) -> Dict:
+    """
+    Pesos de severidad y factor de escala de una configuración
+
+    Args:
+        config: Configuración de análisis (usa su sección 'scoring')
+
+    Returns:
+        Diccionario con error_weight, warning_weight, info_weight y scaling_factor
+    """
+    scoring = (config or {}).get('scoring', {})
+    return {key: scoring.get(key, default) for key, default in DEFAULT_SCORING.items()}
+
+
+def rule_penalty_params(rule: Dict, override: Dict = None) -> Dict:
+    """
+    Parámetros de penalización de una regla
+
+    Args:
+        rule: Regla del RulesManager
+        override: Valores que sustituyen a los de la regla (previsualización)
+
+    Returns:
+        Diccionario con penalty_mode, penalty_value, use_penalty_cap, penalty_cap y severity
+    """
+    params = rule.get('parameters', {})
+    result = {
+        'penalty_mode': params.get('penalty_mode', 'severity_default'),
+        'penalty_value': params.get('penalty_value', 2),
+        'use_penalty_cap': params.get('use_penalty_cap', False),
+        'penalty_cap': params.get('penalty_cap', 10),
+        'severity': rule.get('severity', 'warning'),
+    }
+    if override:
+        result.update({key: value for key, value in override.items() if key in result})
+    return result
+
+
+def collect_rule_params(rule_ids: Iterable[str], rules_manager=None,
+                        overrides: Dict[str, Dict] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Parámetros de penalización de varias reglas
+
+    Args:
+        rule_ids: IDs de regla (claves de findings_by_rule)
+        rules_manager: Gestor de reglas (por defecto el global)
+        overrides: {rule_id: parámetros} que sustituyen a los guardados
+
+    Returns:
+        {rule_id: parámetros o None si la regla no existe (no penaliza)}
+    """
+    if rules_manager is None:
+        from src.rules_manager import get_rules_manager
+        rules_manager = get_rules_manager()
+    overrides = overrides or {}
+
+    params = {}
+    for rule_id in rule_ids:
+        rule = rules_manager.get_rule_by_id(rule_id)
+        params[rule_id] = rule_penalty_params(rule, overrides.get(rule_id)) if rule else None
+    return params
+
+
+def rule_penalty(count: int, params: Dict, settings: Dict) -> float:
+    """
+    Penalización de una regla según su penalty_mode
+
+    Args:
+        count: Hallazgos (ocurrencias) de la regla
+        params: rule_penalty_params() de la regla
+        settings: scoring_settings()
+
+    Returns:
+        Penalización en puntos
+    """
+    penalty_mode = params['penalty_mode']
+    penalty_value = params['penalty_value']
+    severity = params['severity']
+
+    # Si penalty_value es 0, no penalizar independientemente del modo
+    if penalty_value == 0:
+        return 0
+
+    penalty = 0
+    if penalty_mode == 'severity_default':
+        # Usar pesos globales según severidad
+        weight = settings.get(f'{severity}_weight')
+        if weight is not None:
+            penalty = count * abs(weight)
+    elif penalty_mode == 'individual':
+        # Cada hallazgo suma penalty_value%
+        penalty = count * penalty_value
+    elif penalty_mode == 'global':
+        # Penalización fija sin importar cantidad
+        penalty = penalty_value
+
+    # Aplicar límite máximo si está configurado
+    if params['use_penalty_cap'] and penalty_mode in ('severity_default', 'individual'):
+        penalty = min(penalty, params['penalty_cap'])
+    return penalty
+
+
+def grade_for(score: float):
+    """Calificación y color de un score"""
+    for minimum, grade, color in GRADES:
+        if score >= minimum:
+            return grade, color
+    return FAILING_GRADE
+
+
+def _final_score(total_penalty: float, total_activities: int, scaling_factor: float) -> float:
+    """Score final (0-100) a partir de la penalización total y el tamaño del proyecto"""
+    total_activities = max(1, total_activities)
+    if total_activities < SMALL_PROJECT_ACTIVITIES:
+        # Proyectos pequeños: penalización directa amortiguada
+        return max(0, 100 - (total_penalty * 0.5))
+    # Proyectos grandes: penalización ajustada por actividad
+    return max(0, 100 - (total_penalty / total_activities) * scaling_factor)
+
+
+def calculate_score(findings_by_rule: Dict[str, int], total_activities: int,
+                    rule_params: Dict[str, Optional[Dict]], settings: Dict) -> Dict:
+    """
+    Calcular el score de un análisis
+
+    Args:
+        findings_by_rule: {rule_id: hallazgos}
+        total_activities: Actividades del proyecto
+        rule_params: collect_rule_params() de las reglas con hallazgos
+        settings: scoring_settings()
+
+    Returns:
+        Diccionario con score, grade, color y desglose de penalizaciones
+    """
+    total_penalty = 0
+    penalty_details = {}
+    for rule_id, count in findings_by_rule.items():
+        params = rule_params.get(rule_id)
+        if count == 0 or not params:
+            continue
+        penalty = rule_penalty(count, params, settings)
+        total_penalty += penalty
+        penalty_details[rule_id] = {
+            'count': count,
+            'mode': params['penalty_mode'],
+            'penalty': round(penalty, 2)
+        }
+
+    activities = max(1, total_activities)
+    penalty_per_activity = total_penalty / activities
+    scaling_factor = settings['scaling_factor']
+    final_score = _final_score(total_penalty, total_activities, scaling_factor)
+    grade, color = grade_for(final_score)
+
+    return {
+        'score': round(final_score, 2),
+        'grade': grade,
+        'color': color,
+        'penalties': {
+            'total': round(total_penalty, 2),
+            'by_rule': penalty_details,
+            'penalty_per_activity': round(penalty_per_activity, 2),
+            'adjusted_penalty': round(penalty_per_activity * scaling_factor, 2),
+            'scaling_factor': scaling_factor
+        }
+    }
+
+
+def score_many(rows: List[Dict[str, int]], activities: List[int],
+               rule_params: Dict[str, Optional[Dict]], settings: Dict) -> List[float]:
+    """
+    Scores de muchos análisis a la vez (NumPy si está disponible)
+
+    Args:
+        rows: findings_by_rule de cada análisis
+        activities: total_activities de cada análisis
+        rule_params: collect_rule_params() de todas las reglas que aparecen
+        settings: scoring_settings()
+
+    Returns:
+        Lista de scores redondeados a 2 decimales
+    """
+    if not NUMPY_AVAILABLE:
+        scores = []
+        for findings_by_rule, total_activities in zip(rows, activities):
+            total = sum(rule_penalty(count, rule_params[rule_id], settings)
+                        for rule_id, count in findings_by_rule.items()
+                        if count and rule_params.get(rule_id))
+            scores.append(round(_final_score(total, total_activities, settings['scaling_factor']), 2))
+        return scores
+
+    rule_ids = [rule_id for rule_id, params in rule_params.items() if params]
+    column = {rule_id: idx for idx, rule_id in enumerate(rule_ids)}
+    counts = np.zeros((len(rows), len(rule_ids)))
+    for row_idx, findings_by_rule in enumerate(rows):
+        for rule_id, count in findings_by_rule.items():
+            if rule_id in column:
+                counts[row_idx, column[rule_id]] = count
+
+    params = [rule_params[rule_id] for rule_id in rule_ids]
+    mode = np.array([_MODE_CODES.get(p['penalty_mode'], -1) for p in params])
+    value = np.array([p['penalty_value'] for p in params], dtype=float)
+    severity_weight = np.array([abs(settings.get(f"{p['severity']}_weight") or 0) for p in params])
+    use_cap = np.array([bool(p['use_penalty_cap']) for p in params])
+    cap = np.array([p['penalty_cap'] for p in params], dtype=float)
+
+    penalties = np.where(mode == 0, counts * severity_weight,
+                np.where(mode == 1, counts * value,
+                np.where(mode == 2, np.where(counts > 0, value, 0.0), 0.0)))
+    capped = use_cap & (mode != 2)
+    penalties = np.where(capped, np.minimum(penalties, cap), penalties)
+    penalties = np.where(value == 0, 0.0, penalties)
+    total = penalties.sum(axis=1)
+
+    active = np.maximum(1, np.array(activities, dtype=float))
+    small = np.maximum(0, 100 - total * 0.5)
+    large = np.maximum(0, 100 - (total / active) * settings['scaling_factor'])
+    scores = np.where(active < SMALL_PROJECT_ACTIVITIES, small, large)
+    return [round(float(score), 2) for score in scores]
+
+
+def _score_counts(statistics: Dict, baseline: Optional[Dict], config: Dict) -> Dict[str, int]:
+    """Recuentos que puntúan: los nuevos si hay línea base y score_new_only"""
+    from src.config import DEFAULT_CONFIG
+
+    score_new_only = (config or {}).get('baseline', DEFAULT_CONFIG['baseline']).get('score_new_only', True)
+    if baseline and score_new_only and 'findings_by_rule' in baseline.get('new_statistics', {}):
+        return baseline['new_statistics']['findings_by_rule']
+    return statistics.get('findings_by_rule', {})
+
+
+def rescore_result(result: Dict, config: Dict = None, overrides: Dict[str, Dict] = None,
+                   rules_manager=None) -> Dict:
+    """
+    Recalcular el score de un resultado de scan() sin reescanear
+
+    Args:
+        result: Resultado del análisis
+        config: Configuración (pesos, scaling_factor, baseline)
+        overrides: {rule_id: parámetros de penalización} a previsualizar
+        rules_manager: Gestor de reglas (por defecto el global)
+
+    Returns:
+        Nuevo diccionario de score (no modifica el resultado)
+    """
+    stats = result.get('statistics', {})
+    counts = _score_counts(stats, result.get('baseline'), config)
+    rule_params = collect_rule_params(counts, rules_manager, overrides)
+    return calculate_score(counts, stats.get('total_activities', 1), rule_params, scoring_settings(config))
+
+
+def rescore_history(db, config: Dict = None, overrides: Dict[str, Dict] = None,
+                    project_name: str = None, apply: bool = False, rules_manager=None,
+                    inputs: List[Dict] = None) -> List[Dict]:
+    """
+    Recalcular el score de los análisis guardados en MetricsDatabase
+
+    Args:
+        db: MetricsDatabase
+        config: Configuración (pesos, scaling_factor, baseline)
+        overrides: {rule_id: parámetros de penalización} a previsualizar
+        project_name: Limitar a un proyecto (opcional)
+        apply: Guardar los nuevos scores en analysis_history
+        rules_manager: Gestor de reglas (por defecto el global)
+        inputs: Resultado previo de db.get_score_inputs() (evita releer la BD)
+
+    Returns:
+        Lista de {'id', 'project_name', 'analysis_date', 'old_score', 'new_score', 'delta'}
+        (solo análisis con recuentos por regla guardados)
+    """
+    if inputs is None:
+        inputs = db.get_score_inputs(project_name)
+    if not inputs:
+        return []
+
+    rows = [_score_counts(item['statistics'], item.get('baseline'), config) for item in inputs]
+    rule_ids = sorted({rule_id for row in rows for rule_id in row})
+    rule_params = collect_rule_params(rule_ids, rules_manager, overrides)
+    scores = score_many(rows, [item['statistics'].get('total_activities', 1) for item in inputs],
+                        rule_params, scoring_settings(config))
+
+    changes = []
+    for item, new_score in zip(inputs, scores):
+        old_score = item['score']
+        changes.append({
+            'id': item['id'],
+            'project_name': item['project_name'],
+            'analysis_date': item['analysis_date'],
+            'old_score': old_score,
+            'new_score': new_score,
+            'delta': round(new_score - (old_score or 0), 2),
+        })
+
+    if apply:
+        db.update_scores({change['id']: change['new_score'] for change in changes})
+    return changes
+
+
+def preview_rule_change(rule_id: str, override: Dict, config: Dict = None, db=None,
+                        inputs: List[Dict] = None) -> Dict:
+    """
+    Efecto de cambiar la penalización de una regla en el último análisis y el histórico
+
+    Args:
+        rule_id: Regla editada
+        override: Parámetros de penalización propuestos
+        config: Configuración de análisis
+        db: MetricsDatabase (por defecto la global)
+        inputs: Resultado previo de db.get_score_inputs() (para previsualizar en vivo)
+
+    Returns:
+        {'analyses', 'latest': cambio del análisis más reciente o None, 'mean_delta'}
+    """
+    own_db = db is None and inputs is None
+    if own_db:
+        from src.database.metrics_db import get_metrics_db
+        db = get_metrics_db()
+    try:
+        changes = rescore_history(db, config, overrides={rule_id: override}, inputs=inputs)
+    finally:
+        if own_db:
+            db.close()
+
+    latest = max(changes, key=lambda change: (change['analysis_date'] or '', change['id'])) if changes else None
+    mean_delta = round(sum(c['delta'] for c in changes) / len(changes), 2) if changes else 0
+    return {'analyses': len(changes), 'latest': latest, 'mean_delta': mean_delta}
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 Carlos Vidal Castillejo
+# Todos los derechos reservados.
+# Este software es propietario. Ver LICENSE para detalles.
+
+"""
+Registro de tiempos estructurado para el análisis
+Acumula spans por categoría (fase, regla, archivo) y contadores, para
+saber qué fase, regla o XAML hace lento un proyecto concreto.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+# Categorías de spans
+SPAN_PHASE = 'phase'  # Fases del escaneo (discovery, parse, rules, db_save...)
+SPAN_RULE = 'rule'    # Métodos _check_* del analizador
+SPAN_FILE = 'file'    # Parseo + análisis de cada XAML (ruta relativa)
+
+# Claves del diccionario serializado por categoría
+CATEGORY_KEYS = {SPAN_PHASE: 'phases', SPAN_RULE: 'rules', SPAN_FILE: 'files'}
+
+
+class TimingRecorder:
+    """Acumulador de spans (segundos, llamadas, hallazgos) y contadores"""
+
+    def __init__(self):
+        self.spans: Dict[str, Dict[str, list]] = {category: {} for category in CATEGORY_KEYS}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, category: str, name: str, seconds: float, findings: int = 0):
+        """
+        Acumular una medición en un span
+
+        Args:
+            category: SPAN_PHASE, SPAN_RULE o SPAN_FILE
+            name: Nombre del span (fase, método de regla o ruta de archivo)
+            seconds: Duración medida
+            findings: Hallazgos generados durante el span
+        """
+        entry = self.spans[category].get(name)
+        if entry is None:
+            self.spans[category][name] = [seconds, 1, findings]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+            entry[2] += findings
+
+    @contextmanager
+    def span(self, category: str, name: str) -> Iterator[None]:
+        """Medir el bloque con perf_counter y acumularlo en el span indicado"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(category, name, time.perf_counter() - start)
+
+    def set_count(self, name: str, value: int):
+        """Fijar un contador (archivos, actividades, hallazgos...)"""
+        self.counts[name] = int(value)
+
+    def clear(self):
+        """Vaciar spans y contadores"""
+        for spans in self.spans.values():
+            spans.clear()
+        self.counts.clear()
+
+    def seconds(self, category: str, name: str) -> Optional[float]:
+        """Duración acumulada de un span (None si no se ha medido)"""
+        entry = self.spans[category].get(name)
+        return entry[0] if entry else None
+
+    def to_dict(self) -> Dict:
+        """
+        Serializar para el resultado del análisis
+
+        Returns:
+            Diccionario {'phases'|'rules'|'files': {nombre: {'seconds', 'calls'[, 'findings']}},
+            'counts': {...}, 'total_seconds': suma de fases}
+        """
+        result = {}
+        for category, key in CATEGORY_KEYS.items():
+            items = sorted(self.spans[category].items(), key=lambda item: item[1][0], reverse=True)
+            section = {}
+            for name, (seconds, calls, findings) in items:
+                section[name] = {'seconds': round(seconds, 6), 'calls': calls}
+                if category == SPAN_RULE:
+                    section[name]['findings'] = findings
+            result[key] = section
+        result['counts'] = dict(self.counts)
+        result['total_seconds'] = round(sum(entry[0] for entry in self.spans[SPAN_PHASE].values()), 6)
+        return result
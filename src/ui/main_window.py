@@ -41,6 +41,15 @@ class MainWindow:
         self.project_path = None
         
         self._setup_ui()
+        self._schedule_db_maintenance()
+        
+    def _schedule_db_maintenance(self):
+        """Retención y compactación de la BD de métricas en segundo plano (si toca)"""
+        from src.database.maintenance import run_maintenance
+        from src.persistence_pipeline import submit_persistence
+
+        # En la cola de persistencia: no compite con el guardado de un análisis
+        submit_persistence(run_maintenance)
         
     def _setup_ui(self):
         """Configurar la interfaz de usuario"""
@@ -328,6 +337,8 @@ class MainWindow:
         """Limpiar área principal"""
         for widget in self.main_area.winfo_children():
             widget.destroy()
+        # El atajo oculto de perfilado solo está activo en la pantalla de configuración
+        self.root.unbind("<Control-Alt-p>")
     
     # ========================================================================
     # PANTALLAS
@@ -578,6 +589,9 @@ class MainWindow:
     def _show_config_screen(self):
         """Mostrar pantalla de configuración"""
         self._clear_main_area()
+        
+        # Opción avanzada oculta: Ctrl+Alt+P activa/desactiva el modo perfilado
+        self.root.bind("<Control-Alt-p>", lambda e: self._toggle_profiling())
 
         # Botón Volver
         self._add_back_button(self.main_area)
@@ -1105,6 +1119,24 @@ class MainWindow:
             import traceback
             traceback.print_exc()
             
+    def _toggle_profiling(self):
+        """Activar/desactivar el modo perfilado (config['advanced']['profiling'])"""
+        config = load_user_config()
+        advanced = config.setdefault('advanced', {})
+        advanced['profiling'] = not advanced.get('profiling', False)
+        
+        if save_user_config(config):
+            if advanced['profiling']:
+                from src.profiler import get_profile_output_dir
+                messagebox.showinfo(
+                    "Modo perfilado",
+                    "Modo perfilado ACTIVADO.\n\n"
+                    "Los próximos análisis generarán .pstats, pilas colapsadas y un resumen en:\n"
+                    f"{get_profile_output_dir()}"
+                )
+            else:
+                messagebox.showinfo("Modo perfilado", "Modo perfilado DESACTIVADO.")
+    
     def _reset_configuration(self):
         """Restaurar configuración a valores por defecto"""
         confirm = messagebox.askyesno(
@@ -1328,7 +1360,20 @@ class MainWindow:
 
                 # 1. ANÁLISIS ESTÁTICO (BBPP)
                 scanner = ProjectScanner(self.project_path, user_config, active_sets=active_sets)
-                results = scanner.scan(progress_callback)
+                if user_config.get('advanced', {}).get('profiling', False):
+                    # Modo perfilado (opción oculta): scan + reportes automáticos bajo cProfile
+                    from src.profiler import AnalysisProfiler
+                    with AnalysisProfiler(label=Path(self.project_path).name) as profiler:
+                        scanner.profiler = profiler
+                        results = scanner.scan(progress_callback)
+                    scanner.profiler = None
+                    results['profile_files'] = {k: str(v) for k, v in profiler.output_files.items()}
+                    print(f"OK: Perfil generado: {profiler.output_files.get('summary')}")
+                else:
+                    # Guardado en BD y reportes automáticos en segundo plano: los
+                    # resultados se muestran sin esperar a la persistencia, que trabaja
+                    # sobre una copia; _show_results fusiona sus campos al terminar
+                    results = scanner.scan(progress_callback, background_persistence=True)
                 
                 # 2. ANÁLISIS DE IA (OPCIONAL)
                 try:
@@ -1475,9 +1520,17 @@ class MainWindow:
         
         # Actualizar barra de estado
         score = results.get('score', {}).get('score', 0)
+        persisting = scanner.persistence is not None and not scanner.persistence.done()
         self.status_bar.config(
             text=f"Análisis completado - Score: {score}/100"
+                 + (" - Guardando y generando reportes..." if persisting else "")
         )
+        if scanner.persistence is not None:
+            # Registrado tras mostrar los resultados (incluida la IA): la fusión y el
+            # estado final llegan siempre después, aunque la persistencia ya terminara
+            scanner.persistence.add_done_callback(
+                lambda future: self.root.after(0, lambda: self._on_persisted(results, future))
+            )
         
         # Mostrar mensaje de éxito
         messagebox.showinfo(
@@ -1488,6 +1541,37 @@ class MainWindow:
             f"Archivos analizados: {results['analyzed_files']}"
         )
 
+    def _on_persisted(self, results, future):
+        """
+        Guardado en BD y reportes automáticos terminados (persistencia en segundo plano)
+
+        Args:
+            results: Resultados mostrados por _show_results (con el análisis de IA)
+            future: Future de la persistencia con la copia completada
+        """
+        from src.project_scanner import PERSISTED_RESULT_KEYS
+        from src.report_model import mark_findings_changed
+
+        if not future.cancelled() and future.exception() is None:
+            persisted = future.result()
+            for key in PERSISTED_RESULT_KEYS:
+                if key in persisted:
+                    results[key] = persisted[key]
+            # Resultados modificados en sitio: el próximo reporte no reutiliza el modelo
+            mark_findings_changed(results)
+        if results is not self.last_results:
+            return  # Ya se muestra otro análisis: no pisar su barra de estado
+        score = results.get('score', {}).get('score', 0)
+        report_paths = results.get('report_paths') or {}
+        reports = [Path(p).name for p in dict.fromkeys(report_paths.values()) if p]
+        if 'analysis_id' not in results:
+            text = f"Análisis completado - Score: {score}/100 - No se pudo guardar en la base de datos"
+        elif reports:
+            text = f"Análisis completado - Score: {score}/100 - Reportes: {', '.join(reports)}"
+        else:
+            text = f"Análisis completado - Score: {score}/100 - Guardado en base de datos"
+        self.status_bar.config(text=text)
+
     def _generate_report(self):
         """Generar reporte HTML con selección de tipo"""
         if not self.last_results:
@@ -1505,7 +1589,7 @@ class MainWindow:
         # Crear ventana modal
         dialog = tk.Toplevel(self.root)
         dialog.title("Seleccionar Tipo de Reporte HTML")
-        dialog.geometry("550x500")
+        dialog.geometry("550x620")
         dialog.transient(self.root)
         dialog.grab_set()
         dialog.resizable(False, False)
@@ -1513,8 +1597,8 @@ class MainWindow:
         # Centrar ventana
         dialog.update_idletasks()
         x = (dialog.winfo_screenwidth() // 2) - (550 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (500 // 2)
-        dialog.geometry(f"550x500+{x}+{y}")
+        y = (dialog.winfo_screenheight() // 2) - (620 // 2)
+        dialog.geometry(f"550x620+{x}+{y}")
 
         # Frame principal
         main_frame = tk.Frame(dialog, bg="white", padx=30, pady=20)
@@ -1588,6 +1672,31 @@ class MainWindow:
             fg="#555"
         ).pack(anchor="w", padx=15, pady=(0, 10))
 
+        # Opción 3: Todos los formatos (en paralelo)
+        frame_todos = tk.Frame(main_frame, bg="white", relief=tk.GROOVE, borderwidth=2)
+        frame_todos.pack(fill=tk.X, pady=10)
+
+        tk.Radiobutton(
+            frame_todos,
+            text="🗂️ Todos los formatos",
+            variable=report_type,
+            value="todos",
+            bg="white",
+            font=("Arial", 12, "bold"),
+            cursor="hand2",
+            activebackground="white"
+        ).pack(anchor="w", padx=15, pady=(10, 5))
+
+        tk.Label(
+            frame_todos,
+            text="✓ HTML detallado, HTML normal y Excel a la vez\n"
+                 "✓ Cada formato se genera en un proceso separado",
+            bg="white",
+            font=("Arial", 9),
+            justify=tk.LEFT,
+            fg="#555"
+        ).pack(anchor="w", padx=15, pady=(0, 10))
+
         # Botones
         buttons_frame = tk.Frame(main_frame, bg="white")
         buttons_frame.pack(pady=20)
@@ -1622,38 +1731,25 @@ class MainWindow:
         ).pack(side=tk.LEFT, padx=5)
 
     def _generate_html_report(self, report_type="detallado"):
-        """Generar reporte HTML del tipo especificado"""
-        try:
-            from src.report_generator import HTMLReportGenerator
-            from datetime import datetime
-
-            # Crear nombre de archivo con timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            project_name = self.last_results['project_info'].get('name', 'proyecto')
-            type_suffix = "DETALLADO" if report_type == "detallado" else "NORMAL"
-            output_file = Path(f"output/reporte_{type_suffix}_{project_name}_{timestamp}.html")
-
-            # Generar reporte con el tipo especificado
-            generator = HTMLReportGenerator(self.last_results, output_file, report_type=report_type)
-            report_path = generator.generate()
-
-            # Preguntar si abrir el reporte
-            result = messagebox.askyesno(
-                "Reporte Generado",
-                f"Reporte HTML ({type_suffix}) generado con éxito:\n\n{report_path}\n\n¿Deseas abrirlo ahora?"
-            )
-
-            if result:
-                import webbrowser
-                webbrowser.open(str(report_path.absolute()))
-
-            self.status_bar.config(text=f"Reporte generado: {report_path.name}")
+        """Generar reporte HTML del tipo especificado ('todos' = HTML normal, detallado y Excel)"""
+        from src.report_jobs import REPORT_EXCEL, REPORT_HTML_DETALLADO, REPORT_HTML_NORMAL
+        from datetime import datetime
 
-        except Exception as e:
-            messagebox.showerror(
-                "Error",
-                f"Error al generar el reporte:\n\n{str(e)}"
-            )
+        # Crear nombres de archivo con timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        project_name = self.last_results['project_info'].get('name', 'proyecto')
+        output_paths = {
+            REPORT_HTML_DETALLADO: Path(f"output/reporte_DETALLADO_{project_name}_{timestamp}.html"),
+            REPORT_HTML_NORMAL: Path(f"output/reporte_NORMAL_{project_name}_{timestamp}.html"),
+            REPORT_EXCEL: Path(f"output/reporte_{project_name}_{timestamp}.xlsx"),
+        }
+        if report_type == "todos":
+            kinds = [REPORT_HTML_DETALLADO, REPORT_HTML_NORMAL, REPORT_EXCEL]
+        elif report_type == "normal":
+            kinds = [REPORT_HTML_NORMAL]
+        else:
+            kinds = [REPORT_HTML_DETALLADO]
+        self._start_report_jobs(kinds, output_paths)
 
     def _generate_excel_report(self):
         """Generar reporte Excel"""
@@ -1663,52 +1759,71 @@ class MainWindow:
                 "No hay resultados para generar reporte.\nPor favor, analiza un proyecto primero."
             )
             return
-        
-        try:
-            from src.excel_report_generator import ExcelReportGenerator
-            from datetime import datetime
-            
-            # Crear nombre de archivo con timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            project_name = self.last_results['project_info'].get('name', 'proyecto')
-            output_file = Path(f"output/reporte_{project_name}_{timestamp}.xlsx")
-            
-            # Cargar configuración para gráficos
-            config = load_user_config()
-            include_charts = config.get('output', {}).get('include_charts', True)
-            
-            # Generar reporte
-            generator = ExcelReportGenerator(
-                self.last_results, 
-                output_file,
-                include_charts=include_charts
-            )
-            report_path = generator.generate()
-            
-            # Preguntar si abrir el reporte
-            result = messagebox.askyesno(
-                "Reporte Excel Generado",
-                f"Reporte Excel generado con éxito:\n\n{report_path}\n\n¿Deseas abrirlo ahora?"
-            )
-            
-            if result:
-                import os
-                os.startfile(str(report_path.absolute()))
-            
-            self.status_bar.config(text=f"Reporte Excel generado: {report_path.name}")
-            
-        except ImportError:
-            messagebox.showerror(
-                "Error",
-                "No se pudo importar el generador de Excel.\n\n"
-                "Asegúrate de tener instalado: pip install openpyxl"
-            )
-        except Exception as e:
+
+        from src.report_jobs import REPORT_EXCEL
+        from datetime import datetime
+
+        # Crear nombre de archivo con timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        project_name = self.last_results['project_info'].get('name', 'proyecto')
+        output_file = Path(f"output/reporte_{project_name}_{timestamp}.xlsx")
+        self._start_report_jobs([REPORT_EXCEL], {REPORT_EXCEL: output_file})
+
+    def _start_report_jobs(self, kinds, output_paths):
+        """Generar reportes en procesos separados sin bloquear la interfaz"""
+        from src.report_jobs import submit_reports
+
+        # Cargar configuración para gráficos
+        config = load_user_config()
+        include_charts = config.get('output', {}).get('include_charts', True)
+
+        self.status_bar.config(text="Generando reportes...")
+        submit_reports(
+            self.last_results,
+            kinds,
+            include_charts=include_charts,
+            output_paths=output_paths,
+            on_done=lambda outcomes: self.root.after(0, lambda: self._on_reports_generated(outcomes))
+        )
+
+    def _on_reports_generated(self, outcomes):
+        """Mostrar el resultado de los reportes generados (hilo principal)"""
+        from src.report_jobs import REPORT_EXCEL
+
+        generated = {kind: Path(o['path']) for kind, o in outcomes.items() if o['path']}
+        errors = {kind: o['error'] for kind, o in outcomes.items() if o['error']}
+
+        if errors:
+            if errors.get(REPORT_EXCEL) == 'openpyxl no disponible':
+                errors[REPORT_EXCEL] = "Asegúrate de tener instalado: pip install openpyxl"
             messagebox.showerror(
                 "Error",
-                f"Error al generar el reporte Excel:\n\n{str(e)}"
+                "Error al generar el reporte:\n\n"
+                + "\n".join(f"{kind}: {error}" for kind, error in errors.items())
             )
-    
+        if not generated:
+            self.status_bar.config(text="Error al generar reportes")
+            return
+
+        listing = "\n".join(str(path) for path in generated.values())
+        result = messagebox.askyesno(
+            "Reporte Generado",
+            f"Reporte(s) generado(s) con éxito:\n\n{listing}\n\n¿Deseas abrirlos ahora?"
+        )
+
+        if result:
+            import webbrowser
+            for kind, path in generated.items():
+                if kind == REPORT_EXCEL:
+                    import os
+                    os.startfile(str(path.absolute()))
+                else:
+                    webbrowser.open(str(path.absolute()))
+
+        self.status_bar.config(
+            text=f"Reporte generado: {', '.join(path.name for path in generated.values())}"
+        )
+
     def _show_error(self, error_message):
         """Mostrar error en el análisis"""
         if hasattr(self, 'progress_window'):
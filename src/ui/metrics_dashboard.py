@@ -19,6 +19,14 @@ from src.metrics.metrics_calculator import create_metrics_calculator
 class MetricsDashboard(tk.Frame):
     """Dashboard de métricas y análisis histórico"""
     
+    # Espera tras la última tecla antes de buscar (ms) y máximo de resultados
+    SEARCH_DELAY_MS = 250
+    SEARCH_LIMIT = 200
+    
+    # Filas por página del historial y fracción de scroll que carga la siguiente
+    PAGE_SIZE = 200
+    PAGE_PREFETCH_AT = 0.9
+    
     def __init__(self, parent, project_path=None):
         """
         Inicializar dashboard
@@ -41,8 +49,12 @@ class MetricsDashboard(tk.Frame):
         self.db = None
         self.calculator = None
         
-        # Lista de todos los items del tree para búsqueda
-        self.all_tree_items = []
+        # Historial cargado por páginas (clave de la última fila y si quedan más)
+        self.loaded_history = []
+        self._page_after = None
+        self._has_more_pages = False
+        self._page_pending = False
+        self._search_after_id = None
         
         # Diccionario para almacenar datos completos de análisis por ID
         self.analysis_data = {}
@@ -129,7 +141,7 @@ class MetricsDashboard(tk.Frame):
         # Barra de búsqueda en tiempo real
         search_frame = tk.LabelFrame(
             main_container,
-            text="🔎 Búsqueda en Tiempo Real",
+            text="🔎 Búsqueda en Tiempo Real (proyecto, versión, archivo, regla o hallazgo)",
             font=("Segoe UI", 11, "bold"),
             bg=self.BG_COLOR,
             fg=self.NTT_BLUE
@@ -220,7 +232,8 @@ class MetricsDashboard(tk.Frame):
         # Scrollbars (vertical y horizontal)
         vsb = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
         hsb = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll, xscrollcommand=hsb.set)
+        self.tree_vsb = vsb
 
         # Configurar columnas con minwidth y stretch
         self.tree.heading("Fecha", text="Fecha")
@@ -309,6 +322,19 @@ class MetricsDashboard(tk.Frame):
             cursor="hand2"
         ).pack(side=tk.LEFT, padx=(0, 10))
         
+        tk.Button(
+            buttons_frame,
+            text="♻️ Regenerar Reportes",
+            command=self._regenerate_selected,
+            bg="#F39C12",
+            fg="white",
+            font=("Segoe UI", 10),
+            relief=tk.FLAT,
+            padx=15,
+            pady=8,
+            cursor="hand2"
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
         tk.Button(
             buttons_frame,
             text="📁 Carpeta Output",
@@ -344,108 +370,143 @@ class MetricsDashboard(tk.Frame):
                     self.project_filter.set("Todos")
 
             # Obtener selección actual
-            selected_project = self.project_filter.get()
-            if selected_project == "Todos":
-                selected_project = None
+            selected_project = self._selected_project()
             
-            # Obtener historial
-            history = self.db.get_analysis_history(selected_project, limit=50)
+            # Primera página del historial (y reaplicar la búsqueda activa, si la hay)
+            self._reset_history()
+            if self.search_var.get().strip():
+                self._run_search()
             
-            # Limpiar tabla
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            # Actualizar estadísticas (sobre todo el historial, no solo lo cargado)
+            summary = self.db.get_history_summary(selected_project)
+            if summary['total']:
+                self._update_stats(summary, selected_project)
             
-            # Llenar tabla
-            for analysis in history:
-                # Convertir timestamp UTC a hora local
-                try:
-                    from datetime import datetime, timezone
-                    # SQLite guarda en UTC sin timezone info, así que lo parseamos como UTC
-                    utc_time = datetime.strptime(analysis['analysis_date'], "%Y-%m-%d %H:%M:%S")
-                    # Marcar como UTC
-                    utc_time = utc_time.replace(tzinfo=timezone.utc)
-                    # Convertir a hora local
-                    local_time = utc_time.astimezone()
-                    date_str = local_time.strftime("%Y-%m-%d %H:%M")
-                except Exception as e:
-                    # Fallback si hay error en conversión
-                    date_str = analysis['analysis_date'][:16]  # YYYY-MM-DD HH:MM
-                
-                project = analysis.get('project_name', 'N/A')
-                bbpp_sets = analysis.get('bbpp_sets', 'N/A')  # Conjuntos de BBPP
-                version = analysis.get('version', 'N/A')
-                score = f"{analysis['score']:.1f}"
-                # Mapeo: HIGH=Errors, MEDIUM=Warnings, LOW=Info
-                errors = str(analysis.get('high_findings', 0))
-                warnings = str(analysis.get('medium_findings', 0))
-                info = str(analysis.get('low_findings', 0))
-                
-                # Insertar en tree y guardar datos completos
-                item_id = self.tree.insert('', 'end', 
-                               values=(date_str, project, bbpp_sets, version, score, errors, warnings, info),
-                               tags=(str(analysis['id']),))
-                
-                # Guardar datos completos del análisis para acceso posterior
-                self.analysis_data[str(analysis['id'])] = analysis
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al cargar datos:\n{e}")
+
+    def _selected_project(self):
+        """Proyecto seleccionado en el filtro (None = todos)"""
+        selected_project = self.project_filter.get()
+        return None if selected_project in ("", "Todos") else selected_project
+    
+    def _reset_history(self):
+        """Vaciar la tabla y cargar la primera página del historial"""
+        self.loaded_history = []
+        self._page_after = None
+        self._has_more_pages = True
+        self._populate_tree([])
+        self._load_next_page()
+    
+    def _load_next_page(self):
+        """Añadir a la tabla la siguiente página del historial (si quedan)"""
+        self._page_pending = False
+        if not self.db or not self._has_more_pages:
+            return
+        
+        page = self.db.get_history_page(self._selected_project(), after=self._page_after,
+                                        page_size=self.PAGE_SIZE)
+        self._has_more_pages = len(page) == self.PAGE_SIZE
+        if page:
+            self._page_after = (page[-1]['analysis_date'], page[-1]['id'])
+            self.loaded_history.extend(page)
+            self._insert_rows(page)
+    
+    def _on_tree_scroll(self, first, last):
+        """Actualizar la scrollbar y cargar otra página al acercarse al final"""
+        self.tree_vsb.set(first, last)
+        # Con una búsqueda activa la tabla muestra sus resultados, no el historial
+        if self.search_var.get().strip():
+            return
+        if self._has_more_pages and not self._page_pending and float(last) >= self.PAGE_PREFETCH_AT:
+            self._page_pending = True
+            self.after_idle(self._load_next_page)
+    
+    def _populate_tree(self, history):
+        """
+        Rellenar la tabla con una lista de análisis
+        
+        Args:
+            history: Análisis (como get_history_page), más recientes primero
+        """
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.analysis_data = {}
+        self._insert_rows(history)
+    
+    def _insert_rows(self, history):
+        """Añadir análisis al final de la tabla"""
+        for analysis in history:
+            # Convertir timestamp UTC a hora local
+            try:
+                from datetime import datetime, timezone
+                # SQLite guarda en UTC sin timezone info, así que lo parseamos como UTC
+                utc_time = datetime.strptime(analysis['analysis_date'], "%Y-%m-%d %H:%M:%S")
+                # Marcar como UTC
+                utc_time = utc_time.replace(tzinfo=timezone.utc)
+                # Convertir a hora local
+                local_time = utc_time.astimezone()
+                date_str = local_time.strftime("%Y-%m-%d %H:%M")
+            except Exception as e:
+                # Fallback si hay error en conversión
+                date_str = analysis['analysis_date'][:16]  # YYYY-MM-DD HH:MM
             
-            # Actualizar estadísticas
-            # Actualizar estadísticas
-            if history:
-                self._update_stats(history, selected_project)
+            project = analysis.get('project_name', 'N/A')
+            bbpp_sets = analysis.get('bbpp_sets', 'N/A')  # Conjuntos de BBPP
+            version = analysis.get('version', 'N/A')
+            score = f"{analysis['score']:.1f}"
+            # Mapeo: HIGH=Errors, MEDIUM=Warnings, LOW=Info
+            errors = str(analysis.get('high_findings', 0))
+            warnings = str(analysis.get('medium_findings', 0))
+            info = str(analysis.get('low_findings', 0))
             
-            # Guardar todos los items para la búsqueda
-            self.all_tree_items = list(self.tree.get_children())
+            # Insertar en tree y guardar datos completos
+            item_id = self.tree.insert('', 'end', 
+                           values=(date_str, project, bbpp_sets, version, score, errors, warnings, info),
+                           tags=(str(analysis['id']),))
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar datos:\n{e}")
+            # Guardar datos completos del análisis para acceso posterior
+            self.analysis_data[str(analysis['id'])] = analysis
 
     def _on_filter_change(self, event):
         """Manejar cambio de filtro"""
         self._load_data()
     
     def _on_search_change(self):
-        """Manejar cambio en la búsqueda en tiempo real"""
-        search_text = self.search_var.get().lower()
-        
-        # Si no hay texto de búsqueda, mostrar todos los items
-        if not search_text:
-            # Primero detach todos
-            for item in self.all_tree_items:
-                try:
-                    self.tree.detach(item)
-                except:
-                    pass
-            # Luego reattach todos en orden
-            for item in self.all_tree_items:
-                try:
-                    self.tree.reattach(item, '', 'end')
-                except:
-                    pass
+        """Manejar cambio en la búsqueda: esperar a que se deje de escribir"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.SEARCH_DELAY_MS, self._run_search)
+    
+    def _run_search(self):
+        """
+        Buscar en los hallazgos y datos de todos los análisis guardados
+        
+        La búsqueda va al índice de texto completo de la BD (no solo a los
+        análisis cargados). Las coincidencias por fecha se buscan en la tabla.
+        """
+        self._search_after_id = None
+        search_text = self.search_var.get().strip()
+        
+        # Sin texto de búsqueda, volver al historial paginado
+        if not search_text or not self.db:
+            self._reset_history()
             return
         
-        # Filtrar items basándose en el texto de búsqueda
-        for item in self.all_tree_items:
-            try:
-                values = self.tree.item(item)['values']
-                # Buscar en fecha (0), proyecto (1), conjunto BBPP (2), y versión (3)
-                date_str = str(values[0]).lower() if len(values) > 0 else ""
-                project_name = str(values[1]).lower() if len(values) > 1 else ""
-                bbpp_sets_str = str(values[2]).lower() if len(values) > 2 else ""
-                version_str = str(values[3]).lower() if len(values) > 3 else ""
-                
-                # Si coincide con la búsqueda, mantener visible
-                if (search_text in project_name or 
-                    search_text in date_str or 
-                    search_text in bbpp_sets_str or
-                    search_text in version_str):
-                    # Asegurarse de que esté visible
-                    self.tree.reattach(item, '', 'end')
-                else:
-                    # Ocultar item que no coincide
-                    self.tree.detach(item)
-            except:
-                # Si hay algún error con el item, continuar
-                pass
+        try:
+            found = self.db.search_analyses(search_text, self._selected_project(),
+                                            limit=self.SEARCH_LIMIT)
+        except Exception as e:
+            print(f"WARNING: Error en la búsqueda: {e}")
+            found = []
+        
+        found_ids = {analysis['id'] for analysis in found}
+        lowered = search_text.lower()
+        by_date = [analysis for analysis in self.loaded_history
+                   if analysis['id'] not in found_ids and lowered in str(analysis['analysis_date'])]
+        results = sorted(found + by_date, key=lambda a: (a['analysis_date'], a['id']), reverse=True)
+        self._populate_tree(results)
     
     def _on_double_click(self, event):
         """Manejar doble-click en un item para abrir reportes"""
@@ -627,21 +688,19 @@ class MetricsDashboard(tk.Frame):
             )
     
     
-    def _update_stats(self, history, project_name):
-        """Actualizar panel de estadísticas"""
-        if not history:
+    def _update_stats(self, summary, project_name):
+        """Actualizar panel de estadísticas (summary de get_history_summary)"""
+        if not summary['total']:
             return
         
         # Total de análisis
-        self.stats_labels['total_analyses'].config(text=str(len(history)))
+        self.stats_labels['total_analyses'].config(text=str(summary['total']))
         
         # Score promedio
-        avg_score = sum(a['score'] for a in history) / len(history)
-        self.stats_labels['avg_score'].config(text=f"{avg_score:.1f}")
+        self.stats_labels['avg_score'].config(text=f"{summary['avg_score']:.1f}")
         
         # Último score
-        last_score = history[0]['score']
-        self.stats_labels['last_score'].config(text=f"{last_score:.1f}")
+        self.stats_labels['last_score'].config(text=f"{summary['last_score']:.1f}")
         
         # Tendencia
         if project_name and self.calculator:
@@ -715,7 +774,7 @@ Por Severidad:
 
 Archivos Analizados: {analysis['analyzed_files']} de {analysis['total_files']}
 Tiempo de Ejecución: {analysis['execution_time']:.2f}s
-
+{self._format_timings(analysis.get('timings', {}))}
 TODOS LOS HALLAZGOS
 {'=' * 50}
 """
@@ -731,6 +790,46 @@ TODOS LOS HALLAZGOS
         
         text.config(state=tk.DISABLED)
     
+    def _format_timings(self, timings, top=10):
+        """
+        Formatear los tiempos por fase, regla y archivo para la ventana de detalles
+        
+        Args:
+            timings: Diccionario de MetricsDatabase.get_timings
+            top: Número máximo de reglas y archivos a mostrar
+            
+        Returns:
+            Texto de la sección de rendimiento (vacío si no hay tiempos)
+        """
+        if not timings:
+            return ''
+        
+        lines = ['', 'RENDIMIENTO', '=' * 50, '', 'Por Fase:']
+        for name, entry in timings.get('phases', {}).items():
+            lines.append(f"  • {name}: {entry['seconds'] * 1000:.1f} ms")
+        
+        rules = sorted(timings.get('rules', {}).items(), key=lambda e: e[1]['seconds'], reverse=True)
+        if rules:
+            lines.extend(['', f'Reglas más lentas (top {top}):'])
+            for name, entry in rules[:top]:
+                lines.append(f"  • {name}: {entry['seconds'] * 1000:.1f} ms "
+                             f"({entry.get('findings', 0)} hallazgos)")
+        
+        files = sorted(timings.get('files', {}).items(), key=lambda e: e[1]['seconds'], reverse=True)
+        if files:
+            lines.extend(['', f'Archivos más lentos (top {top}):'])
+            for name, entry in files[:top]:
+                lines.append(f"  • {name}: {entry['seconds'] * 1000:.1f} ms")
+        
+        counts = timings.get('counts', {})
+        if counts:
+            lines.extend(['', 'Volumen:'])
+            for name, value in counts.items():
+                lines.append(f"  • {name}: {value}")
+        
+        lines.append('')
+        return '\n'.join(lines)
+    
     def _open_html_report(self):
         """Abrir reporte HTML del análisis seleccionado"""
         from tkinter import messagebox
@@ -753,13 +852,13 @@ TODOS LOS HALLAZGOS
                 print(f"✅ Abriendo reporte HTML: {html_path}")
             else:
                 messagebox.showerror("Error", f"No se pudo abrir el archivo:\n{html_path}")
-        else:
-            messagebox.showwarning(
-                "Reporte no encontrado",
-                "No se encontró el reporte HTML para este análisis.\n\n"
-                "Asegúrate de tener activada la opción 'Generar reportes automáticamente' "
-                "en Configuración."
-            )
+        elif messagebox.askyesno(
+            "Reporte no encontrado",
+            "No se encontró el reporte HTML para este análisis.\n\n"
+            "¿Deseas regenerarlo desde la base de datos (sin reescanear)?"
+        ):
+            from src.report_jobs import REPORT_HTML_DETALLADO
+            self._regenerate_reports([analysis_id], [REPORT_HTML_DETALLADO], open_after=True)
     
     def _open_excel_report(self):
         """Abrir reporte Excel del análisis seleccionado"""
@@ -783,14 +882,74 @@ TODOS LOS HALLAZGOS
                 print(f"✅ Abriendo reporte Excel: {excel_path}")
             else:
                 messagebox.showerror("Error", f"No se pudo abrir el archivo:\n{excel_path}")
-        else:
-            messagebox.showwarning(
-                "Reporte no encontrado",
-                "No se encontró el reporte Excel para este análisis.\n\n"
-                "Asegúrate de tener activada la opción 'Generar reportes automáticamente' "
-                "en Configuración."
-            )
+        elif messagebox.askyesno(
+            "Reporte no encontrado",
+            "No se encontró el reporte Excel para este análisis.\n\n"
+            "¿Deseas regenerarlo desde la base de datos (sin reescanear)?"
+        ):
+            from src.report_jobs import REPORT_EXCEL
+            self._regenerate_reports([analysis_id], [REPORT_EXCEL], open_after=True)
     
+    def _regenerate_selected(self):
+        """Regenerar los reportes de los análisis seleccionados desde la BD"""
+        from src.config import load_user_config
+        from src.report_jobs import report_kinds_from_config
+
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showinfo("Info", "Por favor, selecciona uno o varios análisis")
+            return
+
+        analysis_ids = [int(self.tree.item(item)['tags'][0]) for item in selection]
+        kinds = report_kinds_from_config(load_user_config())
+        if not messagebox.askyesno(
+            "Regenerar Reportes",
+            f"Se regenerarán los reportes de {len(analysis_ids)} análisis "
+            f"({', '.join(kinds)}) sin reescanear.\n\n¿Continuar?"
+        ):
+            return
+        self._regenerate_reports(analysis_ids, kinds)
+
+    def _regenerate_reports(self, analysis_ids, kinds, open_after=False):
+        """Regenerar reportes en segundo plano (un proceso por análisis) y refrescar la tabla"""
+        import threading
+        from src.report_jobs import regenerate_reports
+
+        def run():
+            try:
+                jobs = regenerate_reports(analysis_ids, kinds)
+            except Exception as e:
+                self.after(0, lambda msg=str(e): messagebox.showerror(
+                    "Error", f"Error al regenerar reportes:\n\n{msg}"))
+                return
+            self.after(0, lambda: self._on_reports_regenerated(jobs, open_after))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_reports_regenerated(self, jobs, open_after):
+        """Mostrar el resultado de la regeneración (hilo principal)"""
+        generated = [outcome['path'] for job in jobs.values()
+                     for outcome in job['outcomes'].values() if outcome['path']]
+        errors = [f"{analysis_id}: {job['error']}" for analysis_id, job in jobs.items() if job['error']]
+        errors += [f"{analysis_id} ({kind}): {outcome['error']}" for analysis_id, job in jobs.items()
+                   for kind, outcome in job['outcomes'].items() if outcome['error']]
+        partial = [str(analysis_id) for analysis_id, job in jobs.items() if job['partial']]
+
+        self._load_data()
+        if open_after and len(generated) == 1 and not errors:
+            self._open_file(generated[0])
+            return
+
+        message = f"Reportes regenerados: {len(generated)}"
+        if partial:
+            message += ("\n\nAnálisis anteriores a la persistencia de resultados (solo los primeros "
+                        f"hallazgos guardados): {', '.join(partial)}")
+        if errors:
+            message += "\n\nErrores:\n" + "\n".join(errors)
+            messagebox.showwarning("Regenerar Reportes", message)
+        else:
+            messagebox.showinfo("Regenerar Reportes", message)
+
     def _open_output_folder(self):
         """Abrir carpeta output donde se guardan todos los reportes"""
         from tkinter import messagebox
@@ -811,6 +970,9 @@ TODOS LOS HALLAZGOS
     
     def cleanup(self):
         """Limpiar recursos"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
         if self.db:
             self.db.close()
 
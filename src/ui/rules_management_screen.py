@@ -711,7 +711,60 @@ class RulesManagementScreen:
             justify=tk.LEFT
         )
         desc_label.pack(anchor="w", pady=(10, 0))
-        
+
+        # Previsualización del score: recalcula el histórico sin reescanear
+        score_preview_label = tk.Label(
+            penalty_frame,
+            text="",
+            font=("Arial", 9, "bold"),
+            bg="white",
+            fg=PRIMARY_COLOR,
+            justify=tk.LEFT
+        )
+        score_preview_label.pack(anchor="w", pady=(10, 0))
+
+        try:
+            from src.config import load_user_config
+            from src.database.metrics_db import get_metrics_db
+            from src.scoring import preview_rule_change
+
+            preview_config = load_user_config()
+            preview_db = get_metrics_db()
+            try:
+                score_inputs = preview_db.get_score_inputs()
+            finally:
+                preview_db.close()
+        except Exception as e:
+            print(f"WARNING: No se pudo cargar el histórico para previsualizar el score: {e}")
+            score_inputs = []
+
+        def update_score_preview(*args):
+            if not score_inputs:
+                score_preview_label.config(text="Sin análisis guardados para previsualizar el score")
+                return
+            try:
+                override = {
+                    'penalty_mode': penalty_mode_var.get(),
+                    'penalty_value': penalty_value_var.get(),
+                    'use_penalty_cap': use_cap_var.get(),
+                    'penalty_cap': penalty_cap_var.get(),
+                    'severity': severity_var.get(),
+                }
+            except tk.TclError:
+                # Valor de spinbox incompleto mientras se escribe
+                return
+            preview = preview_rule_change(rule_id, override, preview_config, inputs=score_inputs)
+            latest = preview['latest']
+            score_preview_label.config(
+                text=f"Score último análisis ({latest['project_name']}): "
+                     f"{latest['old_score']:.2f} → {latest['new_score']:.2f}\n"
+                     f"Variación media en {preview['analyses']} análisis: {preview['mean_delta']:+.2f}"
+            )
+
+        for var in (penalty_mode_var, penalty_value_var, use_cap_var, penalty_cap_var, severity_var):
+            var.trace_add("write", update_score_preview)
+        update_score_preview()
+
         # Parámetros (si tiene)
         param_vars = {}
         type_prefixes_list = []  # Para almacenar la lista de prefijos
@@ -1111,7 +1164,111 @@ class RulesManagementScreen:
                 
                 # Permitir agregar con Enter
                 new_exception_entry.bind('<Return>', lambda e: add_exception())
-        
+
+        # Previsualizar impacto: reevalúa solo esta regla sobre la caché del último escaneo
+        impact_frame = tk.LabelFrame(
+            content_frame,
+            text="Previsualizar Impacto (último proyecto analizado)",
+            font=("Arial", 10, "bold"),
+            bg="white",
+            padx=10,
+            pady=10
+        )
+        impact_frame.pack(fill=tk.X, padx=padding, pady=10)
+
+        impact_label = tk.Label(
+            impact_frame,
+            text="",
+            font=("Arial", 9),
+            bg="white",
+            justify=tk.LEFT,
+            wraplength=520
+        )
+        impact_label.pack(anchor="w")
+
+        try:
+            from src.rule_preview import latest_parsed_cache
+            parsed_snapshot = latest_parsed_cache()
+        except Exception as e:
+            print(f"WARNING: No se pudo cargar la caché de parsed_data: {e}")
+            parsed_snapshot = None
+        preview_state = {'after_id': None, 'analyzer': None}
+
+        def build_preview_rule():
+            """Copia de la regla con los valores actuales del diálogo"""
+            import copy
+            preview_rule = copy.deepcopy(rule)
+            preview_rule['enabled'] = active_var.get()
+            preview_rule['severity'] = severity_var.get()
+            params = preview_rule.setdefault('parameters', {})
+            params['penalty_mode'] = penalty_mode_var.get()
+            params['penalty_value'] = penalty_value_var.get()
+            params['use_penalty_cap'] = use_cap_var.get()
+            params['penalty_cap'] = penalty_cap_var.get()
+            for param_name, param_var in param_vars.items():
+                if isinstance(params.get(param_name), dict):
+                    params[param_name]['value'] = param_var.get()
+                else:
+                    params[param_name] = param_var.get()
+            if allow_type_prefixes_var is not None:
+                params['allow_type_prefixes'] = allow_type_prefixes_var.get()
+                params['type_prefixes'] = type_prefixes_list.copy()
+            if parameters and supports_exceptions:
+                params['exceptions'] = exceptions_list.copy()
+            return preview_rule
+
+        def run_impact_preview():
+            preview_state['after_id'] = None
+            if parsed_snapshot is None:
+                impact_label.config(text="Active rule_preview.cache_parsed_data y analice un proyecto para previsualizar el impacto de los cambios", fg="gray")
+                return
+            try:
+                preview_rule = build_preview_rule()
+            except tk.TclError:
+                # Valor de spinbox incompleto mientras se escribe
+                return
+            from src.analyzer import BBPPAnalyzer
+            from src.config import load_user_config
+            from src.rule_preview import preview_rule_impact
+
+            config = load_user_config()
+            if preview_state['analyzer'] is None:
+                preview_state['analyzer'] = BBPPAnalyzer(
+                    config, rules=[], active_sets=parsed_snapshot.get('active_sets') or None)
+            impact = preview_rule_impact(preview_rule, parsed_snapshot, config, preview_state['analyzer'])
+            if not impact['supported']:
+                impact_label.config(text="Esta regla depende del grafo de invocaciones: requiere reanalizar", fg="gray")
+                return
+            impact_label.config(
+                text=f"{Path(parsed_snapshot['project_path']).name}: "
+                     f"{impact['findings_before']} → {impact['findings_after']} hallazgos | "
+                     f"Score {impact['score_before']:.2f} → {impact['score_after']:.2f} "
+                     f"({impact['delta']:+.2f}) | {impact['elapsed_ms']:.0f} ms",
+                fg=COLOR_ERROR if impact['delta'] < 0 else COLOR_SUCCESS if impact['delta'] > 0 else TEXT_COLOR
+            )
+
+        def schedule_impact_preview(*args):
+            # Agrupar cambios rápidos (spinbox) en una sola reevaluación
+            if preview_state['after_id'] is not None:
+                dialog.after_cancel(preview_state['after_id'])
+            preview_state['after_id'] = dialog.after(150, run_impact_preview)
+
+        tk.Button(
+            impact_frame,
+            text="🔄 Previsualizar",
+            command=run_impact_preview,
+            font=("Arial", 9),
+            padx=10
+        ).pack(anchor="w", pady=(5, 0))
+
+        preview_vars = [active_var, severity_var, penalty_mode_var, penalty_value_var,
+                        use_cap_var, penalty_cap_var, *param_vars.values()]
+        if allow_type_prefixes_var is not None:
+            preview_vars.append(allow_type_prefixes_var)
+        for var in preview_vars:
+            var.trace_add("write", schedule_impact_preview)
+        run_impact_preview()
+
         # Conjuntos
         sets_frame = tk.LabelFrame(
             content_frame,
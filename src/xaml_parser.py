@@ -8,6 +8,39 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import re
 
+
+# Flags de contexto de una actividad (bitmask compacto en activity['context'])
+CTX_IN_TRY = 1        # Dentro de TryCatch.Try
+CTX_IN_CATCH = 2      # Dentro de TryCatch.Catches
+CTX_IN_FINALLY = 4    # Dentro de TryCatch.Finally
+CTX_COMMENTED = 8     # Dentro de un CommentOut
+CTX_IN_LOOP = 16      # Dentro de un bucle (ForEach, While, ...)
+CTX_IN_STATE = 32     # Dentro de un estado de StateMachine
+
+# Literales de cadena en expresiones: VB solo escapa con "" (la \ es literal,
+# p. ej. "C:\Temp\"); C# escapa con \" y sus literales verbatim @"..." con ""
+_VB_STRING_LITERAL_RE = re.compile(r'"(?:[^"]|"")*"')
+_CSHARP_STRING_LITERAL_RE = re.compile(r'@"(?:[^"]|"")*"|"(?:[^"\\]|\\.)*"')
+# Identificadores que no son acceso a miembro (no precedidos de '.')
+_IDENTIFIER_RE = re.compile(r'(?<![\w.])[A-Za-z_]\w*')
+
+
+def tokenize_expression(expression: str, csharp: bool = False) -> List[str]:
+    """
+    Extraer identificadores de una expresión VB/C# de UiPath
+    
+    Args:
+        expression: Texto de la expresión (ej: '[in_Config("Key").ToString]')
+        csharp: La expresión es C# (por defecto VB)
+        
+    Returns:
+        Identificadores en minúsculas (VB no distingue mayúsculas)
+    """
+    literal_re = _CSHARP_STRING_LITERAL_RE if csharp else _VB_STRING_LITERAL_RE
+    expression = literal_re.sub(' ', expression)
+    return [token.lower() for token in _IDENTIFIER_RE.findall(expression)]
+
+
 class XamlParser:
     """Parser para archivos XAML de UiPath"""
     
@@ -20,6 +53,20 @@ class XamlParser:
         'mc': 'http://schemas.openxmlformats.org/markup-compatibility/2006',
     }
     
+    # Atributos que contienen expresiones aunque no vayan entre corchetes
+    EXPRESSION_ATTRIBUTES = {'Condition', 'Message', 'To', 'Value', 'Expression', 'ExpressionText'}
+    
+    # Elementos cuyo texto es una expresión (argumentos y expresiones C#/VB)
+    EXPRESSION_ELEMENTS = {
+        'InArgument', 'OutArgument', 'InOutArgument',
+        'CSharpValue', 'CSharpReference', 'VisualBasicValue', 'VisualBasicReference',
+    }
+    
+    # Actividades de tipo bucle (además de cualquier ForEach*)
+    LOOP_ACTIVITIES = {
+        'While', 'DoWhile', 'ParallelForEach', 'RepeatNumberOfTimesX', 'InterruptibleWhile', 'InterruptibleDoWhile',
+    }
+    
     def __init__(self, xaml_path: Path):
         """
         Inicializar parser con ruta del archivo XAML
@@ -32,6 +79,7 @@ class XamlParser:
         self.root = None
         self.workflow_type = None
         self.parsed_data = {}
+        self.csharp = False
         
     def parse(self) -> Dict:
         """
@@ -47,10 +95,14 @@ class XamlParser:
             
             # Detectar tipo de workflow
             self.workflow_type = self._detect_workflow_type()
+            self.csharp = self._detect_csharp()
             
             # Detectar código comentado
             commented_code_data = self._detect_commented_code()
             
+            # Recorrido único con contexto de ancestros
+            walk = self._walk_tree()
+            
             # Extraer información
             self.parsed_data = {
                 'file_path': str(self.xaml_path),
@@ -60,11 +112,12 @@ class XamlParser:
                 'annotation': self._get_annotation(),
                 'variables': self._extract_variables(),
                 'arguments': self._extract_arguments(),
-                'activities': self._extract_activities(),
-                'invoke_workflow_files': self._extract_invoke_workflows(),
-                'log_messages': self._extract_log_messages(),
+                'activities': walk['activities'],
+                'invoke_workflow_files': walk['invoke_workflow_files'],
+                'identifier_index': walk['identifier_index'],
+                'log_messages': walk['log_messages'],
                 'try_catch_blocks': self._extract_try_catch_blocks(),
-                'if_activities': self._extract_if_activities(),
+                'if_activities': walk['if_activities'],
                 'commented_code': commented_code_data,
                 'commented_lines': commented_code_data.get('commented_lines', 0),  # Para el analizador
                 'total_lines': self._count_lines(),
@@ -85,6 +138,19 @@ class XamlParser:
                 'parse_success': False
             }
     
+    def release(self):
+        """Liberar el árbol XML y los datos extraídos (tras analizar el archivo)"""
+        self.tree = None
+        self.root = None
+        self.parsed_data = {}
+    
+    def _detect_csharp(self) -> bool:
+        """Detectar si el workflow usa expresiones C# (ExpressionActivityEditor="C#" en la raíz)"""
+        for attr, value in self.root.attrib.items():
+            if attr.endswith('ExpressionActivityEditor') and value.strip().upper() == 'C#':
+                return True
+        return False
+
     def _detect_workflow_type(self) -> str:
         """Detectar tipo de workflow (StateMachine, Sequence, Flowchart)"""
         # Buscar elemento principal
@@ -154,70 +220,6 @@ class XamlParser:
         
         return arguments
     
-    def _extract_activities(self) -> List[Dict]:
-        """Extraer todas las actividades del workflow"""
-        activities = []
-        activity_count = {}
-        
-        # Buscar todos los elementos con DisplayName (son actividades)
-        for elem in self.root.iter():
-            display_name = elem.get('DisplayName')
-            if display_name:
-                activity_type = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-                
-                # Contar actividades por tipo
-                activity_count[activity_type] = activity_count.get(activity_type, 0) + 1
-                
-                activities.append({
-                    'type': activity_type,
-                    'display_name': display_name,
-                    'tag': elem.tag,
-                })
-        
-        return activities
-    
-    def _extract_invoke_workflows(self) -> List[Dict]:
-        """Extraer todos los InvokeWorkflowFile"""
-        invokes = []
-        
-        for elem in self.root.iter():
-            if 'InvokeWorkflowFile' in elem.tag:
-                workflow_file = elem.get('WorkflowFileName', '')
-                invokes.append({
-                    'workflow_file': workflow_file,
-                    'display_name': elem.get('DisplayName', ''),
-                })
-        
-        return invokes
-    
-    def _extract_log_messages(self) -> List[Dict]:
-        """Extraer todos los LogMessage (excluyendo los comentados)"""
-        logs = []
-        
-        # Primero, identificar todos los elementos dentro de CommentOut
-        commented_elements = set()
-        for elem in self.root.iter():
-            tag = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-            if tag == 'CommentOut':
-                # Marcar todos los descendientes como comentados
-                for child in elem.iter():
-                    commented_elements.add(child)
-        
-        # Ahora buscar LogMessages excluyendo los comentados
-        for elem in self.root.iter():
-            if elem in commented_elements:
-                continue  # Saltar elementos dentro de CommentOut
-                
-            tag = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
-            if tag == 'LogMessage':
-                logs.append({
-                    'message': elem.get('Message', ''),
-                    'level': elem.get('Level', 'Info'),
-                    'display_name': elem.get('DisplayName', ''),
-                })
-        
-        return logs
-    
     def _extract_try_catch_blocks(self) -> List[Dict]:
         """Extraer bloques Try-Catch"""
         try_catches = []
@@ -245,40 +247,108 @@ class XamlParser:
         
         return try_catches
     
-    def _extract_if_activities(self) -> List[Dict]:
-        """Extraer actividades If y calcular anidamiento"""
-        ifs = []
+    def _walk_tree(self) -> Dict[str, List[Dict]]:
+        """
+        Recorrer el árbol una sola vez manteniendo una pila de contexto de ancestros.
         
-        def get_nesting_level(element, level=0):
-            """Calcular nivel de anidamiento de un If"""
-            parent = element.getparent() if hasattr(element, 'getparent') else None
-            if parent is None:
-                return level
-            if parent.tag.endswith('If'):
-                return get_nesting_level(parent, level + 1)
-            return get_nesting_level(parent, level)
+        Cada actividad recibe flags compactos (CTX_*) con su contención
+        (dentro de TryCatch.Try, Catch, Finally, CommentOut, bucle o estado de
+        un StateMachine), de modo que las reglas de contención se resuelven en
+        O(1) por actividad sin buscar ancestros.
         
-        for elem in self.root.iter():
-            if elem.tag.endswith('If'):
-                # Calcular nivel de anidamiento
-                nesting = 0
-                parent = elem
-                for _ in range(10):  # Límite de seguridad
-                    parent_candidates = [p for p in self.root.iter() if elem in list(p)]
-                    if parent_candidates:
-                        for p in parent_candidates:
-                            if p.tag.endswith('If'):
-                                nesting += 1
-                    else:
-                        break
-                
+        Returns:
+            Diccionario con 'activities', 'log_messages', 'if_activities',
+            'invoke_workflow_files' e 'identifier_index'
+        """
+        activities = []
+        logs = []
+        ifs = []
+        invokes = []
+        # Índice invertido: identificador (minúsculas) -> índices de actividad que lo referencian
+        identifier_index = {}
+        
+        # Pila explícita: (elemento, flags, estado actual, nivel de If, tipo del padre, actividad propietaria)
+        stack = [(self.root, 0, None, 0, '', -1)]
+        while stack:
+            elem, flags, state, if_depth, parent_type, owner = stack.pop()
+            tag = elem.tag.split('}')[-1] if '}' in elem.tag else elem.tag
+            display_name = elem.get('DisplayName')
+            
+            if display_name:
+                owner = len(activities)
+                activities.append({
+                    'type': tag,
+                    'display_name': display_name,
+                    'tag': elem.tag,
+                    'index': len(activities),
+                    'parent_type': parent_type,
+                    'context': flags,
+                    'state': state,
+                })
+            
+            # Tokenizar expresiones una sola vez
+            expressions = [
+                value for attr, value in elem.attrib.items()
+                if value.startswith('[') or attr in self.EXPRESSION_ATTRIBUTES
+            ]
+            if elem.text and tag in self.EXPRESSION_ELEMENTS:
+                expressions.append(elem.text)
+            csharp = self.csharp or tag in ('CSharpValue', 'CSharpReference')
+            for expression in expressions:
+                for identifier in tokenize_expression(expression, csharp):
+                    postings = identifier_index.setdefault(identifier, [])
+                    if not postings or postings[-1] != owner:
+                        postings.append(owner)
+            
+            if tag == 'LogMessage' and not flags & CTX_COMMENTED:
+                logs.append({
+                    'message': elem.get('Message', ''),
+                    'level': elem.get('Level', 'Info'),
+                    'display_name': elem.get('DisplayName', ''),
+                })
+            
+            if tag.startswith('InvokeWorkflowFile') and '.' not in tag:
+                invokes.append({
+                    'workflow_file': elem.get('WorkflowFileName', ''),
+                    'display_name': elem.get('DisplayName', ''),
+                    'commented': bool(flags & CTX_COMMENTED),
+                })
+            
+            if tag.endswith('If'):
                 ifs.append({
                     'display_name': elem.get('DisplayName', ''),
                     'condition': elem.get('Condition', ''),
-                    'nesting_level': nesting,
+                    'nesting_level': if_depth,
                 })
+                if_depth += 1
+            
+            # Contexto que heredan los hijos
+            if tag == 'TryCatch.Try':
+                flags |= CTX_IN_TRY
+            elif tag == 'TryCatch.Catches':
+                flags |= CTX_IN_CATCH
+            elif tag == 'TryCatch.Finally':
+                flags |= CTX_IN_FINALLY
+            elif tag == 'CommentOut':
+                flags |= CTX_COMMENTED
+            elif tag == 'State' and display_name:
+                flags |= CTX_IN_STATE
+                state = display_name
+            elif tag in self.LOOP_ACTIVITIES or tag.startswith('ForEach'):
+                flags |= CTX_IN_LOOP
+            
+            child_parent = tag if display_name else parent_type
+            # Insertar en orden inverso para conservar el orden del documento
+            for child in reversed(elem):
+                stack.append((child, flags, state, if_depth, child_parent, owner))
         
-        return ifs
+        return {
+            'activities': activities,
+            'log_messages': logs,
+            'if_activities': ifs,
+            'invoke_workflow_files': invokes,
+            'identifier_index': identifier_index,
+        }
     
     def _detect_commented_code(self) -> Dict:
         """Detectar código XML comentado y actividades CommentOut"""
@@ -0,0 +1,97 @@
+"""
+Test de clasificadores precompilados (ActivityMatcher / NameMatcher)
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.activity_matcher import ActivityMatcher, NameMatcher
+from src.analyzer import BBPPAnalyzer
+
+
+def test_activity_matcher_semantics():
+    """La clasificación equivale a buscar subcadenas y se memoriza por tipo"""
+    print("\n" + "=" * 70)
+    print("TEST: ActivityMatcher")
+    print("=" * 70)
+
+    patterns = ['Click', 'TypeInto', 'InvokeWorkflowFile']
+    matcher = ActivityMatcher({'critical': patterns, 'log': ['LogMessage']})
+
+    for activity_type in ['Click', 'NClick', 'ClickImage', 'TypeIntoX', 'Sequence',
+                          'InvokeWorkflowFile', 'LogMessage', 'Assign']:
+        expected = any(p in activity_type for p in patterns)
+        assert matcher.matches(activity_type, 'critical') == expected, activity_type
+
+    assert matcher.classify('LogMessage') == frozenset({'log'})
+    assert matcher.classify('Sequence') == frozenset()
+
+    # Memorizado: una entrada por tipo distinto
+    size = matcher.cache_size()
+    matcher.classify('Click')
+    assert matcher.cache_size() == size
+
+    print("   ✅ PASS - Clasificación correcta y memorizada")
+    return True
+
+
+def test_name_matcher():
+    """Nombres exactos sin distinguir mayúsculas y patrones combinados"""
+    print("\n" + "=" * 70)
+    print("TEST: NameMatcher")
+    print("=" * 70)
+
+    matcher = NameMatcher(['Temp', 'data'], [r'^var[_]?\d+$', r'^temp[_]?\d+$'])
+
+    assert matcher.check('temp') == 'Nombre genérico exacto'
+    assert matcher.check('DATA') == 'Nombre genérico exacto'
+    assert matcher.check('Var_12') == 'Nombre genérico con número'
+    assert matcher.check('temp3') == 'Nombre genérico con número'
+    assert matcher.check('customerName') is None
+    assert not NameMatcher([], [])
+
+    # Patrones no combinables siguen funcionando por separado
+    fallback = NameMatcher([], [r'(?i)^foo\d+$', r'^bar$'])
+    assert fallback.check('FOO1') == 'Nombre genérico con número'
+    assert fallback.check('bar') == 'Nombre genérico con número'
+
+    print("   ✅ PASS - NameMatcher correcto")
+    return True
+
+
+def test_analyzer_generic_names():
+    """NOMENCLATURA_002 sigue detectando nombres genéricos con el matcher"""
+    print("\n" + "=" * 70)
+    print("TEST: Nombres genéricos en el analizador")
+    print("=" * 70)
+
+    analyzer = BBPPAnalyzer()
+    data = {
+        'file_path': '/test/Main.xaml',
+        'workflow_type': 'Sequence',
+        'variables': [{'name': 'temp'}, {'name': 'var1'}, {'name': 'customerName'}],
+        'arguments': [],
+        'activities': [],
+        'log_messages': [],
+    }
+    findings = analyzer.analyze(data)
+    generic = {f.details.get('variable_name') for f in findings if f.rule_id == 'NOMENCLATURA_002'}
+
+    assert 'temp' in generic
+    assert 'var1' in generic
+    assert 'customerName' not in generic
+
+    print("   ✅ PASS - Nombres genéricos detectados")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_activity_matcher_semantics(),
+        test_name_matcher(),
+        test_analyzer_generic_names(),
+    ]
+    sys.exit(0 if all(results) else 1)
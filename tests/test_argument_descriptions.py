@@ -0,0 +1,68 @@
+"""
+Test de la regla de descripción de argumentos (NOMENCLATURA_004)
+
+Antes la comprobación recorría todas las reglas del conjunto y leía la clave
+'annotation', que el parser no rellena: cada argumento generaba un hallazgo
+por regla (ESTRUCTURA_001, CODIGO_002, ...) aunque estuviera documentado.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.xaml_parser import XamlParser
+from src.analyzer import BBPPAnalyzer
+
+
+TEST_XAML = '''<?xml version="1.0" encoding="utf-8"?>
+<Activity x:Class="Main"
+          xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+          xmlns:sap2010="http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation"
+          xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <x:Members>
+    <x:Property Name="in_Documented" Type="InArgument(x:String)" sap2010:Annotation.AnnotationText="Ruta del archivo de entrada" />
+    <x:Property Name="in_Undocumented" Type="InArgument(x:String)" />
+  </x:Members>
+  <Sequence DisplayName="Main Sequence">
+    <WriteLine Text="[in_Documented + in_Undocumented]" />
+  </Sequence>
+</Activity>
+'''
+
+
+def test_argument_descriptions():
+    """Solo la regla argument_description reporta, y solo argumentos sin descripción"""
+    print("\n" + "=" * 70)
+    print("TEST: Descripción de argumentos")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xaml_path = Path(tmp) / "Main.xaml"
+        xaml_path.write_text(TEST_XAML, encoding='utf-8')
+        data = XamlParser(xaml_path).parse()
+
+    assert data['arguments'][0]['description'] == 'Ruta del archivo de entrada'
+
+    analyzer = BBPPAnalyzer()
+    description_rules = {r['id'] for r in analyzer.rules if r.get('rule_type') == 'argument_description'}
+    findings = [f for f in analyzer.analyze(data) if f.location.startswith('Argumento: ')
+                and 'current_description' in f.details]
+    flagged = sorted((f.rule_id, f.location) for f in findings)
+    print(f"   Hallazgos de descripción: {flagged}")
+
+    assert description_rules
+    assert {f.rule_id for f in findings} <= description_rules, flagged
+    assert {f.location for f in findings} == {'Argumento: in_Undocumented'}, flagged
+
+    print("   ✅ PASS - Un hallazgo por argumento sin descripción")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_argument_descriptions(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,118 @@
+"""
+Test de la persistencia en segundo plano
+Verifica que scan(background_persistence=True) devuelve el resultado sin
+esperar al guardado en BD ni a los reportes, que el callback recibe una
+copia del análisis guardado con las rutas de reportes (el resultado devuelto
+no se modifica desde otro hilo) y que tracemalloc se detiene en el hilo del
+escaneo.
+"""
+
+import copy
+import sys
+import tempfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+import src.config
+from src.config import DEFAULT_CONFIG
+from src.database.metrics_db import get_metrics_db
+from src.persistence_pipeline import submit_persistence, wait_for_persistence
+from src.project_scanner import PERSISTED_RESULT_KEYS, ProjectScanner
+
+
+@contextmanager
+def _temp_app_dirs(tmp: str):
+    """BD de métricas y salida (reportes, cachés) dentro de tmp en vez de data/ y output/"""
+    saved = src.config.DATA_DIR, src.config.OUTPUT_DIR
+    src.config.DATA_DIR, src.config.OUTPUT_DIR = Path(tmp) / 'data', Path(tmp) / 'output'
+    try:
+        yield
+    finally:
+        src.config.DATA_DIR, src.config.OUTPUT_DIR = saved
+
+
+def test_results_before_persistence():
+    """El resultado llega antes que el guardado; el callback trae analysis_id y reportes"""
+    print("\n" + "=" * 70)
+    print("TEST: Resultado antes de la persistencia")
+    print("=" * 70)
+
+    # Ocupar el hilo de persistencia para que el guardado quede en cola
+    gate = threading.Event()
+    blocker = submit_persistence(gate.wait, 30)
+    persisted = []
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'background_proj', files=6, activities=200, seed=43)
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['memory']['accounting'] = True
+        scanner = ProjectScanner(Path(manifest['project_path']), config=config)
+        result = scanner.scan(background_persistence=True, on_persisted=persisted.append)
+
+        assert result['success']
+        assert 'score' in result and 'execution_time' in result
+        assert 'analysis_id' not in result
+        assert 'memory' in result and not tracemalloc.is_tracing()
+        assert scanner.persistence is not None and not scanner.persistence.done()
+        assert persisted == []
+
+        gate.set()
+        blocker.result(timeout=30)
+        saved = scanner.persistence.result(timeout=60)
+        assert wait_for_persistence(timeout=30)
+
+        db = get_metrics_db()
+        assert db.db_path == Path(tmp) / 'data' / 'metrics.db'
+        analysis = db.get_analysis_by_id(saved['analysis_id'])
+        db.close()
+
+    # El hilo de persistencia completa una copia; el llamante fusiona sus campos
+    assert saved is not result and persisted == [saved]
+    assert not any(key in result for key in PERSISTED_RESULT_KEYS if key != 'timings')
+    assert saved['findings'] is result['findings']
+    assert saved['analysis_id'] > 0
+    assert 'db_save' in saved['timings']['phases'] and 'db_save' not in result['timings']['phases']
+
+    assert analysis is not None
+    assert analysis['score'] == result['score']['score']
+    html_path = (saved.get('report_paths') or {}).get('html')
+    if html_path:
+        assert analysis['html_report_path'] == html_path
+        assert html_path.startswith(str(Path(tmp) / 'output'))
+
+    print(f"   ✅ PASS - Análisis {saved['analysis_id']} guardado tras devolver el resultado")
+    return True
+
+
+def test_synchronous_persistence():
+    """Sin background_persistence scan() guarda antes de devolver"""
+    print("\n" + "=" * 70)
+    print("TEST: Persistencia síncrona")
+    print("=" * 70)
+
+    persisted = []
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'sync_proj', files=4, activities=100, seed=44)
+        scanner = ProjectScanner(Path(manifest['project_path']))
+        result = scanner.scan(on_persisted=persisted.append)
+
+    assert scanner.persistence is None
+    assert result['analysis_id'] > 0
+    assert persisted == [result]
+
+    print("   ✅ PASS - Guardado antes de devolver el resultado")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_results_before_persistence(),
+        test_synchronous_persistence(),
+    ]
+    sys.exit(0 if all(results) else 1)
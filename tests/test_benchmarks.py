@@ -0,0 +1,68 @@
+"""
+Test del banco de pruebas por fases (bench/run_benchmarks.py)
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from bench.run_benchmarks import STAGES, benchmark_project, format_summary
+
+
+def test_benchmark_project_stages():
+    """Todas las fases se miden (o se omiten con motivo) y el resultado es JSON"""
+    print("\n" + "=" * 70)
+    print("TEST: Benchmark por fases sobre proyecto sintético")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(Path(tmp) / 'proj', files=8, activities=200, seed=3)
+        measured = benchmark_project(Path(manifest['project_path']), repeat=2)
+
+    assert list(measured['stages']) == STAGES
+    assert measured['xaml_files'] == len(manifest['files'])
+    assert measured['findings'] > 0
+    for stage, metrics in measured['stages'].items():
+        if 'skipped' in metrics:
+            assert stage == 'excel'
+            continue
+        assert len(metrics['samples']) == 2
+        assert metrics['min'] <= metrics['median'] <= metrics['max']
+        assert metrics['peak_memory_kb'] is not None
+
+    json.dumps(measured)
+    print(format_summary({'results': [{'size': 'test', **measured}]}))
+
+    print("   ✅ PASS - Fases medidas")
+    return True
+
+
+def test_benchmark_stage_subset():
+    """Medir solo algunas fases ejecuta igualmente sus prerrequisitos"""
+    print("\n" + "=" * 70)
+    print("TEST: Subconjunto de fases")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(Path(tmp) / 'proj', files=5, activities=100, seed=1)
+        measured = benchmark_project(Path(manifest['project_path']), stages=['html_normal'],
+                                     repeat=1, memory=False)
+
+    assert list(measured['stages']) == ['html_normal']
+    assert measured['stages']['html_normal']['peak_memory_kb'] is None
+
+    print("   ✅ PASS - Prerrequisitos ejecutados")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_benchmark_project_stages(),
+        test_benchmark_stage_subset(),
+    ]
+    sys.exit(0 if all(results) else 1)
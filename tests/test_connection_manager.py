@@ -0,0 +1,143 @@
+"""
+Test del gestor de conexiones de la BD de métricas
+Verifica WAL, conexiones de lectura por hilo, la cola de escritura única y
+que las lecturas no esperan a una escritura en curso.
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.connection_manager import _managers
+from src.database.metrics_db import MetricsDatabase
+
+
+def _analysis(name: str) -> dict:
+    return {'project_path': f'/proyectos/{name}', 'score': {'score': 90}, 'findings': [], 'statistics': {}}
+
+
+def test_wal_and_readers():
+    """WAL activo, un lector de solo lectura por hilo y gestor compartido por archivo"""
+    print("\n" + "=" * 70)
+    print("TEST: WAL y lectores por hilo")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'metrics.db'
+        db = MetricsDatabase(db_path)
+        other = MetricsDatabase(db_path)
+        assert db.manager is other.manager
+        assert db.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert db.conn is other.conn
+
+        thread_conn = []
+        worker = threading.Thread(target=lambda: thread_conn.append(db.conn))
+        worker.start()
+        worker.join()
+        assert thread_conn[0] is not db.conn
+
+        # Los lectores no pueden escribir: las escrituras van por la cola
+        try:
+            db.conn.execute("DELETE FROM analysis_history")
+            assert False, "El lector no debería poder escribir"
+        except sqlite3.OperationalError:
+            pass
+
+        # Cerrar un usuario no cierra el gestor; el último sí
+        other.close()
+        assert not db.manager.closed
+        db.save_analysis(_analysis('tras_cerrar_otro'))
+        db.close()
+        assert db.manager.closed
+        assert str(db_path.resolve()) not in _managers
+
+    print("   ✅ PASS - WAL, lectores por hilo y ciclo de vida")
+    return True
+
+
+def test_reads_not_blocked_by_writes():
+    """Una lectura termina mientras una escritura mantiene abierta su transacción"""
+    print("\n" + "=" * 70)
+    print("TEST: Lecturas sin esperar a escrituras")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        db.save_analysis(_analysis('inicial'))
+
+        in_transaction = threading.Event()
+        release = threading.Event()
+
+        def slow_write(conn):
+            conn.execute("UPDATE analysis_history SET score = 10")
+            in_transaction.set()
+            release.wait(5)
+            return 'ok'
+
+        pending = db.manager.submit(slow_write)
+        assert in_transaction.wait(5)
+        start = time.perf_counter()
+        history = db.get_analysis_history()
+        elapsed = time.perf_counter() - start
+        assert history[0]['score'] == 90  # Instantánea confirmada, sin esperar
+        release.set()
+        assert pending.result(5) == 'ok'
+        assert db.get_analysis_history()[0]['score'] == 10
+
+        db.close()
+
+    print(f"   ✅ PASS - Lectura en {elapsed * 1000:.1f} ms durante una escritura")
+    return True
+
+
+def test_concurrent_writers():
+    """Escrituras desde varios hilos se serializan sin 'database is locked'"""
+    print("\n" + "=" * 70)
+    print("TEST: Escrituras concurrentes")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'metrics.db'
+        errors = []
+
+        def worker(idx: int):
+            try:
+                db = MetricsDatabase(db_path)
+                for n in range(10):
+                    analysis_id = db.save_analysis(_analysis(f'p{idx}'))
+                    db.update_report_paths(analysis_id, html_path=Path(tmp) / f'{idx}_{n}.html')
+                    db.get_analysis_history(limit=5)
+                db.close()
+            except Exception as e:
+                errors.append(e)
+
+        keeper = MetricsDatabase(db_path)
+        threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        rows = keeper.conn.execute(
+            'SELECT COUNT(*), COUNT(html_report_path) FROM analysis_history').fetchone()
+        assert tuple(rows) == (60, 60)
+        keeper.close()
+
+    print("   ✅ PASS - 60 análisis guardados desde 6 hilos")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_wal_and_readers(),
+        test_reads_not_blocked_by_writes(),
+        test_concurrent_writers(),
+    ]
+    sys.exit(0 if all(results) else 1)
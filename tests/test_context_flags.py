@@ -0,0 +1,145 @@
+"""
+Test de flags de contexto del parser (recorrido único con pila de ancestros)
+Verifica TryCatch, CommentOut, bucles y estados de StateMachine, y que
+ESTRUCTURA_003 use esos flags.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.xaml_parser import (
+    XamlParser, CTX_IN_TRY, CTX_IN_CATCH, CTX_COMMENTED, CTX_IN_LOOP, CTX_IN_STATE
+)
+from src.analyzer import BBPPAnalyzer
+
+
+TEST_XAML = '''<?xml version="1.0" encoding="utf-8"?>
+<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+          xmlns:ui="http://schemas.uipath.com/workflow/activities"
+          xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <StateMachine DisplayName="Main">
+    <State DisplayName="Init">
+      <State.Entry>
+        <Sequence DisplayName="Init Sequence">
+          <TryCatch DisplayName="Try Init">
+            <TryCatch.Try>
+              <ui:InvokeWorkflowFile DisplayName="Invoke Protegido" WorkflowFileName="Init.xaml" />
+            </TryCatch.Try>
+            <TryCatch.Catches>
+              <Catch x:TypeArguments="x:Exception">
+                <ui:InvokeWorkflowFile DisplayName="Invoke En Catch" WorkflowFileName="Kill.xaml" />
+              </Catch>
+            </TryCatch.Catches>
+          </TryCatch>
+          <ui:InvokeWorkflowFile DisplayName="Invoke Sin Proteger" WorkflowFileName="Other.xaml" />
+          <ui:CommentOut DisplayName="Comentado">
+            <ui:CommentOut.Body>
+              <ui:InvokeWorkflowFile DisplayName="Invoke Comentado" WorkflowFileName="Old.xaml" />
+              <ui:LogMessage DisplayName="Log Comentado" Message="x" />
+            </ui:CommentOut.Body>
+          </ui:CommentOut>
+          <ui:ForEach x:TypeArguments="x:Object" DisplayName="For Each Item">
+            <ui:ForEach.Body>
+              <ActivityAction x:TypeArguments="x:Object">
+                <If DisplayName="If Externo" Condition="[True]">
+                  <If.Then>
+                    <If DisplayName="If Interno" Condition="[True]">
+                      <If.Then>
+                        <ui:LogMessage DisplayName="Log En Bucle" Message="y" />
+                      </If.Then>
+                    </If>
+                  </If.Then>
+                </If>
+              </ActivityAction>
+            </ui:ForEach.Body>
+          </ui:ForEach>
+        </Sequence>
+      </State.Entry>
+    </State>
+  </StateMachine>
+</Activity>'''
+
+
+def _parse_test_xaml():
+    """Parsear el XAML de prueba desde un archivo temporal"""
+    with tempfile.TemporaryDirectory() as tmp:
+        xaml_path = Path(tmp) / "Main.xaml"
+        xaml_path.write_text(TEST_XAML, encoding='utf-8')
+        return XamlParser(xaml_path).parse()
+
+
+def test_context_flags():
+    """Los flags de contexto reflejan la contención de cada actividad"""
+    print("\n" + "=" * 70)
+    print("TEST: Flags de contexto por actividad")
+    print("=" * 70)
+
+    data = _parse_test_xaml()
+    by_name = {a['display_name']: a for a in data['activities']}
+
+    assert by_name['Invoke Protegido']['context'] & CTX_IN_TRY
+    assert not by_name['Invoke En Catch']['context'] & CTX_IN_TRY
+    assert by_name['Invoke En Catch']['context'] & CTX_IN_CATCH
+    assert not by_name['Invoke Sin Proteger']['context'] & CTX_IN_TRY
+    assert by_name['Invoke Comentado']['context'] & CTX_COMMENTED
+    assert by_name['Log En Bucle']['context'] & CTX_IN_LOOP
+    assert not by_name['Invoke Sin Proteger']['context'] & CTX_IN_LOOP
+    assert by_name['Invoke Sin Proteger']['context'] & CTX_IN_STATE
+    assert by_name['Invoke Sin Proteger']['state'] == 'Init'
+    assert by_name['Invoke Protegido']['parent_type'] == 'TryCatch'
+
+    # Orden del documento preservado
+    indexes = [a['index'] for a in data['activities']]
+    assert indexes == list(range(len(indexes)))
+    assert data['activities'][0]['display_name'] == 'Main'
+
+    print("   ✅ PASS - Flags de contexto correctos")
+    return True
+
+
+def test_logs_and_nesting_from_walk():
+    """Logs comentados excluidos y anidamiento de If calculado"""
+    print("\n" + "=" * 70)
+    print("TEST: Logs y anidamiento desde el recorrido único")
+    print("=" * 70)
+
+    data = _parse_test_xaml()
+    log_names = [log['display_name'] for log in data['log_messages']]
+    nesting = {i['display_name']: i['nesting_level'] for i in data['if_activities']}
+
+    assert log_names == ['Log En Bucle']
+    assert nesting == {'If Externo': 0, 'If Interno': 1}
+
+    print("   ✅ PASS - Logs y anidamiento correctos")
+    return True
+
+
+def test_critical_activities_use_context():
+    """ESTRUCTURA_003 solo reporta actividades críticas fuera de Try y no comentadas"""
+    print("\n" + "=" * 70)
+    print("TEST: ESTRUCTURA_003 con flags de contexto")
+    print("=" * 70)
+
+    data = _parse_test_xaml()
+    analyzer = BBPPAnalyzer()
+    findings = analyzer.analyze(data)
+    locations = sorted(f.location for f in findings if f.rule_id == 'ESTRUCTURA_003')
+    print(f"   Hallazgos ESTRUCTURA_003: {locations}")
+
+    assert locations == ['Invoke En Catch', 'Invoke Sin Proteger']
+
+    print("   ✅ PASS - ESTRUCTURA_003 usa el contexto")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_context_flags(),
+        test_logs_and_nesting_from_walk(),
+        test_critical_activities_use_context(),
+    ]
+    sys.exit(0 if all(results) else 1)
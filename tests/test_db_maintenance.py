@@ -0,0 +1,178 @@
+"""
+Test de la retención, el archivado y la compactación de la BD de métricas
+Verifica que los hallazgos en bruto antiguos se archivan por mes en JSONL.gz
+y se borran conservando los resúmenes, que keep_last_per_project archiva
+antes de eliminar, que compact devuelve el espacio libre y que el
+mantenimiento automático respeta el intervalo configurado.
+"""
+
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.maintenance import apply_retention, read_archive, run_maintenance
+from src.database.metrics_db import MetricsDatabase
+
+NOW = datetime(2025, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _analysis(name, findings=3):
+    return {'project_path': f"/robots/Equipo/{name}", 'score': {'score': 75},
+            'findings': [{'rule_id': f"R{i % 3}", 'rule_name': 'Regla', 'severity': 'warning',
+                          'category': 'general', 'file_path': f"C:/p/{name}_{i}.xaml",
+                          'location': f"Actividad {i}", 'description': f"Hallazgo {name} {i}"}
+                         for i in range(findings)],
+            'statistics': {}}
+
+
+def _set_date(db, analysis_id, date):
+    db._write(lambda conn: conn.execute(
+        'UPDATE analysis_history SET analysis_date = ? WHERE id = ?', (date, analysis_id)))
+
+
+def _raw_rows(db, analysis_id):
+    return db.conn.execute('''
+        SELECT (SELECT COUNT(*) FROM findings_detail WHERE analysis_id = ?)
+             + (SELECT COUNT(*) FROM analysis_results WHERE analysis_id = ?)
+    ''', (analysis_id, analysis_id)).fetchone()[0]
+
+
+def test_retention_archives_raw_findings():
+    """Los hallazgos antiguos van a un archivo por mes; los resúmenes se conservan"""
+    print("\n" + "=" * 70)
+    print("TEST: Retención con archivado mensual")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        january = db.save_analysis(_analysis('Facturas'))
+        february = db.save_analysis(_analysis('Pagos', findings=5))
+        recent = db.save_analysis(_analysis('Nominas'))
+        _set_date(db, january, '2024-01-15 09:00:00')
+        _set_date(db, february, '2024-02-20 09:00:00')
+        _set_date(db, recent, '2025-05-20 09:00:00')
+
+        summary = apply_retention(db, raw_findings_days=90, archive_dir=Path(tmp) / 'archive', now=NOW)
+        assert summary['cutoff'] == '2025-03-03 12:00:00'
+        assert summary['purged_analyses'] == 2 and summary['purged_findings'] == 8
+        assert [Path(p).name for p in summary['archives']] == [
+            'findings-2024-01.jsonl.gz', 'findings-2024-02.jsonl.gz']
+
+        records = list(read_archive(Path(summary['archives'][1])))
+        assert [r['analysis_id'] for r in records] == [february]
+        assert len(records[0]['findings_detail']) == 5
+        assert records[0]['results']['findings'][4]['description'] == 'Hallazgo Pagos 4'
+
+        # Sin hallazgos en bruto, pero con resumen, búsqueda actualizada e intactos los recientes
+        assert _raw_rows(db, january) == 0 and _raw_rows(db, february) == 0
+        assert _raw_rows(db, recent) == 3 + 1
+        assert db.get_history_summary()['total'] == 3
+        assert db.get_analysis_by_id(january)['total_findings'] == 3
+        assert db.search_analyses('Pagos 4') == []
+
+        # Repetir no archiva nada de nuevo
+        again = apply_retention(db, raw_findings_days=90, archive_dir=Path(tmp) / 'archive', now=NOW)
+        assert again['purged_analyses'] == 0 and again['archives'] == []
+        db.close()
+
+    print(f"   ✅ PASS - {summary['purged_findings']} hallazgos archivados en {len(summary['archives'])} archivos")
+    return True
+
+
+def test_keep_last_per_project():
+    """keep_last_per_project archiva y elimina los análisis más antiguos de cada proyecto"""
+    print("\n" + "=" * 70)
+    print("TEST: Conservar los últimos N análisis por proyecto")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        ids = [db.save_analysis(_analysis('Facturas')) for _ in range(4)]
+        for index, analysis_id in enumerate(ids):
+            _set_date(db, analysis_id, f"2025-0{index + 1}-10 08:00:00")
+        other = db.save_analysis(_analysis('Pagos'))
+
+        summary = apply_retention(db, raw_findings_days=0, archive_dir=Path(tmp) / 'archive',
+                                  keep_last_per_project=2, now=NOW)
+        assert summary['deleted_analyses'] == 2 and summary['purged_findings'] == 6
+        remaining = [row['id'] for row in db.get_history_page()]
+        assert sorted(remaining) == sorted([ids[2], ids[3], other])
+        archived = [r['analysis_id'] for path in summary['archives'] for r in read_archive(Path(path))]
+        assert sorted(archived) == sorted(ids[:2])
+        db.close()
+
+    print("   ✅ PASS - Análisis antiguos archivados y eliminados")
+    return True
+
+
+def test_compaction():
+    """compact libera páginas con auto_vacuum incremental y lo activa en BDs antiguas"""
+    print("\n" + "=" * 70)
+    print("TEST: Compactación")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        ids = [db.save_analysis(_analysis(f"Proyecto{i}", findings=400)) for i in range(5)]
+        db.purge_raw_findings(ids)
+        compaction = db.compact()
+        assert compaction['auto_vacuum']
+        assert compaction['pages_after'] < compaction['pages_before'] and compaction['freed_bytes'] > 0
+        db.close()
+
+        # BD creada sin auto_vacuum: solo la compactación completa lo activa
+        legacy_path = Path(tmp) / 'legacy.db'
+        conn = sqlite3.connect(legacy_path)
+        conn.execute('CREATE TABLE anterior (x)')
+        conn.commit()
+        conn.close()
+        db = MetricsDatabase(legacy_path)
+        assert not db.compact()['auto_vacuum']
+        full = db.compact(full=True)
+        assert full['full'] and full['auto_vacuum']
+        db.close()
+
+    print(f"   ✅ PASS - {compaction['freed_bytes'] // 1024} KB liberados")
+    return True
+
+
+def test_scheduled_maintenance():
+    """El mantenimiento automático solo se ejecuta si está activo y pasó el intervalo"""
+    print("\n" + "=" * 70)
+    print("TEST: Mantenimiento programado")
+    print("=" * 70)
+
+    config = {'retention': {'raw_findings_days': 30, 'compact_interval_days': 7}}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        old = db.save_analysis(_analysis('Facturas'))
+        _set_date(db, old, '2025-01-01 00:00:00')
+
+        first = run_maintenance(db, config=config, now=NOW)
+        assert first['retention']['purged_analyses'] == 1
+        assert (Path(tmp) / 'archive' / 'findings-2025-01.jsonl.gz').exists()
+        assert run_maintenance(db, config=config, now=NOW + timedelta(days=3)) is None
+        assert run_maintenance(db, config=config, now=NOW + timedelta(days=8)) is not None
+        assert run_maintenance(db, config=config, now=NOW + timedelta(days=9), force=True) is not None
+
+        disabled = {'retention': {'enabled': False}}
+        assert run_maintenance(db, config=disabled, now=NOW + timedelta(days=30)) is None
+        db.close()
+
+    print("   ✅ PASS - Intervalo y activación respetados")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_retention_archives_raw_findings(),
+        test_keep_last_per_project(),
+        test_compaction(),
+        test_scheduled_maintenance(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,115 @@
+"""
+Test de la agregación de hallazgos en origen
+Verifica que las reglas de nomenclatura emiten un hallazgo por (regla, archivo)
+sin alterar estadísticas ni score, y que el detalle se expande desde el sidecar.
+"""
+
+import copy
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from src.analyzer import Finding
+from src.config import DEFAULT_CONFIG
+from src.database.metrics_db import MetricsDatabase
+from src.finding_aggregation import (FindingSidecar, aggregate_findings, finding_occurrences,
+                                     load_details)
+from src.project_scanner import ProjectScanner
+from src.report_generator import HTMLReportGenerator
+
+
+def _finding(rule_id: str, location: str, penalty: float = 2) -> Finding:
+    return Finding(category='nomenclatura', severity='warning', rule_name=rule_id,
+                   description=f'Regla {rule_id}', file_path='/proj/Main.xaml', location=location,
+                   details={'penalty_mode': 'individual', 'base_penalty': penalty,
+                            'cases_found': 1, 'actual_penalty': penalty},
+                   rule_id=rule_id, penalty=penalty)
+
+
+def test_aggregate_findings():
+    """Un hallazgo por regla con ocurrencias, muestras y penalización sumada"""
+    print("\n" + "=" * 70)
+    print("TEST: aggregate_findings")
+    print("=" * 70)
+
+    findings = [_finding('NOM_001', f'Variable: v{i}') for i in range(5)] + [_finding('NOM_002', 'Variable: x')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sidecar = FindingSidecar(Path(tmp) / 'detail.jsonl')
+        aggregated = aggregate_findings(findings, max_samples=2, sidecar=sidecar)
+        sidecar.close()
+
+        assert [f.rule_id for f in aggregated] == ['NOM_001', 'NOM_002']
+        group, single = aggregated
+        assert single is findings[5]
+        assert group.occurrences == 5 and single.occurrences == 1
+        assert group.penalty == 10 and group.details['cases_found'] == 5
+        assert [s['location'] for s in group.details['samples']] == ['Variable: v0', 'Variable: v1']
+
+        data = group.to_dict()
+        assert finding_occurrences(data) == 5
+        expanded = load_details(data)
+        assert [f['location'] for f in expanded] == [f'Variable: v{i}' for i in range(5)]
+        assert load_details(single.to_dict()) == [single.to_dict()]
+
+    # Sin sidecar solo se pueden expandir las muestras
+    without_sidecar = aggregate_findings(findings[:3], max_samples=2)[0].to_dict()
+    assert 'detail_ref' not in without_sidecar['details']
+    assert len(load_details(without_sidecar)) == 2
+
+    print("   ✅ PASS - Agregado con muestras y detalle completo")
+    return True
+
+
+def test_scan_with_aggregation():
+    """Con agregación, estadísticas y score son idénticos y el detalle se recupera"""
+    print("\n" + "=" * 70)
+    print("TEST: Escaneo con agregación")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(Path(tmp) / 'proj', files=15, activities=600, seed=8)
+        project_path = Path(manifest['project_path'])
+
+        full = ProjectScanner(project_path).scan()
+
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['aggregation'].update({'enabled': True, 'max_samples': 1})
+        aggregated = ProjectScanner(project_path, config=config).scan()
+
+        assert len(aggregated['findings']) < len(full['findings'])
+        assert aggregated['statistics'] == full['statistics']
+        assert aggregated['score'] == full['score']
+        assert Path(aggregated['findings_sidecar']).exists()
+        assert full['findings_sidecar'] is None
+
+        # Expandir todos los agregados reproduce los hallazgos individuales
+        key = lambda f: (f['rule_id'], f['file_path'], f['location'])
+        expanded = [item for f in aggregated['findings'] for item in load_details(f)]
+        assert Counter(map(key, expanded)) == Counter(map(key, full['findings']))
+
+        # El reporte muestra la muestra y el resto de ocurrencias
+        html_path = HTMLReportGenerator(aggregated, Path(tmp) / 'report.html').generate()
+        assert '… y ' in html_path.read_text(encoding='utf-8')
+
+        # La BD cuenta ocurrencias, no hallazgos agregados
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        analysis = db.get_analysis_by_id(db.save_analysis(aggregated))
+        db.close()
+        assert analysis['total_findings'] == full['statistics']['total_findings']
+
+    print(f"   ✅ PASS - {len(full['findings'])} hallazgos -> {len(aggregated['findings'])} agregados")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_aggregate_findings(),
+        test_scan_with_aggregation(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,228 @@
+"""
+Test de huellas de hallazgos y línea base
+Verifica que las huellas son estables ante desplazamientos de línea y que la
+línea base (archivo o BD) resta los hallazgos aceptados del score y los reportes.
+"""
+
+import copy
+import json
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.config
+from bench.synthetic_project import generate_project
+from src.config import DEFAULT_CONFIG
+from src.finding_baseline import (FindingBaseline, assign_fingerprints, baseline_entries,
+                                  finding_fingerprint)
+from src.project_scanner import ProjectScanner
+from src.report_generator import HTMLReportGenerator
+
+
+@contextmanager
+def _temp_app_dirs(tmp: str):
+    """BD de métricas y salida en tmp: los análisis guardados no llegan a data/ ni output/"""
+    saved = src.config.DATA_DIR, src.config.OUTPUT_DIR
+    src.config.DATA_DIR, src.config.OUTPUT_DIR = Path(tmp) / 'data', Path(tmp) / 'output'
+    try:
+        yield
+    finally:
+        src.config.DATA_DIR, src.config.OUTPUT_DIR = saved
+
+
+def _finding(location: str, file_path: str = '/a/proj/Main.xaml', **details) -> dict:
+    return {'rule_id': 'ERR_001', 'file_path': file_path, 'location': location, 'details': details}
+
+
+def test_fingerprint_stability():
+    """La huella ignora números de línea y la raíz del proyecto, no el elemento afectado"""
+    print("\n" + "=" * 70)
+    print("TEST: Estabilidad de huellas")
+    print("=" * 70)
+
+    base = finding_fingerprint(_finding('Try-Catch (línea aprox. 12)'), Path('/a/proj'))
+    assert finding_fingerprint(_finding('Try-Catch (línea aprox. 40)'), Path('/a/proj')) == base
+    assert finding_fingerprint(_finding('Try-Catch (línea aprox. 12)', '/b/copy/Main.xaml'),
+                               Path('/b/copy')) == base
+    assert finding_fingerprint(_finding('Try-Catch (línea aprox. 12)', '/a/proj/Other.xaml'),
+                               Path('/a/proj')) != base
+
+    var1 = finding_fingerprint(_finding('Variable: var1', variable_name='var1'), Path('/a/proj'))
+    var2 = finding_fingerprint(_finding('Variable: var2', variable_name='var2'), Path('/a/proj'))
+    assert var1 != var2
+
+    # Hallazgos idénticos en el mismo lote se distinguen por sufijo
+    batch = assign_fingerprints([_finding('Try-Catch (línea aprox. 1)'),
+                                 _finding('Try-Catch (línea aprox. 9)')], Path('/a/proj'))
+    assert [f['fingerprint'] for f in batch] == [base, f'{base}:1']
+
+    print("   ✅ PASS - Huellas estables")
+    return True
+
+
+def _aggregated(occurrences: int) -> dict:
+    return {'rule_id': 'NOM_001', 'file_path': '/a/proj/Main.xaml', 'location': f'{occurrences} ocurrencias',
+            'details': {'aggregated': True, 'occurrences': occurrences}}
+
+
+def _single() -> dict:
+    return {'rule_id': 'NOM_001', 'file_path': '/a/proj/Main.xaml', 'location': 'Variable: x',
+            'details': {'variable_name': 'x'}}
+
+
+def _accept(findings: list) -> FindingBaseline:
+    return FindingBaseline(baseline_entries(assign_fingerprints(findings, Path('/a/proj')), Path('/a/proj')),
+                           Path('/a/proj'))
+
+
+def _apply(baseline: FindingBaseline, finding: dict) -> dict:
+    baseline.reset()
+    finding = assign_fingerprints([finding], Path('/a/proj'))[0]
+    baseline.apply(finding)
+    return finding
+
+
+def test_aggregated_growth():
+    """Un grupo agregado aceptado solo suprime las ocurrencias aceptadas"""
+    print("\n" + "=" * 70)
+    print("TEST: Crecimiento de hallazgos agregados")
+    print("=" * 70)
+
+    # 5 -> 50 ocurrencias: 45 nuevas; 5 -> 3: todo aceptado
+    baseline = _accept([_aggregated(5)])
+    grown = _apply(baseline, _aggregated(50))
+    assert not grown['suppressed'] and grown['new_occurrences'] == 45
+    assert _apply(baseline, _aggregated(3))['suppressed']
+
+    # 1 -> 2: el hallazgo individual aceptado cuenta para su grupo
+    baseline = _accept([_single()])
+    pair = _apply(baseline, _aggregated(2))
+    assert not pair['suppressed'] and pair['new_occurrences'] == 1
+    assert baseline.fixed() == 0
+
+    # 2 -> 1: el único hallazgo que queda está aceptado
+    baseline = _accept([_aggregated(2)])
+    assert _apply(baseline, _single())['suppressed']
+
+    # Línea base anterior a los recuentos: el agregado se acepta entero
+    legacy = FindingBaseline({finding_fingerprint(_aggregated(5), Path('/a/proj')): {}}, Path('/a/proj'))
+    assert _apply(legacy, _aggregated(50))['suppressed']
+
+    print("   ✅ PASS - Solo el exceso de ocurrencias es nuevo")
+    return True
+
+
+def test_baseline_file_flow():
+    """Aceptar la línea base deja 0 nuevos; los cambios de línea no generan nuevos"""
+    print("\n" + "=" * 70)
+    print("TEST: Línea base en archivo")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'baseline_file_proj', files=10, activities=400, seed=11)
+        project_path = Path(manifest['project_path'])
+
+        scanner = ProjectScanner(project_path)
+        first = scanner.scan()
+        assert first['baseline'] is None
+        assert all('fingerprint' in f for f in first['findings'])
+
+        baseline_path = Path(scanner.save_baseline(first))
+        assert baseline_path == project_path / 'bbpp-baseline.json'
+
+        accepted = ProjectScanner(project_path).scan()
+        baseline = accepted['baseline']
+        assert baseline['source'] == str(baseline_path)
+        assert baseline['new'] == 0 and baseline['fixed'] == 0
+        assert baseline['suppressed'] == first['statistics']['total_findings']
+        assert baseline['score_all'] == first['score']['score']
+        assert accepted['score']['score'] == 100
+        assert accepted['statistics'] == first['statistics']
+
+        # Desplazar líneas (comentario al principio) no crea hallazgos nuevos
+        main_xaml = project_path / 'Main.xaml'
+        content = main_xaml.read_text(encoding='utf-8')
+        header_end = content.index('?>') + 2 if content.startswith('<?xml') else 0
+        main_xaml.write_text(content[:header_end] + '\n\n\n' + content[header_end:], encoding='utf-8')
+        shifted = ProjectScanner(project_path).scan()
+        assert shifted['baseline']['new'] == 0
+
+        # Quitar huellas de la línea base: esos hallazgos vuelven a ser nuevos
+        document = json.loads(baseline_path.read_text(encoding='utf-8'))
+        removed = sorted(document['findings'])[:3]
+        for fingerprint in removed:
+            del document['findings'][fingerprint]
+        baseline_path.write_text(json.dumps(document), encoding='utf-8')
+
+        partial = ProjectScanner(project_path).scan()
+        new_findings = [f for f in partial['findings'] if not f['suppressed']]
+        assert sorted(f['fingerprint'] for f in new_findings) == removed
+        assert partial['baseline']['new'] == partial['baseline']['new_statistics']['total_findings'] >= 3
+        assert partial['score']['score'] < 100
+
+        # El reporte lista solo los nuevos y muestra el resumen de línea base
+        report = HTMLReportGenerator(partial, Path(tmp) / 'report.html').generate().read_text(encoding='utf-8')
+        assert 'Nuevos vs Línea Base' in report
+        assert report.count('class="location-item"') == sum(
+            1 for f in new_findings if f['category'] != 'dependencias' and f['location'])
+
+        # Eliminar un workflow con hallazgos aceptados los cuenta como corregidos
+        removed_file = next(f['file_path'] for f in partial['findings']
+                            if f['suppressed'] and Path(f['file_path']).name != 'Main.xaml'
+                            and Path(f['file_path']).exists() and f['file_path'].endswith('.xaml'))
+        Path(removed_file).unlink()
+        after_delete = ProjectScanner(project_path).scan()
+        assert after_delete['baseline']['fixed'] > 0
+
+    print("   ✅ PASS - Nuevos frente a línea base en score y reporte")
+    return True
+
+
+def test_baseline_db():
+    """Sin archivo, la línea base se lee de la tabla finding_baseline"""
+    print("\n" + "=" * 70)
+    print("TEST: Línea base en BD")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'baseline_db_proj', files=6, activities=200, seed=12)
+        project_path = Path(manifest['project_path'])
+
+        scanner = ProjectScanner(project_path)
+        first = scanner.scan()
+        assert scanner.save_baseline(first, target='db') == 'db'
+
+        accepted = ProjectScanner(project_path).scan()
+        assert accepted['baseline']['source'] == 'db'
+        assert accepted['baseline']['new'] == 0
+
+        # Desactivar la línea base restaura el comportamiento anterior
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['baseline']['enabled'] = False
+        disabled = ProjectScanner(project_path, config=config).scan()
+        assert disabled['baseline'] is None
+        assert disabled['score'] == first['score']
+        assert not any('suppressed' in f for f in disabled['findings'])
+
+        from src.database.metrics_db import get_metrics_db
+        db = get_metrics_db()
+        db.clear_finding_baseline(project_path.name)
+        assert db.get_finding_baseline(project_path.name) == {}
+        db.close()
+
+    print("   ✅ PASS - Línea base desde la BD")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_fingerprint_stability(),
+        test_aggregated_growth(),
+        test_baseline_file_flow(),
+        test_baseline_db(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,108 @@
+"""
+Test de la paginación por clave del historial de análisis
+Verifica que get_history_page recorre todo el historial sin repetir ni saltar
+filas (también con fechas empatadas), que filtra por proyecto usando los
+índices, que no carga metadata y que get_history_summary calcula los totales.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.metrics_db import HISTORY_LIST_COLUMNS, MetricsDatabase
+
+
+def _fill_history(db, rows: int) -> None:
+    """Insertar análisis directamente (varios por segundo: fechas empatadas)"""
+    def insert(conn):
+        conn.executemany('''
+            INSERT INTO analysis_history (project_name, project_path, analysis_date, score, metadata)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(f"Proyecto{i % 3}", f"/proyectos/Proyecto{i % 3}",
+               f"2025-01-{1 + i // 40:02d} 10:00:{(i // 4) % 10:02d}", float(i % 100), '{"x": 1}')
+              for i in range(rows)])
+    db._write(insert)
+
+
+def _all_pages(db, project=None, page_size=50):
+    pages = []
+    after = None
+    while True:
+        page = db.get_history_page(project, after=after, page_size=page_size)
+        pages.append(page)
+        if len(page) < page_size:
+            return pages
+        after = (page[-1]['analysis_date'], page[-1]['id'])
+
+
+def test_keyset_pages():
+    """Las páginas cubren el historial completo en orden (fecha, id) descendente"""
+    print("\n" + "=" * 70)
+    print("TEST: Paginación por clave del historial")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        _fill_history(db, 437)
+
+        rows = [row for page in _all_pages(db) for row in page]
+        expected = db.conn.execute(
+            'SELECT id FROM analysis_history ORDER BY analysis_date DESC, id DESC').fetchall()
+        assert [row['id'] for row in rows] == [row[0] for row in expected]
+        assert set(rows[0]) == set(HISTORY_LIST_COLUMNS) and 'metadata' not in rows[0]
+
+        project_rows = [row for page in _all_pages(db, 'Proyecto1', page_size=30) for row in page]
+        assert len(project_rows) == len([i for i in range(437) if i % 3 == 1])
+        assert {row['project_name'] for row in project_rows} == {'Proyecto1'}
+
+        # Sin ordenación en memoria: ambas consultas recorren un índice
+        for project in (None, 'Proyecto1'):
+            conditions = ['(analysis_date, id) < (?, ?)']
+            params = ['2025-01-05 10:00:00', 100]
+            if project:
+                conditions.insert(0, 'project_name = ?')
+                params.insert(0, project)
+            plan = ' '.join(row[3] for row in db.conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM analysis_history WHERE {' AND '.join(conditions)} "
+                "ORDER BY analysis_date DESC, id DESC LIMIT 50", params))
+            assert 'idx_history' in plan and 'TEMP B-TREE' not in plan, plan
+        db.close()
+
+    print(f"   ✅ PASS - {len(rows)} análisis en páginas sin duplicados ni huecos")
+    return True
+
+
+def test_history_summary():
+    """Totales del historial calculados en SQL"""
+    print("\n" + "=" * 70)
+    print("TEST: Resumen del historial")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        assert db.get_history_summary() == {'total': 0, 'avg_score': None, 'last_score': None}
+
+        _fill_history(db, 90)
+        summary = db.get_history_summary()
+        assert summary['total'] == 90
+        assert abs(summary['avg_score'] - sum(i % 100 for i in range(90)) / 90) < 1e-9
+        assert summary['last_score'] == db.get_history_page(page_size=1)[0]['score'] == 89.0
+
+        project_summary = db.get_history_summary('Proyecto2')
+        assert project_summary['total'] == 30
+        assert project_summary['last_score'] == 89.0
+        db.close()
+
+    print("   ✅ PASS - Total, score promedio y último score")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_keyset_pages(),
+        test_history_summary(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,169 @@
+"""
+Test del grafo de invocaciones: workflows no alcanzables, invocaciones rotas,
+conjuntos de impacto y reanálisis incremental
+"""
+
+import sys
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.invocation_graph import InvocationGraph
+from src.project_scanner import ProjectScanner
+
+
+def _workflow(*invokes, commented=()):
+    """Generar un XAML mínimo con InvokeWorkflowFile (opcionalmente comentados)"""
+    body = ''.join(
+        f'<ui:InvokeWorkflowFile DisplayName="Invoke {name}" WorkflowFileName="{name}" />'
+        for name in invokes
+    )
+    if commented:
+        body += '<ui:CommentOut DisplayName="Comentado"><ui:CommentOut.Body>' + ''.join(
+            f'<ui:InvokeWorkflowFile DisplayName="Old {name}" WorkflowFileName="{name}" />'
+            for name in commented
+        ) + '</ui:CommentOut.Body></ui:CommentOut>'
+    return f'''<?xml version="1.0" encoding="utf-8"?>
+<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+          xmlns:ui="http://schemas.uipath.com/workflow/activities">
+  <Sequence DisplayName="Main Sequence">{body}</Sequence>
+</Activity>'''
+
+
+def _create_project(root: Path):
+    """Proyecto: Main -> Framework/Init -> Missing.xaml (inexistente); Orphan sin invocar"""
+    (root / 'Framework').mkdir()
+    (root / 'project.json').write_text(json.dumps({
+        'name': 'ABC_DEF_GraphTest',
+        'entryPoints': [{'filePath': 'Main.xaml'}],
+        'dependencies': {},
+    }), encoding='utf-8')
+    (root / 'Main.xaml').write_text(_workflow('Framework\\Init.xaml', commented=('Orphan.xaml',)), encoding='utf-8')
+    (root / 'Framework' / 'Init.xaml').write_text(_workflow('Missing.xaml', 'Helper.xaml'), encoding='utf-8')
+    (root / 'Framework' / 'Helper.xaml').write_text(_workflow(), encoding='utf-8')
+    (root / 'Orphan.xaml').write_text(_workflow(), encoding='utf-8')
+
+
+def test_graph_findings_and_rescan():
+    """Detecta no alcanzables, invocaciones rotas y reanaliza solo el impacto"""
+    print("\n" + "=" * 70)
+    print("TEST: Grafo de invocaciones en ProjectScanner")
+    print("=" * 70)
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        _create_project(tmp)
+        scanner = ProjectScanner(tmp)
+        result = scanner.scan()
+        graph = result['invocation_graph']
+        print(f"   Grafo: {graph}")
+
+        assert graph['nodes'] == 4
+        assert graph['unreachable'] == ['Orphan.xaml']
+        assert graph['unresolved'] == [{'source': 'Framework/Init.xaml', 'workflow_file': 'Missing.xaml'}]
+        # 'Helper.xaml' se resuelve relativo a la carpeta del invocador
+        assert 'Framework/Helper.xaml' not in graph['unreachable']
+
+        missing = [f for f in result['findings'] if f['rule_id'] == 'MODULARIZACION_005']
+        assert len(missing) == 1 and missing[0]['file_path'].endswith('Init.xaml')
+
+        # Crear el archivo que faltaba: se re-parsea solo él y se reevalúa su invocador
+        (tmp / 'Missing.xaml').write_text(_workflow(), encoding='utf-8')
+        result = scanner.rescan([tmp / 'Missing.xaml'])
+        print(f"   Incremental: {result['incremental']}")
+
+        assert result['incremental']['impacted'] == ['Missing.xaml', 'Framework/Init.xaml']
+        assert not [f for f in result['findings'] if f['rule_id'] == 'MODULARIZACION_005']
+        assert result['invocation_graph']['unreachable'] == ['Orphan.xaml']
+        assert result['analyzed_files'] == 5
+
+        # Eliminar un workflow invocado: su invocador vuelve a tener una invocación rota
+        (tmp / 'Framework' / 'Helper.xaml').unlink()
+        result = scanner.rescan(['Framework/Helper.xaml'])
+        missing = [f['details']['workflow_file'] for f in result['findings'] if f['rule_id'] == 'MODULARIZACION_005']
+        assert missing == ['Helper.xaml']
+        assert result['analyzed_files'] == 4
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("   ✅ PASS - Grafo e impacto correctos")
+    return True
+
+
+def test_unreachable_with_dynamic_invocations():
+    """Con invocaciones de ruta dinámica alcanzables no se marcan workflows no alcanzables"""
+    print("\n" + "=" * 70)
+    print("TEST: No alcanzables con invocaciones dinámicas")
+    print("=" * 70)
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        _create_project(tmp)
+        static = ProjectScanner(tmp).scan()
+        assert len([f for f in static['findings'] if f['rule_id'] == 'MODULARIZACION_004']) == 1
+        assert static['invocation_graph']['dynamic_sources'] == []
+
+        (tmp / 'Framework' / 'Helper.xaml').write_text(
+            _workflow('[basePath + &quot;Orphan.xaml&quot;]'), encoding='utf-8')
+        result = ProjectScanner(tmp).scan()
+        graph = result['invocation_graph']
+        assert graph['dynamic_invocations'] == 1
+        assert graph['dynamic_sources'] == ['Framework/Helper.xaml']
+        assert graph['unreachable'] == ['Orphan.xaml']
+        assert not [f for f in result['findings'] if f['rule_id'] == 'MODULARIZACION_004']
+
+        # Una invocación dinámica desde un workflow no alcanzable no cambia nada
+        (tmp / 'Framework' / 'Helper.xaml').write_text(_workflow(), encoding='utf-8')
+        (tmp / 'Orphan.xaml').write_text(_workflow('[basePath + &quot;Other.xaml&quot;]'), encoding='utf-8')
+        result = ProjectScanner(tmp).scan()
+        assert result['invocation_graph']['dynamic_sources'] == []
+        assert len([f for f in result['findings'] if f['rule_id'] == 'MODULARIZACION_004']) == 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("   ✅ PASS - Sin falsos no alcanzables con rutas dinámicas")
+    return True
+
+
+def test_graph_queries_scale():
+    """Las consultas siguen siendo rápidas con 1.000 workflows"""
+    print("\n" + "=" * 70)
+    print("TEST: Rendimiento del grafo con 1.000 nodos")
+    print("=" * 70)
+
+    parsed_files = []
+    for i in range(1000):
+        invokes = [{'workflow_file': f'Workflows\\W{j}.xaml'} for j in (2 * i + 1, 2 * i + 2) if j < 1000]
+        parsed_files.append({'file_path': f'/proj/Workflows/W{i}.xaml', 'invoke_workflow_files': invokes})
+    parsed_files.append({'file_path': '/proj/Main.xaml',
+                         'invoke_workflow_files': [{'workflow_file': 'Workflows/W0.xaml'}]})
+
+    start = time.perf_counter()
+    graph = InvocationGraph.build(Path('/proj'), parsed_files)
+    unreachable = graph.unreachable(['Main.xaml'])
+    impact = graph.impact_set(['Workflows/W999.xaml'])
+    callers = graph.callers('Workflows/W999.xaml', transitive=True)
+    elapsed = time.perf_counter() - start
+    print(f"   Construcción + consultas: {elapsed * 1000:.1f} ms")
+
+    assert unreachable == []
+    assert impact == ['Workflows/W999.xaml', 'Workflows/W499.xaml']
+    assert 'Main.xaml' in callers
+    assert elapsed < 1.0
+
+    print("   ✅ PASS - Consultas rápidas")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_graph_findings_and_rescan(),
+        test_unreachable_with_dynamic_invocations(),
+        test_graph_queries_scale(),
+    ]
+    sys.exit(0 if all(results) else 1)
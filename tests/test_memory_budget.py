@@ -0,0 +1,265 @@
+"""
+Test del modo de presupuesto de memoria
+Verifica FindingStore, el resumen de parsed_files, la contabilidad por fase
+con tracemalloc y el paso a modo de baja memoria del escáner.
+"""
+
+import copy
+import gc
+import pickle
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.config
+from bench.synthetic_project import generate_project
+from src.config import DEFAULT_CONFIG
+from src.database.metrics_db import get_metrics_db
+from src.memory_budget import FindingStore, MemoryAccountant, summarize_parsed_file, parsed_count
+from src.project_scanner import ProjectScanner
+from src.report_generator import HTMLReportGenerator
+from src.xaml_parser import XamlParser
+
+
+@contextmanager
+def _temp_app_dirs(tmp: str):
+    """BD de métricas y salida en tmp: los análisis guardados no llegan a data/ ni output/"""
+    saved = src.config.DATA_DIR, src.config.OUTPUT_DIR
+    src.config.DATA_DIR, src.config.OUTPUT_DIR = Path(tmp) / 'data', Path(tmp) / 'output'
+    try:
+        yield
+    finally:
+        src.config.DATA_DIR, src.config.OUTPUT_DIR = saved
+
+
+def _config(**memory):
+    """DEFAULT_CONFIG con la sección 'memory' indicada"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config['memory'].update(memory)
+    return config
+
+
+def test_finding_store():
+    """Los hallazgos volcados se releen igual, por índice, slice e iteración"""
+    print("\n" + "=" * 70)
+    print("TEST: FindingStore")
+    print("=" * 70)
+
+    store = FindingStore()
+    findings = [{'rule_id': f'R{i}', 'description': f'Descripción ñ {i}', 'severity': 'info'}
+                for i in range(10)]
+    store.extend(findings)
+
+    assert len(store) == 10
+    assert list(store) == findings
+    assert store[3] == findings[3]
+    assert store[-1] == findings[-1]
+    assert store[2:5] == findings[2:5]
+
+    store.truncate(4)
+    store.append({'rule_id': 'X'})
+    assert len(store) == 5
+    assert list(store) == findings[:4] + [{'rule_id': 'X'}]
+
+    # Sin descriptor abierto las lecturas usan uno temporal y añadir lo reabre
+    store.release()
+    assert store[4] == {'rule_id': 'X'} and store[1:3] == findings[1:3]
+    store.append({'rule_id': 'Y'})
+    store.release()
+    assert len(list(store)) == 6
+
+    # pickle copia los hallazgos a un FindingStore propio e independiente
+    copied = pickle.loads(pickle.dumps({'findings': store}))['findings']
+    assert isinstance(copied, FindingStore) and copied.path != store.path
+    assert list(copied) == list(store)
+
+    path = Path(store.path)
+    store.close()
+    assert not path.exists()
+    assert copied[5] == {'rule_id': 'Y'}
+
+    # Un resultado descartado sin close() no deja el archivo atrás
+    copied_path = Path(copied.path)
+    del copied
+    gc.collect()
+    assert not copied_path.exists()
+
+    print("   ✅ PASS - Ida y vuelta, slice, truncado y pickle")
+    return True
+
+
+def test_summarize_parsed_file():
+    """El resumen conserva campos ligeros y sustituye listas por contadores"""
+    print("\n" + "=" * 70)
+    print("TEST: Resumen de parsed_data")
+    print("=" * 70)
+
+    parsed = {
+        'file_path': 'C:/p/Main.xaml',
+        'file_name': 'Main.xaml',
+        'activities': [{}, {}, {}],
+        'variables': [{}],
+        'invoke_workflow_files': ['Sub.xaml'],
+        'total_lines': 120,
+        'raw_content': 'x' * 1000,
+    }
+    summary = summarize_parsed_file(parsed)
+
+    assert summary['summarized'] is True
+    assert 'activities' not in summary and 'raw_content' not in summary
+    assert summary['invoke_workflow_files'] == ['Sub.xaml']
+    assert parsed_count(summary, 'activities') == 3
+    assert parsed_count(parsed, 'activities') == 3
+    assert parsed_count(summary, 'arguments') == 0
+    assert summarize_parsed_file(summary) is summary
+
+    print("   ✅ PASS - Contadores equivalentes a las listas")
+    return True
+
+
+def test_memory_accounting_phases():
+    """Con contabilidad activa se registran fases y mayores asignadores"""
+    print("\n" + "=" * 70)
+    print("TEST: Contabilidad de memoria por fase")
+    print("=" * 70)
+
+    accountant = MemoryAccountant(top=5)
+    accountant.start()
+    data = [str(i) * 10 for i in range(20000)]
+    entry = accountant.checkpoint('build')
+    accountant.stop()
+
+    assert entry['delta_kb'] > 0
+    assert 0 < len(entry['top']) <= 5
+    assert entry['top'][0]['location'].rsplit(':', 1)[1].isdigit()
+    report = accountant.to_dict()
+    assert report['exceeded'] is False and report['budget_mb'] is None
+    assert report['phases'][0]['phase'] == 'build'
+    assert 'build' in accountant.format_report()
+    del data
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'proj', files=6, activities=150, seed=3)
+        scanner = ProjectScanner(Path(manifest['project_path']), config=_config(accounting=True))
+        result = scanner.scan()
+
+    phases = [entry['phase'] for entry in result['memory']['phases']]
+    for phase in ('discovery', 'analysis', 'project_checks', 'invocation_graph', 'result'):
+        assert phase in phases, phase
+    assert result['memory']['exceeded'] is False
+    assert result['low_memory'] is False
+    assert isinstance(result['findings'], list)
+
+    print(f"   ✅ PASS - {len(phases)} fases registradas")
+    return True
+
+
+def test_scan_over_budget():
+    """Superar el presupuesto resume parsed_files y vuelca hallazgos sin cambiar el resultado"""
+    print("\n" + "=" * 70)
+    print("TEST: Escaneo con presupuesto superado")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'proj', files=12, activities=400, seed=9)
+        project_path = Path(manifest['project_path'])
+
+        expected = ProjectScanner(project_path).scan()
+
+        # Presupuesto mínimo: se supera ya tras el descubrimiento
+        scanner = ProjectScanner(project_path, config=_config(budget_mb=0.001))
+        result = scanner.scan()
+
+        assert result['low_memory'] is True
+        assert result['memory']['exceeded_at'] == 'discovery'
+        assert isinstance(result['findings'], FindingStore)
+        assert result['findings']._resources['file'] is None  # Descriptor liberado al construir
+        assert list(result['findings']) == expected['findings']
+        assert result['statistics']['total_findings'] == len(result['findings'])
+        assert result['statistics']['total_activities'] == expected['statistics']['total_activities']
+        assert result['score']['score'] == expected['score']['score']
+        assert all(p.get('summarized') for p in result['parsed_files'])
+        assert 'analysis_id' in result
+
+        # Los resultados persistidos se comprimen en streaming desde el FindingStore
+        db = get_metrics_db()
+        restored = db.get_results(result['analysis_id'])
+        db.close()
+        assert restored['findings'] == expected['findings']
+
+        html_path = HTMLReportGenerator(result).generate()
+        assert Path(html_path).exists()
+
+        # Presupuesto superado a mitad del análisis (tras el cuarto archivo)
+        scanner = ProjectScanner(project_path, config=_config(budget_mb=1024))
+
+        def lower_budget(file_name, percentage):
+            if scanner.parsed_files and len(scanner.parsed_files) == 3:
+                scanner.memory.budget_bytes = 1
+
+        result = scanner.scan(progress_callback=lower_budget)
+        rel_paths = [p.relative_to(project_path).as_posix() for p in scanner.xaml_files]
+
+        assert result['memory']['exceeded_at'] == rel_paths[3]
+        assert list(result['findings']) == expected['findings']
+        assert result['statistics'] == expected['statistics']
+
+        # rescan no puede ser incremental sin los parsed_data completos
+        rescanned = scanner.rescan([scanner.xaml_files[0]])
+        assert 'incremental' not in rescanned
+
+    print(f"   ✅ PASS - {len(expected['findings'])} hallazgos idénticos en modo de baja memoria")
+    return True
+
+
+def test_lean_results():
+    """En modo lean solo sobreviven estadísticas por archivo; el resultado no cambia"""
+    print("\n" + "=" * 70)
+    print("TEST: Resultados lean")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'proj', files=8, activities=300, seed=4)
+        project_path = Path(manifest['project_path'])
+
+        parser = XamlParser(project_path / 'Main.xaml')
+        parser.parse()
+        parser.release()
+        assert parser.tree is None and parser.root is None and parser.parsed_data == {}
+
+        # Desactivado por defecto: parsed_files completos
+        full = ProjectScanner(project_path).scan()
+        scanner = ProjectScanner(project_path, config=_config(lean_results=True))
+        lean = scanner.scan()
+
+        assert full['lean_results'] is False and lean['lean_results'] is True
+        assert all('activities' in p for p in full['parsed_files'])
+        assert all(p.get('summarized') and 'activities' not in p for p in lean['parsed_files'])
+        assert all('comments' not in p['commented_code'] for p in lean['parsed_files'])
+        assert lean['findings'] == full['findings']
+        assert lean['statistics'] == full['statistics']
+        assert lean['invocation_graph'] == full['invocation_graph']
+        assert 'SCORE GLOBAL' in scanner.get_summary()
+
+        # El reanálisis incremental sigue funcionando con parsed_files resumidos
+        rescanned = scanner.rescan([project_path / 'Main.xaml'])
+        assert 'incremental' in rescanned
+        assert rescanned['findings'] == full['findings']
+
+    print("   ✅ PASS - Mismos hallazgos y estadísticas con parsed_files resumidos")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_finding_store(),
+        test_summarize_parsed_file(),
+        test_memory_accounting_phases(),
+        test_scan_over_budget(),
+        test_lean_results(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,87 @@
+"""
+Test de la caché LRU de nomenclatura compartida durante un escaneo
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.naming_cache import NamingCache
+from src.analyzer import BBPPAnalyzer
+
+
+def test_lru_bounded_and_counters():
+    """La caché respeta maxsize, expulsa la entrada menos usada y cuenta aciertos"""
+    print("\n" + "=" * 70)
+    print("TEST: NamingCache LRU")
+    print("=" * 70)
+
+    calls = []
+
+    def compute(name):
+        calls.append(name)
+        return name.upper()
+
+    cache = NamingCache(maxsize=2)
+    assert cache.get_or_compute('k', 'a', compute) == 'A'
+    assert cache.get_or_compute('k', 'b', compute) == 'B'
+    assert cache.get_or_compute('k', 'a', compute) == 'A'   # hit, 'a' pasa a reciente
+    cache.get_or_compute('k', 'c', compute)                  # expulsa 'b'
+    cache.get_or_compute('k', 'b', compute)                  # miss de nuevo
+
+    stats = cache.stats()
+    assert calls == ['a', 'b', 'c', 'b']
+    assert stats['hits'] == 1
+    assert stats['misses'] == 4
+    assert stats['size'] == 2
+    assert stats['hit_rate'] == 20.0
+
+    print("   ✅ PASS - LRU acotada con contadores")
+    return True
+
+
+def test_shared_between_analyzers_and_threads():
+    """Varios analizadores e hilos comparten veredictos sin recalcular"""
+    print("\n" + "=" * 70)
+    print("TEST: Caché compartida entre archivos e hilos")
+    print("=" * 70)
+
+    cache = NamingCache()
+    analyzers = [BBPPAnalyzer(naming_cache=cache) for _ in range(4)]
+    names = ['Config', 'TransactionItem', 'io_TransactionNumber', 'customerName'] * 50
+
+    def worker(analyzer):
+        for name in names:
+            analyzer._is_camel_case(name)
+            analyzer._to_pascal_case(name)
+
+    threads = [threading.Thread(target=worker, args=(a,)) for a in analyzers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()
+    print(f"   Estadísticas: {stats}")
+    assert stats['hits'] + stats['misses'] == 4 * len(names) * 2
+    assert stats['size'] == 8
+    assert stats['hit_rate'] > 95
+
+    # Los veredictos no cambian por pasar por la caché
+    assert analyzers[0]._is_camel_case('customerName') is True
+    assert analyzers[0]._is_camel_case('Config') is False
+    assert analyzers[0]._to_camel_case('My_Var') == 'my_Var'
+
+    print("   ✅ PASS - Caché compartida")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_lru_bounded_and_counters(),
+        test_shared_between_analyzers_and_threads(),
+    ]
+    sys.exit(0 if all(results) else 1)
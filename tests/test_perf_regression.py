@@ -0,0 +1,120 @@
+"""
+Test del comparador de rendimiento (bench/compare.py)
+
+La comparación real contra bench/baselines.json es opcional porque depende
+de la máquina: se activa con BBPP_PERF_GATE=1 (tolerancia en BBPP_PERF_TOLERANCE).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.compare import (
+    build_baseline, compare, regressions, load_baseline, DEFAULT_TIME_TOLERANCE, DEFAULT_REPEAT
+)
+
+
+def _document(parse_s, html_s, parse_kb=1000):
+    """Documento mínimo con la forma de run_benchmarks()"""
+    return {
+        'schema_version': 1,
+        'app_version': 'test',
+        'results': [{
+            'size': 'small',
+            'stages': {
+                'parse': {'median': parse_s, 'peak_memory_kb': parse_kb},
+                'html_normal': {'median': html_s, 'peak_memory_kb': 50},
+                'excel': {'skipped': 'openpyxl no disponible'},
+            },
+        }],
+    }
+
+
+def test_compare_detects_regressions():
+    """Una fase 3x más lenta es regresión; las diferencias bajo el ruido no"""
+    print("\n" + "=" * 70)
+    print("TEST: Detección de regresiones")
+    print("=" * 70)
+
+    baseline = build_baseline(_document(parse_s=0.100, html_s=0.001))
+    assert set(baseline['benchmarks']) == {'small/parse', 'small/html_normal'}
+
+    # Sin cambios
+    assert not regressions(compare(_document(0.100, 0.001), baseline))
+
+    # Parseo 3x más lento
+    found = regressions(compare(_document(0.300, 0.001), baseline))
+    assert [(c['benchmark'], c['metric']) for c in found] == [('small/parse', 'median_s')]
+
+    # 3x en una fase de 1 ms: por debajo del umbral de ruido
+    assert not regressions(compare(_document(0.100, 0.003), baseline))
+
+    # Memoria x2 por encima del umbral de ruido
+    found = regressions(compare(_document(0.100, 0.001, parse_kb=2000), baseline))
+    assert [c['metric'] for c in found] == ['peak_memory_kb']
+
+    # Tolerancia configurable
+    assert regressions(compare(_document(0.130, 0.001), baseline, time_tolerance=0.2))
+    assert not regressions(compare(_document(0.130, 0.001), baseline, time_tolerance=0.5))
+
+    print("   ✅ PASS - Regresiones detectadas")
+    return True
+
+
+def test_compare_new_and_improved():
+    """Fases nuevas e improvements no fallan"""
+    print("\n" + "=" * 70)
+    print("TEST: Fases nuevas y mejoras")
+    print("=" * 70)
+
+    baseline = build_baseline(_document(0.100, 0.001))
+    del baseline['benchmarks']['small/html_normal']
+    comparisons = compare(_document(0.020, 0.001), baseline)
+    status = {(c['benchmark'], c['metric']): c['status'] for c in comparisons}
+
+    assert status[('small/parse', 'median_s')] == 'improvement'
+    assert status[('small/html_normal', 'median_s')] == 'new'
+    assert not regressions(comparisons)
+
+    print("   ✅ PASS - Sin falsos positivos")
+    return True
+
+
+def test_performance_gate():
+    """Comparar una medición real con la línea base versionada (opt-in)"""
+    print("\n" + "=" * 70)
+    print("TEST: Gate de rendimiento contra bench/baselines.json")
+    print("=" * 70)
+
+    if os.environ.get('BBPP_PERF_GATE') != '1':
+        print("   SKIP - Define BBPP_PERF_GATE=1 para activar el gate de rendimiento")
+        return True
+
+    from bench.compare import format_comparison
+    from bench.run_benchmarks import run_benchmarks
+
+    baseline = load_baseline()
+    assert baseline is not None, "No existe bench/baselines.json"
+    sizes = sorted({name.split('/')[0] for name in baseline['benchmarks']})
+    document = run_benchmarks(sizes=sizes, repeat=DEFAULT_REPEAT)
+    tolerance = float(os.environ.get('BBPP_PERF_TOLERANCE', DEFAULT_TIME_TOLERANCE))
+    comparisons = compare(document, baseline, time_tolerance=tolerance)
+    print(format_comparison(comparisons))
+
+    found = regressions(comparisons)
+    assert not found, f"Regresiones de rendimiento: {found}"
+
+    print("   ✅ PASS - Sin regresiones")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_compare_detects_regressions(),
+        test_compare_new_and_improved(),
+        test_performance_gate(),
+    ]
+    sys.exit(0 if all(results) else 1)
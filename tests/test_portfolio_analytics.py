@@ -0,0 +1,181 @@
+"""
+Test de la analítica de cartera (todos los proyectos)
+Verifica que latest_analysis sigue al último análisis de cada proyecto al
+guardar, borrar y recalcular scores, que se rellena al abrir una BD anterior y
+que las consultas de reglas, peores archivos por equipo y percentiles
+coinciden con el cálculo directo.
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.metrics_db import MetricsDatabase, project_team
+from src.metrics.portfolio_analytics import PortfolioAnalytics, percentile
+
+
+def _finding(rule_id, severity, file_name):
+    return {'rule_id': rule_id, 'rule_name': f"Regla {rule_id}", 'severity': severity,
+            'category': 'general', 'file_path': f"C:/robots/{file_name}", 'location': '',
+            'description': rule_id}
+
+
+def _analysis(team, name, score, findings):
+    return {'project_path': f"/robots/{team}/{name}", 'score': {'score': score},
+            'findings': findings, 'statistics': {}}
+
+
+def _populate(db):
+    """Dos equipos; el primer análisis de Facturas queda obsoleto"""
+    ids = {}
+    ids['facturas_old'] = db.save_analysis(_analysis('Finanzas', 'Facturas', 40, [
+        _finding('OLD_001', 'error', 'Main.xaml')] * 5))
+    ids['facturas'] = db.save_analysis(_analysis('Finanzas', 'Facturas', 70, [
+        _finding('TRY_001', 'error', 'Process.xaml'),
+        _finding('NOM_001', 'info', 'Process.xaml'),
+        _finding('NOM_001', 'info', 'Main.xaml'),
+    ]))
+    ids['pagos'] = db.save_analysis(_analysis('Finanzas', 'Pagos', 90, [
+        _finding('NOM_001', 'info', 'Main.xaml'),
+        _finding('HC_001', 'warning', 'Main.xaml'),
+    ]))
+    ids['nominas'] = db.save_analysis(_analysis('RRHH', 'Nominas', 55, [
+        _finding('TRY_001', 'error', 'Init.xaml'),
+        _finding('TRY_001', 'error', 'Init.xaml'),
+        _finding('NOM_001', 'info', 'Init.xaml'),
+    ]))
+    return ids
+
+
+def test_latest_analysis_table():
+    """latest_analysis se mantiene con triggers al guardar, borrar y recalcular"""
+    print("\n" + "=" * 70)
+    print("TEST: Tabla latest_analysis")
+    print("=" * 70)
+
+    assert project_team('C:\\Robots\\Finanzas\\Facturas') == 'Finanzas'
+    assert project_team('/robots/RRHH/Nominas') == 'RRHH'
+    assert project_team('') == ''
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        ids = _populate(db)
+        portfolio = PortfolioAnalytics(db)
+
+        latest = {row['project_name']: row for row in portfolio.get_latest_analyses()}
+        assert {name: row['analysis_id'] for name, row in latest.items()} == {
+            'Facturas': ids['facturas'], 'Pagos': ids['pagos'], 'Nominas': ids['nominas']}
+        assert latest['Facturas']['team'] == 'Finanzas' and latest['Facturas']['score'] == 70
+        assert [row['project_name'] for row in portfolio.get_latest_analyses('RRHH')] == ['Nominas']
+
+        # Recalcular el score del último análisis lo actualiza en la tabla
+        db.update_scores({ids['facturas']: 72.5})
+        assert portfolio.get_latest_analyses('Finanzas')[0]['score'] == 72.5
+
+        # Borrar el último análisis: pasa a serlo el anterior; sin análisis, el proyecto sale
+        db.delete_analysis(ids['facturas'])
+        db.delete_analysis(ids['nominas'])
+        latest = {row['project_name']: row['analysis_id'] for row in portfolio.get_latest_analyses()}
+        assert latest == {'Facturas': ids['facturas_old'], 'Pagos': ids['pagos']}
+        db.close()
+
+    print("   ✅ PASS - Último análisis por proyecto sincronizado")
+    return True
+
+
+def test_backfill_existing_database():
+    """Una BD anterior (sin team ni latest_analysis) se rellena al abrirla"""
+    print("\n" + "=" * 70)
+    print("TEST: Relleno de latest_analysis en BD existente")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'metrics.db'
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE analysis_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, project_name TEXT NOT NULL,
+                project_path TEXT NOT NULL, analysis_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+                version TEXT, total_files INTEGER, analyzed_files INTEGER, total_findings INTEGER,
+                critical_findings INTEGER, high_findings INTEGER, medium_findings INTEGER,
+                low_findings INTEGER, score REAL, execution_time REAL, metadata TEXT)
+        ''')
+        conn.executemany('''
+            INSERT INTO analysis_history (project_name, project_path, analysis_date, score)
+            VALUES (?, ?, ?, ?)
+        ''', [('A', '/r/Ventas/A', '2025-01-01 10:00:00', 50),
+              ('A', '/r/Ventas/A', '2025-02-01 10:00:00', 60),
+              ('B', '/r/Compras/B', '2025-01-15 10:00:00', 80)])
+        conn.commit()
+        conn.close()
+
+        db = MetricsDatabase(db_path)
+        latest = {row['project_name']: row for row in PortfolioAnalytics(db).get_latest_analyses()}
+        db.close()
+
+    assert latest['A']['analysis_id'] == 2 and latest['A']['score'] == 60
+    assert latest['A']['team'] == 'Ventas' and latest['B']['team'] == 'Compras'
+
+    print("   ✅ PASS - Historial existente indexado por proyecto")
+    return True
+
+
+def test_portfolio_queries():
+    """Reglas, peores archivos por equipo y percentiles sobre los últimos análisis"""
+    print("\n" + "=" * 70)
+    print("TEST: Consultas de cartera")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        _populate(db)
+        portfolio = PortfolioAnalytics(db)
+
+        # Los hallazgos del análisis obsoleto (OLD_001) no cuentan
+        rules = portfolio.get_top_violated_rules()
+        assert [(r['rule_id'], r['findings'], r['projects']) for r in rules] == [
+            ('NOM_001', 4, 3), ('TRY_001', 3, 2), ('HC_001', 1, 1)]
+        assert rules[0]['rule_name'] == 'Regla NOM_001'
+        assert [r['rule_id'] for r in portfolio.get_top_violated_rules(1, team='RRHH')] == ['TRY_001']
+
+        worst = portfolio.get_worst_files(limit=2)
+        assert set(worst) == {'Finanzas', 'RRHH'}
+        assert [(f['project_name'], f['file_path'], f['score']) for f in worst['Finanzas']] == [
+            ('Facturas', 'C:/robots/Process.xaml', 89), ('Pagos', 'C:/robots/Main.xaml', 94)]
+        assert worst['RRHH'][0]['errors'] == 2 and worst['RRHH'][0]['score'] == 79
+        assert list(portfolio.get_worst_files(team='RRHH')) == ['RRHH']
+
+        distribution = portfolio.get_score_distribution(percentiles=(0, 50, 90, 100))
+        scores = sorted([70, 90, 55])
+        assert distribution['count'] == 3
+        assert distribution['percentiles'] == {0: 55, 50: 70, 90: percentile(scores, 90), 100: 90}
+        assert abs(distribution['percentiles'][90] - 86) < 1e-9
+        assert distribution['buckets'] == {50: 1, 70: 1, 90: 1}
+        assert portfolio.get_score_distribution(team='Nadie')['count'] == 0
+
+        teams = portfolio.get_teams()
+        assert [(t['team'], t['projects']) for t in teams] == [('RRHH', 1), ('Finanzas', 2)]
+
+        # Las agregaciones usan los índices de latest_analysis y findings_detail
+        plan = ' '.join(row[3] for row in db.conn.execute('''
+            EXPLAIN QUERY PLAN SELECT d.rule_id, COUNT(*) FROM latest_analysis l
+            JOIN findings_detail d ON d.analysis_id = l.analysis_id GROUP BY d.rule_id
+        '''))
+        assert 'COVERING INDEX idx_findings_rule' in plan, plan
+        db.close()
+
+    print(f"   ✅ PASS - {len(rules)} reglas, {len(worst)} equipos, P90={distribution['percentiles'][90]:.1f}")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_latest_analysis_table(),
+        test_backfill_existing_database(),
+        test_portfolio_queries(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,88 @@
+"""
+Test del modo de perfilado (src/profiler.py)
+Verifica la salida .pstats, las pilas colapsadas y el etiquetado por workflow.
+"""
+
+import pstats
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from src.profiler import AnalysisProfiler
+from src.project_scanner import ProjectScanner
+
+
+def _busy(seconds):
+    """Consumir CPU durante el tiempo indicado"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_samples_labelled_by_workflow():
+    """Las muestras se atribuyen al workflow indicado con set_current_file"""
+    print("\n" + "=" * 70)
+    print("TEST: Muestras etiquetadas por workflow")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with AnalysisProfiler(label='test', output_dir=Path(tmp), sample_interval=0.002) as profiler:
+            profiler.set_current_file('Lento.xaml')
+            _busy(0.15)
+            profiler.set_current_file('Rapido.xaml')
+            _busy(0.02)
+            profiler.set_current_file(None)
+
+        files = profiler.output_files
+        assert set(files) == {'pstats', 'collapsed', 'summary'}
+        assert all(path.exists() for path in files.values())
+
+        lines = files['collapsed'].read_text(encoding='utf-8').splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert stack.startswith('workflow:') and int(count) > 0
+        assert sum(int(l.rsplit(' ', 1)[1]) for l in lines) == sum(profiler.file_samples.values())
+
+        slowest = profiler.slowest_files()
+        assert slowest[0][0] == 'Lento.xaml'
+        assert 'Lento.xaml' in files['summary'].read_text(encoding='utf-8')
+
+    print("   ✅ PASS - Workflow más lento identificado")
+    return True
+
+
+def test_profile_scan():
+    """Perfilar un escaneo completo genera un .pstats válido con las fases del análisis"""
+    print("\n" + "=" * 70)
+    print("TEST: Perfilado de ProjectScanner.scan")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(Path(tmp) / 'proj', files=10, activities=300, seed=2)
+        scanner = ProjectScanner(Path(manifest['project_path']))
+        with AnalysisProfiler(label='proj', output_dir=Path(tmp) / 'profiles') as profiler:
+            scanner.profiler = profiler
+            result = scanner.scan()
+
+        assert result['success']
+        assert profiler.current_file is None
+        stats = pstats.Stats(str(profiler.output_files['pstats']))
+        functions = {func[2] for func in stats.stats}
+        assert {'scan', 'parse', 'analyze', '_calculate_score'} <= functions
+
+    print("   ✅ PASS - Perfil del escaneo generado")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_samples_labelled_by_workflow(),
+        test_profile_scan(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,166 @@
+"""
+Test de la generación de reportes en procesos separados
+Verifica que HTML normal, HTML detallado y Excel se generan en paralelo a
+partir de los mismos resultados, que el modo en serie produce lo mismo y
+que submit_reports no bloquea al llamante.
+"""
+
+import contextlib
+import copy
+import io
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.config
+from bench.synthetic_project import generate_project
+from src.config import DEFAULT_CONFIG
+from src.excel_report_generator import OPENPYXL_AVAILABLE
+from src.memory_budget import FindingStore
+from src.project_scanner import ProjectScanner
+from src.report_jobs import (REPORT_EXCEL, REPORT_HTML_DETALLADO, REPORT_HTML_NORMAL, REPORT_KINDS,
+                             _pending_jobs, _submit, generate_reports, get_report_pool,
+                             shutdown_report_pool, submit_reports)
+
+
+@contextlib.contextmanager
+def _temp_app_dirs(tmp: str):
+    """Salida (reportes, caché de trabajos) y BD de métricas del escaneo dentro de tmp"""
+    saved = src.config.DATA_DIR, src.config.OUTPUT_DIR
+    src.config.DATA_DIR, src.config.OUTPUT_DIR = Path(tmp) / 'data', Path(tmp) / 'output'
+    try:
+        yield
+    finally:
+        src.config.DATA_DIR, src.config.OUTPUT_DIR = saved
+
+
+def _scan(tmp: str, name: str) -> dict:
+    manifest = generate_project(Path(tmp) / name, files=6, activities=250, seed=45)
+    return ProjectScanner(Path(manifest['project_path'])).scan()
+
+
+def test_parallel_reports():
+    """Los tres formatos se generan en procesos y coinciden con el modo en serie"""
+    print("\n" + "=" * 70)
+    print("TEST: Reportes en procesos separados")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        result = _scan(tmp, 'report_jobs_proj')
+        parallel_paths = {kind: Path(tmp) / f"parallel_{kind}.out" for kind in REPORT_KINDS}
+        serial_paths = {kind: Path(tmp) / f"serial_{kind}.out" for kind in REPORT_KINDS}
+
+        parallel = generate_reports(result, REPORT_KINDS, output_paths=parallel_paths)
+        serial = generate_reports(result, REPORT_KINDS, output_paths=serial_paths, use_processes=False)
+
+        for kind in (REPORT_HTML_NORMAL, REPORT_HTML_DETALLADO):
+            assert parallel[kind]['error'] is None, parallel[kind]
+            assert Path(parallel[kind]['path']) == parallel_paths[kind]
+            # Mismo contenido que en serie (salvo la hora de generación)
+            parallel_size = parallel_paths[kind].stat().st_size
+            serial_size = serial_paths[kind].stat().st_size
+            assert abs(parallel_size - serial_size) < 64, (kind, parallel_size, serial_size)
+
+        normal = parallel_paths[REPORT_HTML_NORMAL].read_text(encoding='utf-8')
+        detallado = parallel_paths[REPORT_HTML_DETALLADO].read_text(encoding='utf-8')
+        assert normal != detallado
+
+        if OPENPYXL_AVAILABLE:
+            assert parallel_paths[REPORT_EXCEL].exists()
+        else:
+            assert parallel[REPORT_EXCEL] == serial[REPORT_EXCEL]
+            assert parallel[REPORT_EXCEL]['error'] == 'openpyxl no disponible'
+
+    print(f"   ✅ PASS - {sum(1 for o in parallel.values() if o['path'])} reporte(s) generados en procesos")
+    return True
+
+
+def test_submit_reports():
+    """submit_reports devuelve de inmediato y avisa al terminar"""
+    print("\n" + "=" * 70)
+    print("TEST: Reportes sin bloquear al llamante")
+    print("=" * 70)
+
+    done = threading.Event()
+    received = []
+
+    def on_done(outcomes):
+        received.append(outcomes)
+        done.set()
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        result = _scan(tmp, 'submit_proj')
+        output_path = Path(tmp) / 'submitted.html'
+        future = submit_reports(result, [REPORT_HTML_DETALLADO],
+                                output_paths={REPORT_HTML_DETALLADO: output_path}, on_done=on_done)
+        outcomes = future.result(timeout=120)
+        assert done.wait(timeout=30)
+        assert output_path.exists()
+
+    assert received == [outcomes]
+    assert outcomes[REPORT_HTML_DETALLADO]['path'] == str(output_path)
+
+    print("   ✅ PASS - Callback recibido con la ruta del reporte")
+    return True
+
+
+def test_low_memory_reports_in_pool():
+    """Con el presupuesto superado (FindingStore) los reportes siguen yendo al pool"""
+    print("\n" + "=" * 70)
+    print("TEST: Reportes en procesos en modo de baja memoria")
+    print("=" * 70)
+
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config['memory']['budget_mb'] = 0.001
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        manifest = generate_project(Path(tmp) / 'low_memory_jobs', files=6, activities=250, seed=45)
+        result = ProjectScanner(Path(manifest['project_path']), config=config).scan()
+        assert isinstance(result['findings'], FindingStore)
+
+        output_path = Path(tmp) / 'low_memory.html'
+        captured = io.StringIO()
+        with contextlib.redirect_stdout(captured):
+            outcomes = generate_reports(result, [REPORT_HTML_DETALLADO],
+                                        output_paths={REPORT_HTML_DETALLADO: output_path})
+        assert 'se generan en serie' not in captured.getvalue(), captured.getvalue()
+        assert outcomes[REPORT_HTML_DETALLADO]['error'] is None
+        assert output_path.exists()
+
+    print("   ✅ PASS - Resultados con FindingStore serializados para el pool")
+    return True
+
+
+def test_shutdown_cancels_pending():
+    """Cerrar el pool cancela los trabajos que aún no han empezado (sin cancel_futures)"""
+    print("\n" + "=" * 70)
+    print("TEST: Cierre del pool con trabajos pendientes")
+    print("=" * 70)
+
+    shutdown_report_pool()
+    pool = get_report_pool(max_workers=1)
+    futures = [_submit(pool, time.sleep, 0.5) for _ in range(8)]
+    shutdown_report_pool()
+
+    assert all(future.done() for future in futures)
+    cancelled = sum(1 for future in futures if future.cancelled())
+    assert cancelled > 0
+    assert not _pending_jobs
+
+    print(f"   ✅ PASS - {cancelled} trabajos pendientes cancelados")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_parallel_reports(),
+        test_submit_reports(),
+        test_low_memory_reports_in_pool(),
+        test_shutdown_cancels_pending(),
+    ]
+    shutdown_report_pool()
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,115 @@
+"""
+Test del modelo de vista de los reportes (ReportModel)
+Verifica las agrupaciones calculadas en una pasada (reglas, archivos,
+severidades), que los hallazgos agregados cuentan todas sus ocurrencias y
+que el modelo se construye una vez y se comparte a través de los resultados.
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.report_model import ReportModel, get_report_model, mark_findings_changed
+
+
+def _finding(severity, category, description, file_path, location, **extra):
+    return dict(severity=severity, category=category, description=description,
+                file_path=file_path, location=location, **extra)
+
+
+FINDINGS = [
+    _finding('info', 'nomenclatura', 'Nombre de variable', 'C:/p/Main.xaml', 'var1'),
+    _finding('error', 'try_catch', 'Catch vacío', 'C:/p/Main.xaml', 'TryCatch 1'),
+    _finding('info', 'nomenclatura', 'Nombre de variable', 'C:/p/Init.xaml', 'var2'),
+    _finding('info', 'nomenclatura', 'Nombre de variable', 'C:/p/Main.xaml', 'var3', suppressed=True),
+    _finding('warning', 'hardcodeo', 'Valor hardcodeado', 'C:/p/Init.xaml', '',
+             details={'aggregated': True, 'occurrences': 5,
+                      'samples': [{'location': 'Assign 1'}, {'location': 'Assign 2'}]}),
+    _finding('warning', 'dependencias', 'Dependencia desactualizada', 'C:/p/project.json', 'UiPath.System'),
+]
+
+
+def test_one_pass_groupings():
+    """Reglas ordenadas por severidad, archivos por nombre y ocurrencias ponderadas"""
+    print("\n" + "=" * 70)
+    print("TEST: Agrupaciones del ReportModel")
+    print("=" * 70)
+
+    model = ReportModel.build(FINDINGS)
+
+    assert model.source_size == len(FINDINGS)
+    assert model.listed_findings == len(FINDINGS) - 1
+    # Un hallazgo agregado cuenta sus 5 ocurrencias
+    assert model.total_occurrences == len(FINDINGS) - 1 + 5
+    assert model.occurrences_by_severity == {'info': 3, 'error': 1, 'warning': 6}
+
+    # Sin dependencias ni hallazgos aceptados; error > warning > info
+    assert [g['severity'] for g in model.rule_groups] == ['error', 'warning', 'info']
+    naming = model.rule_groups[2]
+    assert naming['count'] == 2
+    assert [f['name'] for f in naming['files']] == ['Init.xaml', 'Main.xaml']
+    assert naming['files'][1]['locations'] == ['var1']
+
+    hardcoded = model.rule_groups[1]
+    assert hardcoded['count'] == 5
+    assert hardcoded['files'][0]['locations'][:2] == ['Assign 1', 'Assign 2']
+    assert hardcoded['files'][0]['locations'][2].startswith('… y 3 ocurrencias más')
+    assert model.categories == {'try_catch', 'hardcodeo', 'nomenclatura'}
+
+    # Scores por archivo: incluyen los aceptados, excluyen dependencias
+    assert set(model.file_stats) == {'Main.xaml', 'Init.xaml'}
+    assert model.file_stats['Main.xaml'] == {'errors': 1, 'warnings': 0, 'infos': 2, 'total': 3}
+    scores = model.file_scores()
+    assert [f['name'] for f in scores] == ['Main.xaml', 'Init.xaml']
+    assert scores[0]['score'] == 100 - 10 - 2
+    assert model.top_files(1) == [('Main.xaml', 3)]
+
+    print("   ✅ PASS - Agrupaciones correctas en una pasada")
+    return True
+
+
+def test_shared_model():
+    """get_report_model construye una vez y reconstruye si cambian o se marcan los hallazgos"""
+    print("\n" + "=" * 70)
+    print("TEST: Modelo compartido entre reportes y BD")
+    print("=" * 70)
+
+    results = {'findings': [dict(f) for f in FINDINGS]}
+    model = get_report_model(results)
+    assert results['report_model'] is model
+    assert get_report_model(results) is model
+
+    results['findings'].append(_finding('error', 'try_catch', 'Catch vacío', 'C:/p/Init.xaml', 'TryCatch 2'))
+    rebuilt = get_report_model(results)
+    assert rebuilt is not model
+    assert rebuilt.occurrences_by_severity['error'] == 2
+
+    # Cambio en sitio (mismo tamaño): solo se detecta si se marca
+    listed = rebuilt.listed_findings
+    results['findings'][0]['suppressed'] = True
+    assert get_report_model(results) is rebuilt
+    mark_findings_changed(results)
+    refreshed = get_report_model(results)
+    assert refreshed is not rebuilt and refreshed.listed_findings == listed - 1
+    assert get_report_model(results) is refreshed
+
+    # Los resultados serializados (procesos de reportes) conservan el modelo
+    copied = pickle.loads(pickle.dumps(results))
+    assert get_report_model(copied) is copied['report_model']
+
+    empty = get_report_model({})
+    assert empty.source_size == 0 and empty.rule_groups == []
+
+    print("   ✅ PASS - Modelo reutilizado y reconstruido al cambiar")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_one_pass_groupings(),
+        test_shared_model(),
+    ]
+    sys.exit(0 if all(results) else 1)
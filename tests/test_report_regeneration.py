@@ -0,0 +1,134 @@
+"""
+Test de la regeneración de reportes desde la BD de métricas
+Verifica que los resultados completos se persisten con el análisis, que
+get_results los reconstruye sin reescanear y que la regeneración en lote
+genera reportes nuevos y actualiza sus rutas.
+"""
+
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.config
+from bench.synthetic_project import generate_project
+from src.database.metrics_db import get_metrics_db
+from src.project_scanner import ProjectScanner
+from src.report_jobs import (REPORT_HTML_DETALLADO, REPORT_HTML_NORMAL, regenerate_reports,
+                             shutdown_report_pool)
+
+
+@contextmanager
+def _temp_app_dirs(tmp: str):
+    """Guardar análisis y reportes en tmp (data/ y output/ del repositorio quedan intactos)"""
+    saved = src.config.DATA_DIR, src.config.OUTPUT_DIR
+    src.config.DATA_DIR, src.config.OUTPUT_DIR = Path(tmp) / 'data', Path(tmp) / 'output'
+    try:
+        yield
+    finally:
+        src.config.DATA_DIR, src.config.OUTPUT_DIR = saved
+
+
+def _scan_saved(tmp: str, name: str, seed: int) -> dict:
+    manifest = generate_project(Path(tmp) / name, files=5, activities=200, seed=seed)
+    return ProjectScanner(Path(manifest['project_path'])).scan()
+
+
+def test_reconstruct_results():
+    """get_results devuelve los hallazgos y el score guardados"""
+    print("\n" + "=" * 70)
+    print("TEST: Reconstruir resultados por ID de análisis")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        result = _scan_saved(tmp, 'regen_proj', seed=46)
+
+        db = get_metrics_db()
+        restored = db.get_results(result['analysis_id'])
+        missing = db.get_results(10 ** 9)
+        db.close()
+
+        assert missing is None
+        assert restored['reconstructed'] and not restored['partial']
+        assert len(restored['findings']) == len(result['findings'])
+        assert restored['findings'][0]['rule_id'] == result['findings'][0]['rule_id']
+        assert restored['score']['score'] == result['score']['score']
+        assert restored['statistics']['findings_by_rule'] == result['statistics']['findings_by_rule']
+        assert len(restored['parsed_files']) == result['analyzed_files']
+        assert all(parsed.get('summarized') for parsed in restored['parsed_files'])
+
+    print(f"   ✅ PASS - {len(restored['findings'])} hallazgos reconstruidos")
+    return True
+
+
+def test_regenerate_deleted_report():
+    """Un reporte borrado se regenera sin reescanear y su ruta se actualiza en la BD"""
+    print("\n" + "=" * 70)
+    print("TEST: Regenerar reporte borrado")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        result = _scan_saved(tmp, 'deleted_report_proj', seed=47)
+
+        original = Path(result['report_paths']['html'])
+        original.unlink()
+
+        jobs = regenerate_reports([result['analysis_id']], [REPORT_HTML_DETALLADO])
+        job = jobs[result['analysis_id']]
+        assert job['error'] is None
+        regenerated = Path(job['outcomes'][REPORT_HTML_DETALLADO]['path'])
+        assert regenerated.exists() and regenerated != original
+        assert f"ID{result['analysis_id']}" in regenerated.name
+
+        db = get_metrics_db()
+        analysis = db.get_analysis_by_id(result['analysis_id'])
+        db.close()
+        assert analysis['html_report_path'] == str(regenerated)
+
+    print(f"   ✅ PASS - Regenerado en {regenerated.name}")
+    return True
+
+
+def test_bulk_regeneration():
+    """Varios análisis y formatos en el pool de procesos, con análisis antiguos parciales"""
+    print("\n" + "=" * 70)
+    print("TEST: Regeneración en lote")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp, _temp_app_dirs(tmp):
+        ids = [_scan_saved(tmp, f"bulk_proj_{i}", seed=50 + i)['analysis_id'] for i in range(3)]
+
+        # Simular un análisis anterior a la persistencia de resultados
+        db = get_metrics_db()
+        db._write(lambda conn: conn.execute('DELETE FROM analysis_results WHERE analysis_id = ?', (ids[0],)))
+        legacy = db.get_results(ids[0])
+        db.close()
+        assert legacy['partial'] and legacy['findings']
+
+        progress = []
+        jobs = regenerate_reports(ids, [REPORT_HTML_NORMAL, REPORT_HTML_DETALLADO],
+                                  progress_callback=lambda analysis_id, job: progress.append(analysis_id))
+
+        assert sorted(progress) == sorted(ids)
+        assert jobs[ids[0]]['partial'] and not jobs[ids[1]]['partial']
+        paths = [outcome['path'] for job in jobs.values() for outcome in job['outcomes'].values()]
+        assert len(paths) == 6 and len(set(paths)) == 6
+        assert all(Path(path).exists() for path in paths)
+        # Los procesos del pool escriben en la salida del proceso padre
+        assert all(path.startswith(str(Path(tmp) / 'output')) for path in paths)
+
+    print(f"   ✅ PASS - {len(paths)} reportes regenerados para {len(ids)} análisis")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_reconstruct_results(),
+        test_regenerate_deleted_report(),
+        test_bulk_regeneration(),
+    ]
+    shutdown_report_pool()
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,133 @@
+"""
+Test de la previsualización de impacto de reglas
+Verifica que la caché de parsed_data (opcional) sobrevive al escaneo (también
+con lean_results), que se escribe en un temporal único y que reevaluar una
+regla editada sobre ella reproduce los recuentos del escaneo y refleja el
+cambio de umbral sin reescanear.
+"""
+
+import copy
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from src.config import DEFAULT_CONFIG
+from src.project_scanner import ProjectScanner
+from src.rule_preview import ParsedDataCache, load_parsed_cache, preview_rule_impact
+from src.rules_manager import get_rules_manager
+
+
+def _cache_config() -> dict:
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config['rule_preview']['cache_parsed_data'] = True
+    return config
+
+
+def _scan(tmp: str, name: str, config: dict = None) -> dict:
+    manifest = generate_project(Path(tmp) / name, files=12, activities=500, seed=41)
+    return ProjectScanner(Path(manifest['project_path']), config=config or _cache_config()).scan()
+
+
+def test_cache_matches_scan():
+    """Reevaluar cada regla sin cambios reproduce su recuento y no altera el score"""
+    print("\n" + "=" * 70)
+    print("TEST: Caché de parsed_data y reevaluación por regla")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = _scan(tmp, 'preview_proj')
+        snapshot = load_parsed_cache(result['parsed_cache'])
+
+    assert snapshot is not None
+    assert len(snapshot['parsed_files']) == result['analyzed_files']
+    # Los parsed_data completos sobreviven aunque el escaneo los resuma (lean_results)
+    assert all('activities' in parsed for parsed in snapshot['parsed_files'])
+    assert snapshot['statistics']['findings_by_rule'] == result['statistics']['findings_by_rule']
+
+    rules_manager = get_rules_manager()
+    for rule in rules_manager.get_active_rules(['UiPath', 'NTTData']):
+        impact = preview_rule_impact(copy.deepcopy(rule), snapshot)
+        assert impact['findings_after'] == impact['findings_before'], rule['id']
+        assert impact['delta'] == 0, rule['id']
+
+    print("   ✅ PASS - Recuentos reproducidos para todas las reglas")
+    return True
+
+
+def test_threshold_change():
+    """Subir el umbral de IFs anidados reduce hallazgos y mejora el score"""
+    print("\n" + "=" * 70)
+    print("TEST: Previsualizar cambio de umbral")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = _scan(tmp, 'threshold_proj')
+        snapshot = load_parsed_cache(result['parsed_cache'])
+
+    rule = copy.deepcopy(get_rules_manager().get_rule_by_id('ESTRUCTURA_001'))
+    assert snapshot['statistics']['findings_by_rule'].get('ESTRUCTURA_001', 0) > 0
+
+    rule['parameters']['max_nested_levels']['value'] = 50
+    relaxed = preview_rule_impact(rule, snapshot)
+    assert relaxed['findings_after'] == 0
+    assert relaxed['score_after'] >= relaxed['score_before']
+
+    rule['enabled'] = False
+    disabled = preview_rule_impact(rule, snapshot)
+    assert disabled['findings_after'] == 0
+
+    print(f"   ✅ PASS - {relaxed['findings_before']} → 0 hallazgos en {relaxed['elapsed_ms']} ms")
+    return True
+
+
+def test_cache_disabled():
+    """La caché es opcional: con la configuración por defecto no se escribe"""
+    print("\n" + "=" * 70)
+    print("TEST: Caché desactivada por defecto")
+    print("=" * 70)
+
+    assert DEFAULT_CONFIG['rule_preview']['cache_parsed_data'] is False
+    with tempfile.TemporaryDirectory() as tmp:
+        result = _scan(tmp, 'no_cache_proj', copy.deepcopy(DEFAULT_CONFIG))
+    assert result['parsed_cache'] is None
+
+    print("   ✅ PASS - Sin caché de parsed_data")
+    return True
+
+
+def test_concurrent_cache_writes():
+    """Dos escrituras de la caché del mismo proyecto usan temporales distintos"""
+    print("\n" + "=" * 70)
+    print("TEST: Temporales únicos de la caché")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'proyecto.parsed.pickle'
+        first, second = ParsedDataCache(path), ParsedDataCache(path)
+        first.open(Path(tmp), ['UiPath'], {'name': 'A'})
+        second.open(Path(tmp), ['UiPath'], {'name': 'B'})
+        assert first._tmp_path != second._tmp_path
+
+        first.add({'file_path': 'Main.xaml', 'activities': []})
+        second.discard()
+        assert first.finish({'findings_by_rule': {}, 'total_activities': 1}) == path
+        snapshot = load_parsed_cache(path)
+        assert snapshot['project_info']['name'] == 'A' and len(snapshot['parsed_files']) == 1
+        assert [p.name for p in Path(tmp).iterdir()] == [path.name]
+
+    print("   ✅ PASS - Sin colisiones entre escrituras")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_cache_matches_scan(),
+        test_threshold_change(),
+        test_cache_disabled(),
+        test_concurrent_cache_writes(),
+    ]
+    sys.exit(0 if all(results) else 1)
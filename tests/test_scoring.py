@@ -0,0 +1,122 @@
+"""
+Test del motor de puntuación
+Verifica que src.scoring reproduce el score del escaneo y que permite
+recalcularlo (último resultado e histórico de la BD) sin reescanear.
+"""
+
+import copy
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from src.config import DEFAULT_CONFIG
+from src.database.metrics_db import MetricsDatabase
+from src.project_scanner import ProjectScanner
+from src.scoring import (calculate_score, preview_rule_change, rescore_history, rescore_result,
+                         rule_penalty, scoring_settings)
+
+
+def _params(mode: str, value: float = 2, cap: float = None, severity: str = 'warning') -> dict:
+    return {'penalty_mode': mode, 'penalty_value': value, 'use_penalty_cap': cap is not None,
+            'penalty_cap': cap or 10, 'severity': severity}
+
+
+def test_rule_penalty_modes():
+    """Penalización por modo, límite máximo y proyectos pequeños"""
+    print("\n" + "=" * 70)
+    print("TEST: Modos de penalización")
+    print("=" * 70)
+
+    settings = scoring_settings(DEFAULT_CONFIG)
+    assert rule_penalty(4, _params('severity_default', severity='error'), settings) == 40
+    assert rule_penalty(4, _params('individual', 1.5), settings) == 6
+    assert rule_penalty(4, _params('global', 7), settings) == 7
+    assert rule_penalty(4, _params('individual', 5, cap=12), settings) == 12
+    assert rule_penalty(4, _params('global', 20, cap=12), settings) == 20
+    assert rule_penalty(4, _params('individual', 0), settings) == 0
+
+    rule_params = {'A': _params('individual', 5), 'B': None}
+    small = calculate_score({'A': 2, 'B': 9}, 5, rule_params, settings)
+    assert small['score'] == 95 and list(small['penalties']['by_rule']) == ['A']
+    large = calculate_score({'A': 2}, 100, rule_params, settings)
+    assert large['score'] == 99.5 and large['grade'] == 'A - Excelente'
+
+    print("   ✅ PASS - Penalizaciones por modo")
+    return True
+
+
+def test_rescore_matches_scan():
+    """El recálculo sin cambios reproduce el score; un override lo modifica"""
+    print("\n" + "=" * 70)
+    print("TEST: Recalcular el último resultado")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(Path(tmp) / 'scoring_proj', files=8, activities=300, seed=21)
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['baseline']['enabled'] = False
+        result = ProjectScanner(Path(manifest['project_path']), config=config).scan()
+
+    assert rescore_result(result, config) == result['score']
+
+    rule_id = max(result['statistics']['findings_by_rule'].items(), key=lambda item: item[1])[0]
+    lenient = rescore_result(result, config, overrides={rule_id: {'penalty_value': 0}})
+    assert lenient['penalties']['by_rule'][rule_id]['penalty'] == 0
+    assert lenient['score'] >= result['score']['score']
+
+    stricter = copy.deepcopy(config)
+    stricter['scoring']['scaling_factor'] = 10
+    assert rescore_result(result, stricter)['score'] <= result['score']['score']
+
+    print(f"   ✅ PASS - Score {result['score']['score']} reproducido sin reescanear")
+    return True
+
+
+def test_rescore_history():
+    """Recalcular y aplicar sobre el histórico de la BD"""
+    print("\n" + "=" * 70)
+    print("TEST: Recalcular el histórico")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['baseline']['enabled'] = False
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        results = []
+        for seed in (31, 32, 33):
+            manifest = generate_project(Path(tmp) / f'hist_{seed}', files=5, activities=200, seed=seed)
+            result = ProjectScanner(Path(manifest['project_path']), config=config).scan()
+            db.save_analysis(result)
+            results.append(result)
+
+        unchanged = rescore_history(db, config)
+        assert len(unchanged) == 3
+        assert all(change['delta'] == 0 for change in unchanged)
+
+        rule_id = next(iter(results[0]['statistics']['findings_by_rule']))
+        override = {rule_id: {'penalty_mode': 'global', 'penalty_value': 0}}
+        changes = rescore_history(db, config, overrides=override, apply=True)
+        assert all(change['delta'] >= 0 for change in changes)
+        stored = {item['id']: item['score'] for item in db.get_score_inputs()}
+        assert stored == {change['id']: change['new_score'] for change in changes}
+
+        preview = preview_rule_change(rule_id, {'penalty_mode': 'individual', 'penalty_value': 50},
+                                      config, db=db)
+        assert preview['analyses'] == 3 and preview['mean_delta'] <= 0
+        db.close()
+
+    print("   ✅ PASS - Histórico recalculado y actualizado")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_rule_penalty_modes(),
+        test_rescore_matches_scan(),
+        test_rescore_history(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,144 @@
+"""
+Test de la búsqueda de texto completo en la BD de métricas
+Verifica que search_analyses encuentra análisis por el texto de sus hallazgos
+(archivo + descripción, por prefijo) y por sus datos, que el índice se
+mantiene al borrar y que el respaldo con LIKE devuelve lo mismo sin FTS5.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.metrics_db import MetricsDatabase
+
+
+def _finding(rule_id, description, file_path, location, severity='warning'):
+    return {'rule_id': rule_id, 'rule_name': rule_id, 'description': description,
+            'file_path': file_path, 'location': location, 'severity': severity,
+            'category': 'try_catch'}
+
+
+def _analysis(name, findings, version='23.10.0', bbpp_sets=None):
+    return {'project_path': f'/proyectos/{name}', 'score': {'score': 80}, 'findings': findings,
+            'statistics': {}, 'project_info': {'studio_version': version},
+            'bbpp_sets': bbpp_sets or ['NTTDATA']}
+
+
+def _populate(db):
+    ids = {}
+    ids['facturas'] = db.save_analysis(_analysis('Facturas', [
+        _finding('TRY_001', 'Catch vacío sin registro', 'C:/Facturas/Process.xaml', 'TryCatch Leer'),
+        _finding('NOM_001', 'Nombre de variable sin prefijo', 'C:/Facturas/Main.xaml', 'var1', 'info'),
+    ]))
+    ids['nominas'] = db.save_analysis(_analysis('Nominas', [
+        _finding('TRY_001', 'Catch vacío sin registro', 'C:/Nominas/Init.xaml', 'TryCatch Init'),
+        _finding('HC_001', 'Valor hardcodeado', 'C:/Nominas/Process.xaml', 'Assign 3'),
+    ], version='24.10.1', bbpp_sets=['ABC']))
+    ids['pedidos'] = db.save_analysis(_analysis('Pedidos', []))
+    return ids
+
+
+def _check_queries(db, ids):
+    def found(query, project=None):
+        return [row['id'] for row in db.search_analyses(query, project)]
+
+    # Archivo + palabras de la descripción (sin tilde también)
+    assert found('Process.xaml catch vacio') == [ids['facturas']]
+    assert sorted(found('catch vacío')) == sorted([ids['facturas'], ids['nominas']])
+    # El último término busca por prefijo
+    assert found('hardcod') == [ids['nominas']]
+    # Datos del análisis: proyecto, versión y conjuntos
+    assert found('pedidos') == [ids['pedidos']]
+    assert found('24.10.1') == [ids['nominas']]
+    assert found('abc') == [ids['nominas']]
+    assert found('catch', project='Nominas') == [ids['nominas']]
+    assert found('inexistente') == [] and found('   ') == [] and found('...') == []
+
+    example = db.search_analyses('Process.xaml catch')[0]
+    assert example['matches'] == 1
+    assert example['match_example']['rule_id'] == 'TRY_001'
+    assert example['match_example']['location'] == 'TryCatch Leer'
+
+
+def test_fts_search():
+    """Búsqueda por hallazgos y datos con el índice FTS5"""
+    print("\n" + "=" * 70)
+    print("TEST: Búsqueda de texto completo (FTS5)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        if not db.fts_enabled:
+            db.close()
+            print("   ⚠️  SKIP - SQLite sin FTS5")
+            return True
+        ids = _populate(db)
+        _check_queries(db, ids)
+        db.close()
+
+    print("   ✅ PASS - Análisis encontrados por hallazgos, prefijo y datos")
+    return True
+
+
+def test_index_follows_deletes():
+    """Los triggers mantienen el índice al borrar análisis y al reabrir la BD"""
+    print("\n" + "=" * 70)
+    print("TEST: Índice sincronizado con las tablas")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'metrics.db'
+        db = MetricsDatabase(db_path)
+        ids = _populate(db)
+        assert db.delete_analysis(ids['facturas'])
+        assert [row['id'] for row in db.search_analyses('Process.xaml')] == [ids['nominas']]
+        assert db.search_analyses('facturas') == []
+        db.close()
+
+        # Al reabrir no se duplica el índice
+        db = MetricsDatabase(db_path)
+        assert [row['matches'] for row in db.search_analyses('catch vacío')] == [1]
+        db.close()
+
+    print("   ✅ PASS - Análisis borrados fuera del índice")
+    return True
+
+
+def test_like_fallback():
+    """Sin FTS5 la búsqueda usa LIKE y devuelve los mismos análisis"""
+    print("\n" + "=" * 70)
+    print("TEST: Búsqueda con LIKE (sin FTS5)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        ids = _populate(db)
+        db.fts_enabled = False
+
+        def found(query, project=None):
+            return [row['id'] for row in db.search_analyses(query, project)]
+
+        # LIKE no ignora tildes: se busca con el texto tal cual
+        assert found('Process.xaml catch vacío') == [ids['facturas']]
+        assert found('hardcod') == [ids['nominas']]
+        assert found('24.10.1') == [ids['nominas']]
+        assert found('catch', project='Nominas') == [ids['nominas']]
+        # Los comodines de LIKE se buscan literalmente
+        assert found('%') == [] and found('var_') == []
+        assert db.search_analyses('Process.xaml catch')[0]['match_example']['location'] == 'TryCatch Leer'
+        db.close()
+
+    print("   ✅ PASS - Respaldo con LIKE equivalente")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_fts_search(),
+        test_index_follows_deletes(),
+        test_like_fallback(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,83 @@
+"""
+Test del generador determinista de proyectos sintéticos (bench/synthetic_project.py)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from src.xaml_parser import XamlParser
+from src.invocation_graph import InvocationGraph
+from src.project_scanner import ProjectScanner
+
+
+def _read_tree(root: Path) -> dict:
+    """Contenido de todos los archivos generados, por ruta relativa"""
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in sorted(root.rglob('*')) if p.is_file()}
+
+
+def test_generator_is_deterministic():
+    """Misma semilla => mismos bytes; distinta semilla => proyecto distinto"""
+    print("\n" + "=" * 70)
+    print("TEST: Generador determinista")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        generate_project(tmp / 'a', files=15, activities=400, seed=7)
+        generate_project(tmp / 'b', files=15, activities=400, seed=7)
+        generate_project(tmp / 'c', files=15, activities=400, seed=8)
+
+        assert _read_tree(tmp / 'a') == _read_tree(tmp / 'b')
+        assert _read_tree(tmp / 'a') != _read_tree(tmp / 'c')
+
+    print("   ✅ PASS - Salida reproducible")
+    return True
+
+
+def test_generated_project_is_realistic():
+    """El proyecto se parsea sin errores y tiene la forma esperada"""
+    print("\n" + "=" * 70)
+    print("TEST: Proyecto sintético realista")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manifest = generate_project(root, files=40, activities=2000, seed=11)
+
+        parsed = [XamlParser(root / rel).parse() for rel in manifest['files']]
+        assert all('error' not in p for p in parsed)
+        assert len(parsed) == 40
+
+        total_activities = sum(len(p['activities']) for p in parsed)
+        print(f"   Actividades: {total_activities}")
+        assert 1500 <= total_activities <= 3000
+
+        assert any(a['type'] == 'StateMachine' for p in parsed for a in p['activities'])
+        assert max(i['nesting_level'] for p in parsed for i in p['if_activities']) >= 3
+        assert any(p['commented_code']['comment_out_activities'] for p in parsed)
+        assert sum(len(p['log_messages']) for p in parsed) > 40
+
+        info = ProjectScanner(root)._detect_project_info()
+        assert info['type'] == 'REFramework'
+        assert info['dependencies']
+
+        # Los huérfanos del manifiesto son exactamente los no alcanzables
+        graph = InvocationGraph.build(root, parsed)
+        assert graph.unreachable(['Main.xaml']) == manifest['orphans']
+        assert not graph.unresolved
+
+    print("   ✅ PASS - Proyecto realista")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_generator_is_deterministic(),
+        test_generated_project_is_realistic(),
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,133 @@
+"""
+Test de la instrumentación de tiempos por fase, regla y archivo
+Verifica TimingRecorder, result['timings'] del escáner y su persistencia
+en metrics_summary.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.synthetic_project import generate_project
+from src.timing import TimingRecorder, SPAN_PHASE, SPAN_RULE
+from src.project_scanner import ProjectScanner
+from src.database.metrics_db import MetricsDatabase
+from src.analyzer import FILE_CHECKS
+
+
+def test_timing_recorder():
+    """Los spans acumulan segundos, llamadas y hallazgos"""
+    print("\n" + "=" * 70)
+    print("TEST: TimingRecorder")
+    print("=" * 70)
+
+    timings = TimingRecorder()
+    timings.add(SPAN_RULE, '_check_a', 0.25, findings=2)
+    timings.add(SPAN_RULE, '_check_a', 0.25, findings=1)
+    with timings.span(SPAN_PHASE, 'parse'):
+        pass
+    timings.set_count('files', 3)
+
+    data = timings.to_dict()
+    assert data['rules']['_check_a'] == {'seconds': 0.5, 'calls': 2, 'findings': 3}
+    assert data['phases']['parse']['calls'] == 1
+    assert data['counts'] == {'files': 3}
+    assert data['files'] == {}
+
+    timings.clear()
+    assert timings.to_dict()['rules'] == {}
+
+    print("   ✅ PASS - Spans acumulados")
+    return True
+
+
+def test_scan_returns_and_persists_timings():
+    """scan() devuelve spans por fase/regla/archivo y se guardan en metrics_summary"""
+    print("\n" + "=" * 70)
+    print("TEST: Tiempos en el resultado y en la BD")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(Path(tmp) / 'proj', files=10, activities=300, seed=5)
+        scanner = ProjectScanner(Path(manifest['project_path']))
+        result = scanner.scan()
+        timings = result['timings']
+
+        for phase in ('discovery', 'parse', 'rules', 'project_checks', 'invocation_graph',
+                      'version_validation', 'statistics', 'score', 'db_save'):
+            assert phase in timings['phases'], phase
+        assert set(timings['rules']) >= {name for name, _ in FILE_CHECKS}
+        assert '_check_dependencies' in timings['rules']
+        assert len(timings['files']) == result['total_files']
+        assert 'Main.xaml' in timings['files']
+        assert timings['counts']['files'] == result['total_files']
+        assert timings['counts']['findings'] == len(result['findings'])
+
+        # Hallazgos por regla = hallazgos de archivos + proyecto
+        graph_findings = sum(len(f) for f in scanner.missing_findings.values()) + len(scanner.unreachable_findings)
+        rule_findings = sum(entry['findings'] for entry in timings['rules'].values())
+        assert rule_findings == len(result['findings']) - graph_findings
+
+        # Persistencia en una BD temporal (guardar dos veces reemplaza, no duplica)
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        analysis_id = db.save_analysis(result)
+        db.save_timings(analysis_id, timings)
+        stored = db.get_analysis_by_id(analysis_id)['timings']
+        rows = db.conn.execute('SELECT COUNT(*) FROM metrics_summary WHERE analysis_id = ?',
+                               (analysis_id,)).fetchone()[0]
+        db.close()
+
+    assert set(stored['phases']) == set(timings['phases'])
+    assert stored['counts'] == timings['counts']
+    assert stored['rules']['_check_nested_ifs']['findings'] == timings['rules']['_check_nested_ifs']['findings']
+    expected_rows = (len(timings['phases']) + 2 * len(timings['rules'])
+                     + min(20, len(timings['files'])) + len(timings['counts']))
+    assert rows == expected_rows
+
+    print("   ✅ PASS - Tiempos devueltos y persistidos")
+    return True
+
+
+def test_timings_deleted_with_analysis():
+    """Eliminar análisis (uno o los antiguos de un proyecto) borra también sus tiempos"""
+    print("\n" + "=" * 70)
+    print("TEST: Tiempos eliminados con el análisis")
+    print("=" * 70)
+
+    timings = {'phases': {'parse': {'seconds': 0.5}}, 'rules': {'_check_nested_ifs': {'seconds': 0.1, 'findings': 2}},
+               'files': {'Main.xaml': {'seconds': 0.2}}, 'counts': {'files': 1}}
+    analysis = {'project_path': '/robots/Equipo/Tiempos', 'score': {'score': 80},
+                'findings': [], 'statistics': {}, 'timings': timings}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MetricsDatabase(Path(tmp) / 'metrics.db')
+        ids = [db.save_analysis(analysis) for _ in range(4)]
+
+        def timing_rows(analysis_ids):
+            placeholders = ','.join('?' * len(analysis_ids))
+            return db.conn.execute(f'SELECT COUNT(*) FROM metrics_summary WHERE analysis_id IN ({placeholders})',
+                                   analysis_ids).fetchone()[0]
+
+        assert timing_rows(ids) == 4 * 5
+        assert db.delete_analysis(ids[-1])
+        assert timing_rows([ids[-1]]) == 0
+
+        assert db.cleanup_old_analyses('Tiempos', keep_last=1) == 2
+        assert timing_rows(ids[:2]) == 0
+        assert db.get_timings(ids[2])['counts'] == {'files': 1}
+        db.close()
+
+    print("   ✅ PASS - Sin filas huérfanas en metrics_summary")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_timing_recorder(),
+        test_scan_returns_and_persists_timings(),
+        test_timings_deleted_with_analysis(),
+    ]
+    sys.exit(0 if all(results) else 1)
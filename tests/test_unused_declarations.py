@@ -0,0 +1,117 @@
+"""
+Test del índice invertido de identificadores y de las reglas de
+variables/argumentos sin uso (CODIGO_002 / CODIGO_003)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar raíz del proyecto al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.xaml_parser import XamlParser, tokenize_expression
+from src.analyzer import BBPPAnalyzer
+
+
+TEST_XAML = '''<?xml version="1.0" encoding="utf-8"?>
+<Activity x:Class="Main"
+          xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+          xmlns:ui="http://schemas.uipath.com/workflow/activities"
+          xmlns:mca="clr-namespace:Microsoft.CSharp.Activities;assembly=System.Activities"
+          xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <x:Members>
+    <x:Property Name="in_FilePath" Type="InArgument(x:String)" />
+    <x:Property Name="out_Unused" Type="OutArgument(x:String)" />
+  </x:Members>
+  <Sequence DisplayName="Main Sequence">
+    <Sequence.Variables>
+      <Variable x:TypeArguments="x:String" Name="usedInCondition" />
+      <Variable x:TypeArguments="x:String" Name="usedInAssign" />
+      <Variable x:TypeArguments="x:String" Name="usedInCSharp" />
+      <Variable x:TypeArguments="x:String" Name="usedAfterPath" />
+      <Variable x:TypeArguments="x:String" Name="onlyInLiteral" />
+      <Variable x:TypeArguments="x:String" Name="neverUsed" Default="[String.Empty]" />
+    </Sequence.Variables>
+    <If DisplayName="If" Condition="[UsedInCondition.Length &gt; 0]" />
+    <Assign DisplayName="Assign">
+      <Assign.To>
+        <OutArgument x:TypeArguments="x:String">[usedInAssign]</OutArgument>
+      </Assign.To>
+      <Assign.Value>
+        <InArgument x:TypeArguments="x:String">[in_FilePath.Trim]</InArgument>
+      </Assign.Value>
+    </Assign>
+    <ui:LogMessage DisplayName="Log" Message="[&quot;onlyInLiteral es texto&quot;]" />
+    <ui:LogMessage DisplayName="Log Ruta" Message="[&quot;C:\Temp\&quot; + usedAfterPath + &quot;.xlsx&quot;]" />
+    <ui:LogMessage DisplayName="Log CSharp">
+      <ui:LogMessage.Message>
+        <InArgument x:TypeArguments="x:Object">
+          <mca:CSharpValue x:TypeArguments="x:Object">usedInCSharp.ToUpper()</mca:CSharpValue>
+        </InArgument>
+      </ui:LogMessage.Message>
+    </ui:LogMessage>
+  </Sequence>
+</Activity>'''
+
+
+def test_tokenizer():
+    """El tokenizador ignora literales de cadena y accesos a miembros"""
+    print("\n" + "=" * 70)
+    print("TEST: Tokenizador de expresiones")
+    print("=" * 70)
+
+    tokens = tokenize_expression('[in_Config("Key").ToString + "a ""b"" c" & myVar]')
+    assert tokens == ['in_config', 'myvar']
+    assert 'tostring' not in tokenize_expression('[x.ToString]')
+
+    # VB no escapa con \: una ruta que acaba en \ cierra el literal
+    assert tokenize_expression('["C:\\Temp\\" + fileName + ".xlsx"]') == ['filename']
+    # C#: \" escapa la comilla y @"..." es un literal verbatim
+    assert tokenize_expression('"a \\" b" + fileName', csharp=True) == ['filename']
+    assert tokenize_expression('@"C:\\Temp\\" + fileName', csharp=True) == ['filename']
+
+    print("   ✅ PASS - Tokenizador correcto")
+    return True
+
+
+def test_unused_declarations():
+    """Variables y argumentos sin uso detectados mediante el índice invertido"""
+    print("\n" + "=" * 70)
+    print("TEST: Variables y argumentos sin uso")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xaml_path = Path(tmp) / "Main.xaml"
+        xaml_path.write_text(TEST_XAML, encoding='utf-8')
+        data = XamlParser(xaml_path).parse()
+
+    index = data['identifier_index']
+    assert 'usedincondition' in index
+    assert 'usedafterpath' in index
+    assert 'onlyinliteral' not in index
+    assert 'neverused' not in index
+
+    findings = BBPPAnalyzer().analyze(data)
+    unused_vars = sorted(f.details['variable_name'] for f in findings if f.rule_id == 'CODIGO_002')
+    unused_args = sorted(f.details['argument_name'] for f in findings if f.rule_id == 'CODIGO_003')
+    print(f"   Variables sin uso: {unused_vars}")
+    print(f"   Argumentos sin uso: {unused_args}")
+
+    assert unused_vars == ['neverUsed', 'onlyInLiteral']
+    assert unused_args == ['out_Unused']
+
+    # Datos sin índice (p.ej. sintéticos) no generan falsos positivos
+    data.pop('identifier_index')
+    assert not [f for f in BBPPAnalyzer().analyze(data) if f.rule_id in ('CODIGO_002', 'CODIGO_003')]
+
+    print("   ✅ PASS - Declaraciones sin uso detectadas")
+    return True
+
+
+if __name__ == "__main__":
+    results = [
+        test_tokenizer(),
+        test_unused_declarations(),
+    ]
+    sys.exit(0 if all(results) else 1)